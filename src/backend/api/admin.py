@@ -0,0 +1,104 @@
+"""
+Admin diagnostics endpoints
+"""
+
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from security.auth import require_role
+from services.profiler import profiler
+from services.slow_queries import slow_queries
+from services.slo import slo_engine
+from utils.logging import logger
+
+router = APIRouter()
+
+
+@router.post("/profile")
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: float = Query(5.0, ge=1, le=100),
+    slow_callback_ms: float = Query(100.0, ge=1),
+    output: Literal["collapsed", "speedscope"] = Query("collapsed", alias="format"),
+    current_user = Depends(require_role(["admin"]))
+):
+    """
+    Profile the worker serving this request
+    
+    Samples every thread's stack for `seconds` and returns a flame graph
+    (collapsed stacks or a speedscope document) together with event-loop
+    lag and asyncio slow-callback reports for the same window.
+    """
+    if profiler.running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running on this worker"
+        )
+    
+    logger.info(f"Profile of {seconds}s requested by admin {current_user.id}")
+    
+    return await profiler.profile(
+        seconds=seconds,
+        interval=interval_ms / 1000,
+        slow_callback_threshold=slow_callback_ms / 1000,
+        output=output
+    )
+
+
+@router.get("/slow-queries")
+async def list_slow_queries(
+    flagged: bool = Query(False, description="Only shapes with a latency regression or plan change"),
+    sort: Literal["p95", "total", "slow"] = Query("p95"),
+    dataset_id: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    current_user = Depends(require_role(["admin"]))
+):
+    """
+    Query shapes on this worker by latency
+    
+    Shapes are SQL fingerprints with literals stripped. Each carries latency
+    percentiles, row-count stats, recent versus baseline p95 and plan hashes;
+    regressed shapes are listed first with their flags.
+    """
+    return {"summary": slow_queries.state(), "queries": slow_queries.report(
+        flagged_only=flagged, sort=sort, limit=limit, dataset_id=dataset_id
+    )}
+
+
+@router.get("/slow-queries/{fingerprint}")
+async def get_slow_query(
+    fingerprint: str,
+    current_user = Depends(require_role(["admin"]))
+):
+    """One query shape with its captured EXPLAIN plan (and the baseline plan if it changed)"""
+    shape = slow_queries.get(fingerprint)
+    if shape is None:
+        raise HTTPException(status_code=404, detail="Query shape not found on this worker")
+    return shape
+
+
+@router.post("/slow-queries/{fingerprint}/accept")
+async def accept_slow_query(
+    fingerprint: str,
+    current_user = Depends(require_role(["admin"]))
+):
+    """Accept a shape's current latency and plan as its baseline, clearing its flags"""
+    shape = slow_queries.accept(fingerprint)
+    if shape is None:
+        raise HTTPException(status_code=404, detail="Query shape not found on this worker")
+    logger.info(f"Query shape {fingerprint} baseline accepted by admin {current_user.id}")
+    return shape
+
+
+@router.get("/slo")
+async def get_slo_status(
+    current_user = Depends(require_role(["admin"]))
+):
+    """
+    SLO status on this worker
+    
+    For each SLO: state (ok, warning, critical), SLI and burn rate over the
+    5m/1h/6h/30d windows, remaining 30-day error budget, and recent alerts.
+    """
+    return slo_engine.status()
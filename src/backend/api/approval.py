@@ -1,18 +1,53 @@
 """
 Approval workflow endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from db.session import get_db
-from security.auth import get_current_user
+from sqlalchemy import select, update, tuple_, any_, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PGUUID
+from sqlalchemy.orm.exc import StaleDataError
+from db.session import get_db, get_read_db
+from security.auth import get_current_user, require_role
 from utils.logging import logger
+from utils.pagination import encode_cursor, decode_cursor
 from models.approval import ApprovalRequest, ApprovalStatus
-from schemas.approval import ApprovalRequestCreate, ApprovalRequestResponse
+from services.events import event_broker
+from schemas.approval import (
+    ApprovalRequestCreate,
+    ApprovalRequestResponse,
+    ApprovalRequestPage,
+    BulkApprovalAction,
+    BulkApprovalResult,
+)
 
 router = APIRouter()
 
 
+def _notify(action: str, items: list) -> None:
+    """Push approval.updated to approvers and to the requesters concerned"""
+    if not items:
+        return
+    event_broker.publish(
+        "approval.updated",
+        {"action": action, "items": items},
+        user_ids={item["requested_by"] for item in items},
+        roles=("admin", "approver")
+    )
+
+
+def _event_item(approval: ApprovalRequest) -> dict:
+    return {
+        "id": approval.id,
+        "dataset_id": approval.dataset_id,
+        "requested_by": approval.requested_by,
+        "status": approval.status,
+        "version": approval.version,
+    }
+
+
 @router.post("/requests", response_model=ApprovalRequestResponse, status_code=201)
 async def create_approval_request(payload: ApprovalRequestCreate, db: AsyncSession = Depends(get_db), current_user = Depends(get_current_user)):
     """Create an approval request"""
@@ -28,11 +63,112 @@ async def create_approval_request(payload: ApprovalRequestCreate, db: AsyncSessi
     await db.refresh(approval)
 
     logger.info(f"Approval request created: {approval.id} by {approval.requested_by}")
+    _notify("create", [_event_item(approval)])
     return approval
 
 
+@router.get("/requests", response_model=ApprovalRequestPage)
+async def list_approval_requests(
+    status_filter: Optional[ApprovalStatus] = Query(None, alias="status"),
+    dataset_id: Optional[str] = Query(None),
+    requested_by: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """List approval requests newest first with keyset pagination"""
+    stmt = select(ApprovalRequest)
+
+    if status_filter == ApprovalStatus.pending:
+        # Literal predicate so the planner can match the partial pending-queue index
+        stmt = stmt.where(text("approval_requests.status = 'pending'"))
+    elif status_filter is not None:
+        stmt = stmt.where(ApprovalRequest.status == status_filter)
+    if dataset_id:
+        stmt = stmt.where(ApprovalRequest.dataset_id == dataset_id)
+    if requested_by:
+        stmt = stmt.where(ApprovalRequest.requested_by == requested_by)
+
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            after = (datetime.fromisoformat(created_at), UUID(last_id))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+        stmt = stmt.where(tuple_(ApprovalRequest.created_at, ApprovalRequest.id) < tuple_(*after))
+
+    stmt = stmt.order_by(ApprovalRequest.created_at.desc(), ApprovalRequest.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at.isoformat(), rows[-1].id)
+
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+@router.post("/requests/bulk-action", response_model=BulkApprovalResult)
+async def bulk_act_on_approvals(
+    payload: BulkApprovalAction,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role(["admin", "approver"]))
+):
+    """
+    Approve or reject many requests in a single transaction
+
+    Each item carries the version the approver saw. Only pending requests
+    whose version still matches are updated; everything else is returned
+    as a conflict so the client can refresh and retry.
+    """
+    expected = {item.id: item.version for item in payload.items}
+    ids = list(expected)
+
+    values = {
+        "status": ApprovalStatus.approved if payload.action == "approve" else ApprovalStatus.rejected,
+        "approver_id": str(current_user.id),
+        "version": ApprovalRequest.version + 1,
+        "updated_at": datetime.utcnow(),
+    }
+    if payload.comment:
+        values["comment"] = payload.comment
+
+    stmt = (
+        update(ApprovalRequest)
+        .where(ApprovalRequest.id == any_(bindparam("ids", ids, type_=ARRAY(PGUUID(as_uuid=True)))))
+        .where(tuple_(ApprovalRequest.id, ApprovalRequest.version).in_(list(expected.items())))
+        .where(ApprovalRequest.status == ApprovalStatus.pending)
+        .values(**values)
+        .returning(ApprovalRequest.id, ApprovalRequest.version, ApprovalRequest.dataset_id, ApprovalRequest.requested_by)
+        .execution_options(synchronize_session=False)
+    )
+    updated = (await db.execute(stmt)).all()
+    await db.commit()
+    applied = [{"id": row.id, "version": row.version} for row in updated]
+    _notify(payload.action, [
+        {
+            "id": row.id,
+            "dataset_id": row.dataset_id,
+            "requested_by": row.requested_by,
+            "status": values["status"],
+            "version": row.version,
+        }
+        for row in updated
+    ])
+
+    applied_ids = {row["id"] for row in applied}
+    conflicts = [request_id for request_id in ids if request_id not in applied_ids]
+
+    logger.info(
+        f"Bulk approval {payload.action} by {current_user.id}: "
+        f"{len(applied)} applied, {len(conflicts)} conflicts"
+    )
+    return {"action": payload.action, "applied": applied, "conflicts": conflicts}
+
+
 @router.get("/requests/{request_id}", response_model=ApprovalRequestResponse)
-async def get_approval_request(request_id: str, db: AsyncSession = Depends(get_db), current_user = Depends(get_current_user)):
+async def get_approval_request(request_id: str, db: AsyncSession = Depends(get_read_db), current_user = Depends(get_current_user)):
     result = await db.execute(select(ApprovalRequest).where(ApprovalRequest.id == request_id))
     approval = result.scalars().first()
     if not approval:
@@ -41,7 +177,7 @@ async def get_approval_request(request_id: str, db: AsyncSession = Depends(get_d
 
 
 @router.post("/requests/{request_id}/action", response_model=ApprovalRequestResponse)
-async def act_on_approval(request_id: str, action: str, comment: str = None, db: AsyncSession = Depends(get_db), current_user = Depends(get_current_user)):
+async def act_on_approval(request_id: str, action: str, comment: str = None, expected_version: int = None, db: AsyncSession = Depends(get_db), current_user = Depends(get_current_user)):
     """Approve or reject a request. action should be 'approve' or 'reject'"""
     result = await db.execute(select(ApprovalRequest).where(ApprovalRequest.id == request_id))
     approval = result.scalars().first()
@@ -51,11 +187,19 @@ async def act_on_approval(request_id: str, action: str, comment: str = None, db:
     if action not in ("approve", "reject"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid action")
 
+    if expected_version is not None and approval.version != expected_version:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Approval request was modified by another user")
+
     approval.approver_id = str(current_user.id)
     approval.comment = comment or approval.comment
     approval.status = ApprovalStatus.approved if action == "approve" else ApprovalStatus.rejected
-    await db.commit()
+    try:
+        await db.commit()
+    except StaleDataError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Approval request was modified by another user")
     await db.refresh(approval)
 
     logger.info(f"Approval {action} performed by {approval.approver_id} on {approval.id}")
+    _notify(action, [_event_item(approval)])
     return approval
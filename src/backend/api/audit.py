@@ -2,14 +2,13 @@
 Audit trail API endpoints
 """
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query, Request
 from typing import Optional
 from datetime import datetime
 
-from db.session import get_db
 from security.auth import get_current_user
 from utils.logging import logger
+from utils.http_cache import cached_json_response
 
 router = APIRouter()
 
@@ -17,7 +16,6 @@ router = APIRouter()
 @router.get("/trail")
 async def get_audit_trail(
     current_user = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     event_type: Optional[str] = Query(None),
@@ -28,11 +26,8 @@ async def get_audit_trail(
     Get audit trail events
     """
     logger.info(
-        "Audit trail requested",
-        user_id=str(current_user.id),
-        start_date=start_date,
-        end_date=end_date,
-        event_type=event_type
+        f"Audit trail requested by user {current_user.id} - "
+        f"Start: {start_date} - End: {end_date} - Event type: {event_type}"
     )
     
     # TODO: Implement audit trail retrieval from database
@@ -73,21 +68,18 @@ async def get_audit_trail(
 @router.get("/evidence/{evidence_id}")
 async def get_evidence_pack(
     evidence_id: str,
-    current_user = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    current_user = Depends(get_current_user)
 ):
     """
     Get evidence pack by ID
     """
-    logger.info(
-        "Evidence pack requested",
-        user_id=str(current_user.id),
-        evidence_id=evidence_id
-    )
+    logger.info(f"Evidence pack {evidence_id} requested by user {current_user.id}")
     
     # TODO: Implement evidence pack retrieval from S3
     
-    return {
+    # Evidence packs are immutable, so clients can revalidate with If-None-Match
+    return cached_json_response(request, {
         "evidence_id": evidence_id,
         "query_id": "mock-query-id",
         "timestamp": "2026-02-01T10:00:00Z",
@@ -95,4 +87,4 @@ async def get_evidence_pack(
         "validation": {},
         "signature": "SHA256:mock-signature",
         "download_url": f"https://evidence.aureus.com/download/{evidence_id}"
-    }
+    })
@@ -13,7 +13,8 @@ from security.auth import (
     authenticate_user,
     create_access_token,
     create_refresh_token,
-    get_current_user
+    get_current_user,
+    revoke_token
 )
 from config import settings
 from utils.logging import logger
@@ -37,12 +38,12 @@ async def login(
     
     Returns JWT access token and refresh token
     """
-    logger.info("Login attempt", email=form_data.username)
+    logger.info(f"Login attempt for {form_data.username}")
     
     user = await authenticate_user(db, form_data.username, form_data.password)
     
     if not user:
-        logger.warning("Login failed", email=form_data.username)
+        logger.warning(f"Login failed for {form_data.username}")
         observability.track_authentication(form_data.username, False, "Invalid credentials")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,7 +52,7 @@ async def login(
         )
     
     if not user.is_active:
-        logger.warning("Inactive user login attempt", email=form_data.username)
+        logger.warning(f"Inactive user login attempt for {form_data.username}")
         observability.track_authentication(form_data.username, False, "Account disabled")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -71,7 +72,7 @@ async def login(
         expires_delta=refresh_token_expires
     )
     
-    logger.info("Login successful", user_id=str(user.id), email=user.email)
+    logger.info(f"Login successful for user {user.id} ({user.email})")
     observability.track_authentication(user.email, True)
     
     return {
@@ -109,10 +110,11 @@ async def get_current_user_info(current_user = Depends(get_current_user)):
 
 
 @router.post("/logout")
-async def logout(current_user = Depends(get_current_user)):
+async def logout(current_user = Depends(get_current_user), token: str = Depends(oauth2_scheme)):
     """
-    User logout (client should discard tokens)
+    User logout: the access token is revoked (client should still discard tokens)
     """
-    logger.info("User logout", user_id=str(current_user.id))
+    revoke_token(token)
+    logger.info(f"User logout: {current_user.id}")
     
     return {"message": "Successfully logged out"}
@@ -2,77 +2,60 @@
 Dataset management API endpoints
 """
 
-from fastapi import APIRouter, Depends
+import uuid
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
-from db.session import get_db
-from security.auth import get_current_user
+from db.session import get_db, get_read_db
+from models.snapshot import DatasetSnapshot
+from schemas.quality import DataQualityRequest
+from schemas.snapshot import SnapshotRequest, SnapshotResponse
+from security.auth import get_current_user, require_role
+from utils.errors import ValidationError
 from utils.logging import logger
+from services import catalog
+from services.data_quality import dq_engine
+from services.snapshots import default_key_column, snapshots
+from utils.http_cache import cached_json_response
+from middleware import query_rate_limit
 
 router = APIRouter()
 
 
 @router.get("/")
 async def list_datasets(
-    current_user = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    current_user = Depends(get_current_user)
 ):
     """
     List all available datasets
     """
-    logger.info("Datasets list requested", user_id=str(current_user.id))
-    
-    # TODO: Implement dataset listing from database
-    # For now, return mock data
+    logger.info(f"Datasets list requested by user {current_user.id}")
     
-    mock_datasets = [
-        {
-            "id": "dataset-1",
-            "name": "loan_portfolio",
-            "description": "All active and closed loans",
-            "row_count": 125000,
-            "last_updated": "2026-02-01T00:00:00Z",
-            "schema": [
-                {"name": "loan_id", "type": "VARCHAR", "pii": False},
-                {"name": "customer_ssn", "type": "VARCHAR", "pii": True},
-                {"name": "amount", "type": "NUMERIC", "pii": False},
-                {"name": "risk_rating", "type": "VARCHAR", "pii": False}
-            ]
-        },
-        {
-            "id": "dataset-2",
-            "name": "aml_alerts",
-            "description": "Anti-money laundering alerts",
-            "row_count": 8500,
-            "last_updated": "2026-02-01T00:00:00Z",
-            "schema": [
-                {"name": "alert_id", "type": "VARCHAR", "pii": False},
-                {"name": "customer_id", "type": "VARCHAR", "pii": True},
-                {"name": "alert_type", "type": "VARCHAR", "pii": False},
-                {"name": "severity", "type": "VARCHAR", "pii": False}
-            ]
-        }
-    ]
-    
-    return {"datasets": mock_datasets}
+    return cached_json_response(request, {"datasets": catalog.list()})
 
 
 @router.get("/{dataset_id}")
 async def get_dataset(
     dataset_id: str,
-    current_user = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    current_user = Depends(get_current_user)
 ):
     """
     Get dataset details
     """
-    logger.info(
-        "Dataset details requested",
-        user_id=str(current_user.id),
-        dataset_id=dataset_id
-    )
+    logger.info(f"Dataset {dataset_id} details requested by user {current_user.id}")
     
-    # TODO: Implement dataset retrieval
+    card = catalog.get(dataset_id)
+    if card is not None:
+        return cached_json_response(request, card)
     
     return {
         "id": dataset_id,
@@ -80,3 +63,166 @@ async def get_dataset(
         "description": "Mock dataset (not implemented)",
         "row_count": 0
     }
+
+
+@router.post("/{dataset_id}/quality")
+@query_rate_limit()
+async def run_quality_checks(
+    dataset_id: str,
+    request: Request,
+    payload: DataQualityRequest,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    write_db: AsyncSession = Depends(get_db)
+):
+    """
+    Run data-quality checks against a dataset table
+    
+    All checks are evaluated in a single aggregate scan. Passing runs by an
+    admin or approver become the drift baseline for the next run; other
+    users' runs are compared against it but never move it. Returns results
+    and an evidence pack.
+    """
+    card = catalog.get(dataset_id)
+    if card is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    logger.info(f"Data quality run on {dataset_id} ({len(payload.checks)} checks) by user {current_user.id}")
+    try:
+        await dq_engine.load_baselines(db, card["name"])
+        results = await dq_engine.run_sql(db, card["name"], [check.model_dump() for check in payload.checks])
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ProgrammingError, DataError) as e:
+        # A check names a column the table lacks, or one of the wrong type
+        raise HTTPException(status_code=400, detail=f"Data quality checks failed to run: {str(e.orig)}")
+    
+    baseline_updated = results["passed"] and current_user.role in ("admin", "approver")
+    if baseline_updated:
+        await dq_engine.save_baseline(write_db, card["name"], results, str(current_user.id))
+    
+    return {
+        "dataset_id": dataset_id,
+        "passed": results["passed"],
+        "baseline_updated": baseline_updated,
+        "results": results,
+        "evidence": {
+            "dq_run_id": str(uuid.uuid4()),
+            "timestamp": datetime.utcnow().isoformat(),
+            "user_id": str(current_user.id),
+            "dataset_id": dataset_id,
+            "data_quality": results,
+            "lineage": {"source_dataset": dataset_id, "table": card["name"]}
+        }
+    }
+
+
+def _get_card(dataset_id: str) -> dict:
+    card = catalog.get(dataset_id)
+    if card is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return card
+
+
+async def _get_snapshot(db: AsyncSession, card: dict, snapshot_id: UUID, manifest: bool = False) -> DatasetSnapshot:
+    # The manifest column is deferred: only diffs load it
+    options = [undefer(DatasetSnapshot.manifest)] if manifest else None
+    snapshot = await db.get(DatasetSnapshot, snapshot_id, options=options)
+    if snapshot is None or snapshot.dataset_id != card["id"]:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return snapshot
+
+
+@router.post("/{dataset_id}/snapshots", response_model=SnapshotResponse, status_code=status.HTTP_201_CREATED)
+@query_rate_limit()
+async def create_snapshot(
+    dataset_id: str,
+    request: Request,
+    payload: SnapshotRequest = SnapshotRequest(),
+    current_user = Depends(require_role(["admin", "approver"])),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Snapshot a dataset's table
+
+    Records per-bucket content hashes (one scan, no data copy). Later query
+    evidence cites the dataset's latest snapshot.
+    """
+    card = _get_card(dataset_id)
+    key_column = payload.key_column or default_key_column(card)
+    if key_column is None:
+        raise HTTPException(status_code=400, detail="Dataset has no columns; specify key_column")
+    
+    logger.info(f"Snapshot of {card['id']} requested by user {current_user.id}")
+    try:
+        return await snapshots.take(
+            db, card["id"], card["name"], key_column, str(current_user.id), watermark_column=payload.watermark_column
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{dataset_id}/snapshots", response_model=List[SnapshotResponse])
+async def list_snapshots(
+    dataset_id: str,
+    limit: int = Query(20, ge=1, le=200),
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List a dataset's snapshots, newest first"""
+    card = _get_card(dataset_id)
+    return (await db.execute(
+        select(DatasetSnapshot)
+        .where(DatasetSnapshot.dataset_id == card["id"])
+        .order_by(DatasetSnapshot.created_at.desc())
+        .limit(limit)
+    )).scalars().all()
+
+
+@router.get("/{dataset_id}/snapshots/{snapshot_id}", response_model=SnapshotResponse)
+async def get_snapshot(
+    dataset_id: str,
+    snapshot_id: UUID,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a snapshot's watermark, digest and lineage"""
+    return await _get_snapshot(db, _get_card(dataset_id), snapshot_id)
+
+
+@router.get("/{dataset_id}/snapshots/{snapshot_id}/diff")
+@query_rate_limit()
+async def diff_snapshot(
+    dataset_id: str,
+    snapshot_id: UUID,
+    request: Request,
+    against: str = Query("live", description="Snapshot ID to compare with, or 'live' for the current table"),
+    rows: int = Query(0, ge=0, le=10000, description="Current rows to return from changed buckets (live only; admin or approver)"),
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Diff a snapshot against another snapshot or the live table
+
+    Snapshot-to-snapshot diffs compare stored manifests only. Live diffs
+    rehash the table once and can return the current rows of changed
+    buckets; unchanged buckets are never read. Rows include every column,
+    PII too, so only admins and approvers may request them.
+    """
+    if rows > 0 and current_user.role not in ("admin", "approver"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions. Required roles for rows: admin, approver"
+        )
+    card = _get_card(dataset_id)
+    snapshot = await _get_snapshot(db, card, snapshot_id, manifest=True)
+    try:
+        if against == "live":
+            return await snapshots.diff_live(db, snapshot, rows=rows)
+        try:
+            other_id = UUID(against)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="against must be a snapshot ID or 'live'")
+        return snapshots.diff(snapshot, await _get_snapshot(db, card, other_id, manifest=True))
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,172 @@
+"""
+Push notification endpoints (Server-Sent Events and WebSocket)
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, status
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
+
+from db.session import get_autocommit_db
+from security.auth import authenticate_token
+from services.events import event_broker, AUTH_REASONS, EventBroker, Subscriber
+from utils.logging import logger
+
+router = APIRouter()
+
+# Browsers reconnect this many milliseconds after a stream ends
+RECONNECT_MS = 3000
+
+
+class EventStreamResponse(Response):
+    """
+    text/event-stream body fed from a broker subscriber
+
+    A plain ASGI response rather than StreamingResponse: one task waits on
+    the subscriber and one on the client disconnecting, with no task group
+    or body iterator per connection.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(self, subscriber: Subscriber, broker: EventBroker):
+        super().__init__(headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"})
+        # Unbounded body: no Content-Length
+        self.raw_headers = [(name, value) for name, value in self.raw_headers if name != b"content-length"]
+        self.subscriber = subscriber
+        self.broker = broker
+
+    async def __call__(self, scope, receive, send) -> None:
+        watcher = asyncio.ensure_future(self._watch_disconnect(receive))
+        try:
+            await send({"type": "http.response.start", "status": 200, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": f"retry: {RECONNECT_MS}\n\n".encode(), "more_body": True})
+            while True:
+                message = await self.subscriber.get()
+                if message is None:
+                    break
+                event_type, payload = message
+                if event_type == "ping":
+                    frame = b": ping\n\n"
+                else:
+                    frame = b"event: " + event_type.encode() + b"\ndata: " + payload + b"\n\n"
+                await send({"type": "http.response.body", "body": frame, "more_body": True})
+            final = b""
+            if self.subscriber.reason in ("slow_consumer", "shutdown") + AUTH_REASONS:
+                final = b'event: reset\ndata: {"reason": "' + self.subscriber.reason.encode() + b'"}\n\n'
+            await send({"type": "http.response.body", "body": final, "more_body": False})
+        finally:
+            watcher.cancel()
+            self.broker.unsubscribe(self.subscriber)
+
+    async def _watch_disconnect(self, receive) -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        self.subscriber.close("disconnected")
+
+
+def _bearer_token(authorization: Optional[str], access_token: Optional[str]) -> str:
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:]
+    if access_token:
+        return access_token
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _subscribe(user, token: str) -> Optional[Subscriber]:
+    # The token was verified by authenticate_token; its claims bound the connection
+    claims = jwt.get_unverified_claims(token)
+    return event_broker.subscribe(str(user.id), user.role, jti=claims.get("jti"), expires_at=claims.get("exp"))
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    access_token: Optional[str] = Query(None, description="For EventSource, which cannot send headers"),
+    db: AsyncSession = Depends(get_autocommit_db)
+):
+    """
+    Server-Sent Events stream of the caller's notifications
+
+    Authenticates when the stream opens; the stream is closed when the
+    token expires or is revoked, or the user is disabled or changes role.
+    Events: `query.progress` (stage, rows, stage timings), `evidence.ready`,
+    `approval.updated`. A `reset` event before the stream closes means
+    events may have been missed: refetch over REST, then reconnect (with a
+    fresh token when the reason is token_expired, token_revoked,
+    user_disabled or role_changed).
+    """
+    token = _bearer_token(request.headers.get("authorization"), access_token)
+    user = await authenticate_token(db, token)
+    # The stream can stay open for hours; give the connection back now
+    await db.close()
+
+    subscriber = _subscribe(user, token)
+    if subscriber is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event connections on this worker",
+            headers={"Retry-After": "5"}
+        )
+    return EventStreamResponse(subscriber, event_broker)
+
+
+@router.websocket("/ws")
+async def events_websocket(
+    websocket: WebSocket,
+    access_token: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_autocommit_db)
+):
+    """
+    WebSocket variant of the event stream
+
+    Each notification is a text frame `{"event": ..., "data": ...}`.
+    Messages from the client are ignored. Closed with code 1008 when the
+    connection's credentials no longer hold (see stream_events).
+    """
+    try:
+        token = _bearer_token(websocket.headers.get("authorization"), access_token)
+        user = await authenticate_token(db, token)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+    await db.close()
+
+    subscriber = _subscribe(user, token)
+    if subscriber is None:
+        await websocket.close(code=1013, reason="Too many event connections on this worker")
+        return
+
+    await websocket.accept()
+
+    async def watch_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+        subscriber.close("disconnected")
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    try:
+        while True:
+            message = await subscriber.get()
+            if message is None:
+                break
+            event_type, payload = message
+            await websocket.send_text(f'{{"event": "{event_type}", "data": {payload.decode()}}}')
+        if subscriber.reason != "disconnected":
+            if subscriber.reason in AUTH_REASONS:
+                code = 1008
+            else:
+                code = 1013 if subscriber.reason == "slow_consumer" else 1001
+            await websocket.close(code=code, reason=subscriber.reason)
+    except Exception as e:
+        logger.debug(f"Event WebSocket for user {user.id} ended: {str(e)}")
+    finally:
+        watcher.cancel()
+        event_broker.unsubscribe(subscriber)
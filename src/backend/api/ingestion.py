@@ -0,0 +1,87 @@
+"""
+Dataset ingestion API endpoints
+"""
+
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from config import settings
+from schemas.ingestion import IngestionJobResponse
+from security.auth import get_current_user, require_role
+from services.ingestion import ingestion
+from utils.errors import ValidationError
+from utils.logging import logger
+
+router = APIRouter()
+
+
+# Content types accepted when ?format= is omitted
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/vnd.apache.parquet": "parquet",
+}
+
+
+@router.post("/{dataset_id}", response_model=IngestionJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_load(
+    dataset_id: str,
+    request: Request,
+    format: Optional[Literal["csv", "jsonl", "parquet"]] = None,
+    filename: Optional[str] = None,
+    current_user = Depends(require_role(["admin"]))
+):
+    """
+    Load a CSV, JSON Lines or Parquet extract into a dataset
+    
+    The request body is the file itself. It is streamed to disk and loaded
+    by a background worker that replaces the dataset table atomically;
+    poll GET /v1/ingestion/jobs/{job_id} for progress and the evidence pack.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        format = CONTENT_TYPE_FORMATS.get(content_type)
+        if format is None:
+            raise HTTPException(status_code=400, detail="Specify ?format=csv|jsonl|parquet or a matching Content-Type")
+    
+    try:
+        job = await ingestion.submit(
+            dataset_id=dataset_id,
+            data_format=format,
+            chunks=request.stream(),
+            user_id=str(current_user.id),
+            filename=filename,
+            max_bytes=settings.INGESTION_MAX_UPLOAD_BYTES
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(f"Ingestion {job.job_id} into {dataset_id} submitted by user {current_user.id}")
+    return job.to_dict()
+
+
+@router.get("/jobs", response_model=List[IngestionJobResponse])
+async def list_loads(
+    dataset_id: Optional[str] = None,
+    current_user = Depends(get_current_user)
+):
+    """
+    List recent load jobs, newest first
+    """
+    return [job.to_dict() for job in await ingestion.list(dataset_id)]
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_load(
+    job_id: str,
+    current_user = Depends(get_current_user)
+):
+    """
+    Get load job status, throughput and evidence pack
+    """
+    job = await ingestion.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return job.to_dict()
@@ -0,0 +1,239 @@
+"""
+Pipeline API endpoints
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db.session import get_db, get_read_db
+from models.pipeline import Pipeline, PipelineRun, PipelineStepRun
+from schemas.pipeline import (
+    PipelineCreate,
+    PipelineResponse,
+    PipelineRunRequest,
+    PipelineRunResponse,
+    PipelineStepRunResponse,
+)
+from security.auth import get_current_user, require_role
+from services.pipelines import pipeline_engine, validate_pipeline
+from utils.errors import ValidationError
+from utils.logging import logger
+
+router = APIRouter()
+
+
+def _definition(pipeline: Pipeline) -> dict:
+    return {"id": pipeline.id, "version": pipeline.version, "steps": pipeline.steps}
+
+
+async def _run_response(db: AsyncSession, run: PipelineRun) -> PipelineRunResponse:
+    step_runs = (await db.execute(
+        select(PipelineStepRun).where(PipelineStepRun.run_id == run.id).order_by(PipelineStepRun.started_at)
+    )).scalars().all()
+    response = PipelineRunResponse.model_validate(run)
+    response.steps = [PipelineStepRunResponse.model_validate(step_run) for step_run in step_runs]
+    return response
+
+
+async def _get_pipeline(db: AsyncSession, pipeline_id: str) -> Pipeline:
+    pipeline = await db.get(Pipeline, pipeline_id)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail="Pipeline not found")
+    return pipeline
+
+
+async def _ensure_idle(db: AsyncSession, pipeline_id: str) -> None:
+    """409 while a run is executing; runs abandoned by a stopped worker are marked failed instead"""
+    runs = (await db.execute(
+        select(PipelineRun).where(PipelineRun.pipeline_id == pipeline_id, PipelineRun.status == "running")
+    )).scalars().all()
+    now = datetime.utcnow()
+    for run in runs:
+        last_seen = run.heartbeat_at or run.started_at
+        if pipeline_engine.is_active(run.id) or now - last_seen < timedelta(seconds=settings.PIPELINE_STALE_AFTER):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Pipeline run {run.id} is still running")
+        logger.warning(f"Pipeline run {run.id} has had no heartbeat since {last_seen}; marking it failed")
+        run.status = "failed"
+        run.finished_at = now
+        run.evidence = {**(run.evidence or {}), "error": "Abandoned: the worker executing it stopped"}
+
+
+@router.post("/", response_model=PipelineResponse, status_code=201)
+async def create_pipeline(
+    payload: PipelineCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role(["admin", "approver"]))
+):
+    """Register a pipeline; steps are validated as a DAG of read-only SQL"""
+    steps = [step.model_dump() for step in payload.steps]
+    try:
+        validate_pipeline(steps)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if await db.get(Pipeline, payload.pipeline_id) is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Pipeline already exists")
+
+    pipeline = Pipeline(
+        id=payload.pipeline_id,
+        name=payload.name,
+        description=payload.description,
+        steps=steps,
+        created_by=str(current_user.id)
+    )
+    db.add(pipeline)
+    await db.commit()
+    await db.refresh(pipeline)
+
+    logger.info(f"Pipeline {pipeline.id} registered by {current_user.id} with {len(steps)} steps")
+    return pipeline
+
+
+@router.put("/{pipeline_id}", response_model=PipelineResponse)
+async def update_pipeline(
+    pipeline_id: str,
+    payload: PipelineCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role(["admin", "approver"]))
+):
+    """Replace a pipeline's steps; changed steps re-execute on the next run"""
+    if payload.pipeline_id != pipeline_id:
+        raise HTTPException(status_code=400, detail="pipeline_id does not match the path")
+    steps = [step.model_dump() for step in payload.steps]
+    try:
+        validate_pipeline(steps)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    pipeline = await _get_pipeline(db, pipeline_id)
+    await _ensure_idle(db, pipeline_id)
+
+    pipeline.name = payload.name
+    pipeline.description = payload.description
+    pipeline.steps = steps
+    pipeline.version += 1
+    await db.commit()
+    await db.refresh(pipeline)
+
+    logger.info(f"Pipeline {pipeline.id} updated to version {pipeline.version} by {current_user.id}")
+    return pipeline
+
+
+@router.get("/", response_model=List[PipelineResponse])
+async def list_pipelines(
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """List registered pipelines"""
+    return (await db.execute(select(Pipeline).order_by(Pipeline.id))).scalars().all()
+
+
+@router.get("/{pipeline_id}", response_model=PipelineResponse)
+async def get_pipeline(
+    pipeline_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Get a pipeline definition"""
+    return await _get_pipeline(db, pipeline_id)
+
+
+@router.post("/{pipeline_id}/runs", response_model=PipelineRunResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_run(
+    pipeline_id: str,
+    payload: PipelineRunRequest = PipelineRunRequest(),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role(["admin", "approver"]))
+):
+    """
+    Start a pipeline run in the background
+
+    Steps whose inputs are unchanged since their last successful run are
+    skipped unless force is set. Poll the run for per-step progress.
+    """
+    pipeline = await _get_pipeline(db, pipeline_id)
+    await _ensure_idle(db, pipeline_id)
+
+    run = PipelineRun(
+        pipeline_id=pipeline.id,
+        pipeline_version=pipeline.version,
+        status="running",
+        triggered_by=str(current_user.id),
+        force=payload.force
+    )
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+
+    pipeline_engine.start(_definition(pipeline), run.id, force=payload.force)
+    logger.info(f"Pipeline {pipeline.id} run {run.id} started by {current_user.id}")
+    return await _run_response(db, run)
+
+
+@router.get("/{pipeline_id}/runs", response_model=List[PipelineRunResponse])
+async def list_runs(
+    pipeline_id: str,
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """List a pipeline's runs, newest first (without step detail)"""
+    runs = (await db.execute(
+        select(PipelineRun)
+        .where(PipelineRun.pipeline_id == pipeline_id)
+        .order_by(PipelineRun.started_at.desc())
+        .limit(limit)
+    )).scalars().all()
+    return [PipelineRunResponse.model_validate(run) for run in runs]
+
+
+@router.get("/{pipeline_id}/runs/{run_id}", response_model=PipelineRunResponse)
+async def get_run(
+    pipeline_id: str,
+    run_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user = Depends(get_current_user)
+):
+    """Get a run with per-step timing, fingerprints and evidence"""
+    run = await db.get(PipelineRun, run_id)
+    if run is None or run.pipeline_id != pipeline_id:
+        raise HTTPException(status_code=404, detail="Pipeline run not found")
+    return await _run_response(db, run)
+
+
+@router.post("/{pipeline_id}/runs/{run_id}/resume", response_model=PipelineRunResponse, status_code=status.HTTP_202_ACCEPTED)
+async def resume_run(
+    pipeline_id: str,
+    run_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(require_role(["admin", "approver"]))
+):
+    """
+    Resume a failed run from its checkpoint
+
+    Steps that succeeded keep their results; failed and blocked steps run again.
+    """
+    run = await db.get(PipelineRun, run_id)
+    if run is None or run.pipeline_id != pipeline_id:
+        raise HTTPException(status_code=404, detail="Pipeline run not found")
+    if run.status != "failed" or pipeline_engine.is_active(run.id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Only failed runs can be resumed")
+    pipeline = await _get_pipeline(db, pipeline_id)
+    if pipeline.version != run.pipeline_version:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Pipeline changed since this run; start a new run")
+    await _ensure_idle(db, pipeline_id)
+
+    run.status = "running"
+    run.attempts += 1
+    run.finished_at = None
+    run.heartbeat_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(run)
+
+    pipeline_engine.start(_definition(pipeline), run.id, force=run.force)
+    logger.info(f"Pipeline {pipeline.id} run {run.id} resumed (attempt {run.attempts}) by {current_user.id}")
+    return await _run_response(db, run)
@@ -2,15 +2,32 @@
 Query execution API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.session import get_db
-from schemas.query import QueryRequest, QueryResponse
-from security.auth import get_current_user
+from db.session import get_read_db
+from models.query_history import QueryExecution, QueryFingerprint
+from schemas.query import (
+    QueryRequest, QueryResponse, QueryEnvelope, QueryRowsPage,
+    QueryTemplateCreate, QueryTemplateResponse
+)
+from security.auth import get_current_user, require_role
+from services.catalog import catalog
 from services.query_execution import QueryExecutionService
+from services.schema_index import schema_index
+from services.result_cache import result_cache
+from services.result_store import result_store
+from services.query_templates import query_templates
+from services.query_history import query_history
 from utils.logging import logger
-from utils.errors import QueryExecutionError
+from utils.errors import QueryExecutionError, ValidationError
+from utils.serialization import dumps
+from utils.http_cache import conditional_response
+from utils.pagination import encode_cursor, decode_cursor
 from middleware import query_rate_limit
 
 router = APIRouter()
@@ -22,7 +39,7 @@ async def execute_query(
     http_request: Request,
     request: QueryRequest,
     current_user = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Execute SQL query with evidence generation
@@ -33,33 +50,69 @@ async def execute_query(
         f"Query execution requested by user {current_user.id}"
     )
     
+    # Resolve and bind the template before any execution work
+    template = None
+    sql, dataset_id, params = request.sql, request.dataset_id, request.params
+    if request.template_id is not None:
+        template = await query_templates.get(request.template_id)
+        if template is None:
+            raise HTTPException(status_code=404, detail="Query template not found")
+        card = catalog.get(dataset_id) if dataset_id else None
+        if dataset_id and (card["id"] if card else dataset_id) != template.dataset_id:
+            raise HTTPException(status_code=400, detail="dataset_id does not match the query template")
+        try:
+            params = template.bind(request.params)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        sql, dataset_id = template.sql, template.dataset_id
+    
     try:
+        # Retrieve only the schema relevant to the question
+        schema_context = schema_index.retrieve(request.question) if request.question else None
+        
         # Initialize query execution service
         service = QueryExecutionService(db)
         
         # Execute query
         result = await service.execute_query(
-            sql=request.sql,
-            dataset_id=request.dataset_id,
+            sql=sql,
+            dataset_id=dataset_id,
             user_id=str(current_user.id),
             metadata={
                 "nl_query": request.question,
                 "user_email": current_user.email,
                 "user_role": current_user.role
-            }
+            },
+            schema_context=schema_context,
+            row_format=request.row_format,
+            params=params,
+            template=template,
+            checks=[check.model_dump() for check in request.checks] if request.checks else None,
+            page_size=request.page_size
         )
         
-        return {
-            "query_id": result["execution_id"],
-            "status": "completed",
-            "sql": result["sql"],
-            "columns": result["columns"],
-            "data": result["data"],
-            "row_count": result["row_count"],
-            "execution_time": result["execution_time"],
-            "evidence": result["evidence"],
-            "message": "Query executed successfully"
-        }
+        # Validate the envelope only; rows are serialized directly by orjson
+        envelope = QueryEnvelope(
+            query_id=result["execution_id"],
+            status="completed",
+            sql=result["sql"],
+            columns=result["columns"],
+            row_count=result["row_count"],
+            execution_time=result["execution_time"],
+            evidence=result["evidence"],
+            message="Query executed successfully"
+        )
+        content = envelope.model_dump()
+        content["data"] = result["data"]
+        if request.page_size:
+            content["next_cursor"] = result["next_cursor"]
+            content["truncated"] = result["truncated"]
+        
+        # Serialize once; the same bytes back conditional GETs by execution ID
+        body = dumps(content)
+        etag = result_cache.put(result["execution_id"], body, owner_id=str(current_user.id))
+        
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
         
     except QueryExecutionError as e:
         logger.error(f"Query execution error: {str(e)}")
@@ -82,55 +135,214 @@ async def execute_query(
         )
 
 
+@router.get("/templates", response_model=List[QueryTemplateResponse])
+async def list_query_templates(
+    dataset_id: Optional[str] = None,
+    current_user = Depends(get_current_user)
+):
+    """
+    List registered query templates, optionally for one dataset
+    """
+    return [template.to_dict() for template in await query_templates.list(dataset_id)]
+
+
+@router.get("/templates/{template_id}", response_model=QueryTemplateResponse)
+async def get_query_template(
+    template_id: str,
+    current_user = Depends(get_current_user)
+):
+    """
+    Get a query template by ID
+    """
+    template = await query_templates.get(template_id)
+    if template is None:
+        raise HTTPException(status_code=404, detail="Query template not found")
+    return template.to_dict()
+
+
+@router.post("/templates", response_model=QueryTemplateResponse, status_code=status.HTTP_201_CREATED)
+async def create_query_template(
+    request: QueryTemplateCreate,
+    current_user = Depends(require_role(["admin", "approver"]))
+):
+    """
+    Register a query template
+    
+    The SQL is validated and compiled once here; executions only bind parameters
+    """
+    try:
+        template = await query_templates.register(request.model_dump(), created_by=str(current_user.id))
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(f"Query template {template.template_id} created by user {current_user.id}")
+    return template.to_dict()
+
+
+@router.delete("/templates/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_query_template(
+    template_id: str,
+    current_user = Depends(require_role(["admin"]))
+):
+    """
+    Remove a query template
+    """
+    if not await query_templates.remove(template_id):
+        raise HTTPException(status_code=404, detail="Query template not found")
+    logger.info(f"Query template {template_id} removed by user {current_user.id}")
+
+
+@router.get("/analytics", response_model=dict)
+async def get_query_analytics(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    dataset_id: Optional[str] = Query(None),
+    top: int = Query(20, ge=1, le=200),
+    current_user = Depends(require_role(["admin", "approver"])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Query volume and latency summary from the hourly rollups
+    
+    Hourly execution and error counts, and the busiest SQL fingerprints with
+    p50/p95/p99 latency. Reads rollup rows only, never raw executions.
+    """
+    return await query_history.analytics(db, hours=hours, dataset_id=dataset_id, top=top)
+
+
+@router.get("/{query_id}/rows", response_model=QueryRowsPage)
+async def get_query_rows(
+    query_id: str,
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Rows per page (defaults to the execution's page_size)"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Page through a result materialized by POST /execute with page_size
+    
+    Every page comes from the same execution, so rows are neither skipped
+    nor repeated however long the client takes between pages. Each page
+    read extends the result's lifetime by QUERY_RESULT_TTL.
+    """
+    meta = result_store.meta(query_id)
+    if meta is None or (meta["owner_id"] != str(current_user.id) and current_user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Query result not found or expired; re-run the query with page_size")
+    
+    row_offset, byte_offset = 0, 0
+    if cursor:
+        try:
+            row_offset, byte_offset = (int(value) for value in decode_cursor(cursor, 2))
+            page = result_store.read_page(query_id, row_offset, byte_offset, limit)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+    else:
+        page = result_store.read_page(query_id, limit=limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Query result not found or expired; re-run the query with page_size")
+    meta, lines, next_offset = page
+    
+    body = dumps({
+        "query_id": query_id,
+        "columns": meta["columns"],
+        "row_count": meta["row_count"],
+        "truncated": meta["truncated"],
+        "data": result_store.page_data(lines, meta),
+        "next_cursor": encode_cursor(*next_offset) if next_offset else None,
+    })
+    return Response(content=body, media_type="application/json")
+
+
+@router.delete("/{query_id}/rows", status_code=status.HTTP_204_NO_CONTENT)
+async def discard_query_rows(
+    query_id: str,
+    current_user = Depends(get_current_user)
+):
+    """
+    Release a materialized result before its TTL runs out
+    """
+    meta = result_store.meta(query_id)
+    if meta is None or (meta["owner_id"] != str(current_user.id) and current_user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Query result not found or expired")
+    result_store.discard(query_id)
+
+
 @router.get("/{query_id}", response_model=QueryResponse)
 async def get_query_status(
     query_id: str,
+    request: Request,
     current_user = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get query execution status and results
+    
+    Completed results are served with a strong ETag and honor If-None-Match
     """
-    logger.info(
-        "Query status check",
-        user_id=str(current_user.id),
-        query_id=query_id
-    )
+    logger.info(f"Query status check for {query_id} by user {current_user.id}")
     
-    # TODO: Implement query retrieval
-    # 1. Fetch query from database
-    # 2. Check authorization
-    # 3. Return status and results
+    cached = result_cache.get(query_id)
+    if cached is not None:
+        body, etag, owner_id = cached
+        if owner_id != str(current_user.id) and current_user.role != "admin":
+            raise HTTPException(status_code=404, detail="Query not found")
+        return conditional_response(request, body, etag=etag)
+    
+    # Results are no longer cached: report the recorded outcome without rows
+    try:
+        execution = await db.get(QueryExecution, UUID(query_id))
+    except ValueError:
+        execution = None
+    if execution is None or (execution.user_id != str(current_user.id) and current_user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Query not found")
+    fingerprint = await db.get(QueryFingerprint, execution.fingerprint)
     
     return {
         "query_id": query_id,
-        "status": "pending",
-        "message": "Query execution in progress (mock response)"
+        "status": "completed" if execution.status == "success" else "error",
+        "sql": execution.sql_text or (fingerprint.sql_text if fingerprint else None),
+        "row_count": execution.row_count,
+        "execution_time": execution.duration_ms / 1000,
+        "message": execution.error or "Results expired; re-run the query to fetch rows"
     }
 
 
 @router.get("/", response_model=dict)
 async def get_query_history(
+    dataset_id: Optional[str] = Query(None),
+    user_id: Optional[str] = Query(None, description="Another user's history (admin only)"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
     current_user = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-    limit: int = 50,
-    offset: int = 0
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Get user's query history
+    Get query history newest first with keyset pagination
+    
+    Users see their own executions; admins may pass user_id, or omit it
+    together with dataset_id to filter by dataset alone.
     """
-    logger.info(
-        "Query history requested",
-        user_id=str(current_user.id),
-        limit=limit,
-        offset=offset
-    )
+    if current_user.role != "admin":
+        if user_id not in (None, str(current_user.id)):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot read another user's history")
+        user_id = str(current_user.id)
+    elif user_id is None and dataset_id is None:
+        user_id = str(current_user.id)
     
-    # TODO: Implement query history
+    before = None
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            before = (datetime.fromisoformat(created_at), UUID(last_id))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
     
-    return {
-        "queries": [],
-        "total": 0,
-        "limit": limit,
-        "offset": offset
-    }
+    logger.info(f"Query history requested by user {current_user.id}: user={user_id}, dataset={dataset_id}")
+    
+    service = QueryExecutionService(db)
+    queries = await service.get_query_history(user_id=user_id, dataset_id=dataset_id, limit=limit + 1, before=before)
+    
+    next_cursor = None
+    if len(queries) > limit:
+        queries = queries[:limit]
+        next_cursor = encode_cursor(queries[-1]["created_at"].isoformat(), queries[-1]["execution_id"])
+    
+    return {"queries": queries, "limit": limit, "next_cursor": next_cursor}
@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the AUREUS backend
+
+Run from src/backend, e.g.:
+    python -m benchmarks.bench_schema_index
+"""
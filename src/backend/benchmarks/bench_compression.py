@@ -0,0 +1,73 @@
+"""
+Response compression benchmark
+
+Measures bytes on the wire and CPU time per response for each available
+content-coding over representative payloads (query results, dataset
+listing, audit page), plus the cost of a conditional GET that hits 304.
+
+Usage:
+    python -m benchmarks.bench_compression --repeat 20
+"""
+
+import argparse
+import time
+
+from benchmarks.bench_serialization import COLUMNS, synthetic_rows
+from middleware.compression import available_encoders
+from services.catalog import DEFAULT_DATASETS
+from utils.http_cache import compute_etag, etag_matches
+from utils.serialization import dumps
+
+
+def payloads() -> dict:
+    audit_events = [
+        {
+            "event_id": f"event-{i}",
+            "event_type": "query_executed",
+            "user_email": "analyst@aureus-platform.com",
+            "timestamp": "2026-02-01T10:00:00Z",
+            "details": {"dataset": "loan_portfolio", "row_count": i}
+        }
+        for i in range(50)
+    ]
+    return {
+        "query 1k rows": dumps({"columns": COLUMNS, "data": [dict(zip(COLUMNS, row)) for row in synthetic_rows(1000)]}),
+        "query 50k rows": dumps({"columns": COLUMNS, "data": [dict(zip(COLUMNS, row)) for row in synthetic_rows(50000)]}),
+        "query 50k arrays": dumps({"columns": COLUMNS, "data": synthetic_rows(50000)}),
+        "dataset listing": dumps({"datasets": DEFAULT_DATASETS * 50}),
+        "audit page": dumps({"events": audit_events, "total": 50}),
+    }
+
+
+def cpu_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    encoders = available_encoders()
+    print(f"{'payload':<18} {'coding':<9} {'bytes':>10} {'ratio':>7} {'cpu ms':>8}")
+    for name, body in payloads().items():
+        print(f"{name:<18} {'identity':<9} {len(body):>10} {1.0:>7.2f} {0.0:>8.2f}")
+        for coding, factory in encoders.items():
+            compressed = factory().finish(body)
+            ms = cpu_ms(lambda: factory().finish(body), args.repeat)
+            print(f"{'':<18} {coding:<9} {len(compressed):>10} {len(body) / len(compressed):>7.1f} {ms:>8.2f}")
+
+        # Conditional GET with the ETag recomputed from the body; cached query
+        # results store their ETag, so their 304 path skips the hash entirely
+        etag = compute_etag(body)
+        ms = cpu_ms(lambda: etag_matches(etag, compute_etag(body)), args.repeat)
+        print(f"{'':<18} {'304+hash':<9} {0:>10} {'-':>7} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
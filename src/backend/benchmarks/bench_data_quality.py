@@ -0,0 +1,136 @@
+"""
+Data-quality engine benchmark
+
+Runs N declarative checks (null rates, uniqueness, ranges, referential
+integrity and drift, cycled over the columns of a synthetic loan table)
+two ways:
+
+  sql    one aggregate pass against Postgres versus one query per check.
+         The table is generated server-side; per-check timing runs a sample
+         of checks individually and extrapolates. Requires DATABASE_URL.
+  local  the same checks over in-memory NumPy columns.
+
+Usage:
+    python -m benchmarks.bench_data_quality --mode sql --rows 50000000 --checks 100
+    python -m benchmarks.bench_data_quality --mode local --rows 50000000 --checks 100
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from services.data_quality import DataQualityEngine
+
+TABLE = "bench_dq_loans"
+REFERENCE_TABLE = "bench_dq_customers"
+CUSTOMERS = 100000
+
+
+def build_checks(count: int):
+    """`count` checks cycling through every type and column"""
+    templates = [
+        {"type": "unique", "column": "loan_id"},
+        {"type": "null_rate", "column": "loan_id"},
+        {"type": "null_rate", "column": "interest_rate", "max_rate": 0.05},
+        {"type": "range", "column": "amount", "min": 0, "max": 5000000},
+        {"type": "range", "column": "interest_rate", "min": 0, "max": 0.3, "max_rate": 0.01},
+        {"type": "referential", "column": "customer_id", "ref_table": REFERENCE_TABLE, "ref_column": "customer_id"},
+        {"type": "drift", "column": "amount"},
+        {"type": "drift", "column": "interest_rate"},
+        {"type": "range", "column": "term_months", "min": 1, "max": 480},
+        {"type": "null_rate", "column": "customer_id"},
+    ]
+    return [dict(templates[i % len(templates)], name=f"check_{i}") for i in range(count)]
+
+
+async def run_sql(rows: int, checks, per_check_limit: int):
+    from sqlalchemy import text
+    from db.session import AsyncSessionLocal, engine
+
+    async with AsyncSessionLocal() as session:
+        print(f"generating {rows} rows...")
+        await session.execute(text(f"DROP TABLE IF EXISTS {TABLE}, {REFERENCE_TABLE}"))
+        await session.execute(text(
+            f"CREATE TABLE {REFERENCE_TABLE} AS SELECT g AS customer_id FROM generate_series(1, {CUSTOMERS}) AS g"
+        ))
+        await session.execute(text(f"""
+            CREATE TABLE {TABLE} AS
+            SELECT g AS loan_id,
+                   (g % {CUSTOMERS + 10}) + 1 AS customer_id,
+                   (1000 + (g % 100000) * 7.5)::numeric(14, 2) AS amount,
+                   CASE WHEN g % 50 = 0 THEN NULL ELSE 0.02 + (g % 100) / 1000.0 END AS interest_rate,
+                   12 * (1 + g % 30) AS term_months
+            FROM generate_series(1, {rows}) AS g
+        """))
+        await session.execute(text(f"ANALYZE {TABLE}"))
+        await session.commit()
+
+        dq = DataQualityEngine()
+        # Establish drift baselines so drift checks do their bucket counts
+        dq.record_baseline(TABLE, await dq.run_sql(session, TABLE, [c for c in checks if c["type"] == "drift"][:2]))
+
+        start = time.perf_counter()
+        results = await dq.run_sql(session, TABLE, checks)
+        single_pass = time.perf_counter() - start
+
+        sample = checks[:per_check_limit]
+        start = time.perf_counter()
+        for check in sample:
+            await dq.run_sql(session, TABLE, [check])
+        per_check = (time.perf_counter() - start) / len(sample) * len(checks)
+
+        await session.execute(text(f"DROP TABLE IF EXISTS {TABLE}, {REFERENCE_TABLE}"))
+        await session.commit()
+    await engine.dispose()
+
+    failed = len(results["failed"]) + len(results["warnings"])
+    print(f"{'checks':>7} {'rows':>11} {'single pass s':>14} {'per check s':>12} {'speedup':>8} {'failing':>8}")
+    print(f"{len(checks):>7} {rows:>11} {single_pass:>14.2f} {per_check:>12.2f} {per_check / single_pass:>7.1f}x {failed:>8}")
+    print(f"(per-check time extrapolated from {len(sample)} individual queries)")
+
+
+def run_local(rows: int, checks):
+    rng = np.random.default_rng(7)
+    g = np.arange(1, rows + 1, dtype=np.int64)
+    interest = 0.02 + (g % 100) / 1000.0
+    interest[g % 50 == 0] = np.nan
+    columns = {
+        "loan_id": g,
+        "customer_id": (g % (CUSTOMERS + 10)) + 1,
+        "amount": 1000 + (g % 100000) * 7.5 + rng.normal(0, 1, rows),
+        "interest_rate": interest,
+        "term_months": 12 * (1 + g % 30),
+    }
+    references = {f"{REFERENCE_TABLE}.customer_id": np.arange(1, CUSTOMERS + 1)}
+
+    dq = DataQualityEngine()
+    dq.record_baseline(TABLE, dq.run_local(TABLE, columns, [c for c in checks if c["type"] == "drift"][:2]))
+
+    start = time.perf_counter()
+    results = dq.run_local(TABLE, columns, checks, references=references)
+    elapsed = time.perf_counter() - start
+
+    failed = len(results["failed"]) + len(results["warnings"])
+    print(f"{'checks':>7} {'rows':>11} {'local s':>9} {'Mrows*checks/s':>15} {'failing':>8}")
+    print(f"{len(checks):>7} {rows:>11} {elapsed:>9.2f} {rows * len(checks) / elapsed / 1e6:>15.1f} {failed:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["sql", "local"], default="local")
+    parser.add_argument("--rows", type=int, default=50000000)
+    parser.add_argument("--checks", type=int, default=100)
+    parser.add_argument("--per-check-limit", type=int, default=10, help="checks timed individually in sql mode")
+    args = parser.parse_args()
+
+    checks = build_checks(args.checks)
+    if args.mode == "sql":
+        asyncio.run(run_sql(args.rows, checks, args.per_check_limit))
+    else:
+        run_local(args.rows, checks)
+
+
+if __name__ == "__main__":
+    main()
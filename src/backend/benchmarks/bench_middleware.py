@@ -0,0 +1,105 @@
+"""
+Request tracking middleware benchmark
+
+Compares bare-endpoint throughput of the previous BaseHTTPMiddleware
+request tracking (uuid4, time.time, track_request plus a log line) with
+the pure ASGI RequestTrackingMiddleware. Requests are driven in-process
+through httpx's ASGI transport at fixed concurrency; logs go to /dev/null
+so formatting cost is counted but terminal I/O is not.
+
+Usage:
+    python -m benchmarks.bench_middleware --requests 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+from middleware.request_tracking import RequestTrackingMiddleware
+from services.observability import ObservabilityService
+from utils.logging import logger
+
+
+def legacy_app() -> FastAPI:
+    app = FastAPI()
+    registry = ObservabilityService()
+
+    @app.middleware("http")
+    async def add_request_id(request: Request, call_next):
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        response.headers["X-Request-ID"] = request_id
+        response.headers["X-Process-Time"] = str(process_time)
+        registry.track_request(request.method, request.url.path, response.status_code, process_time)
+        logger.info(
+            f"Request processed: {request.method} {request.url.path} - "
+            f"Status: {response.status_code} - Time: {process_time:.3f}s - "
+            f"RequestID: {request_id}"
+        )
+        return response
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    return app
+
+
+def asgi_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestTrackingMiddleware, registry=ObservabilityService())
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    return app
+
+
+async def drive(app: FastAPI, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/ping")
+                assert response.status_code == 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    root = logging.getLogger()
+    root.handlers = [logging.StreamHandler(open(os.devnull, "w"))]
+    root.setLevel(logging.INFO)
+
+    results = {}
+    for name, factory in (("BaseHTTPMiddleware", legacy_app), ("pure ASGI", asgi_app)):
+        app = factory()
+        asyncio.run(drive(app, min(500, args.requests), args.concurrency))  # warm-up
+        results[name] = asyncio.run(drive(app, args.requests, args.concurrency))
+        print(f"{name:<20} {results[name]:>10.0f} req/s")
+
+    print(f"{'speedup':<20} {results['pure ASGI'] / results['BaseHTTPMiddleware']:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
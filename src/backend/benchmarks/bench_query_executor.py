@@ -0,0 +1,97 @@
+"""
+Query executor benchmark
+
+Compares fetching and shaping result sets through the SQLAlchemy path
+(text() -> Row -> dict, and Row -> tuple) with the raw asyncpg executor
+(prepared statement -> Record, and Records -> column lists). Rows are
+generated server-side with generate_series, so the database does the same
+work on every path. Requires a reachable Postgres at DATABASE_URL.
+
+Usage:
+    python -m benchmarks.bench_query_executor --rows 1000 100000 1000000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from benchmarks.bench_serialization import COLUMNS
+from db.session import AsyncSessionLocal, engine
+from services.asyncpg_executor import AsyncpgExecutor
+
+
+def generate_sql(count: int) -> str:
+    return f"""
+        SELECT 'LN-' || lpad(g::text, 8, '0') AS {COLUMNS[0]},
+               md5(g::text)::uuid AS {COLUMNS[1]},
+               (1000 + g + 0.25)::numeric(14, 2) AS {COLUMNS[2]},
+               0.0650::numeric(6, 4) AS {COLUMNS[3]},
+               (ARRAY['Low', 'Medium', 'High'])[g % 3 + 1] AS {COLUMNS[4]},
+               timestamp '2026-01-01' + g * interval '1 minute' AS {COLUMNS[5]}
+        FROM generate_series(1, {count}) AS g
+    """
+
+
+async def sqlalchemy_dicts(session, sql: str):
+    result = await session.execute(text(sql))
+    rows = result.fetchall()
+    columns = list(result.keys())
+    return [dict(zip(columns, row)) for row in rows]
+
+
+async def sqlalchemy_tuples(session, sql: str):
+    result = await session.execute(text(sql))
+    return [tuple(row) for row in result.fetchall()]
+
+
+async def asyncpg_records(executor, session, sql: str):
+    _, records = await executor.fetch(session, sql)
+    return records
+
+
+async def asyncpg_columns(executor, session, sql: str):
+    _, records = await executor.fetch(session, sql)
+    return [list(column) for column in zip(*records)]
+
+
+async def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def run(row_counts, repeat: int):
+    executor = AsyncpgExecutor()
+    print(f"{'rows':>9} {'sa dicts ms':>12} {'sa tuples ms':>13} {'records ms':>11} {'columns ms':>11} {'speedup':>8}")
+    async with AsyncSessionLocal() as session:
+        for count in row_counts:
+            sql = generate_sql(count)
+            # Prime the statement cache; steady state is what matters
+            await executor.fetch(session, sql)
+            dicts_ms = await timed(lambda: sqlalchemy_dicts(session, sql), repeat)
+            tuples_ms = await timed(lambda: sqlalchemy_tuples(session, sql), repeat)
+            records_ms = await timed(lambda: asyncpg_records(executor, session, sql), repeat)
+            columns_ms = await timed(lambda: asyncpg_columns(executor, session, sql), repeat)
+            print(
+                f"{count:>9} {dicts_ms:>12.1f} {tuples_ms:>13.1f} {records_ms:>11.1f} "
+                f"{columns_ms:>11.1f} {dicts_ms / records_ms:>7.1f}x"
+            )
+    print(f"statement cache: {executor.state()}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
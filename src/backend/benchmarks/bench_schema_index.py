@@ -0,0 +1,124 @@
+"""
+Schema index retrieval benchmark
+
+Builds a synthetic catalog (default 10k tables x 20 columns) and reports
+build time, incremental update time and retrieval latency percentiles,
+with and without a hashed bag-of-words embedder.
+
+Usage:
+    python -m benchmarks.bench_schema_index --tables 10000 --queries 500
+"""
+
+import argparse
+import random
+import statistics
+import time
+import zlib
+
+import numpy as np
+
+from services.schema_index import SchemaIndex, tokenize
+
+
+DOMAINS = [
+    "loan", "deposit", "card", "payment", "customer", "alert", "trade", "account",
+    "collateral", "mortgage", "branch", "merchant", "wire", "ledger", "exposure"
+]
+ATTRIBUTES = [
+    "amount", "balance", "rating", "status", "date", "country", "currency", "score",
+    "limit", "rate", "segment", "type", "owner", "region", "maturity", "fee",
+    "channel", "product", "industry", "severity"
+]
+QUESTIONS = [
+    "show high risk loans by industry",
+    "total outstanding balance per customer segment",
+    "aml alerts with severity above 80 in the last week",
+    "which merchants have the most card payments",
+    "wire transfers by country and currency",
+    "mortgage maturity date distribution by region",
+]
+
+
+def synthetic_card(i: int, rng: random.Random) -> dict:
+    domain = rng.choice(DOMAINS)
+    qualifier = rng.choice(DOMAINS)
+    columns = [
+        {
+            "name": f"{domain}_{attribute}",
+            "type": rng.choice(["VARCHAR", "NUMERIC", "DATE"]),
+            "description": f"{attribute} of the {domain} ({qualifier})"
+        }
+        for attribute in rng.sample(ATTRIBUTES, 20)
+    ]
+    return {
+        "id": f"dataset-{i}",
+        "name": f"{domain}_{qualifier}_{i}",
+        "description": f"{domain} records joined with {qualifier} reference data",
+        "schema": columns
+    }
+
+
+def hashed_embedder(dim: int = 256):
+    """Deterministic local embedder: hashed bag of tokens"""
+    def embed(texts):
+        matrix = np.zeros((len(texts), dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                matrix[row, zlib.crc32(token.encode()) % dim] += 1.0
+        return matrix
+    return embed
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(tables: int, queries: int, embedder=None) -> dict:
+    rng = random.Random(42)
+    cards = [synthetic_card(i, rng) for i in range(tables)]
+
+    index = SchemaIndex(embedder=embedder)
+    start = time.perf_counter()
+    for card in cards:
+        index.upsert(card)
+    build_s = time.perf_counter() - start
+
+    # Incremental update: replace 1% of cards
+    start = time.perf_counter()
+    for card in rng.sample(cards, max(1, tables // 100)):
+        index.upsert(dict(card, description=card["description"] + " refreshed"))
+    update_ms = (time.perf_counter() - start) * 1000 / max(1, tables // 100)
+
+    latencies = []
+    for i in range(queries):
+        start = time.perf_counter()
+        index.retrieve(QUESTIONS[i % len(QUESTIONS)])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "build_s": build_s,
+        "update_ms": update_ms,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12} {'build s':>9} {'upsert ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for mode, embedder in (("bm25", None), ("hybrid", hashed_embedder())):
+        result = run(args.tables, args.queries, embedder)
+        print(
+            f"{mode:<12} {result['build_s']:>9.2f} {result['update_ms']:>10.3f} "
+            f"{result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f} {result['p99_ms']:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Query response serialization benchmark
+
+Compares the previous path (FastAPI response_model validation of every row,
+then stdlib json rendering) with the fast path (envelope-only validation,
+rows rendered by orjson) for result sets of increasing size. Rows mix
+Decimal, datetime, UUID, int and str values like a typical loan query.
+
+Usage:
+    python -m benchmarks.bench_serialization --rows 1000 10000 50000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from schemas.query import QueryResponse, QueryEnvelope
+from utils.serialization import AureusJSONResponse
+
+
+COLUMNS = ["loan_id", "customer_id", "amount", "rate", "risk_rating", "originated_at"]
+
+
+def synthetic_rows(count: int):
+    base = datetime(2026, 1, 1)
+    return [
+        (
+            f"LN-{i:08d}",
+            uuid.UUID(int=i),
+            Decimal(f"{1000 + i}.25"),
+            Decimal("0.0650"),
+            ("Low", "Medium", "High")[i % 3],
+            base + timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+
+def envelope_fields(count: int) -> dict:
+    return {
+        "query_id": str(uuid.uuid4()),
+        "status": "completed",
+        "sql": "SELECT * FROM loan_portfolio",
+        "columns": COLUMNS,
+        "row_count": count,
+        "execution_time": 0.1,
+        "evidence": {"execution_id": "bench", "lineage": {"source_dataset": "loan_portfolio"}},
+        "message": "Query executed successfully"
+    }
+
+
+async def legacy_path(rows) -> bytes:
+    field = create_response_field(name="response", type_=QueryResponse)
+    content = envelope_fields(len(rows))
+    content["data"] = [dict(zip(COLUMNS, row)) for row in rows]
+    serialized = await serialize_response(field=field, response_content=content)
+    return JSONResponse(serialized).body
+
+
+def fast_path(rows, row_format: str) -> bytes:
+    content = QueryEnvelope(**envelope_fields(len(rows))).model_dump()
+    if row_format == "arrays":
+        content["data"] = rows
+    else:
+        content["data"] = [dict(zip(COLUMNS, row)) for row in rows]
+    return AureusJSONResponse(content).body
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - start)
+        size = len(body)
+    return best * 1000, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    print(f"{'rows':>8} {'legacy ms':>10} {'objects ms':>11} {'arrays ms':>10} {'speedup':>8} {'bytes':>10}")
+    for count in args.rows:
+        rows = synthetic_rows(count)
+        legacy_ms, _ = timed(lambda: loop.run_until_complete(legacy_path(rows)), args.repeat)
+        objects_ms, size = timed(lambda: fast_path(rows, "objects"), args.repeat)
+        arrays_ms, _ = timed(lambda: fast_path(rows, "arrays"), args.repeat)
+        print(
+            f"{count:>8} {legacy_ms:>10.2f} {objects_ms:>11.2f} {arrays_ms:>10.2f} "
+            f"{legacy_ms / objects_ms:>7.1f}x {size:>10}"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Database session lifecycle benchmark
+
+Drives one endpoint at a time through the in-process app against a real
+Postgres and reports p50/p95 latency together with connection pool use:
+connections checked out per request, how long each was held, and the
+mean and peak number in use. Each endpoint runs twice:
+
+    before  every request shares one get_db session (user lookup and
+            handler in one read-write transaction, always committed)
+    after   the user lookup runs in autocommit and returns its connection
+            at once; read handlers use get_read_db (BEGIN READ ONLY, no
+            commit); handlers that never query hold no connection
+
+Requires a reachable Postgres at DATABASE_URL with the load-test data
+(python -m benchmarks.loadtest --base-url ... --seed-database loads it);
+the stand-ins of the in-process load test cannot model pool use, so this
+benchmark is run by hand rather than in CI, and exits with a message
+when Postgres is unreachable.
+
+Usage:
+    python -m benchmarks.bench_sessions --concurrency 16 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_STORAGE_URI", "memory://")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+from fastapi import Depends
+from jose import jwt
+from sqlalchemy import event
+
+from benchmarks.loadtest import QUERIES, login
+from db.session import AsyncSessionLocal, engine, get_autocommit_db, get_db, get_read_db
+from security.auth import authenticate_token, create_access_token, get_current_user, oauth2_scheme
+
+
+async def legacy_get_db():
+    """get_db as it was: one read-write session per request, always committed"""
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def legacy_get_current_user(token: str = Depends(oauth2_scheme), db=Depends(legacy_get_db)):
+    return await authenticate_token(db, token)
+
+
+LEGACY_OVERRIDES = {
+    get_db: legacy_get_db,
+    get_read_db: legacy_get_db,
+    get_autocommit_db: legacy_get_db,
+    get_current_user: legacy_get_current_user,
+}
+
+
+class PoolMonitor:
+    """Connection checkouts, hold times and connections in use, from pool events and sampling"""
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.checkouts = 0
+        self.hold_seconds = 0.0
+        self.in_use: List[int] = []
+        pool = engine.sync_engine.pool
+        event.listen(pool, "checkout", self._checkout)
+        event.listen(pool, "checkin", self._checkin)
+
+    def _checkout(self, dbapi_connection, record, proxy) -> None:
+        self.checkouts += 1
+        record.info["checked_out_at"] = time.perf_counter()
+
+    def _checkin(self, dbapi_connection, record) -> None:
+        started = record.info.pop("checked_out_at", None)
+        if started is not None:
+            self.hold_seconds += time.perf_counter() - started
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.hold_seconds = 0.0
+        self.in_use = []
+
+    async def sample(self, until: float) -> None:
+        while time.perf_counter() < until:
+            self.in_use.append(engine.pool.checkedout())
+            await asyncio.sleep(self.interval)
+
+
+def endpoints(tokens: Dict[str, str], user_id: str) -> Dict[str, Callable]:
+    analyst = {"Authorization": f"Bearer {tokens['analyst']}"}
+
+    def logout(client: httpx.AsyncClient):
+        # Logout revokes the token it is called with: use a fresh one each time
+        token = create_access_token({"sub": user_id})
+        return client.post("/v1/auth/logout", headers={"Authorization": f"Bearer {token}"})
+
+    return {
+        "datasets": lambda client: client.get("/v1/datasets/", headers=analyst),
+        "audit_trail": lambda client: client.get("/v1/audit/trail", headers=analyst),
+        "logout": logout,
+        "query_execute": lambda client: client.post(
+            "/v1/query/execute", json={"sql": QUERIES[1][1], "dataset_id": QUERIES[1][0]}, headers=analyst
+        ),
+        "query_history": lambda client: client.get("/v1/query/", headers=analyst),
+    }
+
+
+async def measure(client: httpx.AsyncClient, request: Callable, monitor: PoolMonitor, concurrency: int, duration: float) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            began = time.perf_counter()
+            response = await request(client)
+            latencies.append((time.perf_counter() - began) * 1000)
+            errors += response.status_code >= 400
+
+    monitor.reset()
+    await asyncio.gather(monitor.sample(deadline), *(worker() for _ in range(concurrency)))
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "checkouts_per_request": monitor.checkouts / max(len(latencies), 1),
+        "hold_ms": monitor.hold_seconds * 1000 / max(monitor.checkouts, 1),
+        "mean_in_use": statistics.fmean(monitor.in_use) if monitor.in_use else 0.0,
+        "peak_in_use": max(monitor.in_use, default=0),
+    }
+
+
+async def run(concurrency: int, duration: float, selected: List[str]) -> None:
+    from main import app
+
+    try:
+        async with engine.connect():
+            pass
+    except OSError as e:
+        raise SystemExit(f"bench_sessions needs Postgres at DATABASE_URL: {str(e)}")
+
+    monitor = PoolMonitor()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60.0) as client:
+        response = await login(client, "loadtest-analyst@aureus-platform.com")
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        user_id = jwt.get_unverified_claims(token)["sub"]
+        requests = endpoints({"analyst": token}, user_id)
+
+        print(
+            f"{'endpoint':<14} {'mode':<7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'conns/req':>9} {'hold ms':>8} {'in use':>7} {'peak':>5} {'errors':>7}"
+        )
+        for name in selected or list(requests):
+            for mode in ("before", "after"):
+                app.dependency_overrides.clear()
+                if mode == "before":
+                    app.dependency_overrides.update(LEGACY_OVERRIDES)
+                # Warm the pool and statement caches for this mode
+                await measure(client, requests[name], monitor, concurrency, min(duration, 1.0))
+                row = await measure(client, requests[name], monitor, concurrency, duration)
+                print(
+                    f"{name:<14} {mode:<7} {row['rps']:>8.0f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+                    f"{row['checkouts_per_request']:>9.2f} {row['hold_ms']:>8.2f} {row['mean_in_use']:>7.2f} "
+                    f"{row['peak_in_use']:>5} {row['errors']:>7}"
+                )
+        app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--endpoints", nargs="*", default=[], help="Subset of endpoints to run")
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.duration, args.endpoints))
+
+
+if __name__ == "__main__":
+    main()
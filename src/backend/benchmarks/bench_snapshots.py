@@ -0,0 +1,166 @@
+"""
+Dataset snapshot benchmark
+
+Snapshots a table, applies churn (updates, deletes and inserts of a
+fraction of rows), snapshots again and diffs the two manifests:
+
+  sql    against Postgres with the service's own scan. The table is
+         generated server-side. Requires DATABASE_URL.
+  local  the same bucketing and hashing over NumPy arrays (splitmix64
+         stands in for hashtextextended), in chunks to bound memory.
+
+Reported: snapshot time, manifest size, diff time, and the share of
+buckets (and so of rows) a row-level diff has to read.
+
+Usage:
+    python -m benchmarks.bench_snapshots --mode sql --rows 100000000 --churn 0.001
+    python -m benchmarks.bench_snapshots --mode local --rows 100000000 --churn 0.001
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from services.snapshots import bucket_count_for, diff_manifests, pack_manifest
+
+TABLE = "bench_snapshot_loans"
+CHUNK_ROWS = 5000000
+
+
+def report(rows: int, bucket_count: int, first: float, second: float, churned: int, manifest: bytes, diff: dict, diff_seconds: float):
+    print(f"{'rows':>11} {'buckets':>9} {'churned':>8} {'snap1 s':>8} {'snap2 s':>8} {'manifest MB':>12} "
+          f"{'diff ms':>8} {'changed':>8} {'read %':>7}")
+    print(f"{rows:>11} {bucket_count:>9} {churned:>8} {first:>8.2f} {second:>8.2f} {len(manifest) / 1e6:>12.1f} "
+          f"{diff_seconds * 1000:>8.2f} {diff['changed_buckets']:>8} {diff['changed_fraction'] * 100:>6.2f}%")
+    print("(read %: share of buckets a row-level diff reads; the rest are proven unchanged)")
+
+
+async def run_sql(rows: int, churn: float, bucket_rows: int, max_buckets: int):
+    from sqlalchemy import text
+    from db.session import AsyncSessionLocal, engine
+    from services.snapshots import SnapshotService
+
+    service = SnapshotService(bucket_rows=bucket_rows, max_buckets=max_buckets)
+    bucket_count = bucket_count_for(rows, bucket_rows, max_buckets)
+    churned = int(rows * churn)
+    async with AsyncSessionLocal() as session:
+        print(f"generating {rows} rows...")
+        await session.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await session.execute(text(f"""
+            CREATE TABLE {TABLE} AS
+            SELECT g AS loan_id,
+                   (1000 + (g % 100000) * 7.5)::numeric(14, 2) AS amount,
+                   0.02 + (g % 100) / 1000.0 AS interest_rate,
+                   now() - (g % 1000) * interval '1 minute' AS updated_at
+            FROM generate_series(1, {rows}) AS g
+        """))
+        await session.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (loan_id)"))
+        await session.commit()
+
+        start = time.perf_counter()
+        before, _, _ = await service.scan(session, TABLE, "loan_id", bucket_count, "updated_at")
+        first = time.perf_counter() - start
+
+        # Churn: half updates, a quarter deletes, a quarter inserts, spread over the key space
+        step = max(rows // max(churned, 1), 1)
+        await session.execute(text(
+            f"UPDATE {TABLE} SET amount = amount + 1, updated_at = now() WHERE loan_id % {step} = 0 AND loan_id % {2 * step} <> 0"
+        ))
+        await session.execute(text(f"DELETE FROM {TABLE} WHERE loan_id % {4 * step} = 0"))
+        await session.execute(text(
+            f"INSERT INTO {TABLE} SELECT {rows} + g, 1000, 0.05, now() FROM generate_series(1, {churned // 4}) AS g"
+        ))
+        await session.commit()
+
+        start = time.perf_counter()
+        after, _, _ = await service.scan(session, TABLE, "loan_id", bucket_count, "updated_at")
+        second = time.perf_counter() - start
+
+        await session.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await session.commit()
+    await engine.dispose()
+
+    start = time.perf_counter()
+    diff = diff_manifests(before, after, bucket_count, 1000)
+    report(rows, bucket_count, first, second, churned, after, diff, time.perf_counter() - start)
+
+
+def splitmix64(values):
+    z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def local_manifest(keys, versions, bucket_count: int) -> bytes:
+    """Per-bucket counts and wrapped hash sums, computed in 16-bit limbs so float bincounts stay exact"""
+    counts = np.zeros(bucket_count, dtype=np.int64)
+    limbs = np.zeros((4, bucket_count), dtype=np.float64)
+    mask = np.uint64(bucket_count - 1)
+    with np.errstate(over="ignore"):
+        for offset in range(0, keys.size, CHUNK_ROWS):
+            chunk_keys = keys[offset:offset + CHUNK_ROWS]
+            buckets = (splitmix64(chunk_keys) & mask).astype(np.int64)
+            content = splitmix64(splitmix64(chunk_keys) ^ versions[offset:offset + CHUNK_ROWS].astype(np.uint64))
+            counts += np.bincount(buckets, minlength=bucket_count)
+            for limb in range(4):
+                weights = ((content >> np.uint64(16 * limb)) & np.uint64(0xFFFF)).astype(np.float64)
+                limbs[limb] += np.bincount(buckets, weights=weights, minlength=bucket_count)
+    hashes = np.zeros(bucket_count, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for limb in range(4):
+            hashes += limbs[limb].astype(np.uint64) << np.uint64(16 * limb)
+    return pack_manifest(counts, hashes)
+
+
+def run_local(rows: int, churn: float, bucket_rows: int, max_buckets: int):
+    rng = np.random.default_rng(7)
+    bucket_count = bucket_count_for(rows, bucket_rows, max_buckets)
+    keys = np.arange(1, rows + 1, dtype=np.int64)
+    versions = np.zeros(rows, dtype=np.uint8)
+
+    start = time.perf_counter()
+    before = local_manifest(keys, versions, bucket_count)
+    first = time.perf_counter() - start
+
+    churned = int(rows * churn)
+    touched = rng.choice(rows, size=churned, replace=False)
+    updates, deletes = touched[:churned // 2], touched[churned // 2:churned // 2 + churned // 4]
+    versions[updates] += 1
+    keep = np.ones(rows, dtype=bool)
+    keep[deletes] = False
+    inserted = np.arange(rows + 1, rows + 1 + churned // 4, dtype=np.int64)
+    keys = np.concatenate([keys[keep], inserted])
+    versions = np.concatenate([versions[keep], np.zeros(inserted.size, dtype=np.uint8)])
+
+    start = time.perf_counter()
+    after = local_manifest(keys, versions, bucket_count)
+    second = time.perf_counter() - start
+
+    start = time.perf_counter()
+    diff = diff_manifests(before, after, bucket_count, 1000)
+    report(rows, bucket_count, first, second, churned, after, diff, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["sql", "local"], default="local")
+    parser.add_argument("--rows", type=int, default=100000000)
+    parser.add_argument("--churn", type=float, default=0.001, help="fraction of rows updated, deleted or inserted")
+    parser.add_argument("--bucket-rows", type=int, default=None, help="defaults to SNAPSHOT_BUCKET_ROWS")
+    parser.add_argument("--max-buckets", type=int, default=None, help="defaults to SNAPSHOT_MAX_BUCKETS")
+    args = parser.parse_args()
+
+    from config import settings
+    bucket_rows = args.bucket_rows or settings.SNAPSHOT_BUCKET_ROWS
+    max_buckets = args.max_buckets or settings.SNAPSHOT_MAX_BUCKETS
+    if args.mode == "sql":
+        asyncio.run(run_sql(args.rows, args.churn, bucket_rows, max_buckets))
+    else:
+        run_local(args.rows, args.churn, bucket_rows, max_buckets)
+
+
+if __name__ == "__main__":
+    main()
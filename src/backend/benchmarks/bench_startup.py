@@ -0,0 +1,101 @@
+"""
+API startup benchmark
+
+Measures cold import time of the application module, time until the first
+/health request is served by a fresh uvicorn process, and the slowest
+modules reported by `python -X importtime`. Each measurement runs in a new
+interpreter so nothing is warm from a previous run.
+
+Usage:
+    python -m benchmarks.bench_startup --repeat 5 --top 15
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def import_time_ms() -> float:
+    code = "import time; s = time.perf_counter(); import main; print((time.perf_counter() - s) * 1000)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=_env(),
+        capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request_ms(timeout: float = 30.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("API did not become healthy")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def slowest_imports(top: int):
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR, env=_env(),
+        capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((int(cumulative_us), int(self_us), name.strip()))
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    imports = [import_time_ms() for _ in range(args.repeat)]
+    firsts = [first_request_ms() for _ in range(args.repeat)]
+    print(f"{'measurement':<22} {'p50 ms':>9} {'min ms':>9}")
+    print(f"{'import main':<22} {statistics.median(imports):>9.1f} {min(imports):>9.1f}")
+    print(f"{'first /health':<22} {statistics.median(firsts):>9.1f} {min(firsts):>9.1f}")
+
+    print(f"\n{'cumulative ms':>13} {'self ms':>8}  module")
+    for cumulative_us, self_us, name in slowest_imports(args.top):
+        print(f"{cumulative_us / 1000:>13.1f} {self_us / 1000:>8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Worker scaling benchmark
+
+Starts launcher.py with 1..N workers, each pinned to its own CPU, and
+drives it with keep-alive HTTP/1.1 load from client processes pinned to
+the remaining CPUs. Reports throughput, speedup over one worker and
+latency for each pool size. /health runs the full middleware stack but
+needs no database, so the numbers measure the per-request cost of the
+server and framework rather than Postgres.
+
+Give the load generator at least as many CPUs as the largest pool
+(e.g. 8 CPUs for --workers 1,2,4); with fewer, clients share CPUs with
+the workers and scaling is understated.
+
+Usage:
+    python -m benchmarks.bench_workers --workers 1,2,4 --duration 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import List, Optional, Tuple
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONTENT_LENGTH = re.compile(rb"content-length:\s*(\d+)", re.IGNORECASE)
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env.setdefault("RATE_LIMIT_STORAGE_URI", "memory://")
+    env.setdefault("METRICS_HISTORY_ENABLED", "false")
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _cpu_list(cpus: List[int]) -> str:
+    return ",".join(str(cpu) for cpu in cpus)
+
+
+async def _connection(port: int, path: str, deadline: float, latencies: List[float]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode()
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            await reader.readexactly(int(CONTENT_LENGTH.search(head).group(1)))
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+def _client(args: Tuple[int, str, int, float, Optional[int]]) -> List[float]:
+    """Load generator process: `connections` closed-loop connections for `duration` seconds"""
+    port, path, connections, duration, cpu = args
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    async def run():
+        latencies: List[float] = []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(_connection(port, path, deadline, latencies) for _ in range(connections)))
+        return latencies
+
+    return asyncio.run(run())
+
+
+def _wait_healthy(port: int, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError("Launcher did not become healthy")
+
+
+def measure(workers: int, clients: int, connections: int, duration: float, path: str, cpus: List[int]) -> dict:
+    port = _free_port()
+    server_cpus = cpus[:workers]
+    client_cpus = cpus[workers:]
+    launcher = subprocess.Popen(
+        [sys.executable, "launcher.py", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1",
+         "--cpu-affinity", _cpu_list(server_cpus), "--graceful-timeout", "1"],
+        cwd=BACKEND_DIR, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_healthy(port)
+        time.sleep(1.0)  # let every worker finish startup
+        jobs = [
+            (port, path, connections, duration, client_cpus[i % len(client_cpus)] if client_cpus else None)
+            for i in range(clients)
+        ]
+        with multiprocessing.get_context("spawn").Pool(clients) as pool:
+            results = pool.map(_client, jobs)
+    finally:
+        launcher.terminate()
+        launcher.wait()
+
+    latencies = sorted(latency for result in results for latency in result)
+    return {
+        "workers": workers,
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cpus = sorted(os.sched_getaffinity(0))
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, 8, 16) if n <= max(len(cpus) // 2, 1)),
+                        help="Comma-separated pool sizes")
+    parser.add_argument("--clients", type=int, default=0, help="Load generator processes (default: CPUs left over)")
+    parser.add_argument("--connections", type=int, default=32, help="Keep-alive connections per client process")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--path", default="/health")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.workers.split(",")]
+    if max(sizes) * 2 > len(cpus):
+        print(f"warning: {len(cpus)} CPUs for up to {max(sizes)} workers plus clients; scaling will be understated\n")
+
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'efficiency':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    baseline = None
+    for workers in sizes:
+        clients = args.clients or max(len(cpus) - workers, 1)
+        result = measure(workers, clients, args.connections, args.duration, args.path, cpus)
+        baseline = baseline or result["rps"] / workers
+        speedup = result["rps"] / baseline
+        print(
+            f"{workers:>7} {result['rps']:>10.0f} {speedup:>7.2f}x {speedup / workers:>9.0%} "
+            f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
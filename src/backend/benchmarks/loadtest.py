@@ -0,0 +1,276 @@
+"""
+End-to-end API load test
+
+Drives a weighted mix of login, query execute, dataset listing and audit
+trail requests at a fixed concurrency and reports throughput and latency
+percentiles per operation. Results are written as JSON and can be compared
+against a stored baseline: the run fails (exit code 1) when p95 latency or
+throughput regress beyond the tolerance, when the error rate grows, or when
+query execution breaches its latency SLOs (docs/slo-definitions.md).
+
+Targets:
+    in-process (default)  the app is mounted on an ASGI transport with the
+                          database replaced by benchmarks.stand_ins
+    --base-url URL        a running API, e.g. docker-compose.backend.yml;
+                          start it with RATE_LIMIT_ENABLED=false and pass
+                          --seed-database once to load the scaled demo data
+
+Usage:
+    python -m benchmarks.loadtest --concurrency 32 --duration 20 --output baseline.json
+    python -m benchmarks.loadtest --baseline benchmarks/baselines/loadtest-inprocess.json
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --seed-database --scale 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+# Must be set before the app (and its settings) are imported
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_STORAGE_URI", "memory://")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("ENVIRONMENT", "loadtest")
+
+import httpx
+
+from benchmarks.stand_ins import (
+    LOADTEST_PASSWORD,
+    LOADTEST_ROLES,
+    StandInSession,
+    build_database,
+    load_demo_rows,
+    seed_users,
+    stand_in_get_db,
+)
+
+
+# Query execution latency SLOs from docs/slo-definitions.md
+SLO_TARGETS = {
+    "query_execute": {"p50_ms": 1000.0, "p95_ms": 3000.0, "p99_ms": 10000.0},
+}
+
+QUERIES = [
+    ("loan_portfolio", "SELECT * FROM loan_portfolio WHERE risk_rating = 'High' LIMIT 500"),
+    ("loan_portfolio", "SELECT industry, COUNT(*) AS loans, SUM(outstanding_balance) AS exposure FROM loan_portfolio GROUP BY industry"),
+    ("customer_transactions", "SELECT * FROM customer_transactions WHERE amount > 1000 ORDER BY amount DESC LIMIT 200"),
+    ("aml_alerts", "SELECT alert_type, AVG(risk_score) AS avg_risk FROM aml_alerts GROUP BY alert_type"),
+]
+
+# Operation name -> relative weight in the mix
+WORKLOAD = {
+    "login": 2,
+    "query_execute": 38,
+    "dataset_list": 30,
+    "audit_trail": 30,
+}
+
+
+async def login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post("/v1/auth/login", data={"username": email, "password": LOADTEST_PASSWORD})
+
+
+async def run_operation(name: str, client: httpx.AsyncClient, token: str, email: str, rng: random.Random) -> httpx.Response:
+    headers = {"Authorization": f"Bearer {token}"}
+    if name == "login":
+        return await login(client, email)
+    if name == "query_execute":
+        dataset_id, sql = rng.choice(QUERIES)
+        return await client.post(
+            "/v1/query/execute",
+            json={"sql": sql, "dataset_id": dataset_id, "question": f"loan exposure for {dataset_id}"},
+            headers=headers
+        )
+    if name == "dataset_list":
+        return await client.get("/v1/datasets/", headers=headers)
+    if name == "audit_trail":
+        return await client.get("/v1/audit/trail", params={"limit": 50}, headers=headers)
+    raise ValueError(f"Unknown operation {name}")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, dict]:
+    summary = {}
+    for name in WORKLOAD:
+        values = sorted(latencies[name])
+        count = len(values)
+        summary[name] = {
+            "requests": count,
+            "errors": errors[name],
+            "error_rate": errors[name] / count if count else 0.0,
+            "rps": count / elapsed,
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+        }
+    return summary
+
+
+async def drive(client: httpx.AsyncClient, concurrency: int, duration: float, seed: int) -> Dict[str, dict]:
+    tokens = {}
+    for role in LOADTEST_ROLES:
+        email = f"loadtest-{role}@aureus-platform.com"
+        response = await login(client, email)
+        response.raise_for_status()
+        tokens[email] = response.json()["access_token"]
+
+    names = list(WORKLOAD)
+    weights = [WORKLOAD[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed + worker_id)
+        # Viewers may not query; keep each worker on a querying role
+        email = f"loadtest-{LOADTEST_ROLES[worker_id % 3]}@aureus-platform.com"
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            began = time.perf_counter()
+            try:
+                response = await run_operation(name, client, tokens[email], email, rng)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies[name].append((time.perf_counter() - began) * 1000)
+            errors[name] += failed
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def seed_database(scale: int) -> None:
+    """Load scaled demo tables and load-test users into Postgres"""
+    import asyncpg
+    from config import settings
+
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        for name, rows in load_demo_rows(scale).items():
+            columns = list(rows[0])
+            column_defs = ", ".join(
+                f"{column} {'DOUBLE PRECISION' if isinstance(rows[0][column], (int, float)) else 'TEXT'}"
+                for column in columns
+            )
+            await conn.execute(f"DROP TABLE IF EXISTS {name}")
+            await conn.execute(f"CREATE TABLE {name} ({column_defs})")
+            await conn.copy_records_to_table(
+                name, records=[tuple(row[column] for column in columns) for row in rows], columns=columns
+            )
+        for user in seed_users():
+            await conn.execute(
+                """
+                INSERT INTO users (id, email, full_name, hashed_password, role, is_active, created_at, updated_at)
+                VALUES ($1, $2, $3, $4, $5, true, now(), now())
+                ON CONFLICT (email) DO UPDATE SET hashed_password = EXCLUDED.hashed_password, is_active = true
+                """,
+                user.id, user.email, user.full_name, user.hashed_password, user.role
+            )
+    finally:
+        await conn.close()
+
+
+def in_process_client(scale: int) -> httpx.AsyncClient:
+    from db.session import get_db, get_read_db, get_autocommit_db
+    from main import app
+
+    session = StandInSession(build_database(load_demo_rows(scale)), seed_users())
+    for dependency in (get_db, get_read_db, get_autocommit_db):
+        app.dependency_overrides[dependency] = stand_in_get_db(session)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest")
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float, slack_ms: float) -> List[str]:
+    """
+    Regressions of `results` against `baseline`, as readable messages
+
+    Latency must exceed the baseline by both `tolerance` (relative) and
+    `slack_ms` (absolute), so millisecond-level jitter on fast endpoints
+    does not fail a run.
+    """
+    failures = []
+    for name, current in results.items():
+        for metric, target in SLO_TARGETS.get(name, {}).items():
+            if current[metric] > target:
+                failures.append(f"{name}: {metric} {current[metric]:.0f}ms breaches the {target:.0f}ms SLO")
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if current["p95_ms"] > max(reference["p95_ms"] * (1 + tolerance), reference["p95_ms"] + slack_ms):
+            failures.append(f"{name}: p95 {current['p95_ms']:.1f}ms vs baseline {reference['p95_ms']:.1f}ms")
+        if current["rps"] < reference["rps"] * (1 - tolerance):
+            failures.append(f"{name}: {current['rps']:.1f} req/s vs baseline {reference['rps']:.1f} req/s")
+        if current["error_rate"] > reference["error_rate"] + 0.01:
+            failures.append(f"{name}: error rate {current['error_rate']:.2%} vs baseline {reference['error_rate']:.2%}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="Target a running API instead of the in-process app")
+    parser.add_argument("--seed-database", action="store_true", help="Seed Postgres (DATABASE_URL) before the run")
+    parser.add_argument("--scale", type=int, default=200, help="Copies of each demo row")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", default=None, help="Compare against this results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="Allowed absolute p95 regression")
+    args = parser.parse_args()
+
+    if args.base_url:
+        if args.seed_database:
+            asyncio.run(seed_database(args.scale))
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30.0)
+    else:
+        client = in_process_client(args.scale)
+
+    async def run():
+        async with client:
+            return await drive(client, args.concurrency, args.duration, args.seed)
+
+    results = asyncio.run(run())
+
+    print(f"{'operation':<15} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, row in results.items():
+        print(
+            f"{name:<15} {row['requests']:>9} {row['rps']:>8.1f} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['errors']:>7}"
+        )
+
+    report = {
+        "target": args.base_url or "in-process",
+        "scale": args.scale,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        failures = compare(results, baseline, args.tolerance, args.slack_ms)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
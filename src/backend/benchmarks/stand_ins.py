@@ -0,0 +1,166 @@
+"""
+In-process stand-ins for the load-test harness
+
+Lets the API run without Postgres or Redis: demo datasets from
+demo_data/*.json are scaled up synthetically into an in-memory SQLite
+database that answers the read-only SQL sent to /v1/query/execute, and
+user lookups are served from seeded User rows. Used through FastAPI
+dependency overrides of the db.session session dependencies only;
+nothing in the app imports this module.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.sql.elements import TextClause
+
+from models.user import User
+from security.auth import get_password_hash
+
+
+DEMO_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "demo_data"
+)
+
+LOADTEST_PASSWORD = "LoadTest123!"
+LOADTEST_ROLES = ["admin", "approver", "analyst", "viewer"]
+
+
+def load_demo_rows(scale: int = 1, seed: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load demo datasets and scale them up synthetically
+
+    Each sample row is replicated `scale` times with a unique ID suffix and
+    numeric fields jittered by up to +/-20%, so filters and aggregates see
+    realistic cardinalities.
+
+    Returns:
+        Rows by table name (the "dataset" field of each demo file)
+    """
+    rng = random.Random(seed)
+    tables: Dict[str, List[Dict[str, Any]]] = {}
+    for filename in sorted(os.listdir(DEMO_DATA_DIR)):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(DEMO_DATA_DIR, filename)) as f:
+            demo = json.load(f)
+
+        samples = demo["rows"]
+        id_field = next(iter(samples[0]))
+        rows = []
+        for i in range(scale):
+            for sample in samples:
+                row = dict(sample)
+                row[id_field] = f"{sample[id_field]}-{i:06d}"
+                for key, value in sample.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        jittered = value * rng.uniform(0.8, 1.2)
+                        row[key] = round(jittered, 4) if isinstance(value, float) else int(jittered)
+                rows.append(row)
+        tables[demo["dataset"]] = rows
+    return tables
+
+
+def build_database(tables: Dict[str, List[Dict[str, Any]]]) -> sqlite3.Connection:
+    """Create an in-memory SQLite database holding the given tables"""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    for name, rows in tables.items():
+        columns = list(rows[0])
+        conn.execute(f"CREATE TABLE {name} ({', '.join(columns)})")
+        placeholders = ", ".join("?" for _ in columns)
+        conn.executemany(
+            f"INSERT INTO {name} VALUES ({placeholders})",
+            [tuple(row[column] for column in columns) for row in rows]
+        )
+    conn.commit()
+    return conn
+
+
+def seed_users(password: str = LOADTEST_PASSWORD) -> List[User]:
+    """One active user per role, all sharing the load-test password"""
+    hashed = get_password_hash(password)
+    now = datetime.utcnow()
+    return [
+        User(
+            id=uuid.uuid4(),
+            email=f"loadtest-{role}@aureus-platform.com",
+            full_name=f"Load Test {role.title()}",
+            hashed_password=hashed,
+            role=role,
+            is_active=True,
+            created_at=now,
+            updated_at=now
+        )
+        for role in LOADTEST_ROLES
+    ]
+
+
+class StandInResult:
+    """The subset of the SQLAlchemy Result API used by the app"""
+
+    def __init__(self, rows: List[Any], columns: Optional[List[str]] = None, scalar: Any = None):
+        self._rows = rows
+        self._columns = columns or []
+        self._scalar = scalar
+        self.returns_rows = columns is not None
+
+    def fetchall(self) -> List[Any]:
+        return self._rows
+
+    def keys(self) -> List[str]:
+        return self._columns
+
+    def scalar_one_or_none(self) -> Any:
+        return self._scalar
+
+
+class StandInSession:
+    """
+    AsyncSession stand-in backed by SQLite and an in-memory user table
+
+    Text SQL runs on the SQLite connection; ORM selects on User are
+    resolved by email or ID. SQLite calls run inline on the event loop, so
+    results compare runs of this harness rather than predict Postgres
+    latency.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, users: List[User]):
+        self.conn = conn
+        self.users_by_email = {user.email: user for user in users}
+        self.users_by_id = {user.id: user for user in users}
+
+    async def execute(self, statement, params=None, execution_options=None):
+        if isinstance(statement, TextClause):
+            cursor = self.conn.execute(statement.text, params or {})
+            columns = [column[0] for column in cursor.description] if cursor.description else None
+            return StandInResult(cursor.fetchall(), columns)
+
+        clause = statement.whereclause
+        key, value = clause.left.key, clause.right.value
+        if key == "email":
+            return StandInResult([], scalar=self.users_by_email.get(value))
+        if key == "id":
+            return StandInResult([], scalar=self.users_by_id.get(value))
+        raise NotImplementedError(f"Stand-in session cannot resolve lookup on {key}")
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+def stand_in_get_db(session: StandInSession):
+    """Build a session dependency override yielding the shared stand-in session"""
+    async def get_db():
+        yield session
+    return get_db
@@ -1,33 +0,0 @@
--- Initial database schema for AUREUS Platform
-
--- Users table
-CREATE TABLE IF NOT EXISTS users (
-    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-    email VARCHAR(255) UNIQUE NOT NULL,
-    full_name VARCHAR(255) NOT NULL,
-    hashed_password VARCHAR(255) NOT NULL,
-    role VARCHAR(50) NOT NULL CHECK (role IN ('admin', 'approver', 'analyst', 'viewer')),
-    is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMPTZ DEFAULT NOW(),
-    updated_at TIMESTAMPTZ DEFAULT NOW(),
-    last_login_at TIMESTAMPTZ
-);
-
--- Create default admin user (password: Admin123!)
--- Password hash for 'Admin123!' using bcrypt
-INSERT INTO users (email, full_name, hashed_password, role, is_active)
-VALUES (
-    'admin@aureus-platform.com',
-    'AUREUS Administrator',
-    '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5eSB7BvS.LBGW',
-    'admin',
-    TRUE
-) ON CONFLICT (email) DO NOTHING;
-
--- Indexes
-CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
-CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
-
--- Comments
-COMMENT ON TABLE users IS 'User accounts and authentication';
-COMMENT ON COLUMN users.role IS 'User role: admin, approver, analyst, or viewer';
@@ -0,0 +1,64 @@
+"""
+Alembic migration environment
+
+Migrations run as a one-shot step (`alembic upgrade head`) before API
+workers start; the application itself never issues DDL.
+"""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import settings
+from db.base import Base
+# Import every model module so its tables are registered on Base.metadata
+import models.user  # noqa: F401
+import models.approval  # noqa: F401
+import models.pipeline  # noqa: F401
+import models.snapshot  # noqa: F401
+import models.query_history  # noqa: F401
+import models.ingestion  # noqa: F401
+import models.query_template  # noqa: F401
+import models.data_quality  # noqa: F401
+import models.catalog  # noqa: F401
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of connecting (alembic upgrade --sql)"""
+    context.configure(
+        url=database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    engine = create_async_engine(database_url)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
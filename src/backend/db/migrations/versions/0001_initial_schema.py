@@ -0,0 +1,79 @@
+"""Initial schema: users and approval requests
+
+Replaces the hand-maintained db/init.sql.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-02-03
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text("gen_random_uuid()")),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("full_name", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("role", sa.String(50), nullable=False),
+        sa.Column("is_active", sa.Boolean(), server_default=sa.true()),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("(now() at time zone 'utc')")),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("(now() at time zone 'utc')")),
+        sa.Column("last_login_at", sa.DateTime(), nullable=True),
+        sa.CheckConstraint("role IN ('admin', 'approver', 'analyst', 'viewer')", name="ck_users_role"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_role", "users", ["role"])
+
+    approval_status = postgresql.ENUM("pending", "approved", "rejected", name="approvalstatus")
+    op.create_table(
+        "approval_requests",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("dataset_id", sa.String(), nullable=False),
+        sa.Column("requested_by", sa.String(), nullable=False),
+        sa.Column("approver_id", sa.String(), nullable=True),
+        sa.Column("status", approval_status, nullable=False),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_approval_requests_status_created", "approval_requests", ["status", "created_at", "id"])
+    op.create_index("ix_approval_requests_dataset_created", "approval_requests", ["dataset_id", "created_at", "id"])
+    op.create_index("ix_approval_requests_requester_created", "approval_requests", ["requested_by", "created_at", "id"])
+    op.create_index(
+        "ix_approval_requests_pending_queue",
+        "approval_requests",
+        ["created_at", "id"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+    # Default admin user (password: Admin123!) - rotate after first login
+    op.execute(
+        """
+        INSERT INTO users (email, full_name, hashed_password, role, is_active)
+        VALUES (
+            'admin@aureus-platform.com',
+            'AUREUS Administrator',
+            '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5eSB7BvS.LBGW',
+            'admin',
+            TRUE
+        ) ON CONFLICT (email) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("approval_requests")
+    op.execute("DROP TYPE IF EXISTS approvalstatus")
+    op.drop_index("ix_users_role", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
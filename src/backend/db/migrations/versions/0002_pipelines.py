@@ -0,0 +1,71 @@
+"""Pipeline definitions, runs and per-step checkpoints
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-02-10
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pipelines",
+        sa.Column("id", sa.String(64), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("steps", postgresql.JSONB(), nullable=False),
+        sa.Column("created_by", sa.String(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "pipeline_runs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("pipeline_id", sa.String(64), sa.ForeignKey("pipelines.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("pipeline_version", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("triggered_by", sa.String(), nullable=False),
+        sa.Column("force", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("evidence", postgresql.JSONB(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_pipeline_runs_pipeline_started", "pipeline_runs", ["pipeline_id", "started_at"])
+
+    op.create_table(
+        "pipeline_step_runs",
+        sa.Column("run_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("pipeline_runs.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("step_id", sa.String(64), primary_key=True),
+        sa.Column("pipeline_id", sa.String(64), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("fingerprint", sa.String(64), nullable=True),
+        sa.Column("rows_written", sa.BigInteger(), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("evidence", postgresql.JSONB(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_pipeline_step_runs_step_finished",
+        "pipeline_step_runs",
+        ["pipeline_id", "step_id", "finished_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pipeline_step_runs_step_finished", table_name="pipeline_step_runs")
+    op.drop_table("pipeline_step_runs")
+    op.drop_index("ix_pipeline_runs_pipeline_started", table_name="pipeline_runs")
+    op.drop_table("pipeline_runs")
+    op.drop_table("pipelines")
@@ -0,0 +1,40 @@
+"""Dataset snapshots: watermarks and per-bucket content hashes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-02-12
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dataset_snapshots",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("dataset_id", sa.String(64), nullable=False),
+        sa.Column("table_name", sa.String(63), nullable=False),
+        sa.Column("key_column", sa.String(63), nullable=False),
+        sa.Column("parent_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("dataset_snapshots.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("bucket_count", sa.Integer(), nullable=False),
+        sa.Column("row_count", sa.BigInteger(), nullable=False),
+        sa.Column("watermark", postgresql.JSONB(), nullable=True),
+        sa.Column("digest", sa.String(64), nullable=False),
+        sa.Column("manifest", sa.LargeBinary(), nullable=False),
+        sa.Column("changed_buckets", sa.Integer(), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("created_by", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_dataset_snapshots_dataset_created", "dataset_snapshots", ["dataset_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dataset_snapshots_dataset_created", table_name="dataset_snapshots")
+    op.drop_table("dataset_snapshots")
@@ -0,0 +1,62 @@
+"""Query history: executions, deduplicated SQL fingerprints and hourly rollups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-02-14
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "query_fingerprints",
+        sa.Column("fingerprint", sa.String(32), primary_key=True),
+        sa.Column("sql_text", sa.Text(), nullable=False),
+        sa.Column("dataset_id", sa.String(), nullable=True),
+        sa.Column("template_id", sa.String(64), nullable=True),
+        sa.Column("first_seen_at", sa.DateTime(), nullable=False),
+    )
+
+    op.create_table(
+        "query_executions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("dataset_id", sa.String(), nullable=False),
+        sa.Column("fingerprint", sa.String(32), sa.ForeignKey("query_fingerprints.fingerprint"), nullable=False),
+        sa.Column("params", postgresql.JSONB(), nullable=True),
+        sa.Column("status", sa.String(10), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_ms", sa.Float(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_query_executions_user_created", "query_executions", ["user_id", "created_at", "id"])
+    op.create_index("ix_query_executions_dataset_created", "query_executions", ["dataset_id", "created_at", "id"])
+
+    op.create_table(
+        "query_rollups_hourly",
+        sa.Column("hour", sa.DateTime(), primary_key=True),
+        sa.Column("dataset_id", sa.String(), primary_key=True),
+        sa.Column("fingerprint", sa.String(32), primary_key=True),
+        sa.Column("executions", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("errors", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("rows_total", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("duration_total_ms", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("duration_max_ms", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("latency_histogram", postgresql.ARRAY(sa.BigInteger()), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("query_rollups_hourly")
+    op.drop_index("ix_query_executions_dataset_created", table_name="query_executions")
+    op.drop_index("ix_query_executions_user_created", table_name="query_executions")
+    op.drop_table("query_executions")
+    op.drop_table("query_fingerprints")
@@ -0,0 +1,21 @@
+"""Dedicated schema for pipeline step outputs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Pipelines create, rename and drop tables here only (PIPELINE_OUTPUT_SCHEMA)
+    op.execute("CREATE SCHEMA IF NOT EXISTS pipeline_outputs")
+
+
+def downgrade() -> None:
+    op.execute("DROP SCHEMA IF EXISTS pipeline_outputs CASCADE")
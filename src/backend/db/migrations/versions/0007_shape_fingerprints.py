@@ -0,0 +1,103 @@
+"""Query history keyed by query shape, the fingerprint slow-query analytics uses
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from utils.sql import query_shape, shape_fingerprint
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("query_executions", sa.Column("sql_text", sa.Text(), nullable=True))
+
+    # Map each statement fingerprint to its shape fingerprint; executions keep
+    # their statement text when the shape hides literals
+    bind = op.get_bind()
+    op.execute(
+        "CREATE TEMPORARY TABLE fingerprint_map "
+        "(old varchar(32) PRIMARY KEY, new varchar(32) NOT NULL, shape text NOT NULL, literals boolean NOT NULL) "
+        "ON COMMIT DROP"
+    )
+    rows, unchanged = [], []
+    for old, sql_text in bind.execute(sa.text("SELECT fingerprint, sql_text FROM query_fingerprints")).all():
+        shape = query_shape(sql_text)
+        new = shape_fingerprint(sql_text)
+        if new == old:
+            # No literals: the normalized statement already was its shape
+            unchanged.append({"fingerprint": old, "shape": shape})
+        else:
+            rows.append({"old": old, "new": new, "shape": shape, "literals": "?" in shape})
+    if unchanged:
+        bind.execute(
+            sa.text("UPDATE query_fingerprints SET sql_text = :shape WHERE fingerprint = :fingerprint"),
+            unchanged
+        )
+    if not rows:
+        return
+    bind.execute(
+        sa.text("INSERT INTO fingerprint_map (old, new, shape, literals) VALUES (:old, :new, :shape, :literals)"),
+        rows
+    )
+
+    op.execute("""
+        INSERT INTO query_fingerprints (fingerprint, sql_text, dataset_id, template_id, first_seen_at)
+        SELECT DISTINCT ON (m.new) m.new, m.shape, f.dataset_id, f.template_id, f.first_seen_at
+        FROM fingerprint_map m JOIN query_fingerprints f ON f.fingerprint = m.old
+        ORDER BY m.new, f.first_seen_at
+        ON CONFLICT (fingerprint) DO NOTHING
+    """)
+    op.execute("""
+        UPDATE query_executions e
+        SET fingerprint = m.new, sql_text = CASE WHEN m.literals THEN f.sql_text END
+        FROM fingerprint_map m JOIN query_fingerprints f ON f.fingerprint = m.old
+        WHERE e.fingerprint = m.old
+    """)
+    # Merge the rollups of statements that share a shape, histograms element-wise
+    op.execute("""
+        INSERT INTO query_rollups_hourly (
+            hour, dataset_id, fingerprint, executions, errors, rows_total,
+            duration_total_ms, duration_max_ms, latency_histogram
+        )
+        SELECT g.hour, g.dataset_id, g.new, g.executions, g.errors, g.rows_total,
+               g.duration_total_ms, g.duration_max_ms, h.histogram
+        FROM (
+            SELECT r.hour, r.dataset_id, m.new, sum(r.executions) AS executions, sum(r.errors) AS errors,
+                   sum(r.rows_total) AS rows_total, sum(r.duration_total_ms) AS duration_total_ms,
+                   max(r.duration_max_ms) AS duration_max_ms, array_agg(r.fingerprint) AS olds
+            FROM query_rollups_hourly r JOIN fingerprint_map m ON m.old = r.fingerprint
+            GROUP BY r.hour, r.dataset_id, m.new
+        ) g
+        CROSS JOIN LATERAL (
+            SELECT array_agg(s.total ORDER BY s.i) AS histogram
+            FROM (
+                SELECT u.i, sum(u.v)::bigint AS total
+                FROM query_rollups_hourly r, unnest(r.latency_histogram) WITH ORDINALITY AS u(v, i)
+                WHERE r.hour = g.hour AND r.dataset_id = g.dataset_id AND r.fingerprint = ANY(g.olds)
+                GROUP BY u.i
+            ) s
+        ) h
+        ON CONFLICT (hour, dataset_id, fingerprint) DO UPDATE SET
+            executions = query_rollups_hourly.executions + excluded.executions,
+            errors = query_rollups_hourly.errors + excluded.errors,
+            rows_total = query_rollups_hourly.rows_total + excluded.rows_total,
+            duration_total_ms = query_rollups_hourly.duration_total_ms + excluded.duration_total_ms,
+            duration_max_ms = greatest(query_rollups_hourly.duration_max_ms, excluded.duration_max_ms),
+            latency_histogram = ARRAY(
+                SELECT a + b FROM unnest(query_rollups_hourly.latency_histogram, excluded.latency_histogram) AS u(a, b)
+            )
+    """)
+    op.execute("DELETE FROM query_rollups_hourly WHERE fingerprint IN (SELECT old FROM fingerprint_map)")
+    op.execute("DELETE FROM query_fingerprints WHERE fingerprint IN (SELECT old FROM fingerprint_map)")
+
+
+def downgrade() -> None:
+    # Statement fingerprints are not restored: history stays keyed by shape
+    op.drop_column("query_executions", "sql_text")
@@ -0,0 +1,30 @@
+"""Slow-query baselines per query shape, kept across restarts
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "query_shape_baselines",
+        sa.Column("fingerprint", sa.String(32), primary_key=True),
+        sa.Column("dataset_id", sa.String(), nullable=True),
+        sa.Column("baseline_p95_ms", sa.Float(), nullable=True),
+        sa.Column("baseline_plan_hash", sa.String(16), nullable=True),
+        sa.Column("baseline_plan", postgresql.JSONB(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("query_shape_baselines")
@@ -0,0 +1,48 @@
+"""Ingestion jobs, visible to every worker and kept across restarts
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingestion_jobs",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("dataset_id", sa.String(64), nullable=False),
+        sa.Column("table_name", sa.String(63), nullable=False),
+        sa.Column("format", sa.String(16), nullable=False),
+        sa.Column("filename", sa.String(), nullable=True),
+        sa.Column("bytes", sa.BigInteger(), nullable=False),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("submitted_by", sa.String(), nullable=False),
+        sa.Column("rows_loaded", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("rows_rejected", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("batches", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rows_per_second", sa.Float(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("snapshot_id", sa.String(36), nullable=True),
+        sa.Column("evidence", postgresql.JSONB(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_ingestion_jobs_created", "ingestion_jobs", ["created_at"])
+    op.create_index("ix_ingestion_jobs_dataset_created", "ingestion_jobs", ["dataset_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ingestion_jobs_dataset_created", table_name="ingestion_jobs")
+    op.drop_index("ix_ingestion_jobs_created", table_name="ingestion_jobs")
+    op.drop_table("ingestion_jobs")
@@ -0,0 +1,67 @@
+"""Query templates, shared by every worker and kept across restarts
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+# Seed templates for the demo datasets (catalog IDs dataset-1 and dataset-2)
+SEED_TEMPLATES = [
+    {
+        "template_id": "loans-by-risk",
+        "dataset_id": "dataset-1",
+        "description": "Largest exposures with a given risk rating",
+        "sql": (
+            "SELECT loan_id, industry, outstanding_balance, risk_rating FROM loan_portfolio "
+            "WHERE risk_rating = :risk_rating AND outstanding_balance >= :min_balance "
+            "ORDER BY outstanding_balance DESC LIMIT :row_limit"
+        ),
+        "parameters": [
+            {"name": "risk_rating", "type": "string", "required": True},
+            {"name": "min_balance", "type": "number", "required": False, "default": 0},
+            {"name": "row_limit", "type": "integer", "required": False, "default": 100},
+        ],
+    },
+    {
+        "template_id": "aml-alerts-by-type",
+        "dataset_id": "dataset-2",
+        "description": "AML alerts of one typology and status",
+        "sql": (
+            "SELECT alert_id, alert_date, alert_type, risk_score, status FROM aml_alerts "
+            "WHERE alert_type = :alert_type AND status = :status ORDER BY risk_score DESC"
+        ),
+        "parameters": [
+            {"name": "alert_type", "type": "string", "required": True},
+            {"name": "status", "type": "string", "required": True},
+        ],
+    },
+]
+
+
+def upgrade() -> None:
+    templates = op.create_table(
+        "query_templates",
+        sa.Column("template_id", sa.String(64), primary_key=True),
+        sa.Column("dataset_id", sa.String(64), nullable=False),
+        sa.Column("sql", sa.Text(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("parameters", postgresql.JSONB(), nullable=False),
+        sa.Column("created_by", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_query_templates_dataset", "query_templates", ["dataset_id"])
+    op.bulk_insert(templates, SEED_TEMPLATES)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_query_templates_dataset", table_name="query_templates")
+    op.drop_table("query_templates")
@@ -0,0 +1,29 @@
+"""Data-quality drift baselines, shared by every worker and kept across restarts
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dq_baselines",
+        sa.Column("table_name", sa.String(63), primary_key=True),
+        sa.Column("column_name", sa.String(63), primary_key=True),
+        sa.Column("edges", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("recorded_by", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("dq_baselines")
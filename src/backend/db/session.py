@@ -2,42 +2,170 @@
 Database session management using SQLAlchemy
 """
 
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
 
 from config import settings
+from db.base import Base
+from utils.errors import DependencyUnavailableError
+from utils.resilience import dependencies
 
 # Convert postgres:// to postgresql:// for asyncpg
 database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
-# Create async engine
+# Create async engine. No pre-ping round trip per checkout: a connection
+# that died while pooled fails its first statement, is invalidated by the
+# pool and the failure counts against the Postgres circuit breaker.
 engine = create_async_engine(
     database_url,
     echo=settings.ENVIRONMENT == "development",
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW
 )
 
+
+def is_unavailable_error(error: BaseException) -> bool:
+    """Whether a database error means Postgres is unreachable or saturated (not a bad query)"""
+    if isinstance(error, (DependencyUnavailableError, OperationalError, InterfaceError, PoolTimeoutError, OSError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+# Execution options for statements whose run time depends on the data they
+# touch (analyst queries, data-quality checks, snapshot scans, pipeline
+# steps): pass as execute(..., execution_options=WORKLOAD)
+WORKLOAD = {"workload": True}
+
+
+def _is_workload(statement, options) -> bool:
+    if options and options.get("workload"):
+        return True
+    get_options = getattr(statement, "get_execution_options", None)
+    return bool(get_options and get_options().get("workload"))
+
+
+class GuardedSession(AsyncSession):
+    """
+    AsyncSession whose statements go through the Postgres circuit breaker
+    
+    While the breaker is open, execute() raises DependencyUnavailableError
+    immediately instead of waiting on the pool or the network. Connectivity
+    errors count against the breaker; query errors do not. Slow calls count
+    too, but a slow workload statement (see WORKLOAD) says nothing about
+    Postgres' health, so for those only the pool checkout is timed.
+    """
+    
+    async def execute(self, statement, params=None, **kwargs):
+        breaker = dependencies["postgres"].breaker
+        if not breaker.allow():
+            raise DependencyUnavailableError("postgres", "circuit open")
+        workload = _is_workload(statement, kwargs.get("execution_options"))
+        start = time.perf_counter()
+        latency = None
+        try:
+            if workload:
+                # Checks out a connection on the session's first statement
+                await self.connection()
+                latency = time.perf_counter() - start
+            result = await super().execute(statement, params, **kwargs)
+        except asyncio.CancelledError:
+            breaker.cancel()
+            raise
+        except Exception as e:
+            if is_unavailable_error(e):
+                breaker.record(False)
+            else:
+                breaker.record(True, time.perf_counter() - start if latency is None else latency)
+            raise
+        breaker.record(True, time.perf_counter() - start if latency is None else latency)
+        return result
+
+
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=GuardedSession,
     expire_on_commit=False
 )
 
-# Base class for models
-Base = declarative_base()
+# Same pool, different transaction characteristics: the driver applies them
+# when the transaction begins (BEGIN READ ONLY) or skips BEGIN entirely
+# (AUTOCOMMIT), and they are reset when the connection goes back to the pool.
+# Neither costs a round trip of its own.
+ReadOnlySessionLocal = async_sessionmaker(
+    engine.execution_options(postgresql_readonly=True),
+    class_=GuardedSession,
+    expire_on_commit=False
+)
+AutocommitSessionLocal = async_sessionmaker(
+    engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=GuardedSession,
+    expire_on_commit=False
+)
 
 
 async def get_db():
-    """Dependency to get database session"""
+    """
+    Dependency to get a read-write database session
+    
+    Sessions check out a connection on their first statement only. The
+    transaction is committed after the handler if one is still open.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if session.in_transaction():
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+
+
+async def get_read_db():
+    """
+    Dependency to get a read-only database session
+    
+    The transaction starts as BEGIN READ ONLY on first use, so every
+    statement in the handler sees one snapshot and Postgres rejects writes.
+    That includes statements the asyncpg executor sends to the driver
+    directly: it begins the session's transaction first.
+    It is never committed: closing the session ends it and returns the
+    connection.
+    """
+    async with ReadOnlySessionLocal() as session:
+        yield session
+
+
+async def get_autocommit_db():
+    """
+    Dependency to get a session for single-statement lookups
+    
+    No transaction is opened, so a lookup is one round trip. Close the
+    session once the lookup is done to return the connection before the
+    rest of the request runs.
+    """
+    async with AutocommitSessionLocal() as session:
+        yield session
+
+
+async def warm_pool(connections: int) -> None:
+    """
+    Open pooled connections ahead of the first requests
+    
+    Checks out `connections` connections concurrently, runs a trivial
+    query on each and returns them to the pool.
+    """
+    async def touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    await asyncio.gather(*(touch() for _ in range(connections)))
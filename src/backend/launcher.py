@@ -0,0 +1,302 @@
+"""
+AUREUS Platform - Production launcher
+Supervises uvicorn worker processes sharing one listening socket
+
+Each worker runs the app on uvloop with the httptools parser. The launcher
+binds the socket once, so workers accept from the same queue and a
+replacement can start accepting before its predecessor stops. Workers
+share counters and revoked tokens through a shared memory segment
+(utils/shared_state.py); /metrics on any worker reports the fleet totals.
+
+Other state every worker must agree on lives in Postgres and is cached
+per process: dataset catalog cards and snapshot citations are re-read
+every CATALOG_REFRESH_INTERVAL / SNAPSHOT_CITATION_REFRESH_INTERVAL
+seconds, query templates every QUERY_TEMPLATE_REFRESH_INTERVAL, and
+data-quality drift baselines before each run that compares against them.
+A dataset ingested through one worker is therefore known to the others
+within one refresh interval. The completed-result cache stays per
+process: another worker answers GET /v1/query/{id} with the recorded
+outcome without rows, as after eviction.
+
+Signals:
+    SIGHUP           rolling restart: one worker at a time, a replacement is
+                     started and becomes ready (warm pool) before the old
+                     worker drains its in-flight requests and exits
+    SIGTERM, SIGINT  graceful shutdown of every worker
+
+Usage:
+    python launcher.py --port 8000
+    python launcher.py --workers 4 --port 8000 --cpu-affinity auto
+    kill -HUP $(cat /tmp/aureus.pid)
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+from config import settings
+from utils.logging import setup_logging, logger
+from utils.shared_state import SharedState, SEGMENT_ENV, SLOT_ENV, POSITION_ENV, EMPTY, READY, DRAINING
+
+
+def parse_cpus(spec: str) -> Optional[List[int]]:
+    """CPU list for worker pinning: "auto" (every available CPU) or e.g. "0-3,6"; None for no pinning"""
+    if not spec:
+        return None
+    if spec == "auto":
+        return sorted(os.sched_getaffinity(0))
+    cpus = []
+    for part in spec.split(","):
+        low, _, high = part.strip().partition("-")
+        cpus.extend(range(int(low), int(high or low) + 1))
+    return cpus
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that marks itself draining and closes push streams before shutting down"""
+
+    async def shutdown(self, sockets=None) -> None:
+        from services import event_broker
+        from utils.shared_state import shared_state
+
+        shared_state.set_state(DRAINING)
+        # Event streams never finish on their own; close them (clients get a
+        # `reset` event and reconnect to another worker) so only real
+        # in-flight requests hold up the drain
+        await event_broker.stop()
+        await super().shutdown(sockets=sockets)
+
+
+def serve(app: str, sock: socket.socket, cpu: Optional[int], graceful_timeout: float) -> None:
+    """Worker process entry point (the shared segment and slot arrive in the environment)"""
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    config = uvicorn.Config(
+        app,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        access_log=False,
+        timeout_graceful_shutdown=graceful_timeout
+    )
+    DrainingServer(config).run(sockets=[sock])
+
+
+class Worker:
+    """One supervised worker process in a fixed position (CPU) of the pool"""
+
+    def __init__(self, position: int, slot: int, process: multiprocessing.Process):
+        self.position = position
+        self.slot = slot
+        self.process = process
+        self.started_at = time.monotonic()
+
+
+class Supervisor:
+    """
+    Keep `workers` worker processes running
+
+    Worker slots in the shared segment are twice the pool size, so every
+    position can run a replacement next to its current worker during a
+    rolling restart. Workers that die are replaced, with backoff when they
+    die right after starting (e.g. bad configuration).
+    """
+
+    def __init__(
+        self,
+        app: str = "main:app",
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = 1,
+        cpus: Optional[List[int]] = None,
+        graceful_timeout: float = 30.0,
+        ready_timeout: float = 120.0,
+        backlog: int = 2048
+    ):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.size = workers
+        self.cpus = cpus
+        self.graceful_timeout = graceful_timeout
+        self.ready_timeout = ready_timeout
+        self.backlog = backlog
+        self.context = multiprocessing.get_context("spawn")
+        self.workers: Dict[int, Worker] = {}
+        self.sock: Optional[socket.socket] = None
+        self.state: Optional[SharedState] = None
+        self._stopping = False
+        self._restart_requested = False
+        self._crashes = 0
+        self._respawn_at = 0.0
+
+    def run(self) -> None:
+        self.sock = self._bind()
+        self.state = SharedState.create(
+            slots=2 * self.size,
+            revocation_size=settings.SHARED_STATE_REVOCATION_SLOTS,
+            revocation_hashes=settings.SHARED_STATE_REVOCATION_HASHES,
+            rotation=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        )
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_restart)
+        logger.info(f"Launcher {os.getpid()} serving {self.app} on {self.host}:{self.port} with {self.size} workers")
+        try:
+            for position in range(self.size):
+                self._spawn(position)
+            while not self._stopping:
+                self._reap()
+                if self._restart_requested:
+                    self._restart_requested = False
+                    self._rolling_restart()
+                self.state.prepare_rotation()
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def _request_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _request_restart(self, signum, frame) -> None:
+        self._restart_requested = True
+
+    def _free_slot(self) -> int:
+        used = {worker.slot for worker in self.workers.values()}
+        return next(slot for slot in range(1, 2 * self.size + 1) if slot not in used and self.state.worker_state(slot) == EMPTY)
+
+    def _spawn(self, position: int) -> Worker:
+        slot = self._free_slot()
+        cpu = self.cpus[position % len(self.cpus)] if self.cpus else None
+        process = self.context.Process(
+            target=serve,
+            args=(self.app, self.sock, cpu, self.graceful_timeout),
+            name=f"aureus-worker-{position}"
+        )
+        # Read when the worker first imports utils.shared_state
+        os.environ[SEGMENT_ENV] = self.state.name
+        os.environ[SLOT_ENV] = str(slot)
+        os.environ[POSITION_ENV] = str(position)
+        process.start()
+        worker = Worker(position, slot, process)
+        self.workers[process.pid] = worker
+        logger.info(f"Started worker {process.pid} (position {position}, slot {slot}{f', cpu {cpu}' if cpu is not None else ''})")
+        return worker
+
+    def _retire(self, worker: Worker) -> None:
+        worker.process.join()
+        self.workers.pop(worker.process.pid, None)
+        self.state.retire(worker.slot)
+
+    def _reap(self) -> None:
+        """Replace workers that exited unexpectedly"""
+        for worker in list(self.workers.values()):
+            if worker.process.is_alive():
+                continue
+            lifetime = time.monotonic() - worker.started_at
+            logger.warning(f"Worker {worker.process.pid} exited with code {worker.process.exitcode} after {lifetime:.0f}s")
+            self._retire(worker)
+            self._crashes = self._crashes + 1 if lifetime < 10 else 0
+            self._respawn_at = time.monotonic() + min(2 ** self._crashes, 30) if self._crashes else 0.0
+        filled = {worker.position for worker in self.workers.values()}
+        if time.monotonic() >= self._respawn_at:
+            for position in range(self.size):
+                if position not in filled:
+                    self._spawn(position)
+
+    def _stop_worker(self, worker: Worker) -> None:
+        """SIGTERM: the worker stops accepting, drains in-flight requests and exits"""
+        worker.process.terminate()
+        worker.process.join(self.graceful_timeout + 10)
+        if worker.process.is_alive():
+            logger.warning(f"Worker {worker.process.pid} did not drain in time; killing it")
+            worker.process.kill()
+        self._retire(worker)
+
+    def _wait_ready(self, worker: Worker) -> bool:
+        deadline = time.monotonic() + self.ready_timeout
+        while time.monotonic() < deadline and not self._stopping:
+            if not worker.process.is_alive():
+                return False
+            if self.state.worker_state(worker.slot) == READY:
+                return True
+            time.sleep(0.1)
+        return False
+
+    def _rolling_restart(self) -> None:
+        """Replace every worker, one at a time, without dropping capacity below the pool size"""
+        logger.info("Rolling restart started")
+        for old in sorted(self.workers.values(), key=lambda worker: worker.position):
+            if self._stopping:
+                return
+            replacement = self._spawn(old.position)
+            if not self._wait_ready(replacement):
+                logger.error(f"Replacement worker {replacement.process.pid} did not become ready; keeping the old workers")
+                self._stop_worker(replacement)
+                return
+            self._stop_worker(old)
+        logger.info("Rolling restart completed")
+
+    def _shutdown(self) -> None:
+        logger.info(f"Stopping {len(self.workers)} workers")
+        for worker in self.workers.values():
+            if worker.process.is_alive():
+                worker.process.terminate()
+        deadline = time.monotonic() + self.graceful_timeout + 10
+        for worker in list(self.workers.values()):
+            worker.process.join(max(deadline - time.monotonic(), 0))
+            if worker.process.is_alive():
+                worker.process.kill()
+            self._retire(worker)
+        if self.sock is not None:
+            self.sock.close()
+        if self.state is not None:
+            self.state.close(unlink=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="main:app")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.LAUNCHER_WORKERS, help="0 = one per available CPU")
+    parser.add_argument("--cpu-affinity", default=settings.LAUNCHER_CPU_AFFINITY, help='"auto" or a CPU list like "0-3,6"')
+    parser.add_argument("--graceful-timeout", type=float, default=settings.LAUNCHER_GRACEFUL_TIMEOUT)
+    parser.add_argument("--ready-timeout", type=float, default=settings.LAUNCHER_READY_TIMEOUT)
+    parser.add_argument("--pid-file", help="Write the launcher PID here (for kill -HUP)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    cpus = parse_cpus(args.cpu_affinity)
+    workers = args.workers or len(cpus or os.sched_getaffinity(0))
+    if args.pid_file:
+        with open(args.pid_file, "w") as f:
+            f.write(str(os.getpid()))
+    Supervisor(
+        app=args.app,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        cpus=cpus,
+        graceful_timeout=args.graceful_timeout,
+        ready_timeout=args.ready_timeout
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
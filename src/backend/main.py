@@ -3,38 +3,125 @@ AUREUS Platform - FastAPI Backend
 Main application entry point
 """
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from slowapi.errors import RateLimitExceeded
-import time
-import uuid
 from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
+import asyncio
 
 from config import settings
-from api import auth, query, dataset, audit
-from db.session import engine, Base
+from api import auth, query, dataset, audit, approval, admin, ingestion, pipelines, events
+from db.session import AsyncSessionLocal, engine, warm_pool
 from utils.logging import setup_logging, logger
-from middleware import limiter, rate_limit_exceeded_handler
-from services import observability
+from middleware import (
+    limiter,
+    rate_limit_exceeded_handler,
+    CompressionMiddleware,
+    LoadSheddingMiddleware,
+    RequestTrackingMiddleware,
+)
+from services import observability, schema_index, loop_monitor, snapshots, query_history, slow_queries, metrics_history, event_broker, result_store, query_templates, dq_engine, catalog, ingestion as ingestion_service
+from utils.serialization import AureusJSONResponse
+from utils.errors import DependencyUnavailableError, create_error_response
+from utils.resilience import dependencies
+from utils.shared_state import shared_state, READY
 
 # Setup logging
 setup_logging()
 
 
+async def warm_up(app: FastAPI):
+    """
+    Warm connection pools and indexes in the background
+    
+    Retries with backoff until the database is reachable; /ready reports
+    503 until this completes. Schema is managed by Alembic migrations run
+    as a separate step (`alembic upgrade head`), never at worker startup.
+    """
+    delay = 0.5
+    while True:
+        try:
+            await warm_pool(settings.DB_POOL_SIZE)
+            break
+        except Exception as e:
+            logger.warning(f"Database pool warm-up failed, retrying in {delay:.1f}s: {str(e)}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10.0)
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            await catalog.load(session)
+    except Exception as e:
+        # The seed cards are served until the next catalog refresh
+        logger.warning(f"Loading the dataset catalog failed: {str(e)}")
+    schema_index.sync()
+    try:
+        async with AsyncSessionLocal() as session:
+            await snapshots.load_latest(session)
+    except Exception as e:
+        # Evidence omits snapshot citations until the next snapshot is taken
+        logger.warning(f"Loading latest dataset snapshots failed: {str(e)}")
+    try:
+        async with AsyncSessionLocal() as session:
+            await slow_queries.load_baselines(session)
+    except Exception as e:
+        # Shapes learn new baselines from their first execution windows
+        logger.warning(f"Loading slow-query baselines failed: {str(e)}")
+    try:
+        async with AsyncSessionLocal() as session:
+            await query_templates.load(session)
+    except Exception as e:
+        # Templates are then read from Postgres on first use
+        logger.warning(f"Loading query templates failed: {str(e)}")
+    try:
+        async with AsyncSessionLocal() as session:
+            await dq_engine.load_baselines(session)
+    except Exception as e:
+        # Checks on query results see no drift baseline until a dataset or pipeline run loads one
+        logger.warning(f"Loading data-quality baselines failed: {str(e)}")
+    app.state.ready = True
+    shared_state.set_state(READY)
+    logger.info("AUREUS Backend API ready")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     logger.info(f"Starting AUREUS Backend API version {settings.VERSION}")
     
-    # Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
-    logger.info("Database tables created")
+    app.state.ready = False
+    shared_state.start(observability.sample)
+    loop_monitor.start()
+    query_history.start()
+    slow_queries.start()
+    if settings.METRICS_HISTORY_ENABLED:
+        metrics_history.start()
+    event_broker.start()
+    result_store.start()
+    ingestion_service.start()
+    query_templates.start()
+    catalog.start()
+    snapshots.start()
+    warm_up_task = asyncio.create_task(warm_up(app))
     
     yield
     
+    warm_up_task.cancel()
+    await event_broker.stop()
+    await result_store.stop()
+    await ingestion_service.stop()
+    await snapshots.stop()
+    await catalog.stop()
+    await query_templates.stop()
+    await loop_monitor.stop()
+    await query_history.stop()
+    await slow_queries.stop()
+    await metrics_history.stop()
+    await shared_state.stop()
+    await engine.dispose()
     logger.info("Shutting down AUREUS Backend API")
 
 
@@ -45,6 +132,7 @@ app = FastAPI(
     version=settings.VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=AureusJSONResponse,
     lifespan=lifespan
 )
 
@@ -52,6 +140,19 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
+# Adaptive load shedding (503 + Retry-After before work is queued; inside
+# CORS so browsers can read the rejection)
+if settings.LOAD_SHEDDING_ENABLED:
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        target_latency=settings.LOAD_SHEDDING_TARGET_LATENCY_MS / 1000,
+        max_loop_lag=settings.LOAD_SHEDDING_MAX_LOOP_LAG_MS / 1000,
+        initial_limit=settings.LOAD_SHEDDING_INITIAL_LIMIT,
+        min_limit=settings.LOAD_SHEDDING_MIN_LIMIT,
+        max_limit=settings.LOAD_SHEDDING_MAX_LIMIT,
+        retry_after=settings.LOAD_SHEDDING_RETRY_AFTER
+    )
+
 # CORS middleware
 cors_origins = settings.CORS_ORIGINS.split(',') if isinstance(settings.CORS_ORIGINS, str) else settings.CORS_ORIGINS
 app.add_middleware(
@@ -60,46 +161,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],
 )
 
+# Response compression (zstd / brotli / gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL
+)
 
-# Request ID middleware
-@app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    """Add unique request ID to all requests and track metrics"""
-    request_id = str(uuid.uuid4())
-    request.state.request_id = request_id
-    
-    start_time = time.time()
-    
-    response = await call_next(request)
-    
-    process_time = time.time() - start_time
-    
-    response.headers["X-Request-ID"] = request_id
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    # Track request metrics
-    user = getattr(request.state, 'user', None)
-    user_id = str(user.id) if user else None
-    observability.track_request(
-        method=request.method,
-        path=request.url.path,
-        status_code=response.status_code,
-        duration=process_time,
-        user_id=user_id
-    )
-    
-    logger.info(
-        f"Request processed: {request.method} {request.url.path} - "
-        f"Status: {response.status_code} - Time: {process_time:.3f}s - "
-        f"RequestID: {request_id}"
+# Request IDs, timing and metrics (outermost, so it times every layer)
+app.add_middleware(RequestTrackingMiddleware)
+
+
+# Circuit breaker and bulkhead state in the metrics snapshot
+observability.register_state("resilience", dependencies.state)
+# Fleet totals and per-worker rows when run under launcher.py
+observability.register_state("workers", shared_state.state)
+
+
+# Exception handlers
+@app.exception_handler(DependencyUnavailableError)
+async def dependency_unavailable_handler(request: Request, exc: DependencyUnavailableError):
+    """Fail fast with 503 while a dependency's circuit is open or its bulkhead is full"""
+    request_id = getattr(request.state, 'request_id', None)
+    return JSONResponse(
+        status_code=503,
+        content=create_error_response("DEPENDENCY_UNAVAILABLE", str(exc), request_id=request_id),
+        headers={"Retry-After": str(exc.retry_after)}
     )
-    
-    return response
 
 
-# Exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
@@ -124,14 +219,33 @@ async def global_exception_handler(request: Request, exc: Exception):
 # Health check endpoint
 @app.get("/health", tags=["System"])
 async def health_check():
-    """Health check endpoint for monitoring"""
+    """Health check endpoint for monitoring (degraded while any circuit breaker is not closed)"""
+    breakers = dependencies.health()
     return {
-        "status": "healthy",
+        "status": "healthy" if all(state == "closed" for state in breakers.values()) else "degraded",
         "version": settings.VERSION,
-        "environment": settings.ENVIRONMENT
+        "environment": settings.ENVIRONMENT,
+        "dependencies": breakers
     }
 
 
+# Readiness endpoint
+@app.get("/ready", tags=["System"])
+async def readiness_check():
+    """Readiness probe: 503 until the connection pool is warm"""
+    pool = engine.pool
+    ready = getattr(app.state, "ready", False)
+    content = {
+        "status": "ready" if ready else "starting",
+        "pool": {
+            "size": pool.size(),
+            "idle": pool.checkedin(),
+            "checked_out": pool.checkedout()
+        }
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
+
 # Metrics endpoint
 @app.get("/metrics", tags=["System"])
 async def get_metrics():
@@ -139,6 +253,27 @@ async def get_metrics():
     return observability.get_metrics()
 
 
+@app.get("/metrics/history", tags=["System"])
+async def get_metrics_history(
+    series: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: Optional[str] = None
+):
+    """
+    Metric time series over a range (default: the last hour)
+    
+    `series` is a comma-separated list of series names or prefixes
+    (`requests` matches `requests.count`, `requests.errors`, ...).
+    Resolution defaults to the finest tier still holding `start`: 10s for
+    the last day, then 1m, then 1h.
+    """
+    try:
+        return metrics_history.query(series, start, end, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # Root endpoint
 @app.get("/", tags=["System"])
 async def root():
@@ -156,9 +291,15 @@ app.include_router(auth.router, prefix="/v1/auth", tags=["Authentication"])
 app.include_router(query.router, prefix="/v1/query", tags=["Query"])
 app.include_router(dataset.router, prefix="/v1/datasets", tags=["Datasets"])
 app.include_router(audit.router, prefix="/v1/audit", tags=["Audit"])
+app.include_router(approval.router, prefix="/v1/approvals", tags=["Approvals"])
+app.include_router(admin.router, prefix="/v1/admin", tags=["Admin"])
+app.include_router(ingestion.router, prefix="/v1/ingestion", tags=["Ingestion"])
+app.include_router(pipelines.router, prefix="/v1/pipelines", tags=["Pipelines"])
+app.include_router(events.router, prefix="/v1/events", tags=["Events"])
 
 
 if __name__ == "__main__":
+    # Single development process; production runs launcher.py
     import uvicorn
     uvicorn.run(
         "main:app",
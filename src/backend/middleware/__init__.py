@@ -10,6 +10,9 @@ from .rate_limiting import (
     general_rate_limit,
     strict_rate_limit,
 )
+from .compression import CompressionMiddleware
+from .request_tracking import RequestTrackingMiddleware, next_request_id
+from .load_shedding import LoadSheddingMiddleware, AIMDLimiter, classify_route
 
 __all__ = [
     "limiter",
@@ -18,4 +21,10 @@ __all__ = [
     "auth_rate_limit",
     "general_rate_limit",
     "strict_rate_limit",
+    "CompressionMiddleware",
+    "RequestTrackingMiddleware",
+    "next_request_id",
+    "LoadSheddingMiddleware",
+    "AIMDLimiter",
+    "classify_route",
 ]
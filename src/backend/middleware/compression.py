@@ -0,0 +1,244 @@
+"""
+Response Compression Middleware
+Pure ASGI content negotiation with zstd, brotli and gzip encoders
+"""
+
+from typing import Callable, Dict, List, Optional
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional codec
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional codec
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "text/plain",
+    "text/html",
+    "text/csv",
+)
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._obj.compress(data) + self._obj.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._obj.process(data) + self._obj.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._obj.compress(data) + self._obj.flush()
+
+
+def available_encoders(gzip_level: int = 6, brotli_quality: int = 4, zstd_level: int = 3) -> Dict[str, Callable]:
+    """Encoder factories by content-coding, in server preference order"""
+    encoders: Dict[str, Callable] = {}
+    if zstandard is not None:
+        encoders["zstd"] = lambda: _ZstdEncoder(zstd_level)
+    if brotli is not None:
+        encoders["br"] = lambda: _BrotliEncoder(brotli_quality)
+    encoders["gzip"] = lambda: _GzipEncoder(gzip_level)
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """
+    Pick a content-coding from an Accept-Encoding header
+
+    Honors q-values (q=0 excludes a coding); ties are broken by the
+    server preference order of `supported`.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _with_encoding_suffix(etag: str, coding: str) -> str:
+    # Each encoded representation needs its own strong validator
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{coding}"'
+    return etag
+
+
+class CompressionMiddleware:
+    """
+    Compress responses when the client accepts it
+
+    Complete bodies below `minimum_size` are sent as-is. Streaming bodies
+    (more_body=True) are compressed chunk by chunk with a flush per chunk,
+    so nothing is buffered beyond the current chunk.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders = available_encoders(gzip_level, brotli_quality, zstd_level)
+        self.supported = list(self.encoders)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        coding = negotiate_encoding(accept_encoding, self.supported) if accept_encoding else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, coding, self.encoders[coding], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, coding: str, encoder_factory: Callable, minimum_size: int):
+        self._send = send
+        self._coding = coding
+        self._encoder_factory = encoder_factory
+        self._minimum_size = minimum_size
+        self._start_message = None
+        self._encoder = None
+        self._passthrough = False
+
+    async def send(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self._start_message = message
+            self._passthrough = not self._is_compressible(message)
+            if self._passthrough:
+                await self._send(message)
+            return
+
+        if message_type != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._encoder is None:
+            if not more_body and len(body) < self._minimum_size:
+                # Small complete body: not worth compressing
+                self._passthrough = True
+                await self._send(self._start_message)
+                await self._send(message)
+                return
+
+            self._encoder = self._encoder_factory()
+            headers = self._rewrite_headers(self._start_message)
+            if not more_body:
+                compressed = self._encoder.finish(body)
+                headers.append((b"content-length", str(len(compressed)).encode()))
+                await self._send({**self._start_message, "headers": headers})
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+
+            await self._send({**self._start_message, "headers": headers})
+
+        if more_body:
+            chunk = self._encoder.chunk(body) if body else b""
+            if chunk:
+                await self._send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            await self._send({"type": "http.response.body", "body": self._encoder.finish(body)})
+
+    def _is_compressible(self, message) -> bool:
+        status = message["status"]
+        if status < 200 or status in (204, 304):
+            return False
+
+        content_type = b""
+        for name, value in message.get("headers", []):
+            if name == b"content-encoding":
+                return False
+            if name == b"cache-control" and b"no-transform" in value:
+                return False
+            if name == b"content-type":
+                content_type = value
+        media_type = content_type.split(b";", 1)[0].strip().decode("latin-1").lower()
+        return media_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _rewrite_headers(self, message) -> list:
+        headers = []
+        vary = None
+        for name, value in message.get("headers", []):
+            if name == b"content-length":
+                continue
+            if name == b"vary":
+                vary = value
+                continue
+            if name == b"etag":
+                value = _with_encoding_suffix(value.decode("latin-1"), self._coding).encode("latin-1")
+            headers.append((name, value))
+
+        headers.append((b"content-encoding", self._coding.encode()))
+        if vary is None:
+            headers.append((b"vary", b"Accept-Encoding"))
+        elif b"accept-encoding" not in vary.lower():
+            headers.append((b"vary", vary + b", Accept-Encoding"))
+        else:
+            headers.append((b"vary", vary))
+        return headers
@@ -0,0 +1,177 @@
+"""
+Load Shedding Middleware
+Adaptive (AIMD) concurrency limits per route class with early 503s
+"""
+
+import json
+from time import perf_counter
+from typing import Dict
+
+from services.loop_monitor import loop_monitor
+from services.observability import observability
+from utils.logging import logger
+
+
+# Never shed: liveness/readiness probes, metrics scrapes, authentication and
+# push streams (long-lived; holding a concurrency slot each would starve the limit)
+CRITICAL_PREFIXES = ("/health", "/ready", "/metrics", "/v1/auth", "/v1/events")
+
+# Shed first: expensive, database-bound analytics traffic
+ANALYTICS_PREFIXES = ("/v1/query", "/v1/audit", "/v1/datasets")
+
+
+def classify_route(path: str) -> str:
+    """Route class for a request path: critical, analytics or default"""
+    if path.startswith(CRITICAL_PREFIXES):
+        return "critical"
+    if path.startswith(ANALYTICS_PREFIXES):
+        return "analytics"
+    return "default"
+
+
+class AIMDLimiter:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit
+
+    Each completion within the latency target grows the limit by 1/limit
+    (about +1 per limit's worth of requests); a completion over target, or
+    while the event loop is lagging, cuts it by `backoff`. Cuts happen at
+    most once per target-latency window, so a burst of slow completions
+    from one overload episode counts once.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 50,
+        min_limit: int = 4,
+        max_limit: int = 500,
+        target_latency: float = 1.0,
+        backoff: float = 0.9
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self.accepted = 0
+        self.shed = 0
+        self._last_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.accepted += 1
+        return True
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        self.in_flight -= 1
+        if overloaded or latency > self.target_latency:
+            now = perf_counter()
+            if now - self._last_decrease >= self.target_latency:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def state(self) -> Dict[str, float]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "accepted": self.accepted,
+            "shed": self.shed,
+        }
+
+
+class LoadSheddingMiddleware:
+    """
+    Reject excess load early with 503 + Retry-After
+
+    Analytics and default routes each get an AIMD limiter driven by
+    request latency and event-loop lag. When the loop lags beyond
+    `max_loop_lag`, analytics requests are shed before reaching a handler;
+    default routes only past twice that. Critical routes always pass, so
+    probes and logins stay fast while the database is struggling.
+    """
+
+    def __init__(
+        self,
+        app,
+        target_latency: float = 1.0,
+        max_loop_lag: float = 0.2,
+        initial_limit: int = 50,
+        min_limit: int = 4,
+        max_limit: int = 500,
+        retry_after: int = 1,
+        monitor=loop_monitor,
+        registry=observability
+    ):
+        self.app = app
+        self.max_loop_lag = max_loop_lag
+        self.retry_after = retry_after
+        self.monitor = monitor
+        self.limiters = {
+            route_class: AIMDLimiter(initial_limit, min_limit, max_limit, target_latency)
+            for route_class in ("analytics", "default")
+        }
+        if registry is not None:
+            registry.register_state("load_shedding", self.state)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_route(scope["path"])
+        if route_class == "critical":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        lag = self.monitor.lag
+        lag_limit = self.max_loop_lag if route_class == "analytics" else self.max_loop_lag * 2
+        if lag > lag_limit:
+            limiter.shed += 1
+            await self._reject(send, route_class, f"event loop lag {lag * 1000:.0f}ms")
+            return
+        if not limiter.try_acquire():
+            await self._reject(send, route_class, f"concurrency limit {int(limiter.limit)} reached")
+            return
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(perf_counter() - start, overloaded=self.monitor.lag > self.max_loop_lag)
+
+    async def _reject(self, send, route_class: str, reason: str):
+        # Log the first shed and every 100th after it, not one line per rejection
+        if self.limiters[route_class].shed % 100 == 1:
+            logger.warning(f"Shedding {route_class} load: {reason}")
+        body = json.dumps({
+            "error": {
+                "code": "SERVICE_OVERLOADED",
+                "message": "Server is overloaded. Please retry later.",
+                "details": {
+                    "route_class": route_class,
+                    "retry_after": self.retry_after
+                }
+            }
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def state(self) -> Dict[str, Dict[str, float]]:
+        snapshot = {route_class: limiter.state() for route_class, limiter in self.limiters.items()}
+        snapshot["event_loop"] = self.monitor.state()
+        return snapshot
@@ -8,11 +8,13 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
+from limits.storage import RedisStorage
 from typing import Callable
 import redis.asyncio as redis
 
 from config import settings
 from utils.logging import logger
+from utils.resilience import dependencies
 
 
 # Initialize Redis connection for rate limiting
@@ -40,12 +42,58 @@ def get_user_id(request: Request) -> str:
     return f"ip:{get_remote_address(request)}"
 
 
+class GuardedRedisStorage(RedisStorage):
+    """
+    Rate limit storage whose Redis calls go through the Redis circuit breaker
+    
+    Selected with a `guarded+redis://` (or `guarded+rediss://`) URI. The
+    limiter calls storage synchronously on the event loop, so socket
+    timeouts bound each call and, once the breaker opens, calls fail
+    without touching the network. The limiter then switches to its
+    in-memory fallback and keeps enforcing limits per worker until a
+    health check gets through again.
+    """
+    
+    STORAGE_SCHEME = ["guarded+redis", "guarded+rediss"]
+    
+    def __init__(self, uri: str, **options):
+        super().__init__(uri.replace("guarded+", "", 1), **options)
+    
+    def incr(self, *args, **kwargs) -> int:
+        return dependencies["redis"].call_sync(super().incr, *args, **kwargs)
+    
+    def get(self, *args, **kwargs) -> int:
+        return dependencies["redis"].call_sync(super().get, *args, **kwargs)
+    
+    def get_expiry(self, *args, **kwargs) -> float:
+        return dependencies["redis"].call_sync(super().get_expiry, *args, **kwargs)
+    
+    def check(self) -> bool:
+        if not dependencies["redis"].breaker.allow():
+            return False
+        healthy = super().check()
+        dependencies["redis"].breaker.record(healthy)
+        return healthy
+
+
+def _storage_settings():
+    """Storage URI and options: Redis URIs get the guarded storage and short socket timeouts"""
+    uri = settings.RATE_LIMIT_STORAGE_URI or settings.REDIS_URL
+    if not uri.startswith(("redis://", "rediss://")):
+        return uri, {}
+    timeout = settings.RESILIENCE_REDIS_SOCKET_TIMEOUT_MS / 1000
+    return f"guarded+{uri}", {"socket_timeout": timeout, "socket_connect_timeout": timeout}
+
+
 # Initialize rate limiter
+_storage_uri, _storage_options = _storage_settings()
 limiter = Limiter(
     key_func=get_user_id,
-    storage_uri=settings.REDIS_URL,
+    storage_uri=_storage_uri,
+    storage_options=_storage_options,
     strategy="fixed-window",
-    enabled=True
+    in_memory_fallback_enabled=True,
+    enabled=settings.RATE_LIMIT_ENABLED
 )
 
 
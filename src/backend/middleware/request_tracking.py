@@ -0,0 +1,101 @@
+"""
+Request Tracking Middleware
+Pure ASGI request IDs, timing and metrics
+"""
+
+import itertools
+import logging
+import os
+from time import perf_counter
+
+from services import observability, slo_engine
+from utils.logging import logger
+
+
+# Request metrics are keyed by route template, so their number is bounded
+# by the routes: IDs in paths, unknown paths and made-up methods share keys
+UNMATCHED_PATH = "<unmatched>"
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+_prefix = os.urandom(6).hex()
+_counter = itertools.count(1)
+
+
+def _reset_request_ids():
+    # Forked workers must not share the parent's ID sequence
+    global _prefix, _counter
+    _prefix = os.urandom(6).hex()
+    _counter = itertools.count(1)
+
+
+os.register_at_fork(after_in_child=_reset_request_ids)
+
+
+def next_request_id() -> str:
+    """
+    Generate a request ID
+
+    A random per-process prefix plus a counter: unique across workers and
+    several times cheaper than str(uuid.uuid4()).
+    """
+    return f"{_prefix}-{next(_counter):x}"
+
+
+class RequestTrackingMiddleware:
+    """
+    Assign request IDs and record timing and metrics
+
+    Unlike @app.middleware("http") (BaseHTTPMiddleware) this wraps `send`
+    directly: no extra task or memory stream per request, and streaming
+    bodies pass through untouched. Metrics are recorded when the final
+    body chunk is sent.
+    """
+
+    def __init__(self, app, registry=observability, slo=slo_engine):
+        self.app = app
+        self.registry = registry
+        self.slo = slo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next_request_id()
+        scope.setdefault("state", {})["request_id"] = request_id
+        start = perf_counter()
+        status_code = 500
+        recorded = False
+
+        async def send_wrapper(message):
+            nonlocal status_code, recorded
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                status_code = message["status"]
+                headers = message.setdefault("headers", [])
+                if not isinstance(headers, list):
+                    headers = message["headers"] = list(headers)
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                headers.append((b"x-process-time", repr(perf_counter() - start).encode("latin-1")))
+            await send(message)
+            if message_type == "http.response.body" and not message.get("more_body", False):
+                recorded = True
+                self._record(scope, status_code, perf_counter() - start, request_id)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                self._record(scope, status_code, perf_counter() - start, request_id)
+
+    def _record(self, scope, status_code: int, duration: float, request_id: str):
+        # Set on the (shared) scope by the router once a route matched
+        route = scope.get("route")
+        method = scope["method"] if scope["method"] in METHODS else "OTHER"
+        self.registry.record_request(method, route.path if route is not None else UNMATCHED_PATH, status_code, duration)
+        self.slo.record_request(scope["path"], status_code)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Request processed: %s %s - Status: %s - Time: %.3fs - RequestID: %s",
+                scope["method"], scope["path"], status_code, duration, request_id
+            )
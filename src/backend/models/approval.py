@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Text, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 import enum
 import datetime
@@ -20,5 +20,21 @@ class ApprovalRequest(Base):
     approver_id = Column(String, nullable=True)
     status = Column(Enum(ApprovalStatus), default=ApprovalStatus.pending, nullable=False)
     comment = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    version = Column(Integer, nullable=False, default=1)  # optimistic concurrency token
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        # Queue listings are newest-first keyset scans: (filter, created_at, id)
+        Index("ix_approval_requests_status_created", "status", "created_at", "id"),
+        Index("ix_approval_requests_dataset_created", "dataset_id", "created_at", "id"),
+        Index("ix_approval_requests_requester_created", "requested_by", "created_at", "id"),
+        # The pending queue is a small, hot slice of the table
+        Index(
+            "ix_approval_requests_pending_queue",
+            "created_at", "id",
+            postgresql_where=text("status = 'pending'")
+        ),
+    )
+
+    __mapper_args__ = {"version_id_col": version}
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+import datetime
+from db.base import Base
+
+
+class DatasetCardRecord(Base):
+    __tablename__ = "dataset_cards"
+
+    dataset_id = Column(String(64), primary_key=True)
+    card = Column(JSONB, nullable=False)  # the full card, as services.catalog serves it
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
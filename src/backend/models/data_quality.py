@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, Float
+from sqlalchemy.dialects.postgresql import ARRAY
+import datetime
+from db.base import Base
+
+
+class DataQualityBaseline(Base):
+    __tablename__ = "dq_baselines"
+
+    table_name = Column(String(63), primary_key=True)  # dataset table or pipeline output
+    column_name = Column(String(63), primary_key=True)
+    edges = Column(ARRAY(Float), nullable=False)  # decile edges of the accepted run
+    recorded_by = Column(String, nullable=True)  # user or pipeline run that accepted it
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, DateTime, Text, Integer, BigInteger, Float, Index
+from sqlalchemy.dialects.postgresql import JSONB
+import datetime
+from db.base import Base
+
+
+class IngestionJobRecord(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String(36), primary_key=True)  # job ID returned by POST /v1/ingestion
+    dataset_id = Column(String(64), nullable=False)
+    table_name = Column(String(63), nullable=False)
+    format = Column(String(16), nullable=False)  # csv, jsonl, parquet
+    filename = Column(String, nullable=True)
+    bytes = Column(BigInteger, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False)  # queued, running, completed, failed
+    submitted_by = Column(String, nullable=False)
+    rows_loaded = Column(BigInteger, nullable=False, default=0)
+    rows_rejected = Column(BigInteger, nullable=False, default=0)
+    batches = Column(Integer, nullable=False, default=0)
+    rows_per_second = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    snapshot_id = Column(String(36), nullable=True)
+    evidence = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # refreshed while queued or running
+
+    __table_args__ = (
+        Index("ix_ingestion_jobs_created", "created_at"),
+        Index("ix_ingestion_jobs_dataset_created", "dataset_id", "created_at"),
+    )
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, BigInteger, Boolean, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import datetime
+from db.base import Base
+
+
+class Pipeline(Base):
+    __tablename__ = "pipelines"
+
+    id = Column(String(64), primary_key=True)
+    name = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    steps = Column(JSONB, nullable=False)  # [{step_id, sql, output, depends_on, inputs, watermarks}]
+    created_by = Column(String, nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+
+class PipelineRun(Base):
+    __tablename__ = "pipeline_runs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=lambda: __import__('uuid').uuid4())
+    pipeline_id = Column(String(64), ForeignKey("pipelines.id", ondelete="CASCADE"), nullable=False)
+    pipeline_version = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="running")  # running, completed, failed
+    triggered_by = Column(String, nullable=False)
+    force = Column(Boolean, nullable=False, default=False)  # rerun every step, ignoring fingerprints
+    attempts = Column(Integer, nullable=False, default=1)  # incremented on each resume
+    evidence = Column(JSONB, nullable=True)
+    started_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=True)  # refreshed while executing
+
+    __table_args__ = (
+        Index("ix_pipeline_runs_pipeline_started", "pipeline_id", "started_at"),
+    )
+
+
+class PipelineStepRun(Base):
+    __tablename__ = "pipeline_step_runs"
+
+    run_id = Column(UUID(as_uuid=True), ForeignKey("pipeline_runs.id", ondelete="CASCADE"), primary_key=True)
+    step_id = Column(String(64), primary_key=True)
+    pipeline_id = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False)  # completed, skipped, failed, blocked
+    fingerprint = Column(String(64), nullable=True)  # digest of SQL, upstream fingerprints and input probes
+    rows_written = Column(BigInteger, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    evidence = Column(JSONB, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Last successful fingerprint per step: newest-first scan per (pipeline, step)
+        Index("ix_pipeline_step_runs_step_finished", "pipeline_id", "step_id", "finished_at"),
+    )
@@ -0,0 +1,61 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, BigInteger, Float, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+import datetime
+from db.base import Base
+
+
+class QueryFingerprint(Base):
+    __tablename__ = "query_fingerprints"
+
+    fingerprint = Column(String(32), primary_key=True)  # utils.sql.shape_fingerprint
+    sql_text = Column(Text, nullable=False)  # the query shape (literals replaced by ?), stored once
+    dataset_id = Column(String, nullable=True)
+    template_id = Column(String(64), nullable=True)
+    first_seen_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+
+class QueryExecution(Base):
+    __tablename__ = "query_executions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)  # execution ID from the evidence pack
+    user_id = Column(String, nullable=False)
+    dataset_id = Column(String, nullable=False)
+    fingerprint = Column(String(32), ForeignKey("query_fingerprints.fingerprint"), nullable=False)
+    sql_text = Column(Text, nullable=True)  # the statement as run, only when it has literals its shape hides
+    params = Column(JSONB, nullable=True)
+    status = Column(String(10), nullable=False)  # success, error
+    row_count = Column(Integer, nullable=False, default=0)
+    duration_ms = Column(Float, nullable=False)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # History listings are newest-first keyset scans: (filter, created_at, id)
+        Index("ix_query_executions_user_created", "user_id", "created_at", "id"),
+        Index("ix_query_executions_dataset_created", "dataset_id", "created_at", "id"),
+    )
+
+
+class QueryRollupHourly(Base):
+    __tablename__ = "query_rollups_hourly"
+
+    hour = Column(DateTime, primary_key=True)
+    dataset_id = Column(String, primary_key=True)
+    fingerprint = Column(String(32), primary_key=True)
+    executions = Column(BigInteger, nullable=False, default=0)
+    errors = Column(BigInteger, nullable=False, default=0)
+    rows_total = Column(BigInteger, nullable=False, default=0)
+    duration_total_ms = Column(Float, nullable=False, default=0)
+    duration_max_ms = Column(Float, nullable=False, default=0)
+    latency_histogram = Column(ARRAY(BigInteger), nullable=False)  # counts per LATENCY_BOUNDS_MS bucket, plus overflow
+
+
+class QueryShapeBaseline(Base):
+    __tablename__ = "query_shape_baselines"
+
+    fingerprint = Column(String(32), primary_key=True)  # utils.sql.shape_fingerprint
+    dataset_id = Column(String, nullable=True)
+    baseline_p95_ms = Column(Float, nullable=True)
+    baseline_plan_hash = Column(String(16), nullable=True)
+    baseline_plan = Column(JSONB, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
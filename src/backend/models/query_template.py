@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
+import datetime
+from db.base import Base
+
+
+class QueryTemplateRecord(Base):
+    __tablename__ = "query_templates"
+
+    template_id = Column(String(64), primary_key=True)
+    dataset_id = Column(String(64), nullable=False)  # catalog dataset ID
+    sql = Column(Text, nullable=False)  # SELECT with :name placeholders
+    description = Column(Text, nullable=True)
+    parameters = Column(JSONB, nullable=False)  # [{name, type, required, default, description}]
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_query_templates_dataset", "dataset_id"),
+    )
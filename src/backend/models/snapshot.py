@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, BigInteger, LargeBinary, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import deferred
+import datetime
+from db.base import Base
+
+
+class DatasetSnapshot(Base):
+    __tablename__ = "dataset_snapshots"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=lambda: __import__('uuid').uuid4())
+    dataset_id = Column(String(64), nullable=False)
+    table_name = Column(String(63), nullable=False)
+    key_column = Column(String(63), nullable=False)  # rows are bucketed by a hash of this column
+    parent_id = Column(UUID(as_uuid=True), ForeignKey("dataset_snapshots.id", ondelete="SET NULL"), nullable=True)
+    bucket_count = Column(Integer, nullable=False)  # power of two, inherited from the parent so manifests compare
+    row_count = Column(BigInteger, nullable=False)
+    watermark = Column(JSONB, nullable=True)  # {"column": ..., "max": ...} when a watermark column is declared
+    digest = Column(String(64), nullable=False)  # hash of the whole manifest: equal digests, equal content
+    # Per-bucket row counts (int64) then content hashes (uint64); up to 64 MB, so
+    # loaded only where diffed: query with undefer(DatasetSnapshot.manifest)
+    manifest = deferred(Column(LargeBinary, nullable=False))
+    changed_buckets = Column(Integer, nullable=True)  # versus the parent snapshot
+    duration_ms = Column(Integer, nullable=True)
+    created_by = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Latest snapshot per dataset: newest-first scan
+        Index("ix_dataset_snapshots_dataset_created", "dataset_id", "created_at"),
+    )
@@ -2,7 +2,7 @@
 User model
 """
 
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, CheckConstraint
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from datetime import datetime
@@ -23,5 +23,9 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login_at = Column(DateTime, nullable=True)
     
+    __table_args__ = (
+        CheckConstraint("role IN ('admin', 'approver', 'analyst', 'viewer')", name="ck_users_role"),
+    )
+    
     def __repr__(self):
         return f"<User {self.email}>"
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
 from datetime import datetime
 from uuid import UUID
 
@@ -15,8 +15,31 @@ class ApprovalRequestResponse(BaseModel):
     approver_id: Optional[str]
     status: str
     comment: Optional[str]
+    version: int
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+class ApprovalRequestPage(BaseModel):
+    items: List[ApprovalRequestResponse]
+    next_cursor: Optional[str] = None
+
+class BulkApprovalItem(BaseModel):
+    id: UUID
+    version: int  # version the approver saw; stale versions are reported as conflicts
+
+class BulkApprovalAction(BaseModel):
+    action: Literal["approve", "reject"]
+    comment: Optional[str] = None
+    items: List[BulkApprovalItem] = Field(..., min_length=1, max_length=1000)
+
+class BulkApprovalApplied(BaseModel):
+    id: UUID
+    version: int
+
+class BulkApprovalResult(BaseModel):
+    action: str
+    applied: List[BulkApprovalApplied]
+    conflicts: List[UUID]  # not found, no longer pending, or version changed
@@ -0,0 +1,29 @@
+"""
+Ingestion schemas (Pydantic models for validation)
+"""
+
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class IngestionJobResponse(BaseModel):
+    """Dataset load job status"""
+    job_id: str
+    dataset_id: str
+    table: str
+    format: str  # csv, jsonl, parquet
+    filename: Optional[str] = None
+    bytes: int
+    status: str  # queued, running, completed, failed
+    submitted_by: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    rows_loaded: int = 0
+    rows_rejected: int = 0
+    batches: int = 0
+    rows_per_second: Optional[float] = None
+    error: Optional[str] = None
+    snapshot_id: Optional[str] = None  # snapshot taken after a completed load
+    evidence: Optional[dict] = None  # set when the load finishes
@@ -0,0 +1,83 @@
+"""
+Pipeline schemas (Pydantic models for validation)
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
+from datetime import datetime
+from uuid import UUID
+
+from .quality import DQCheck
+
+
+class PipelineStep(BaseModel):
+    """One SQL transformation step, materialized into its output table"""
+    step_id: str = Field(..., pattern=r"^[a-z0-9_\-]{1,64}$")
+    sql: str  # SELECT producing the output table
+    output: str  # table the step writes
+    depends_on: List[str] = []  # step IDs that must succeed first
+    inputs: List[str] = []  # external tables read; probed to detect changes
+    watermarks: Dict[str, str] = {}  # input table -> monotonic column (e.g. updated_at); others are content-hashed
+    checks: List[DQCheck] = []  # run on the built output before it replaces the old one
+
+
+class PipelineCreate(BaseModel):
+    """Pipeline registration request"""
+    pipeline_id: str = Field(..., pattern=r"^[a-z0-9_\-]{3,64}$")
+    name: str
+    description: Optional[str] = None
+    steps: List[PipelineStep] = Field(..., min_length=1)
+
+
+class PipelineResponse(BaseModel):
+    """Registered pipeline"""
+    id: str
+    name: str
+    description: Optional[str] = None
+    steps: List[PipelineStep]
+    created_by: str
+    version: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PipelineRunRequest(BaseModel):
+    """Pipeline run request"""
+    force: bool = False  # re-execute every step even if its inputs are unchanged
+
+
+class PipelineStepRunResponse(BaseModel):
+    """Checkpointed outcome of one step"""
+    step_id: str
+    status: str  # completed, skipped, failed, blocked
+    fingerprint: Optional[str] = None
+    rows_written: Optional[int] = None
+    duration_ms: Optional[int] = None
+    error: Optional[str] = None
+    evidence: Optional[dict] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PipelineRunResponse(BaseModel):
+    """Pipeline run status"""
+    id: UUID
+    pipeline_id: str
+    pipeline_version: int
+    status: str  # running, completed, failed
+    triggered_by: str
+    force: bool
+    attempts: int
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    evidence: Optional[dict] = None
+    steps: List[PipelineStepRunResponse] = []
+
+    class Config:
+        from_attributes = True
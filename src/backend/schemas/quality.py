@@ -0,0 +1,25 @@
+"""
+Data quality schemas (Pydantic models for validation)
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+
+
+class DQCheck(BaseModel):
+    """Declarative data-quality check on one column"""
+    type: Literal["null_rate", "unique", "range", "referential", "drift"]
+    column: str
+    name: Optional[str] = None  # defaults to "<type>:<column>"
+    severity: Literal["error", "warn"] = "error"  # warn failures never fail the run
+    max_rate: float = Field(0.0, ge=0, le=1)  # null_rate, range, referential: tolerated violation rate
+    min: Optional[float] = None  # range
+    max: Optional[float] = None  # range
+    ref_table: Optional[str] = None  # referential
+    ref_column: Optional[str] = None  # referential
+    max_psi: float = Field(0.2, ge=0)  # drift: population stability index vs previous profile
+
+
+class DataQualityRequest(BaseModel):
+    """Data-quality run request"""
+    checks: List[DQCheck] = Field(..., min_length=1, max_length=1000)
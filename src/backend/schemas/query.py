@@ -2,29 +2,86 @@
 Query schemas (Pydantic models for validation)
 """
 
-from pydantic import BaseModel
-from typing import Optional, List, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Any, Dict, Literal
 from datetime import datetime
 
+from .quality import DQCheck
+
 
 class QueryRequest(BaseModel):
     """SQL query execution request"""
     question: Optional[str] = None  # Natural language query (optional)
-    sql: str  # SQL query to execute
-    dataset_id: str  # Dataset being queried
+    sql: Optional[str] = None  # SQL query to execute (omit when using template_id)
+    template_id: Optional[str] = None  # Registered query template to execute
+    params: Optional[Dict[str, Any]] = None  # Bind parameters for :name placeholders
+    dataset_id: Optional[str] = None  # Dataset being queried (defaults to the template's)
+    row_format: Literal["objects", "arrays", "columns"] = "objects"  # arrays: one list per row; columns: one list per column
+    checks: Optional[List[DQCheck]] = None  # data-quality checks run over the result (recorded in evidence)
+    page_size: Optional[int] = Field(None, ge=1, le=10000)  # return the first page and a cursor for GET /{query_id}/rows
 
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.sql is None) == (self.template_id is None):
+            raise ValueError("Provide exactly one of sql or template_id")
+        if self.sql is not None and not self.dataset_id:
+            raise ValueError("dataset_id is required when executing sql")
+        if self.page_size is not None and self.checks:
+            raise ValueError("checks cannot be combined with page_size")
+        return self
 
-class QueryResponse(BaseModel):
-    """Query execution response"""
+
+class QueryTemplateParameter(BaseModel):
+    """Declared bind parameter of a query template"""
+    name: str = Field(..., pattern=r"^[A-Za-z_][A-Za-z0-9_]*$")
+    type: Literal["string", "integer", "number", "decimal", "boolean", "date", "timestamp"] = "string"
+    required: bool = True
+    default: Optional[Any] = None
+    description: Optional[str] = None
+
+
+class QueryTemplateCreate(BaseModel):
+    """Query template registration request"""
+    template_id: str = Field(..., pattern=r"^[a-z0-9_\-]{3,64}$")
+    dataset_id: str
+    sql: str  # SELECT with :name placeholders for every declared parameter
+    description: Optional[str] = None
+    parameters: List[QueryTemplateParameter] = []
+
+
+class QueryTemplateResponse(QueryTemplateCreate):
+    """Registered query template"""
+    created_by: Optional[str] = None
+    created_at: datetime
+
+
+class QueryEnvelope(BaseModel):
+    """Query execution response without the row payload"""
     query_id: str
     status: str  # pending, running, completed, error
     sql: Optional[str] = None
     columns: Optional[List[str]] = None
-    data: Optional[List[dict]] = None
     row_count: Optional[int] = None
     execution_time: Optional[float] = None
     evidence: Optional[dict] = None
     message: Optional[str] = None
-    
+
     class Config:
         from_attributes = True
+
+
+class QueryResponse(QueryEnvelope):
+    """Query execution response"""
+    data: Optional[List[Any]] = None  # dicts for row_format=objects, row lists for arrays, column lists for columns
+    next_cursor: Optional[str] = None  # paged results: cursor for the next page, null on the last one
+    truncated: Optional[bool] = None  # paged results: rows beyond the stored size limit were dropped
+
+
+class QueryRowsPage(BaseModel):
+    """One page of a materialized query result"""
+    query_id: str
+    columns: List[str]
+    row_count: int  # rows in the whole result
+    truncated: bool
+    data: List[Any]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,34 @@
+"""
+Dataset snapshot schemas (Pydantic models for validation)
+"""
+
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+
+
+class SnapshotRequest(BaseModel):
+    """Snapshot request; columns default to the dataset card's key"""
+    key_column: Optional[str] = None  # defaults to the card's primary_key, else its first column
+    watermark_column: Optional[str] = None  # monotonic column (e.g. updated_at) whose high-water mark is recorded
+
+
+class SnapshotResponse(BaseModel):
+    """Recorded snapshot (the bucket manifest itself is not returned)"""
+    id: UUID
+    dataset_id: str
+    table_name: str
+    key_column: str
+    parent_id: Optional[UUID] = None
+    bucket_count: int
+    row_count: int
+    watermark: Optional[dict] = None
+    digest: str
+    changed_buckets: Optional[int] = None  # versus the parent snapshot
+    duration_ms: Optional[int] = None
+    created_by: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
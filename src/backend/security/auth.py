@@ -2,19 +2,25 @@
 Authentication and JWT handling
 """
 
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import uuid
 
 from config import settings
 from models.user import User
-from db.session import get_db
+from db.session import get_autocommit_db, is_unavailable_error
+from utils.errors import DependencyUnavailableError
+from utils.logging import logger
+from utils.shared_state import shared_state
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -23,6 +29,51 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/auth/login")
 
 
+class UserSnapshotCache:
+    """
+    Recently authenticated users, for authenticating while Postgres is down
+    
+    Holds the identity fields of each user resolved from the database
+    (bounded LRU, entries expire after `ttl` seconds). When the user lookup
+    fails because Postgres is unavailable, a fresh snapshot stands in for
+    the row, so requests that do not otherwise need the database keep
+    working for users seen recently.
+    """
+    
+    def __init__(self, ttl: float = 300.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+    
+    def put(self, user: User) -> None:
+        self._entries[str(user.id)] = (time.monotonic(), {
+            "id": user.id,
+            "email": user.email,
+            "full_name": user.full_name,
+            "role": user.role,
+            "is_active": user.is_active,
+        })
+        self._entries.move_to_end(str(user.id))
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def get(self, user_id: str) -> Optional[User]:
+        """Detached User built from a fresh snapshot, or None"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        stored_at, fields = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[user_id]
+            return None
+        self.hits += 1
+        return User(**fields)
+
+
+user_snapshots = UserSnapshotCache(settings.USER_SNAPSHOT_TTL, settings.USER_SNAPSHOT_MAX_ENTRIES)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -92,7 +143,8 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
     if not user:
         return None
     
-    if not verify_password(password, user.hashed_password):
+    # bcrypt is deliberately slow; keep it off the event loop
+    if not await run_in_threadpool(verify_password, password, user.hashed_password):
         return None
     
     # Update last login
@@ -104,9 +156,31 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_autocommit_db)
 ) -> User:
-    """Get current user from JWT token"""
+    """
+    Get current user from JWT token
+    
+    The lookup's connection is returned straight away; handlers that need
+    the database open their own session.
+    """
+    try:
+        return await authenticate_token(db, token)
+    finally:
+        await db.close()
+
+
+async def authenticate_token(db: AsyncSession, token: str) -> User:
+    """
+    Resolve an access token to an active user
+    
+    Raises 401 for an invalid, revoked or unknown-user token and 403 for a
+    disabled account. Long-lived connections call this once when they
+    open rather than per request; the event broker then closes them when
+    the token expires or is revoked. If Postgres is unavailable, a recent
+    snapshot of the user is used instead (DependencyUnavailableError
+    when there is none).
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -125,14 +199,30 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    result = await db.execute(
-        select(User).where(User.id == uuid.UUID(user_id))
-    )
-    user = result.scalar_one_or_none()
-    
-    if user is None:
+    jti = payload.get("jti")
+    if jti and shared_state.is_revoked(jti):
         raise credentials_exception
     
+    try:
+        result = await db.execute(
+            select(User).where(User.id == uuid.UUID(user_id))
+        )
+        user = result.scalar_one_or_none()
+    except Exception as e:
+        if not is_unavailable_error(e):
+            raise
+        await db.rollback()
+        user = user_snapshots.get(user_id)
+        if user is None:
+            if isinstance(e, DependencyUnavailableError):
+                raise
+            raise DependencyUnavailableError("postgres", str(e)) from e
+        logger.warning(f"Authenticated user {user_id} from cached snapshot: {str(e)}")
+    else:
+        if user is None:
+            raise credentials_exception
+        user_snapshots.put(user)
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -142,6 +232,16 @@ async def get_current_user(
     return user
 
 
+def revoke_token(token: str) -> None:
+    """Reject an access token on every worker of this host until it expires"""
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return
+    if payload.get("jti"):
+        shared_state.revoke(payload["jti"])
+
+
 def require_role(allowed_roles: list[str]):
     """Decorator to require specific roles"""
     async def role_checker(current_user: User = Depends(get_current_user)):
@@ -4,9 +4,58 @@ Services package initialization
 
 from .query_execution import QueryExecutionService
 from .observability import observability, track_performance
+from .catalog import catalog, DatasetCatalog
+from .schema_index import schema_index, SchemaIndex, format_prompt_context
+from .profiler import profiler, SamplingProfiler
+from .loop_monitor import loop_monitor, EventLoopLagMonitor
+from .coalescing import coalescer, QueryCoalescer
+from .query_templates import query_templates, QueryTemplateRegistry
+from .ingestion import ingestion, IngestionService
+from .pipelines import pipeline_engine, PipelineEngine
+from .data_quality import dq_engine, DataQualityEngine
+from .snapshots import snapshots, SnapshotService
+from .query_history import query_history, QueryHistoryStore
+from .slow_queries import slow_queries, SlowQueryAnalyzer
+from .slo import slo_engine, SLOEngine
+from .metrics_history import metrics_history, MetricsHistory
+from .events import event_broker, EventBroker
+from .result_store import result_store, ResultStore
 
 __all__ = [
     "QueryExecutionService",
     "observability",
     "track_performance",
+    "catalog",
+    "DatasetCatalog",
+    "schema_index",
+    "SchemaIndex",
+    "format_prompt_context",
+    "profiler",
+    "SamplingProfiler",
+    "loop_monitor",
+    "EventLoopLagMonitor",
+    "coalescer",
+    "QueryCoalescer",
+    "query_templates",
+    "QueryTemplateRegistry",
+    "ingestion",
+    "IngestionService",
+    "pipeline_engine",
+    "PipelineEngine",
+    "dq_engine",
+    "DataQualityEngine",
+    "snapshots",
+    "SnapshotService",
+    "query_history",
+    "QueryHistoryStore",
+    "slow_queries",
+    "SlowQueryAnalyzer",
+    "slo_engine",
+    "SLOEngine",
+    "metrics_history",
+    "MetricsHistory",
+    "event_broker",
+    "EventBroker",
+    "result_store",
+    "ResultStore",
 ]
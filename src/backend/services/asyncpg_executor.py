@@ -0,0 +1,112 @@
+"""
+Asyncpg Query Executor
+Raw-driver fast path for read queries on the session's pooled connection
+"""
+
+import itertools
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+from weakref import WeakKeyDictionary
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from utils.lazy import lazy_import
+from .observability import observability
+
+asyncpg = lazy_import("asyncpg")
+
+
+class AsyncpgExecutor:
+    """
+    Execute SQL directly on asyncpg, bypassing SQLAlchemy result processing
+
+    Uses the asyncpg connection underneath the session, so pooling,
+    transactions and the session lifecycle are unchanged. Statements are
+    prepared once per connection under a stable name and kept in a
+    per-connection LRU; asyncpg executes them over the binary protocol and
+    results come back as native Records (tuple-like, not converted per row).
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self.cache_size = cache_size
+        self._caches: "WeakKeyDictionary[Any, OrderedDict]" = WeakKeyDictionary()
+        self._names = itertools.count(1)
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "reprepared": 0}
+
+    async def driver_connection(self, session: AsyncSession):
+        """
+        The asyncpg connection backing a session, inside the session's transaction
+
+        SQLAlchemy's asyncpg adapter sends BEGIN lazily, before the first
+        statement it runs itself, so statements sent straight to the driver
+        would run in autocommit without the session's characteristics
+        (READ ONLY for get_read_db). Begin the transaction here exactly as
+        the adapter would; the adapter then commits or rolls it back as
+        usual. Sessions in AUTOCOMMIT stay without a transaction.
+        """
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        adapter = raw.dbapi_connection
+        if not adapter._started:
+            # Private adapter API (pinned sqlalchemy==2.0.25): the same call
+            # the adapter's cursor makes before its first statement
+            async with adapter._execute_mutex:
+                if not adapter._started:
+                    await adapter._start_transaction()
+        return raw.driver_connection
+
+    async def fetch(self, session: AsyncSession, sql: str, params: Sequence[Any] = ()) -> Tuple[List[str], List[Any]]:
+        """
+        Run a query and return (columns, records)
+
+        Args:
+            session: Session whose connection to use
+            sql: SQL with asyncpg-style positional parameters ($1, $2, ...)
+            params: Parameter values
+
+        Returns:
+            Column names and the list of asyncpg Records
+        """
+        connection = await self.driver_connection(session)
+        statement = await self._prepare(connection, sql)
+        try:
+            records = await statement.fetch(*params)
+        except asyncpg.exceptions.InvalidCachedStatementError:
+            # Schema changed under a cached plan; prepare again once
+            self._stats["reprepared"] += 1
+            self._cache(connection).pop(sql, None)
+            statement = await self._prepare(connection, sql)
+            records = await statement.fetch(*params)
+        return [attribute.name for attribute in statement.get_attributes()], records
+
+    async def _prepare(self, connection, sql: str):
+        cache = self._cache(connection)
+        statement = cache.get(sql)
+        if statement is not None:
+            cache.move_to_end(sql)
+            self._stats["hits"] += 1
+            return statement
+
+        self._stats["misses"] += 1
+        statement = await connection.prepare(sql, name=f"aureus_stmt_{next(self._names)}")
+        cache[sql] = statement
+        if len(cache) > self.cache_size:
+            # asyncpg deallocates server-side statements once unreferenced
+            cache.popitem(last=False)
+            self._stats["evictions"] += 1
+        return statement
+
+    def _cache(self, connection) -> OrderedDict:
+        cache = self._caches.get(connection)
+        if cache is None:
+            cache = self._caches[connection] = OrderedDict()
+        return cache
+
+    def state(self) -> Dict[str, int]:
+        return {"connections": len(self._caches), **self._stats}
+
+
+# Global asyncpg executor instance
+asyncpg_executor = AsyncpgExecutor(cache_size=settings.QUERY_STATEMENT_CACHE_SIZE)
+observability.register_state("asyncpg_executor", asyncpg_executor.state)
@@ -0,0 +1,178 @@
+"""
+Dataset Catalog Service
+Registry of dataset cards with change notification, persisted in Postgres
+"""
+
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+import asyncio
+import copy
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db.session import AsyncSessionLocal
+from models.catalog import DatasetCardRecord
+from utils.logging import logger
+
+
+# Seed dataset cards (stored cards with the same ID replace them)
+DEFAULT_DATASETS: List[Dict[str, Any]] = [
+    {
+        "id": "dataset-1",
+        "name": "loan_portfolio",
+        "description": "All active and closed loans",
+        "row_count": 125000,
+        "last_updated": "2026-02-01T00:00:00Z",
+        "schema": [
+            {"name": "loan_id", "type": "VARCHAR", "pii": False, "description": "Unique loan identifier"},
+            {"name": "customer_ssn", "type": "VARCHAR", "pii": True, "description": "Borrower social security number"},
+            {"name": "amount", "type": "NUMERIC", "pii": False, "description": "Original loan amount"},
+            {"name": "risk_rating", "type": "VARCHAR", "pii": False, "description": "Credit risk rating (Low, Medium, High)"}
+        ]
+    },
+    {
+        "id": "dataset-2",
+        "name": "aml_alerts",
+        "description": "Anti-money laundering alerts",
+        "row_count": 8500,
+        "last_updated": "2026-02-01T00:00:00Z",
+        "schema": [
+            {"name": "alert_id", "type": "VARCHAR", "pii": False, "description": "Unique alert identifier"},
+            {"name": "customer_id", "type": "VARCHAR", "pii": True, "description": "Customer under investigation"},
+            {"name": "alert_type", "type": "VARCHAR", "pii": False, "description": "Alert typology, e.g. structuring or large cash transaction"},
+            {"name": "severity", "type": "VARCHAR", "pii": False, "description": "Alert severity"}
+        ]
+    }
+]
+
+
+CatalogListener = Callable[[str, Optional[Dict[str, Any]]], None]
+
+
+class DatasetCatalog:
+    """
+    Registry of dataset cards keyed by dataset ID
+
+    Reads are served from memory. Cards changed with `save` are written to
+    Postgres, and every worker merges the stored cards in at warm-up and
+    then every `refresh_interval` seconds (`load`), so a dataset ingested
+    through one worker reaches the others.
+    """
+
+    def __init__(
+        self,
+        datasets: Optional[List[Dict[str, Any]]] = None,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        refresh_interval: float = 30.0
+    ):
+        self._datasets: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[CatalogListener] = []
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._refresher: Optional[asyncio.Task] = None
+        for card in datasets or []:
+            self._datasets[card["id"]] = copy.deepcopy(card)
+
+    def subscribe(self, listener: CatalogListener, replay: bool = True) -> None:
+        """
+        Register a change listener
+
+        Listeners are called with (dataset_id, card) on upsert and
+        (dataset_id, None) on removal. With replay=True the listener
+        immediately receives every card already in the catalog.
+        """
+        self._listeners.append(listener)
+        if replay:
+            for dataset_id, card in self._datasets.items():
+                listener(dataset_id, card)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """List all dataset cards"""
+        return list(self._datasets.values())
+
+    def get(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Get a dataset card by ID or name"""
+        card = self._datasets.get(dataset_id)
+        if card is not None:
+            return card
+        for candidate in self._datasets.values():
+            if candidate.get("name") == dataset_id:
+                return candidate
+        return None
+
+    def upsert(self, card: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert or replace a dataset card and notify listeners"""
+        card = copy.deepcopy(card)
+        self._datasets[card["id"]] = card
+        self._notify(card["id"], card)
+        return card
+
+    def remove(self, dataset_id: str) -> bool:
+        """Remove a dataset card and notify listeners"""
+        if self._datasets.pop(dataset_id, None) is None:
+            return False
+        self._notify(dataset_id, None)
+        return True
+
+    async def save(self, card: Dict[str, Any]) -> Dict[str, Any]:
+        """Upsert a card here and store it for every other worker"""
+        card = self.upsert(card)
+        async with self.session_factory() as session:
+            await self._write(session, {"dataset_id": card["id"], "card": card, "updated_at": datetime.utcnow()})
+            await session.commit()
+        return card
+
+    async def _write(self, session: AsyncSession, row: Dict[str, Any]) -> None:
+        stmt = pg_insert(DatasetCardRecord).values(row)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=["dataset_id"],
+            set_={"card": stmt.excluded.card, "updated_at": stmt.excluded.updated_at}
+        ))
+
+    async def load(self, session: AsyncSession) -> None:
+        """Merge in the stored cards; only cards that changed notify listeners"""
+        records = (await session.execute(select(DatasetCardRecord))).scalars().all()
+        changed = 0
+        for record in records:
+            if self._datasets.get(record.dataset_id) != record.card:
+                self.upsert(record.card)
+                changed += 1
+        if changed:
+            logger.info(f"Loaded {changed} changed dataset cards")
+
+    def start(self) -> None:
+        """Start the periodic refresh on the running loop"""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                async with self.session_factory() as session:
+                    await self.load(session)
+            except Exception as e:
+                logger.warning(f"Refreshing the dataset catalog failed: {str(e)}")
+
+    def _notify(self, dataset_id: str, card: Optional[Dict[str, Any]]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(dataset_id, card)
+            except Exception as e:
+                logger.error(f"Catalog listener failed for {dataset_id}: {str(e)}")
+
+
+# Global dataset catalog instance
+catalog = DatasetCatalog(DEFAULT_DATASETS, refresh_interval=settings.CATALOG_REFRESH_INTERVAL)
@@ -0,0 +1,275 @@
+"""
+Query Coalescing Service
+Single-flight execution of identical concurrent queries, in-process and across workers
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from config import settings
+from utils.errors import DependencyUnavailableError
+from utils.logging import logger
+from utils.resilience import dependencies
+from utils.sql import normalize_sql
+from .observability import observability
+
+
+# Shared outcome of one database execution: (leader execution ID, columns, rows)
+Outcome = Tuple[str, List[str], List[tuple]]
+
+
+def coalescing_key(sql: str, dataset_id: str, role: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Identity of a query for coalescing
+
+    Masking is role-dependent, so only callers with the same role may
+    share a result. Bound parameters are part of the identity.
+    """
+    material = f"{dataset_id}\x00{role}\x00{normalize_sql(sql)}".encode()
+    if params:
+        material += b"\x00" + orjson.dumps(params, default=str, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(material, digest_size=16).hexdigest()
+
+
+# Redis payloads must round-trip driver types exactly, without pickle
+_ENCODERS = (
+    (Decimal, "dec", str),
+    (datetime, "dt", datetime.isoformat),
+    (date, "d", date.isoformat),
+    (time, "t", time.isoformat),
+    (timedelta, "td", timedelta.total_seconds),
+    (uuid.UUID, "uuid", str),
+    (bytes, "b", lambda value: base64.b64encode(value).decode()),
+)
+
+_DECODERS = {
+    "dec": Decimal,
+    "dt": datetime.fromisoformat,
+    "d": date.fromisoformat,
+    "t": time.fromisoformat,
+    "td": lambda value: timedelta(seconds=value),
+    "uuid": uuid.UUID,
+    "b": base64.b64decode,
+}
+
+
+def _encode_value(value: Any) -> Any:
+    for kind, tag, encode in _ENCODERS:
+        if isinstance(value, kind):
+            return {"$": tag, "v": encode(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$" in value:
+        return _DECODERS[value["$"]](value["v"])
+    return value
+
+
+def encode_outcome(outcome: Outcome) -> bytes:
+    leader_id, columns, rows = outcome
+    return orjson.dumps({
+        "leader": leader_id,
+        "columns": columns,
+        "rows": [[_encode_value(value) for value in row] for row in rows],
+    })
+
+
+def decode_outcome(payload: bytes) -> Outcome:
+    message = orjson.loads(payload)
+    if "error" in message:
+        raise RuntimeError(message["error"])
+    rows = [tuple(_decode_value(value) for value in row) for row in message["rows"]]
+    return message["leader"], message["columns"], rows
+
+
+class QueryCoalescer:
+    """
+    Share one database execution among identical concurrent queries
+
+    The first caller for a key becomes the leader and runs the query;
+    callers arriving while it is in flight await the leader's outcome
+    instead of taking their own connection. With a Redis URL, leaders in
+    different workers additionally serialize on a Redis lock and publish
+    their outcome, so only one worker hits the database. Any Redis failure
+    falls back to executing locally.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        lock_ttl: float = 60.0,
+        wait_timeout: float = 30.0,
+        result_ttl: float = 5.0
+    ):
+        self.redis_url = redis_url
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.result_ttl = result_ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._redis = None
+        self._stats = {"leader": 0, "local_follower": 0, "remote_follower": 0, "redis_errors": 0, "redis_skipped": 0}
+
+    async def run(
+        self,
+        key: str,
+        execution_id: str,
+        execute: Callable[[], Awaitable[Tuple[List[str], List[tuple]]]]
+    ) -> Tuple[Outcome, Dict[str, Any]]:
+        """
+        Execute through the coalescer
+
+        Args:
+            key: Coalescing key from coalescing_key()
+            execution_id: The caller's own execution ID
+            execute: Coroutine function returning (columns, rows) from the database
+
+        Returns:
+            (outcome, coalescing info for the evidence pack)
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                outcome = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leader's request went away; take over as leader
+                return await self.run(key, execution_id, execute)
+            self._stats["local_follower"] += 1
+            return outcome, {"coalesced": True, "scope": "local", "leader_execution_id": outcome[0]}
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self.redis_url:
+                outcome, info = await self._run_distributed(key, execution_id, execute)
+            else:
+                outcome, info = await self._run_leader(execution_id, execute)
+            future.set_result(outcome)
+            return outcome, info
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody was waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _run_leader(self, execution_id: str, execute) -> Tuple[Outcome, Dict[str, Any]]:
+        self._stats["leader"] += 1
+        columns, rows = await execute()
+        return (execution_id, columns, rows), {"coalesced": False, "scope": "leader", "leader_execution_id": execution_id}
+
+    async def _run_distributed(self, key: str, execution_id: str, execute) -> Tuple[Outcome, Dict[str, Any]]:
+        try:
+            client = self._client()
+            lock = client.lock(f"aureus:coalesce:lock:{key}", timeout=self.lock_ttl, blocking=False)
+            acquired = await dependencies["redis"].call(lock.acquire)
+        except DependencyUnavailableError:
+            # Redis circuit open: coalesce within this worker only
+            self._stats["redis_skipped"] += 1
+            return await self._run_leader(execution_id, execute)
+        except Exception as e:
+            self._redis_error("lock", e)
+            return await self._run_leader(execution_id, execute)
+
+        if not acquired:
+            outcome = await self._await_remote(client, key)
+            if outcome is not None:
+                self._stats["remote_follower"] += 1
+                return outcome, {"coalesced": True, "scope": "distributed", "leader_execution_id": outcome[0]}
+            return await self._run_leader(execution_id, execute)
+
+        try:
+            # Drop the previous leader's published outcome; it predates this execution
+            await client.delete(f"aureus:coalesce:result:{key}")
+        except Exception as e:
+            self._redis_error("delete", e)
+
+        try:
+            outcome, info = await self._run_leader(execution_id, execute)
+            payload = encode_outcome(outcome)
+        except Exception as e:
+            await self._publish(client, key, orjson.dumps({"error": str(e)}))
+            raise
+        else:
+            await self._publish(client, key, payload)
+            return outcome, info
+        finally:
+            try:
+                await lock.release()
+            except Exception:
+                pass  # expired or Redis gone; the TTL cleans up
+
+    async def _await_remote(self, client, key: str) -> Optional[Outcome]:
+        """Wait for another worker's outcome; None means run locally instead"""
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(f"aureus:coalesce:done:{key}")
+            # The leader may have finished between our lock attempt and subscribing
+            payload = await client.get(f"aureus:coalesce:result:{key}")
+            if payload is None:
+                payload = await asyncio.wait_for(self._next_message(pubsub), self.wait_timeout)
+            return decode_outcome(payload)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out waiting for coalesced query {key}; executing locally")
+            return None
+        except RuntimeError:
+            # The leader failed; run it ourselves so the error is our own
+            return None
+        except Exception as e:
+            self._redis_error("subscribe", e)
+            return None
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    async def _next_message(self, pubsub) -> bytes:
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.wait_timeout)
+            if message is not None:
+                return message["data"]
+
+    async def _publish(self, client, key: str, payload: bytes) -> None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(f"aureus:coalesce:result:{key}", payload, px=int(self.result_ttl * 1000))
+            pipe.publish(f"aureus:coalesce:done:{key}", payload)
+            await dependencies["redis"].call(pipe.execute)
+        except Exception as e:
+            self._redis_error("publish", e)
+
+    def _client(self):
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    def _redis_error(self, operation: str, error: Exception) -> None:
+        self._stats["redis_errors"] += 1
+        logger.warning(f"Query coalescing Redis {operation} failed in worker {os.getpid()}: {str(error)}")
+
+    def state(self) -> Dict[str, int]:
+        return {"in_flight": len(self._inflight), **self._stats}
+
+
+# Global coalescer instance
+coalescer = QueryCoalescer(
+    redis_url=settings.REDIS_URL if settings.QUERY_COALESCING_DISTRIBUTED else None,
+    lock_ttl=settings.QUERY_COALESCING_LOCK_TTL_MS / 1000,
+    wait_timeout=settings.QUERY_COALESCING_WAIT_TIMEOUT_MS / 1000
+)
+observability.register_state("query_coalescing", coalescer.state)
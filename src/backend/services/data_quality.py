@@ -0,0 +1,418 @@
+"""
+Data Quality Engine
+Declarative checks evaluated in one aggregate pass per table
+"""
+
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.session import WORKLOAD
+from models.data_quality import DataQualityBaseline
+from utils.errors import ValidationError
+from utils.lazy import lazy_import
+from utils.logging import logger
+from utils.sql import IDENTIFIER_RE
+from .observability import observability
+
+np = lazy_import("numpy")
+
+
+CHECK_TYPES = ("null_rate", "unique", "range", "referential", "drift")
+
+# Decile edges define ten equally likely buckets for drift (PSI) comparisons
+DECILES = [i / 10 for i in range(1, 10)]
+
+# Floor for empty buckets so PSI stays finite
+PSI_EPSILON = 1e-4
+
+
+def validate_checks(checks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Normalize check definitions and give each a unique name
+
+    Raises:
+        ValidationError: Unknown types, invalid identifiers or missing arguments
+    """
+    normalized = []
+    names = set()
+    for index, check in enumerate(checks):
+        check = dict(check)
+        check_type = check.get("type")
+        if check_type not in CHECK_TYPES:
+            raise ValidationError(f"Unknown check type {check_type}")
+        if not IDENTIFIER_RE.match(check.get("column") or ""):
+            raise ValidationError(f"Invalid column for check {index}: {check.get('column')}")
+        if check_type == "range" and check.get("min") is None and check.get("max") is None:
+            raise ValidationError(f"Range check on {check['column']} needs min or max")
+        if check_type == "referential" and not (
+            IDENTIFIER_RE.match(check.get("ref_table") or "") and IDENTIFIER_RE.match(check.get("ref_column") or "")
+        ):
+            raise ValidationError(f"Referential check on {check['column']} needs ref_table and ref_column")
+        check.setdefault("severity", "error")
+        check.setdefault("max_rate", 0.0)
+        check.setdefault("max_psi", 0.2)
+        name = check.get("name") or f"{check_type}:{check['column']}"
+        if name in names:
+            name = f"{name}#{index}"
+        check["name"] = name
+        names.add(name)
+        normalized.append(check)
+    return normalized
+
+
+def population_stability(bucket_counts: Sequence[int]) -> float:
+    """PSI of observed bucket counts against the uniform (decile) baseline"""
+    total = sum(bucket_counts)
+    if total == 0:
+        return 0.0
+    expected = 1 / len(bucket_counts)
+    psi = 0.0
+    for count in bucket_counts:
+        actual = max(count / total, PSI_EPSILON)
+        psi += (actual - expected) * math.log(actual / expected)
+    return psi
+
+
+class DataQualityEngine:
+    """
+    Evaluate data-quality checks without per-check scans
+
+    Against a database table, every check compiles to aggregate expressions
+    of a single SELECT (referential checks become LEFT JOINs to distinct key
+    sets), so 100 checks cost one scan. Against data already in memory
+    (query results, Arrow tables) the same checks run as NumPy vector
+    operations. Drift compares a numeric column with decile edges from the
+    last accepted run of the same table (see `record_baseline`). Accepted
+    baselines are persisted (`save_baseline`) and re-read before SQL runs
+    (`load_baselines`), so every worker compares against the same one.
+    """
+
+    def __init__(self):
+        self._baselines: Dict[Tuple[str, str], List[float]] = {}
+        self._stats = {"sql_runs": 0, "local_runs": 0, "checks": 0, "failures": 0}
+
+    def baseline(self, table: str, column: str) -> Optional[List[float]]:
+        return self._baselines.get((table, column))
+
+    def record_baseline(self, table: str, results: Dict[str, Any]) -> None:
+        """Accept a run's column profiles as the drift baseline for `table` (this worker only)"""
+        for column, edges in results.get("profile", {}).items():
+            if edges:
+                self._baselines[(table, column)] = edges
+
+    async def save_baseline(
+        self,
+        session: AsyncSession,
+        table: str,
+        results: Dict[str, Any],
+        recorded_by: Optional[str] = None
+    ) -> None:
+        """Accept a run's column profiles as the drift baseline for `table`, persisted and committed"""
+        now = datetime.utcnow()
+        rows = [
+            {"table_name": table, "column_name": column, "edges": edges, "recorded_by": recorded_by, "updated_at": now}
+            for column, edges in results.get("profile", {}).items()
+            if edges
+        ]
+        if rows:
+            await self._write_baselines(session, rows)
+            await session.commit()
+        self.record_baseline(table, results)
+
+    async def _write_baselines(self, session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        stmt = pg_insert(DataQualityBaseline).values(rows)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=["table_name", "column_name"],
+            set_={column: stmt.excluded[column] for column in ("edges", "recorded_by", "updated_at")}
+        ))
+
+    async def load_baselines(self, session: AsyncSession, table: Optional[str] = None) -> None:
+        """Replace cached baselines (of every table, or one) with the persisted ones"""
+        query = select(DataQualityBaseline)
+        if table is not None:
+            query = query.where(DataQualityBaseline.table_name == table)
+        rows = (await session.execute(query)).scalars().all()
+        if table is None:
+            self._baselines.clear()
+        else:
+            for key in [key for key in self._baselines if key[0] == table]:
+                del self._baselines[key]
+        for row in rows:
+            self._baselines[(row.table_name, row.column_name)] = list(row.edges)
+        if table is None:
+            logger.info(f"Loaded data-quality baselines for {len(rows)} columns")
+
+    async def run_sql(
+        self,
+        session: AsyncSession,
+        table: str,
+        checks: List[Dict[str, Any]],
+        baseline_table: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate checks against a table in one aggregate query
+
+        Args:
+            session: Session to run the query on
+            table: Table to check
+            checks: Check definitions (see validate_checks)
+            baseline_table: Table whose drift baseline applies (defaults to `table`)
+
+        Returns:
+            Results dict: passed, per-check results, row count, profile, scan stats
+        """
+        if not IDENTIFIER_RE.match(table):
+            raise ValidationError(f"Invalid table name {table}")
+        checks = validate_checks(checks)
+        baseline_table = baseline_table or table
+        started = time.perf_counter()
+
+        select_list = ["count(*) AS n"]
+        joins: List[str] = []
+        params: Dict[str, Any] = {}
+        for index, check in enumerate(checks):
+            column = f't."{check["column"]}"'
+            alias = f"m{index}"
+            if check["type"] == "null_rate":
+                select_list.append(f"count(*) - count({column}) AS {alias}")
+            elif check["type"] == "unique":
+                select_list.append(f"count({column}) - count(DISTINCT {column}) AS {alias}")
+            elif check["type"] == "range":
+                bounds = []
+                if check.get("min") is not None:
+                    params[f"{alias}_min"] = check["min"]
+                    bounds.append(f"{column} < :{alias}_min")
+                if check.get("max") is not None:
+                    params[f"{alias}_max"] = check["max"]
+                    bounds.append(f"{column} > :{alias}_max")
+                select_list.append(f"count(*) FILTER (WHERE {' OR '.join(bounds)}) AS {alias}")
+            elif check["type"] == "referential":
+                # DISTINCT keeps the join from multiplying rows
+                joins.append(
+                    f'LEFT JOIN (SELECT DISTINCT "{check["ref_column"]}" AS v FROM "{check["ref_table"]}") AS r{index} '
+                    f"ON r{index}.v = {column}"
+                )
+                select_list.append(f"count(*) FILTER (WHERE {column} IS NOT NULL AND r{index}.v IS NULL) AS {alias}")
+            elif check["type"] == "drift":
+                select_list.append(
+                    f"percentile_cont(ARRAY{DECILES}::float8[]) WITHIN GROUP (ORDER BY {column}) AS {alias}_edges"
+                )
+                edges = self.baseline(baseline_table, check["column"])
+                if edges:
+                    for bucket in range(len(edges) + 1):
+                        conditions = [f"{column} IS NOT NULL"]
+                        if bucket > 0:
+                            params[f"{alias}_lo{bucket}"] = edges[bucket - 1]
+                            conditions.append(f"{column} >= :{alias}_lo{bucket}")
+                        if bucket < len(edges):
+                            params[f"{alias}_hi{bucket}"] = edges[bucket]
+                            conditions.append(f"{column} < :{alias}_hi{bucket}")
+                        select_list.append(f"count(*) FILTER (WHERE {' AND '.join(conditions)}) AS {alias}_b{bucket}")
+
+        sql = f'SELECT {", ".join(select_list)} FROM "{table}" AS t {" ".join(joins)}'
+        result = await session.execute(text(sql), params, execution_options=WORKLOAD)
+        metrics = dict(zip(result.keys(), result.fetchall()[0]))
+        results = self._evaluate(table, checks, metrics["n"], lambda index, check: self._sql_metric(metrics, index, check))
+        results["scan"] = {"mode": "sql", "queries": 1, "duration_ms": round((time.perf_counter() - started) * 1000, 3)}
+        self._stats["sql_runs"] += 1
+        return results
+
+    @staticmethod
+    def _sql_metric(metrics: Dict[str, Any], index: int, check: Dict[str, Any]) -> Any:
+        alias = f"m{index}"
+        if check["type"] != "drift":
+            return metrics[alias]
+        buckets = [metrics[key] for key in sorted(
+            (key for key in metrics if key.startswith(f"{alias}_b")), key=lambda key: int(key.rsplit("_b", 1)[1])
+        )]
+        edges = metrics[f"{alias}_edges"]
+        return {"edges": [float(edge) for edge in edges] if edges else None, "buckets": buckets or None}
+
+    def run_local(
+        self,
+        table: str,
+        columns: Dict[str, Any],
+        checks: List[Dict[str, Any]],
+        references: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate checks over in-memory columns with NumPy
+
+        Args:
+            table: Label for results and drift baselines
+            columns: Column name -> values (list, NumPy array or Arrow array)
+            checks: Check definitions (see validate_checks)
+            references: "ref_table.ref_column" -> key values for referential checks
+
+        Returns:
+            Results dict in the same shape as run_sql
+        """
+        checks = validate_checks(checks)
+        started = time.perf_counter()
+        arrays = {name: self._as_array(values) for name, values in columns.items()}
+        rows = len(next(iter(arrays.values()))[0]) if arrays else 0
+        # Per-column intermediates shared by every check on that column
+        cache: Dict[Tuple[str, ...], Any] = {}
+
+        def cached(key: Tuple[str, ...], compute):
+            if key not in cache:
+                cache[key] = compute()
+            return cache[key]
+
+        def metric(index: int, check: Dict[str, Any]) -> Any:
+            column = check["column"]
+            if column not in arrays:
+                raise ValidationError(f"Column {column} not present")
+            values, nulls = arrays[column]
+            present = cached(("present", column), lambda: values[~nulls])
+            if check["type"] == "null_rate":
+                return cached(("nulls", column), lambda: int(nulls.sum()))
+            if check["type"] == "unique":
+                return cached(("duplicates", column), lambda: int(present.size - self._distinct(present)))
+            if check["type"] == "range":
+                violations = np.zeros(present.size, dtype=bool)
+                if check.get("min") is not None:
+                    violations |= present < check["min"]
+                if check.get("max") is not None:
+                    violations |= present > check["max"]
+                return int(violations.sum())
+            if check["type"] == "referential":
+                key = f"{check['ref_table']}.{check['ref_column']}"
+                if references is None or key not in references:
+                    raise ValidationError(f"Reference values for {key} not provided")
+
+                def orphans():
+                    keys, key_nulls = self._as_array(references[key])
+                    return int(np.isin(present, keys[~key_nulls], invert=True).sum())
+                return cached(("orphans", column, key), orphans)
+            # drift
+            numeric = cached(("numeric", column), lambda: present.astype(np.float64))
+            edges = self.baseline(table, column)
+            buckets = None
+            if edges and numeric.size:
+                # side="right": bucket i holds edges[i-1] <= v < edges[i], as in SQL
+                buckets = cached(("buckets", column), lambda: np.bincount(
+                    np.searchsorted(edges, numeric, side="right"), minlength=len(edges) + 1
+                ).tolist())
+            current = cached(("deciles", column), lambda: np.quantile(numeric, DECILES).tolist() if numeric.size else None)
+            return {"edges": current, "buckets": buckets}
+
+        results = self._evaluate(table, checks, rows, metric)
+        results["scan"] = {"mode": "local", "queries": 0, "duration_ms": round((time.perf_counter() - started) * 1000, 3)}
+        self._stats["local_runs"] += 1
+        return results
+
+    @staticmethod
+    def _distinct(values: "np.ndarray") -> int:
+        if values.size == 0:
+            return 0
+        try:
+            # Sort + adjacent compare beats np.unique's general path on numeric columns
+            ordered = np.sort(values)
+            return int(np.count_nonzero(ordered[1:] != ordered[:-1])) + 1
+        except TypeError:
+            # Mixed types do not sort; fall back to hashing
+            return len(set(values.tolist()))
+
+    @staticmethod
+    def _as_array(values: Any) -> Tuple["np.ndarray", "np.ndarray"]:
+        """(values, null mask) for a list, NumPy array or Arrow (chunked) array"""
+        if hasattr(values, "to_numpy") and not isinstance(values, np.ndarray):
+            if hasattr(values, "is_null"):
+                nulls = np.asarray(values.is_null().to_numpy(zero_copy_only=False), dtype=bool)
+                return np.asarray(values.to_numpy(zero_copy_only=False)), nulls
+            values = values.to_numpy()
+        array = np.asarray(values)
+        if array.dtype == object:
+            nulls = np.equal(array, None)
+            present = array[~nulls]
+            # Promote all-numeric object columns so comparisons vectorize
+            if present.size and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present[:1000]):
+                try:
+                    numeric = np.full(array.shape, np.nan)
+                    numeric[~nulls] = present.astype(np.float64)
+                    return numeric, nulls
+                except (TypeError, ValueError):
+                    pass
+            return array, nulls
+        if array.dtype.kind == "f":
+            return array, np.isnan(array)
+        return array, np.zeros(array.shape, dtype=bool)
+
+    def _evaluate(self, table: str, checks: List[Dict[str, Any]], rows: int, metric) -> Dict[str, Any]:
+        results = []
+        profile: Dict[str, List[float]] = {}
+        for index, check in enumerate(checks):
+            result = {
+                "name": check["name"],
+                "type": check["type"],
+                "column": check["column"],
+                "severity": check["severity"],
+            }
+            try:
+                value = metric(index, check)
+            except (ValidationError, TypeError, ValueError) as e:
+                result.update({"passed": False, "value": None, "message": f"Check could not be evaluated: {str(e)}"})
+                results.append(result)
+                continue
+
+            if check["type"] == "drift":
+                if value["edges"]:
+                    profile[check["column"]] = value["edges"]
+                if value["buckets"] is None:
+                    result.update({"passed": True, "value": None, "message": "No baseline profile yet"})
+                else:
+                    psi = population_stability(value["buckets"])
+                    result.update({
+                        "passed": psi <= check["max_psi"],
+                        "value": round(psi, 6),
+                        "threshold": check["max_psi"],
+                        "message": f"PSI {psi:.4f} vs previous profile (max {check['max_psi']})"
+                    })
+            elif check["type"] == "unique":
+                result.update({
+                    "passed": value == 0,
+                    "value": value,
+                    "threshold": 0,
+                    "message": f"{value} duplicate values"
+                })
+            else:
+                rate = value / rows if rows else 0.0
+                label = {"null_rate": "null", "range": "out-of-range", "referential": "orphaned"}[check["type"]]
+                result.update({
+                    "passed": rate <= check["max_rate"],
+                    "value": round(rate, 6),
+                    "threshold": check["max_rate"],
+                    "message": f"{value} {label} values ({rate:.4%}, max {check['max_rate']:.4%})"
+                })
+            results.append(result)
+
+        failed = [result["name"] for result in results if not result["passed"] and result["severity"] == "error"]
+        warnings = [result["name"] for result in results if not result["passed"] and result["severity"] != "error"]
+        self._stats["checks"] += len(results)
+        self._stats["failures"] += len(failed)
+        if failed:
+            logger.warning(f"Data quality checks failed on {table}: {failed}")
+        return {
+            "table": table,
+            "rows": rows,
+            "passed": not failed,
+            "failed": failed,
+            "warnings": warnings,
+            "checks": results,
+            "profile": profile
+        }
+
+    def state(self) -> Dict[str, int]:
+        return {"baselines": len(self._baselines), **self._stats}
+
+
+# Global data quality engine instance
+dq_engine = DataQualityEngine()
+observability.register_state("data_quality", dq_engine.state)
@@ -0,0 +1,408 @@
+"""
+Event Broker
+In-process pub/sub for push notifications, bridged across workers via Redis
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db.session import AutocommitSessionLocal
+from models.user import User
+from utils.logging import logger
+from utils.resilience import dependencies
+from utils.shared_state import shared_state
+from .observability import observability
+
+
+REDIS_CHANNEL = "aureus:events"
+
+# (event type, JSON payload), encoded once per event and shared by every recipient
+Message = Tuple[str, bytes]
+
+PING: Message = ("ping", b"{}")
+
+# Close reasons that mean the connection's credentials no longer hold
+AUTH_REASONS = ("token_expired", "token_revoked", "user_disabled", "role_changed")
+
+
+class Subscriber:
+    """
+    One push connection: a bounded queue of encoded events
+
+    The transport awaits `get()`; publishers only append. When the
+    connection cannot keep up and `limit` events are waiting, the
+    subscriber is closed as a slow consumer instead of buffering without
+    bound, and the client resynchronizes over REST when it reconnects.
+    `jti` is the id of the access token the connection was opened with.
+    """
+
+    __slots__ = ("user_id", "role", "limit", "jti", "queue", "closed", "reason", "_waiter", "_expiry")
+
+    def __init__(self, user_id: str, role: str, limit: int, jti: Optional[str] = None):
+        self.user_id = user_id
+        self.role = role
+        self.limit = limit
+        self.jti = jti
+        self.queue: deque = deque()
+        self.closed = False
+        self.reason: Optional[str] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self._expiry: Optional[asyncio.TimerHandle] = None
+
+    def put(self, message: Message) -> bool:
+        if self.closed:
+            return False
+        if len(self.queue) >= self.limit:
+            self.close("slow_consumer")
+            return False
+        self.queue.append(message)
+        self._wake()
+        return True
+
+    def close(self, reason: str) -> None:
+        if not self.closed:
+            self.closed = True
+            self.reason = reason
+            self._wake()
+
+    async def get(self) -> Optional[Message]:
+        """Next event, or None once closed and drained"""
+        while not self.queue:
+            if self.closed:
+                return None
+            # Only a waiting connection holds a future; idle ones hold nothing extra
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self.queue.popleft()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class EventBroker:
+    """
+    Fan out events to push connections by user and by role
+
+    `publish` never blocks and costs one dict lookup when nobody on this
+    worker is listening. Events are encoded once and the same bytes are
+    queued on every matching subscriber. With a Redis URL, events are also
+    published to a pub/sub channel (batched by one writer task) and events
+    from other workers are delivered locally, so a user connected to any
+    worker sees every notification. Redis failures only lose cross-worker
+    delivery; local delivery is unaffected.
+
+    A heartbeat pings idle connections so proxies keep them open and dead
+    ones are noticed; one timer serves all connections.
+
+    A connection lives no longer than its credentials: it is closed when
+    its token expires, on the first heartbeat after the token is revoked,
+    and, every `revalidate_interval` seconds, when its user has been
+    disabled, deleted or given another role (one query for all connected
+    users). Clients reconnect with a fresh token.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        queue_size: int = 256,
+        heartbeat_interval: float = 15.0,
+        max_connections: int = 10000,
+        max_outbound: int = 10000,
+        session_factory: Callable[[], AsyncSession] = AutocommitSessionLocal,
+        revalidate_interval: float = 60.0
+    ):
+        self.redis_url = redis_url
+        self.queue_size = queue_size
+        self.heartbeat_interval = heartbeat_interval
+        self.max_connections = max_connections
+        self.session_factory = session_factory
+        self.revalidate_interval = revalidate_interval
+        self.origin = uuid.uuid4().hex
+        self._by_user: Dict[str, Set[Subscriber]] = {}
+        self._by_role: Dict[str, Set[Subscriber]] = {}
+        self._count = 0
+        self._outbound: deque = deque(maxlen=max_outbound)
+        self._outbound_waiter: Optional[asyncio.Future] = None
+        self._tasks: List[asyncio.Task] = []
+        self._redis = None
+        self._stats = {
+            "published": 0,
+            "delivered": 0,
+            "slow_consumers": 0,
+            "rejected_connections": 0,
+            "bridged_out": 0,
+            "bridged_in": 0,
+            "bridge_dropped": 0,
+            "redis_errors": 0,
+            "auth_closed": 0,
+        }
+
+    def subscribe(
+        self,
+        user_id: str,
+        role: str,
+        jti: Optional[str] = None,
+        expires_at: Optional[float] = None
+    ) -> Optional[Subscriber]:
+        """
+        Register a connection; None when this worker is at its connection limit
+
+        Args:
+            user_id: Authenticated user
+            role: The user's role when the connection opened
+            jti: Access token id, checked against revocations on each heartbeat
+            expires_at: Token expiry (Unix time); the connection is closed then
+        """
+        if self._count >= self.max_connections:
+            self._stats["rejected_connections"] += 1
+            return None
+        subscriber = Subscriber(user_id, role, self.queue_size, jti)
+        if expires_at is not None:
+            subscriber._expiry = asyncio.get_running_loop().call_later(
+                max(expires_at - time.time(), 0.0), self._close_for, subscriber, "token_expired"
+            )
+        self._by_user.setdefault(user_id, set()).add(subscriber)
+        self._by_role.setdefault(role, set()).add(subscriber)
+        self._count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        members = self._by_user.get(subscriber.user_id)
+        if members is None or subscriber not in members:
+            return
+        for index, key in ((self._by_user, subscriber.user_id), (self._by_role, subscriber.role)):
+            members = index[key]
+            members.discard(subscriber)
+            if not members:
+                del index[key]
+        self._count -= 1
+        if subscriber._expiry is not None:
+            subscriber._expiry.cancel()
+        if subscriber.reason == "slow_consumer":
+            self._stats["slow_consumers"] += 1
+        subscriber.close("unsubscribed")
+
+    def _close_for(self, subscriber: Subscriber, reason: str) -> None:
+        if not subscriber.closed:
+            self._stats["auth_closed"] += 1
+            subscriber.close(reason)
+
+    def publish(
+        self,
+        event_type: str,
+        data: Dict[str, Any],
+        user_ids: Iterable[str] = (),
+        roles: Iterable[str] = ()
+    ) -> None:
+        """
+        Notify the given users and roles on every worker
+
+        Args:
+            event_type: Event name, e.g. "query.progress"
+            data: JSON-serializable payload
+            user_ids: Users to notify (all their connections)
+            roles: Roles to notify (every connection with that role)
+        """
+        user_ids = [str(user_id) for user_id in user_ids]
+        roles = list(roles)
+        bridged = self.redis_url is not None and bool(self._tasks)
+        if not bridged and not self._listening(user_ids, roles):
+            return
+        self._stats["published"] += 1
+        payload = orjson.dumps(data, default=str)
+        self._deliver((event_type, payload), user_ids, roles)
+        if bridged:
+            self._outbound.append(orjson.dumps({
+                "o": self.origin, "t": event_type, "u": user_ids, "r": roles, "d": orjson.Fragment(payload)
+            }))
+            if self._outbound_waiter is not None and not self._outbound_waiter.done():
+                self._outbound_waiter.set_result(None)
+
+    def _listening(self, user_ids: List[str], roles: List[str]) -> bool:
+        return any(user_id in self._by_user for user_id in user_ids) or any(role in self._by_role for role in roles)
+
+    def _deliver(self, message: Message, user_ids: List[str], roles: List[str]) -> None:
+        recipients: Set[Subscriber] = set()
+        for user_id in user_ids:
+            recipients.update(self._by_user.get(user_id, ()))
+        for role in roles:
+            recipients.update(self._by_role.get(role, ()))
+        for subscriber in recipients:
+            if subscriber.put(message):
+                self._stats["delivered"] += 1
+
+    def start(self) -> None:
+        """Start the heartbeat and, with a Redis URL, the pub/sub bridge"""
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks.append(loop.create_task(self._heartbeat()))
+        if self.revalidate_interval > 0:
+            self._tasks.append(loop.create_task(self._revalidate()))
+        if self.redis_url:
+            self._tasks.append(loop.create_task(self._bridge_out()))
+            self._tasks.append(loop.create_task(self._bridge_in()))
+
+    async def stop(self) -> None:
+        """Close every connection and stop background tasks"""
+        for members in list(self._by_user.values()):
+            for subscriber in list(members):
+                subscriber.close("shutdown")
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+            self._redis = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self.beat()
+
+    def beat(self) -> None:
+        """Close connections whose token was revoked (logout) and ping idle ones"""
+        for members in list(self._by_user.values()):
+            for subscriber in list(members):
+                if subscriber.jti and shared_state.is_revoked(subscriber.jti):
+                    self._close_for(subscriber, "token_revoked")
+                elif not subscriber.queue:
+                    subscriber.put(PING)
+
+    async def _revalidate(self) -> None:
+        while True:
+            await asyncio.sleep(self.revalidate_interval)
+            try:
+                await self.revalidate()
+            except Exception as e:
+                # Postgres unavailable: keep streams open, as authentication does with snapshots
+                logger.warning(f"Event connection revalidation failed in worker {os.getpid()}: {str(e)}")
+
+    async def revalidate(self) -> None:
+        """Close connections of users who were disabled, deleted or given another role"""
+        user_ids = list(self._by_user)
+        current: Dict[str, Tuple[str, bool]] = {}
+        async with self.session_factory() as session:
+            for start in range(0, len(user_ids), 1000):
+                batch = [uuid.UUID(user_id) for user_id in user_ids[start:start + 1000]]
+                result = await session.execute(
+                    select(User.id, User.role, User.is_active).where(User.id.in_(batch))
+                )
+                current.update((str(user_id), (role, is_active)) for user_id, role, is_active in result)
+        for user_id in user_ids:
+            role, is_active = current.get(user_id, (None, False))
+            for subscriber in list(self._by_user.get(user_id, ())):
+                if not is_active:
+                    self._close_for(subscriber, "user_disabled")
+                elif subscriber.role != role:
+                    self._close_for(subscriber, "role_changed")
+
+    async def _bridge_out(self) -> None:
+        """Publish queued events to Redis in pipelined batches"""
+        loop = asyncio.get_running_loop()
+        delay = 0.5
+        while True:
+            if not self._outbound:
+                self._outbound_waiter = loop.create_future()
+                try:
+                    await self._outbound_waiter
+                finally:
+                    self._outbound_waiter = None
+            batch = [self._outbound.popleft() for _ in range(min(len(self._outbound), 500))]
+            try:
+                pipe = self._client().pipeline(transaction=False)
+                for message in batch:
+                    pipe.publish(REDIS_CHANNEL, message)
+                await dependencies["redis"].call(pipe.execute)
+            except Exception as e:
+                # Notifications are best-effort: clients resynchronize over REST
+                self._stats["bridge_dropped"] += len(batch)
+                self._redis_error("publish", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 10.0)
+                continue
+            delay = 0.5
+            self._stats["bridged_out"] += len(batch)
+
+    async def _bridge_in(self) -> None:
+        """Deliver events published by other workers"""
+        delay = 0.5
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._client().pubsub()
+                await pubsub.subscribe(REDIS_CHANNEL)
+                delay = 0.5
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.heartbeat_interval)
+                    if message is not None:
+                        self._receive(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._redis_error("subscribe", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 10.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    def _receive(self, raw: bytes) -> None:
+        event = orjson.loads(raw)
+        if event["o"] == self.origin or not self._listening(event["u"], event["r"]):
+            return
+        self._stats["bridged_in"] += 1
+        self._deliver((event["t"], orjson.dumps(event["d"])), event["u"], event["r"])
+
+    def _client(self):
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    def _redis_error(self, operation: str, error: Exception) -> None:
+        self._stats["redis_errors"] += 1
+        logger.warning(f"Event bridge Redis {operation} failed in worker {os.getpid()}: {str(error)}")
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "connections": self._count,
+            "users": len(self._by_user),
+            "bridge_queued": len(self._outbound),
+            **self._stats,
+        }
+
+
+# Global event broker instance
+event_broker = EventBroker(
+    redis_url=settings.REDIS_URL if settings.EVENTS_DISTRIBUTED else None,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    heartbeat_interval=settings.EVENTS_HEARTBEAT_INTERVAL,
+    max_connections=settings.EVENTS_MAX_CONNECTIONS,
+    revalidate_interval=settings.EVENTS_REVALIDATE_INTERVAL
+)
+observability.register_state("events", event_broker.state)
@@ -0,0 +1,837 @@
+"""
+Dataset Ingestion Service
+Streams uploaded extracts into Postgres with COPY, validating in batches
+"""
+
+import asyncio
+import csv
+import hashlib
+import io
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db.session import AsyncSessionLocal
+from models.ingestion import IngestionJobRecord
+from utils.errors import ValidationError
+from utils.lazy import lazy_import
+from utils.logging import logger
+from utils.sql import IDENTIFIER_RE
+from .catalog import catalog
+from .observability import observability
+from .pipelines import STAGING_PREFIXES, reserved_tables
+from .snapshots import default_key_column, snapshots
+
+asyncpg = lazy_import("asyncpg")
+
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+
+def _to_text(value: Any) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
+def _to_integer(value: Any) -> int:
+    if isinstance(value, bool) or isinstance(value, float):
+        raise ValueError
+    return int(value)
+
+
+def _to_double(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError
+    return float(value)
+
+
+def _to_decimal(value: Any) -> Decimal:
+    if isinstance(value, bool):
+        raise ValueError
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError
+
+
+def _to_boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    raise ValueError
+
+
+def _to_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def _to_timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+# Catalog column type -> (Postgres type, converter to the value COPY expects)
+COLUMN_TYPES: Dict[str, Tuple[str, Callable[[Any], Any]]] = {
+    "VARCHAR": ("TEXT", _to_text),
+    "TEXT": ("TEXT", _to_text),
+    "INTEGER": ("BIGINT", _to_integer),
+    "BIGINT": ("BIGINT", _to_integer),
+    "NUMERIC": ("NUMERIC", _to_decimal),
+    "DOUBLE PRECISION": ("DOUBLE PRECISION", _to_double),
+    "FLOAT": ("DOUBLE PRECISION", _to_double),
+    "BOOLEAN": ("BOOLEAN", _to_boolean),
+    "DATE": ("DATE", _to_date),
+    "TIMESTAMP": ("TIMESTAMP", _to_timestamp),
+}
+
+# Inference order for columns the catalog does not declare; first fit wins
+INFERRED_TYPES = ("INTEGER", "DOUBLE PRECISION", "BOOLEAN", "DATE", "TIMESTAMP")
+
+
+# Column names that identify personal data regardless of content
+PII_NAME_RE = re.compile(
+    r"(ssn|social_security|tax_id|passport|email|phone|birth|dob|address|"
+    r"account_number|iban|customer_name|borrower_name|full_name|first_name|last_name)",
+    re.IGNORECASE
+)
+
+# Value shapes that identify personal data; a column is PII when most values match
+PII_VALUE_PATTERNS: Dict[str, re.Pattern] = {
+    "ssn": re.compile(r"^\d{3}-\d{2}-\d{4}$"),
+    "email": re.compile(r"^[^@\s]+@[^@\s]+\.[a-zA-Z]{2,}$"),
+    "phone": re.compile(r"^\+?\d{0,3}[\s.-]?\(?\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}$"),
+}
+
+# Values checked against PII_VALUE_PATTERNS per column and batch
+PII_SAMPLE_SIZE = 1000
+
+# Rejected rows kept (with reasons) for the evidence pack
+REJECTION_SAMPLES = 20
+
+
+def read_csv(stream: BinaryIO, batch_rows: int) -> Iterator[Tuple[List[str], List[List[Any]]]]:
+    """Yield (header, rows) batches from a CSV file with a header line"""
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = next(reader, None)
+    if not header:
+        raise ValidationError("CSV file has no header")
+    batch = []
+    for row in reader:
+        batch.append([value if value != "" else None for value in row])
+        if len(batch) >= batch_rows:
+            yield header, batch
+            batch = []
+    if batch:
+        yield header, batch
+
+
+def read_jsonl(stream: BinaryIO, batch_rows: int) -> Iterator[Tuple[List[str], List[List[Any]]]]:
+    """Yield (header, rows) batches from JSON Lines; the first record fixes the columns"""
+    header: Optional[List[str]] = None
+    batch = []
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            record = None
+        if not isinstance(record, dict):
+            # Keep the row count honest; validation rejects it
+            batch.append(None)
+        else:
+            if header is None:
+                header = list(record)
+            batch.append([record.get(column) for column in header] if set(record) <= set(header) else None)
+        if len(batch) >= batch_rows:
+            yield header or [], batch
+            batch = []
+    if batch:
+        yield header or [], batch
+
+
+def read_parquet(stream: BinaryIO, batch_rows: int) -> Iterator[Tuple[List[str], List[List[Any]]]]:
+    """Yield (header, rows) batches from a Parquet file, one record batch at a time"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValidationError("Parquet ingestion requires pyarrow")
+
+    parquet_file = pq.ParquetFile(stream)
+    header = parquet_file.schema_arrow.names
+    for record_batch in parquet_file.iter_batches(batch_size=batch_rows):
+        columns = [column.to_pylist() for column in record_batch.columns]
+        yield header, [list(row) for row in zip(*columns)]
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "parquet": read_parquet}
+
+# Upload chunks are buffered up to this size per spool write
+SPOOL_WRITE_BYTES = 1 << 20
+
+# Infixes of the side tables _load builds and retires next to the target
+STAGING_INFIXES = ("__load_", "__old_")
+
+
+async def _settle(future: asyncio.Future) -> None:
+    """
+    Wait for a worker-thread future to finish, discarding its outcome
+
+    Cancelling the future does not stop its thread, which would keep
+    reading a file that the caller is about to close.
+    """
+    await asyncio.wait([future])
+    if not future.cancelled():
+        future.exception()
+
+
+async def _in_thread(func: Callable, *args: Any) -> Any:
+    """asyncio.to_thread that, when cancelled, waits for the thread before propagating"""
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await _settle(future)
+        raise
+
+
+def infer_column_type(values: List[Any]) -> str:
+    """Narrowest catalog type every non-null value converts to"""
+    present = [value for value in values if value is not None]
+    if not present:
+        return "VARCHAR"
+    for column_type in INFERRED_TYPES:
+        if column_type == "INTEGER" and any(
+            isinstance(value, str) and len(value) > 1 and value.startswith("0") for value in present
+        ):
+            # Zero-padded identifiers stay text
+            continue
+        converter = COLUMN_TYPES[column_type][1]
+        try:
+            for value in present:
+                converter(value)
+        except (TypeError, ValueError):
+            continue
+        return column_type
+    return "VARCHAR"
+
+
+class _ColumnPlan:
+    """Target type and PII evidence for one column"""
+
+    def __init__(self, name: str, column_type: str, declared: Optional[Dict[str, Any]]):
+        self.name = name
+        self.type = column_type
+        self.pg_type, self.convert = COLUMN_TYPES[column_type]
+        self.declared = declared
+        self.pii_reason = None
+        if declared and declared.get("pii"):
+            self.pii_reason = "declared"
+        elif PII_NAME_RE.search(name):
+            self.pii_reason = "name"
+        self.pattern_hits = {pattern: 0 for pattern in PII_VALUE_PATTERNS}
+        self.sampled = 0
+
+    def observe(self, values: List[Any]) -> None:
+        if self.pii_reason is not None:
+            return
+        for value in values[:PII_SAMPLE_SIZE]:
+            if not isinstance(value, str):
+                continue
+            self.sampled += 1
+            for pattern, regex in PII_VALUE_PATTERNS.items():
+                if regex.match(value):
+                    self.pattern_hits[pattern] += 1
+
+    def classification(self) -> Optional[str]:
+        if self.pii_reason is not None:
+            return self.pii_reason
+        for pattern, hits in self.pattern_hits.items():
+            if self.sampled and hits * 2 >= self.sampled:
+                return f"value:{pattern}"
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        reason = self.classification()
+        column = dict(self.declared or {})
+        column.update({"name": self.name, "type": self.type, "pii": reason is not None, "pii_reason": reason})
+        column.setdefault("description", "")
+        return column
+
+
+class IngestionJob:
+    """State of one load; holds counters only, never rows"""
+
+    def __init__(self, dataset_id: str, table: str, data_format: str, path: str, size: int, sha256: str,
+                 user_id: str, filename: Optional[str] = None):
+        self.job_id = str(uuid.uuid4())
+        self.dataset_id = dataset_id
+        self.table = table
+        self.format = data_format
+        self.path = path
+        self.filename = filename
+        self.bytes = size
+        self.sha256 = sha256
+        self.user_id = user_id
+        self.status = "queued"  # queued, running, completed, failed
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.rows_loaded = 0
+        self.rows_rejected = 0
+        self.batches = 0
+        self.rows_per_second: Optional[float] = None
+        self.error: Optional[str] = None
+        self.rejections: List[Dict[str, Any]] = []
+        self.columns: List[_ColumnPlan] = []
+        self.snapshot_id: Optional[str] = None
+        self.evidence: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "dataset_id": self.dataset_id,
+            "table": self.table,
+            "format": self.format,
+            "filename": self.filename,
+            "bytes": self.bytes,
+            "status": self.status,
+            "submitted_by": self.user_id,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "rows_loaded": self.rows_loaded,
+            "rows_rejected": self.rows_rejected,
+            "batches": self.batches,
+            "rows_per_second": self.rows_per_second,
+            "error": self.error,
+            "snapshot_id": self.snapshot_id,
+            "evidence": self.evidence,
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """Column values of the job's ingestion_jobs row"""
+        return {
+            "id": self.job_id,
+            "dataset_id": self.dataset_id,
+            "table_name": self.table,
+            "format": self.format,
+            "filename": self.filename,
+            "bytes": self.bytes,
+            "sha256": self.sha256,
+            "status": self.status,
+            "submitted_by": self.user_id,
+            "rows_loaded": self.rows_loaded,
+            "rows_rejected": self.rows_rejected,
+            "batches": self.batches,
+            "rows_per_second": self.rows_per_second,
+            "error": self.error,
+            "snapshot_id": self.snapshot_id,
+            "evidence": self.evidence,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    @classmethod
+    def from_record(cls, record: IngestionJobRecord) -> "IngestionJob":
+        """Job as stored, possibly by another worker; its spool file is not available here"""
+        job = cls(
+            record.dataset_id, record.table_name, record.format, "", record.bytes,
+            record.sha256, record.submitted_by, record.filename
+        )
+        job.job_id = record.id
+        job.status = record.status
+        job.created_at = record.created_at
+        job.started_at = record.started_at
+        job.finished_at = record.finished_at
+        job.rows_loaded = record.rows_loaded
+        job.rows_rejected = record.rows_rejected
+        job.batches = record.batches
+        job.rows_per_second = record.rows_per_second
+        job.error = record.error
+        job.snapshot_id = record.snapshot_id
+        job.evidence = record.evidence
+        return job
+
+
+class _BatchConverter:
+    """Turn raw (header, rows) batches into COPY records, rejecting bad rows"""
+
+    def __init__(self, job: IngestionJob, max_rejected: int):
+        self.job = job
+        self.max_rejected = max_rejected
+        self.row = 0
+
+    def convert(self, rows: List[Optional[List[Any]]]) -> List[tuple]:
+        columns = self.job.columns
+        width = len(columns)
+        records = []
+        for row in rows:
+            self.row += 1
+            if row is None or len(row) != width:
+                self._reject(None, "malformed row" if row is None else f"expected {width} fields, got {len(row)}")
+                continue
+            try:
+                records.append(tuple(
+                    None if value is None else plan.convert(value)
+                    for plan, value in zip(columns, row)
+                ))
+            except (TypeError, ValueError, OverflowError):
+                bad = next(plan for plan, value in zip(columns, row) if not self._converts(plan, value))
+                self._reject(bad.name, f"not a valid {bad.type}")
+        for index, plan in enumerate(columns):
+            plan.observe([row[index] for row in rows[:PII_SAMPLE_SIZE] if row is not None and len(row) == width])
+        return records
+
+    @staticmethod
+    def _converts(plan: _ColumnPlan, value: Any) -> bool:
+        try:
+            plan.convert(value) if value is not None else None
+            return True
+        except (TypeError, ValueError, OverflowError):
+            return False
+
+    def _reject(self, column: Optional[str], reason: str) -> None:
+        self.job.rows_rejected += 1
+        if len(self.job.rejections) < REJECTION_SAMPLES:
+            self.job.rejections.append({"row": self.row, "column": column, "reason": reason})
+        if self.job.rows_rejected > self.max_rejected:
+            raise ValidationError(f"More than {self.max_rejected} rejected rows")
+
+
+class IngestionService:
+    """
+    Bulk loads of uploaded extracts into dataset tables
+
+    Uploads are spooled to disk, then a worker task reads them in
+    fixed-size batches (parsing and validation run in a thread), COPYs each
+    batch into a staging table and, in the same transaction, swaps the
+    staging table in by rename. Readers see the old table until commit and
+    the new one after; a failed load leaves the old table untouched. Memory
+    is bounded by two batches (one converting while the previous is
+    copied) regardless of file size.
+
+    Jobs are saved to the ingestion_jobs table when queued, started and
+    finished, and the progress of this worker's unfinished jobs every
+    `heartbeat_interval` seconds, so any worker can report them and they
+    survive restarts. The spool file is local to the worker that received
+    the upload: a queued or running job whose heartbeat stops (its worker
+    died) is failed by the next read that finds it.
+    """
+
+    def __init__(
+        self,
+        batch_rows: int = 10000,
+        max_concurrent_loads: int = 2,
+        max_rejected_rows: int = 1000,
+        max_jobs: int = 100,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        heartbeat_interval: float = 10.0,
+        stale_after: float = 60.0
+    ):
+        self.batch_rows = batch_rows
+        self.max_rejected_rows = max_rejected_rows
+        self.max_jobs = max_jobs
+        self.session_factory = session_factory
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self._slots = asyncio.Semaphore(max_concurrent_loads)
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._stats = {"completed": 0, "failed": 0, "rows_loaded": 0, "bytes_loaded": 0, "save_errors": 0}
+
+    def resolve_table(self, dataset_id: str) -> str:
+        """
+        Target table for a dataset (the catalog name, or the ID for new datasets)
+
+        Raises:
+            ValidationError: If the name is not a plain lowercase identifier, or
+                a new dataset would replace an application table, another
+                dataset or a staging table
+        """
+        card = catalog.get(dataset_id)
+        table = card["name"] if card else dataset_id
+        if not IDENTIFIER_RE.match(table):
+            raise ValidationError(f"Invalid dataset table name {table}")
+        if card is None and (
+            table in reserved_tables()
+            or table.startswith(STAGING_PREFIXES)
+            or any(infix in table for infix in STAGING_INFIXES)
+        ):
+            raise ValidationError(f"{table} is a reserved table name")
+        return table
+
+    async def submit(
+        self,
+        dataset_id: str,
+        data_format: str,
+        chunks: AsyncIterator[bytes],
+        user_id: str,
+        filename: Optional[str] = None,
+        max_bytes: Optional[int] = None
+    ) -> IngestionJob:
+        """
+        Spool an upload to disk and queue its load
+
+        Args:
+            dataset_id: Catalog dataset ID or name; unknown names create a dataset
+            data_format: "csv", "jsonl" or "parquet"
+            chunks: Upload body chunks
+            user_id: Submitting user
+            filename: Original file name, for the evidence pack
+            max_bytes: Reject uploads larger than this
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValidationError: Unknown format, invalid name or oversized upload
+        """
+        if data_format not in FORMATS:
+            raise ValidationError(f"Unsupported format {data_format}; expected one of {', '.join(FORMATS)}")
+        table = self.resolve_table(dataset_id)
+        card = catalog.get(dataset_id)
+        if card is not None:
+            dataset_id = card["id"]
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, path = tempfile.mkstemp(prefix="aureus-ingest-", suffix=f".{data_format}", dir=settings.INGESTION_SPOOL_DIR or None)
+        try:
+            with os.fdopen(fd, "wb") as spool:
+                buffer = bytearray()
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise ValidationError(f"Upload exceeds {max_bytes} bytes")
+                    digest.update(chunk)
+                    buffer += chunk
+                    if len(buffer) >= SPOOL_WRITE_BYTES:
+                        await _in_thread(spool.write, bytes(buffer))
+                        buffer.clear()
+                if buffer:
+                    await _in_thread(spool.write, bytes(buffer))
+            if size == 0:
+                raise ValidationError("Upload is empty")
+        except BaseException:
+            os.unlink(path)
+            raise
+
+        job = IngestionJob(dataset_id, table, data_format, path, size, digest.hexdigest(), user_id, filename)
+        self._remember(job)
+        await self._save([job])
+        self._tasks[job.job_id] = asyncio.create_task(self._run(job))
+        logger.info(f"Ingestion {job.job_id} queued: {size} bytes of {data_format} into {table}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[IngestionJob]:
+        """A job of any worker; this worker's own jobs are read from memory"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        async with self.session_factory() as session:
+            record = await session.get(IngestionJobRecord, job_id)
+            if record is None:
+                return None
+            await self._fail_abandoned(session, [record])
+        return IngestionJob.from_record(record)
+
+    async def list(self, dataset_id: Optional[str] = None) -> List[IngestionJob]:
+        """The latest `max_jobs` jobs of every worker (optionally of one dataset, by ID or name), newest first"""
+        query = select(IngestionJobRecord).order_by(IngestionJobRecord.created_at.desc()).limit(self.max_jobs)
+        keys = None
+        if dataset_id is not None:
+            card = catalog.get(dataset_id)
+            keys = {card["id"], card["name"]} if card else {dataset_id}
+            query = query.where(IngestionJobRecord.dataset_id.in_(keys))
+        async with self.session_factory() as session:
+            records = (await session.execute(query)).scalars().all()
+            await self._fail_abandoned(session, records)
+        jobs = {record.id: IngestionJob.from_record(record) for record in records}
+        # This worker's jobs are more current than their last save (or were never saved)
+        jobs.update({
+            job.job_id: job for job in self._jobs.values()
+            if keys is None or job.dataset_id in keys
+        })
+        return sorted(jobs.values(), key=lambda job: job.created_at, reverse=True)[:self.max_jobs]
+
+    async def _fail_abandoned(self, session: AsyncSession, records: List[IngestionJobRecord]) -> None:
+        """Mark failed the unfinished jobs of other workers whose heartbeat stopped"""
+        now = datetime.utcnow()
+        abandoned = [
+            record for record in records
+            if record.status in ("queued", "running") and record.id not in self._jobs
+            and (now - (record.heartbeat_at or record.created_at)).total_seconds() >= self.stale_after
+        ]
+        for record in abandoned:
+            logger.warning(f"Ingestion {record.id} has had no heartbeat since {record.heartbeat_at}; marking it failed")
+            record.status = "failed"
+            record.finished_at = now
+            record.error = "Abandoned: the worker loading it stopped"
+        if abandoned:
+            await session.commit()
+
+    async def _save(self, jobs: List[IngestionJob]) -> None:
+        """Upsert jobs; a failed save is logged, the loads themselves carry on"""
+        try:
+            async with self.session_factory() as session:
+                await self._write(session, [dict(job.to_record(), heartbeat_at=datetime.utcnow()) for job in jobs])
+                await session.commit()
+        except Exception as e:
+            self._stats["save_errors"] += 1
+            logger.warning(f"Saving ingestion jobs {', '.join(job.job_id for job in jobs)} failed: {str(e)}")
+
+    async def _write(self, session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        stmt = pg_insert(IngestionJobRecord).values(rows)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={column: stmt.excluded[column] for column in rows[0] if column != "id"}
+        ))
+
+    def start(self) -> None:
+        """Start the heartbeat of this worker's unfinished jobs on the running loop"""
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.get_running_loop().create_task(self._run_heartbeat())
+
+    async def stop(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            active = [job for job in self._jobs.values() if job.status in ("queued", "running")]
+            if active:
+                await self._save(active)
+
+    def _remember(self, job: IngestionJob) -> None:
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            oldest = next((key for key, old in self._jobs.items() if old.status in ("completed", "failed")), None)
+            if oldest is None:
+                break
+            del self._jobs[oldest]
+
+    async def _run(self, job: IngestionJob) -> None:
+        async with self._slots:
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            started = time.perf_counter()
+            try:
+                await self._save([job])
+                await self._load(job)
+                job.status = "completed"
+                self._stats["completed"] += 1
+                self._stats["rows_loaded"] += job.rows_loaded
+                self._stats["bytes_loaded"] += job.bytes
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                self._stats["failed"] += 1
+                logger.error(f"Ingestion {job.job_id} into {job.table} failed: {str(e)}")
+            except BaseException:
+                job.status = "failed"
+                job.error = "cancelled"
+                self._stats["failed"] += 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                job.finished_at = datetime.utcnow()
+                job.rows_per_second = round(job.rows_loaded / elapsed, 1) if elapsed > 0 else None
+                if job.status == "completed" and settings.SNAPSHOT_ON_INGEST:
+                    await self._snapshot(job)
+                job.evidence = self._generate_evidence(job, elapsed)
+                await self._save([job])
+                self._tasks.pop(job.job_id, None)
+                os.unlink(job.path)
+
+        if job.status == "completed":
+            logger.info(
+                f"Ingestion {job.job_id} completed: {job.rows_loaded} rows into {job.table} "
+                f"({job.rows_rejected} rejected) at {job.rows_per_second} rows/s"
+            )
+
+    async def _load(self, job: IngestionJob) -> None:
+        staging, retired = (f"{job.table}{infix}{job.job_id[:8]}" for infix in STAGING_INFIXES)
+
+        with open(job.path, "rb") as stream:
+            batches = READERS[job.format](stream, self.batch_rows)
+            first = await _in_thread(next, batches, None)
+            if first is None:
+                raise ValidationError("File contains no rows")
+            header, rows = first
+            self._plan_columns(job, header, rows)
+            converter = _BatchConverter(job, self.max_rejected_rows)
+
+            def next_records() -> Optional[List[tuple]]:
+                batch = next(batches, None)
+                if batch is None:
+                    return None
+                if batch[0] != header:
+                    raise ValidationError("Columns changed mid-file")
+                return converter.convert(batch[1])
+
+            # Dedicated connection: a long load must not hold a request pool slot
+            conn = await asyncpg.connect(settings.DATABASE_URL)
+            try:
+                async with conn.transaction():
+                    column_defs = ", ".join(f'"{plan.name}" {plan.pg_type}' for plan in job.columns)
+                    await conn.execute(f'CREATE TABLE "{staging}" ({column_defs})')
+
+                    names = [plan.name for plan in job.columns]
+                    records = await _in_thread(converter.convert, rows)
+                    while records is not None:
+                        # Convert the next batch while this one is copied
+                        pending = asyncio.ensure_future(asyncio.to_thread(next_records))
+                        try:
+                            if records:
+                                await conn.copy_records_to_table(staging, records=records, columns=names)
+                            job.rows_loaded += len(records)
+                            job.batches += 1
+                            records = await asyncio.shield(pending)
+                        except BaseException:
+                            # The conversion thread reads the file: it must finish before the file closes
+                            await _settle(pending)
+                            raise
+
+                    if job.rows_loaded == 0:
+                        raise ValidationError("No valid rows to load")
+
+                    # Atomic swap: readers switch tables at commit
+                    await conn.execute(f'ALTER TABLE IF EXISTS "{job.table}" RENAME TO "{retired}"')
+                    await conn.execute(f'ALTER TABLE "{staging}" RENAME TO "{job.table}"')
+                    await conn.execute(f'DROP TABLE IF EXISTS "{retired}"')
+                    await conn.execute(f'ANALYZE "{job.table}"')
+            finally:
+                await conn.close()
+
+        await self._update_catalog(job)
+
+    def _plan_columns(self, job: IngestionJob, header: List[str], rows: List[Optional[List[Any]]]) -> None:
+        """Fix column types from the catalog card, inferring undeclared ones from the first batch"""
+        if not header:
+            raise ValidationError("File has no columns")
+        if len(set(header)) != len(header):
+            raise ValidationError("Duplicate column names")
+
+        card = catalog.get(job.dataset_id)
+        declared = {column["name"]: column for column in (card or {}).get("schema", [])}
+        for index, name in enumerate(header):
+            if not IDENTIFIER_RE.match(name):
+                raise ValidationError(f"Invalid column name {name}")
+            column = declared.get(name)
+            if column is not None and column.get("type", "").upper() in COLUMN_TYPES:
+                column_type = column["type"].upper()
+            else:
+                column_type = infer_column_type([
+                    row[index] for row in rows if row is not None and len(row) == len(header)
+                ])
+            job.columns.append(_ColumnPlan(name, column_type, column))
+
+    async def _update_catalog(self, job: IngestionJob) -> None:
+        card = catalog.get(job.dataset_id)
+        card = dict(card) if card else {"id": job.dataset_id, "name": job.table, "description": ""}
+        card["schema"] = [
+            {key: value for key, value in plan.to_dict().items() if key != "pii_reason"}
+            for plan in job.columns
+        ]
+        card["row_count"] = job.rows_loaded
+        card["last_updated"] = job.finished_at.isoformat() + "Z" if job.finished_at else datetime.utcnow().isoformat() + "Z"
+        try:
+            await catalog.save(card)
+        except Exception as e:
+            # This worker has the card; the others learn the dataset from its next load
+            logger.warning(f"Saving the catalog card of {card['id']} failed: {str(e)}")
+
+    async def _snapshot(self, job: IngestionJob) -> None:
+        """Snapshot the loaded table so later evidence can cite (and diff against) this load"""
+        card = catalog.get(job.dataset_id) or {}
+        key_column = default_key_column(card)
+        if key_column is None:
+            return
+        try:
+            async with AsyncSessionLocal() as session:
+                snapshot = await snapshots.take(session, card.get("id", job.dataset_id), job.table, key_column, job.user_id)
+            job.snapshot_id = str(snapshot.id)
+        except Exception as e:
+            # The load itself succeeded; a missing snapshot only weakens later citations
+            logger.warning(f"Snapshot after ingestion {job.job_id} failed: {str(e)}")
+
+    def _generate_evidence(self, job: IngestionJob, elapsed: float) -> Dict[str, Any]:
+        """Evidence pack for one load, successful or not"""
+        return {
+            "load_id": job.job_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "user_id": job.user_id,
+            "dataset_id": job.dataset_id,
+            "source": {
+                "filename": job.filename,
+                "format": job.format,
+                "bytes": job.bytes,
+                "sha256": job.sha256
+            },
+            "load": {
+                "status": job.status,
+                "error": job.error,
+                "rows_loaded": job.rows_loaded,
+                "rows_rejected": job.rows_rejected,
+                "batches": job.batches,
+                "duration_seconds": round(elapsed, 3),
+                "rows_per_second": job.rows_per_second
+            },
+            "schema": [plan.to_dict() for plan in job.columns],
+            "policy_checks": {
+                "pii_classified": True,
+                "pii_columns": [plan.name for plan in job.columns if plan.classification()],
+                "rejected_rows_within_limit": job.rows_rejected <= self.max_rejected_rows
+            },
+            "rejections": job.rejections,
+            "lineage": {
+                "target_table": job.table,
+                "snapshot_id": job.snapshot_id,
+                "write_mode": "replace (staging table swapped in by rename)"
+            }
+        }
+
+    def state(self) -> Dict[str, Any]:
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            **self._stats
+        }
+
+
+# Global ingestion service instance
+ingestion = IngestionService(
+    batch_rows=settings.INGESTION_BATCH_ROWS,
+    max_concurrent_loads=settings.INGESTION_MAX_CONCURRENT_LOADS,
+    max_rejected_rows=settings.INGESTION_MAX_REJECTED_ROWS,
+    heartbeat_interval=settings.INGESTION_HEARTBEAT_INTERVAL,
+    stale_after=settings.INGESTION_STALE_AFTER
+)
+observability.register_state("ingestion", ingestion.state)
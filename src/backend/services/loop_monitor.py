@@ -0,0 +1,66 @@
+"""
+Event Loop Lag Monitor
+Continuous measurement of how late the event loop runs scheduled callbacks
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+from config import settings
+from utils.logging import logger
+
+
+class EventLoopLagMonitor:
+    """
+    Track event-loop lag with a periodic timer
+
+    Every `interval` seconds a timer measures how late it woke up. The
+    smoothed lag rises within a few intervals of the loop saturating and
+    is what overload protection reads on every request, so reading it is a
+    plain attribute access.
+    """
+
+    def __init__(self, interval: float = 0.1, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.lag += self.smoothing * (lag - self.lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag > 1.0:
+                logger.warning(f"Event loop blocked for {lag:.3f}s")
+
+    def state(self) -> Dict[str, float]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "lag_ms": self.lag * 1000,
+            "max_lag_ms": self.max_lag * 1000,
+        }
+
+
+# Global event loop monitor instance
+loop_monitor = EventLoopLagMonitor(interval=settings.EVENT_LOOP_MONITOR_INTERVAL_MS / 1000)
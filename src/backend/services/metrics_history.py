@@ -0,0 +1,404 @@
+"""
+Metrics History
+Embedded fixed-memory time series of the service's own metrics
+"""
+
+import asyncio
+import json
+import os
+import struct
+import tempfile
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from utils.logging import logger
+from utils.shared_state import POSITION_ENV
+from .observability import observability, ObservabilityService
+
+
+# (name, resolution in seconds, retention in seconds). The first tier holds
+# the raw samples; the others hold avg/min/max rollups of those samples.
+TIERS = (
+    ("10s", 10, 86400),
+    ("1m", 60, 3 * 86400),
+    ("1h", 3600, 90 * 86400),
+)
+
+FILE_MAGIC = b"AMH1"
+
+NAN = float("nan")
+
+
+class _Tier:
+    """
+    Ring of `retention // resolution` slots shared by every series
+
+    `slots` records which time slot each index currently holds, so a read
+    skips indexes left over from an earlier lap of the ring and a write
+    clears them first.
+    """
+
+    def __init__(self, name: str, resolution: int, retention: int, rollup: bool):
+        self.name = name
+        self.resolution = resolution
+        self.retention = retention
+        self.rollup = rollup
+        self.size = retention // resolution
+        self.columns = ("avg", "min", "max") if rollup else ("value",)
+        self.slots = array("q", [-1]) * self.size
+        self.series: Dict[str, List[array]] = {}
+        # Rollup bucket in progress: name -> [sum, count, min, max]
+        self.pending: Dict[str, List[float]] = {}
+        self.pending_slot: Optional[int] = None
+
+    def add_series(self, name: str) -> None:
+        self.series[name] = [array("d", [NAN]) * self.size for _ in self.columns]
+
+    def _open(self, slot: int) -> int:
+        index = slot % self.size
+        if self.slots[index] != slot:
+            self.slots[index] = slot
+            for columns in self.series.values():
+                for column in columns:
+                    column[index] = NAN
+        return index
+
+    def record(self, slot: int, values: Dict[str, float]) -> None:
+        if not self.rollup:
+            index = self._open(slot)
+            for name, value in values.items():
+                columns = self.series.get(name)
+                if columns is not None:
+                    columns[0][index] = value
+            return
+
+        if self.pending_slot is not None and slot != self.pending_slot:
+            self.commit()
+        self.pending_slot = slot
+        for name, value in values.items():
+            if name not in self.series:
+                continue
+            bucket = self.pending.get(name)
+            if bucket is None:
+                self.pending[name] = [value, 1, value, value]
+                continue
+            bucket[0] += value
+            bucket[1] += 1
+            if value < bucket[2]:
+                bucket[2] = value
+            if value > bucket[3]:
+                bucket[3] = value
+
+    def commit(self) -> None:
+        """Write the completed rollup bucket into the ring"""
+        index = self._open(self.pending_slot)
+        for name, (total, count, low, high) in self.pending.items():
+            avg, minimum, maximum = self.series[name]
+            avg[index] = total / count
+            minimum[index] = low
+            maximum[index] = high
+        self.pending = {}
+        self.pending_slot = None
+
+    def read(self, names: List[str], start_slot: int, end_slot: int) -> Tuple[List[int], Dict[str, Dict[str, list]]]:
+        start_slot = max(start_slot, end_slot - self.size + 1)
+        timestamps: List[int] = []
+        result = {name: {column: [] for column in self.columns} for name in names}
+        for slot in range(start_slot, end_slot + 1):
+            index = slot % self.size
+            if self.slots[index] != slot:
+                continue
+            timestamps.append(slot * self.resolution)
+            for name in names:
+                series = result[name]
+                for column, values in zip(self.columns, self.series[name]):
+                    value = values[index]
+                    series[column].append(None if value != value else round(value, 6))
+        return timestamps, result
+
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    """Naive datetimes are UTC, as everywhere else in the API"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class MetricsHistory:
+    """
+    Sample the observability metrics into tiered, fixed-size rings
+
+    Every 10 seconds the flat numeric view of the metrics
+    (`ObservabilityService.sample`) is written to the raw tier and folded
+    into the 1m and 1h rollups. Each tier is a ring of preallocated
+    float64 arrays, so memory is fixed once a series exists:
+
+        10s raw     1 day      8,640 slots x 1 column    69 KB
+        1m rollup   3 days     4,320 slots x 3 columns  104 KB
+        1h rollup   90 days    2,160 slots x 3 columns   52 KB
+
+    about 220 KB per series, plus 120 KB of shared slot indexes. Series
+    beyond `max_series` are not recorded (~14 MB at the default 64).
+
+    The rings are flushed to a file every `flush_interval` seconds and on
+    shutdown, and restored at startup; a rollup bucket still in progress
+    is not persisted. History is per worker: under the launcher each
+    worker position has its own file (see history_path).
+    """
+
+    def __init__(
+        self,
+        registry: ObservabilityService,
+        max_series: int = 64,
+        path: Optional[str] = None,
+        flush_interval: float = 300.0
+    ):
+        self.registry = registry
+        self.max_series = max_series
+        self.path = path
+        self.flush_interval = flush_interval
+        self.tiers = [
+            _Tier(name, resolution, retention, rollup=position > 0)
+            for position, (name, resolution, retention) in enumerate(TIERS)
+        ]
+        self.interval = self.tiers[0].resolution
+        self.names: List[str] = []
+        self.samples = 0
+        self.dropped_values = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(
+            tier.slots.itemsize * tier.size * (1 + len(tier.columns) * len(tier.series))
+            for tier in self.tiers
+        )
+
+    def record(self, values: Dict[str, float], now: Optional[float] = None) -> None:
+        """Write one sample of every series at `now`"""
+        now = time.time() if now is None else now
+        raw = self.tiers[0]
+        for name in values:
+            if name in raw.series:
+                continue
+            if len(self.names) >= self.max_series:
+                self.dropped_values += 1
+                continue
+            self.names.append(name)
+            for tier in self.tiers:
+                tier.add_series(name)
+        for tier in self.tiers:
+            tier.record(int(now // tier.resolution), values)
+        self.samples += 1
+
+    def match(self, series: Optional[str]) -> List[str]:
+        """Series named, or under a prefix named, in a comma-separated list"""
+        if not series:
+            return list(self.names)
+        patterns = [pattern.strip() for pattern in series.split(",") if pattern.strip()]
+        return [
+            name for name in self.names
+            if any(name == pattern or name.startswith(f"{pattern}.") for pattern in patterns)
+        ]
+
+    def query(
+        self,
+        series: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        resolution: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Series values over [start, end] (default: the last hour)
+
+        Without a `resolution`, the finest tier still holding `start` is
+        used. Timestamps are epoch seconds at the start of each slot; gaps
+        (worker down, series not yet present) are omitted or null.
+        """
+        now = time.time()
+        end_ts = _epoch(end) or now
+        start_ts = _epoch(start) or end_ts - 3600
+        if start_ts > end_ts:
+            raise ValueError("start must be before end")
+
+        if resolution is None:
+            tier = next((tier for tier in self.tiers if now - start_ts <= tier.retention), self.tiers[-1])
+        else:
+            tier = next((tier for tier in self.tiers if tier.name == resolution), None)
+            if tier is None:
+                raise ValueError(f"Unknown resolution: {resolution} (one of {', '.join(t.name for t in self.tiers)})")
+
+        names = self.match(series)
+        timestamps, values = tier.read(names, int(start_ts // tier.resolution), int(end_ts // tier.resolution))
+        return {
+            "resolution": tier.name,
+            "start": int(start_ts),
+            "end": int(end_ts),
+            "timestamps": timestamps,
+            "series": values
+        }
+
+    def start(self) -> None:
+        """Restore the persisted history and start sampling on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling and flush to disk"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.path:
+            await self.flush()
+
+    async def _run(self) -> None:
+        if self.path:
+            await self.restore()
+        loop = asyncio.get_running_loop()
+        next_flush = loop.time() + self.flush_interval
+        while True:
+            # Sample on slot boundaries so every tick lands in its own slot
+            await asyncio.sleep(self.interval - time.time() % self.interval)
+            try:
+                self.record(self.registry.sample())
+            except Exception as e:
+                logger.error(f"Metrics sampling failed: {str(e)}")
+            if self.path and loop.time() >= next_flush:
+                next_flush = loop.time() + self.flush_interval
+                await self.flush()
+
+    def dump(self) -> bytes:
+        """Serialize the rings: magic, header length, JSON header, then raw arrays"""
+        header = json.dumps({
+            "tiers": [[tier.name, tier.resolution, tier.size] for tier in self.tiers],
+            "series": self.names
+        }).encode()
+        parts = [FILE_MAGIC, struct.pack("<I", len(header)), header]
+        for tier in self.tiers:
+            parts.append(tier.slots.tobytes())
+            for name in self.names:
+                parts.extend(column.tobytes() for column in tier.series[name])
+        return b"".join(parts)
+
+    def load(self, data: bytes) -> bool:
+        """Replace the rings with a `dump`; False if the layout does not match"""
+        if data[:4] != FILE_MAGIC:
+            return False
+        (length,) = struct.unpack_from("<I", data, 4)
+        header = json.loads(data[8:8 + length])
+        if header["tiers"] != [[tier.name, tier.resolution, tier.size] for tier in self.tiers]:
+            return False
+        names = header["series"]
+        expected = 8 + length + sum(
+            tier.slots.itemsize * tier.size * (1 + len(tier.columns) * len(names)) for tier in self.tiers
+        )
+        if len(data) != expected:
+            return False
+
+        kept = names[:self.max_series]
+        offset = 8 + length
+        for tier in self.tiers:
+            chunk = tier.slots.itemsize * tier.size
+            tier.slots = array("q")
+            tier.slots.frombytes(data[offset:offset + chunk])
+            offset += chunk
+            tier.series = {}
+            tier.pending, tier.pending_slot = {}, None
+            for name in names:
+                columns = []
+                for _ in tier.columns:
+                    column = array("d")
+                    column.frombytes(data[offset:offset + chunk])
+                    columns.append(column)
+                    offset += chunk
+                if name in kept:
+                    tier.series[name] = columns
+        self.names = list(kept)
+        return True
+
+    async def restore(self) -> None:
+        try:
+            data = await asyncio.to_thread(self._read)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Reading metrics history from {self.path} failed: {str(e)}")
+            return
+        if self.load(data):
+            logger.info(f"Restored metrics history for {len(self.names)} series from {self.path}")
+        else:
+            logger.warning(f"Ignoring metrics history at {self.path}: layout does not match")
+
+    async def flush(self) -> None:
+        """Write the rings to `path` atomically"""
+        data = self.dump()
+        try:
+            await asyncio.to_thread(self._write, data)
+            self.flushes += 1
+        except Exception as e:
+            self.flush_errors += 1
+            logger.error(f"Metrics history flush to {self.path} failed: {str(e)}")
+
+    def _read(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def _write(self, data: bytes) -> None:
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp = tempfile.mkstemp(prefix=".metrics-history-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "series": len(self.names),
+            "samples": self.samples,
+            "dropped_values": self.dropped_values,
+            "memory_bytes": self.memory_bytes,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+        }
+
+
+def history_path() -> str:
+    """
+    History file for this process
+
+    Workers started by the launcher get one file per pool position, so they
+    never overwrite each other; a replacement worker restores the file its
+    predecessor at the same position flushed.
+    """
+    path = settings.METRICS_HISTORY_PATH or os.path.join(tempfile.gettempdir(), "aureus-metrics-history.bin")
+    position = os.environ.get(POSITION_ENV)
+    if position is None:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.worker{position}{extension}"
+
+
+# Global metrics history instance
+metrics_history = MetricsHistory(
+    observability,
+    max_series=settings.METRICS_HISTORY_MAX_SERIES,
+    path=history_path(),
+    flush_interval=settings.METRICS_HISTORY_FLUSH_INTERVAL
+)
+observability.register_state("metrics_history", metrics_history.state)
@@ -4,7 +4,7 @@ Comprehensive logging, metrics, and monitoring
 """
 
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple, Callable
 from datetime import datetime
 from functools import wraps
 import json
@@ -22,35 +22,44 @@ class ObservabilityService:
             "errors": {},
             "performance": {}
         }
+        # (method, route template) -> [count, success, errors, total_duration]
+        self._request_stats: Dict[Tuple[str, str], List[float]] = {}
+        # Component name -> callable returning its current state
+        self._state_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+    
+    def register_state(self, name: str, provider: Callable[[], Dict[str, Any]]):
+        """
+        Export a component's state in the metrics snapshot
+        
+        The provider is only called when metrics are read, so components
+        keep their hot paths free of metric bookkeeping.
+        """
+        self._state_providers[name] = provider
     
     def track_request(self, method: str, path: str, status_code: int, duration: float, user_id: Optional[str] = None):
         """Track API request"""
         logger.info(
             f"API Request: {method} {path} - Status: {status_code} - Duration: {duration:.3f}s - User: {user_id or 'anonymous'}"
         )
+        self.record_request(method, path, status_code, duration)
+    
+    def record_request(self, method: str, path: str, status_code: int, duration: float):
+        """
+        Record request metrics without logging
         
-        # Update metrics
-        key = f"{method}:{path}"
-        if key not in self.metrics["requests"]:
-            self.metrics["requests"][key] = {
-                "count": 0,
-                "success": 0,
-                "errors": 0,
-                "total_duration": 0,
-                "avg_duration": 0
-            }
-        
-        self.metrics["requests"][key]["count"] += 1
-        self.metrics["requests"][key]["total_duration"] += duration
-        self.metrics["requests"][key]["avg_duration"] = (
-            self.metrics["requests"][key]["total_duration"] / 
-            self.metrics["requests"][key]["count"]
-        )
+        Hot path called once per request by the request tracking middleware:
+        no string formatting, one dict lookup and in-place list updates.
+        """
+        stats = self._request_stats.get((method, path))
+        if stats is None:
+            stats = self._request_stats[(method, path)] = [0, 0, 0, 0.0]
         
+        stats[0] += 1
+        stats[3] += duration
         if 200 <= status_code < 300:
-            self.metrics["requests"][key]["success"] += 1
+            stats[1] += 1
         else:
-            self.metrics["requests"][key]["errors"] += 1
+            stats[2] += 1
     
     def track_query_execution(
         self,
@@ -121,11 +130,53 @@ class ObservabilityService:
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics snapshot"""
+        self.metrics["requests"] = {
+            f"{method}:{path}": {
+                "count": count,
+                "success": success,
+                "errors": errors,
+                "total_duration": total_duration,
+                "avg_duration": total_duration / count if count else 0
+            }
+            for (method, path), (count, success, errors, total_duration) in self._request_stats.items()
+        }
+        for name, provider in self._state_providers.items():
+            self.metrics[name] = provider()
         return {
             "timestamp": datetime.utcnow().isoformat(),
             "metrics": self.metrics
         }
     
+    def sample(self) -> Dict[str, float]:
+        """
+        Flat numeric view of the metrics for time-series sampling
+        
+        Per-path and per-dataset counters are summed so the number of
+        series stays fixed as routes and datasets grow; component states
+        contribute their numeric fields as `<component>.<field>`.
+        """
+        requests = [0, 0, 0, 0.0]
+        for stats in self._request_stats.values():
+            for i, value in enumerate(stats):
+                requests[i] += value
+        queries = self.metrics["queries"].values()
+        values = {
+            "requests.count": requests[0],
+            "requests.success": requests[1],
+            "requests.errors": requests[2],
+            "requests.total_duration": requests[3],
+            "queries.total": sum(q["total_queries"] for q in queries),
+            "queries.failed": sum(q["failed_queries"] for q in queries),
+            "queries.rows_returned": sum(q["total_rows_returned"] for q in queries),
+            "queries.total_execution_time": sum(q["total_execution_time"] for q in queries),
+            "errors.count": sum(e["count"] for e in self.metrics["errors"].values()),
+        }
+        for name, provider in self._state_providers.items():
+            for key, value in provider().items():
+                if isinstance(value, (int, float)):
+                    values[f"{name}.{key}"] = float(value)
+        return values
+    
     def reset_metrics(self):
         """Reset all metrics"""
         self.metrics = {
@@ -134,6 +185,7 @@ class ObservabilityService:
             "errors": {},
             "performance": {}
         }
+        self._request_stats = {}
         logger.info("Metrics reset")
 
 
@@ -0,0 +1,436 @@
+"""
+Pipeline Execution Engine
+Runs DAGs of SQL transformation steps with incremental skips and checkpoints
+"""
+
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import orjson
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db.base import Base
+from db.session import AsyncSessionLocal, WORKLOAD
+# Every model module, so Base.metadata lists all application tables
+import models.approval  # noqa: F401
+import models.catalog  # noqa: F401
+import models.data_quality  # noqa: F401
+import models.ingestion  # noqa: F401
+import models.query_history  # noqa: F401
+import models.query_template  # noqa: F401
+import models.snapshot  # noqa: F401
+import models.user  # noqa: F401
+from models.pipeline import PipelineRun, PipelineStepRun
+from utils.errors import DataQualityError, SQLValidationError, ValidationError
+from utils.logging import logger
+from utils.sql import IDENTIFIER_RE, normalize_sql, validate_read_only_sql
+from .catalog import catalog
+from .data_quality import dq_engine, validate_checks
+from .observability import observability
+
+
+# Step statuses that satisfy downstream dependencies
+SUCCEEDED = ("completed", "skipped")
+
+# hashtextextended seed for input content digests
+PROBE_SEED = 3
+
+# Prefixes of the per-run side tables _materialize builds and retires
+STAGING_PREFIXES = ("pipeline_build_", "pipeline_old_")
+
+
+def reserved_tables() -> set:
+    """Table names a step may not write: application tables and catalog datasets"""
+    return set(Base.metadata.tables) | {"alembic_version"} | {card["name"] for card in catalog.list()}
+
+
+def validate_pipeline(steps: List[Dict[str, Any]]) -> List[str]:
+    """
+    Check that steps form a DAG of read-only SQL transformations
+
+    Args:
+        steps: Step definitions (step_id, sql, output, depends_on, inputs, watermarks)
+
+    Returns:
+        Step IDs in topological order
+
+    Raises:
+        ValidationError: Duplicate IDs or outputs, unknown dependencies, cycles,
+            invalid table names, outputs naming application or catalog
+            tables, or non-SELECT SQL
+    """
+    by_id: Dict[str, Dict[str, Any]] = {}
+    outputs = set()
+    reserved = reserved_tables()
+    for step in steps:
+        step_id = step["step_id"]
+        if step_id in by_id:
+            raise ValidationError(f"Duplicate step {step_id}")
+        if step["output"] in outputs:
+            raise ValidationError(f"Output {step['output']} is written by more than one step")
+        for table in [step["output"], *step.get("inputs", [])]:
+            if not IDENTIFIER_RE.match(table):
+                raise ValidationError(f"Step {step_id}: invalid table name {table}")
+        if step["output"] in reserved or step["output"].startswith(STAGING_PREFIXES):
+            raise ValidationError(f"Step {step_id}: output {step['output']} is a reserved table name")
+        for table, column in step.get("watermarks", {}).items():
+            if table not in step.get("inputs", []) or not IDENTIFIER_RE.match(column):
+                raise ValidationError(f"Step {step_id}: watermark {table}.{column} is not on a declared input")
+        try:
+            validate_read_only_sql(step["sql"])
+        except SQLValidationError as e:
+            raise ValidationError(f"Step {step_id}: {str(e)}")
+        validate_checks(step.get("checks", []))
+        by_id[step_id] = step
+        outputs.add(step["output"])
+
+    # Kahn's algorithm; anything left over sits on a cycle
+    remaining = {step_id: set(step.get("depends_on", [])) for step_id, step in by_id.items()}
+    for step_id, deps in remaining.items():
+        unknown = deps - set(by_id)
+        if unknown:
+            raise ValidationError(f"Step {step_id} depends on unknown steps {sorted(unknown)}")
+    order: List[str] = []
+    ready = sorted(step_id for step_id, deps in remaining.items() if not deps)
+    while ready:
+        step_id = ready.pop(0)
+        order.append(step_id)
+        for other, deps in remaining.items():
+            if step_id in deps:
+                deps.discard(step_id)
+                if not deps and other not in order and other not in ready:
+                    ready.append(other)
+    if len(order) != len(by_id):
+        raise ValidationError(f"Dependency cycle among steps {sorted(set(by_id) - set(order))}")
+    return order
+
+
+def step_fingerprint(step: Dict[str, Any], upstream: Dict[str, str], probes: Dict[str, Any]) -> str:
+    """
+    Digest of what a step's output depends on
+
+    Args:
+        step: Step definition
+        upstream: Fingerprints of the steps it depends on
+        probes: Probe of each external input (watermark or content digest)
+
+    Returns:
+        Hex digest; equal to the last successful run's means the step can be skipped
+    """
+    return hashlib.blake2b(orjson.dumps(
+        {"sql": normalize_sql(step["sql"]), "output": step["output"], "upstream": upstream, "inputs": probes},
+        option=orjson.OPT_SORT_KEYS
+    ), digest_size=16).hexdigest()
+
+
+class PipelineEngine:
+    """
+    Execute pipeline runs in the background
+
+    Steps whose dependencies have succeeded run concurrently, at most
+    `max_parallel_steps` at a time (each holds one pooled connection).
+    Before running, a step is fingerprinted from its SQL, its upstream
+    steps' fingerprints and a probe of each external input (a watermark
+    max(), or a content digest); if the fingerprint matches the step's last
+    successful run and its output table exists, the step is skipped. Every
+    finished step is checkpointed, so resuming a failed run re-executes only
+    the steps that did not succeed. Outputs are written to `output_schema`
+    only; step SQL reads them unqualified through the search path. A
+    running run's heartbeat is refreshed every `heartbeat_interval`
+    seconds; a run whose heartbeat stops (its worker died) is failed by the
+    next request that finds it, and can then be resumed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_parallel_steps: int = 4,
+        output_schema: str = "pipeline_outputs",
+        heartbeat_interval: float = 10.0
+    ):
+        self.session_factory = session_factory
+        self.max_parallel_steps = max_parallel_steps
+        self.output_schema = output_schema
+        self.heartbeat_interval = heartbeat_interval
+        self._runs: Dict[str, asyncio.Task] = {}
+        self._stats = {"runs": 0, "steps_completed": 0, "steps_skipped": 0, "steps_failed": 0}
+
+    def is_active(self, run_id: UUID) -> bool:
+        """Whether this worker is currently executing the run"""
+        return str(run_id) in self._runs
+
+    def start(self, pipeline: Dict[str, Any], run_id: UUID, force: bool = False) -> None:
+        """
+        Execute (or resume) a run in the background
+
+        Args:
+            pipeline: Pipeline definition (id, version, steps)
+            run_id: Existing pipeline_runs row, status running
+            force: Re-execute steps even when their fingerprint is unchanged
+        """
+        task = asyncio.create_task(self._execute(pipeline, run_id, force))
+        self._runs[str(run_id)] = task
+        task.add_done_callback(lambda _: self._runs.pop(str(run_id), None))
+        self._stats["runs"] += 1
+
+    async def _execute(self, pipeline: Dict[str, Any], run_id: UUID, force: bool) -> None:
+        started = time.perf_counter()
+        heartbeat = asyncio.create_task(self._heartbeat(run_id))
+        running: Dict[asyncio.Task, str] = {}
+        error = None
+        try:
+            steps = {step["step_id"]: step for step in pipeline["steps"]}
+            order = validate_pipeline(pipeline["steps"])
+
+            # Checkpoint: steps that already succeeded in an earlier attempt
+            async with self.session_factory() as session:
+                checkpoint = (await session.execute(
+                    select(PipelineStepRun).where(PipelineStepRun.run_id == run_id)
+                )).scalars().all()
+            fingerprints = {row.step_id: row.fingerprint for row in checkpoint if row.status in SUCCEEDED}
+            statuses = {step_id: "completed" for step_id in fingerprints}
+            pending = [step_id for step_id in order if step_id not in fingerprints]
+            if fingerprints:
+                logger.info(f"Pipeline run {run_id} resuming; {len(fingerprints)} steps checkpointed")
+
+            while pending or running:
+                # One pass in topological order settles blocked chains
+                for step_id in list(pending):
+                    deps = steps[step_id].get("depends_on", [])
+                    failed = [dep for dep in deps if statuses.get(dep) in ("failed", "blocked")]
+                    if failed:
+                        pending.remove(step_id)
+                        statuses[step_id] = "blocked"
+                        await self._checkpoint(PipelineStepRun(
+                            run_id=run_id, step_id=step_id, pipeline_id=pipeline["id"], status="blocked",
+                            error=f"Upstream steps did not succeed: {', '.join(failed)}"
+                        ))
+                    elif all(dep in fingerprints for dep in deps) and len(running) < self.max_parallel_steps:
+                        pending.remove(step_id)
+                        upstream = {dep: fingerprints[dep] for dep in deps}
+                        task = asyncio.create_task(self._run_step(pipeline["id"], run_id, steps[step_id], upstream, force))
+                        running[task] = step_id
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step_id = running.pop(task)
+                    status, fingerprint = task.result()
+                    statuses[step_id] = status
+                    if status in SUCCEEDED:
+                        fingerprints[step_id] = fingerprint
+        except Exception as e:
+            # The run is marked failed below; it never stays "running"
+            error = str(e)
+            logger.error(f"Pipeline {pipeline['id']} run {run_id} aborted: {error}")
+        except BaseException:
+            error = "cancelled"
+            raise
+        finally:
+            for task in running:
+                task.cancel()
+            heartbeat.cancel()
+            await self._finish(pipeline, run_id, time.perf_counter() - started, error)
+
+    async def _heartbeat(self, run_id: UUID) -> None:
+        """Refresh the run's heartbeat so other workers can tell it is still executing"""
+        while True:
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(
+                        update(PipelineRun).where(PipelineRun.id == run_id).values(heartbeat_at=datetime.utcnow())
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"Pipeline run {run_id} heartbeat failed: {str(e)}")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _run_step(
+        self,
+        pipeline_id: str,
+        run_id: UUID,
+        step: Dict[str, Any],
+        upstream: Dict[str, str],
+        force: bool
+    ) -> Tuple[str, Optional[str]]:
+        """Fingerprint, then skip or materialize one step; returns (status, fingerprint)"""
+        step_id = step["step_id"]
+        record = PipelineStepRun(run_id=run_id, step_id=step_id, pipeline_id=pipeline_id, started_at=datetime.utcnow())
+        started = time.perf_counter()
+        probes: Dict[str, Any] = {}
+        quality = None
+        skip_reason = None
+        try:
+            async with self.session_factory() as session:
+                # Upstream outputs resolve before application tables; ends with the transaction
+                await session.execute(text(f'SET LOCAL search_path TO "{self.output_schema}", public'))
+                for table in step.get("inputs", []):
+                    probes[table] = await self._probe(session, table, step.get("watermarks", {}).get(table))
+                record.fingerprint = step_fingerprint(step, upstream, probes)
+
+                previous = await session.scalar(
+                    select(PipelineStepRun.fingerprint)
+                    .where(
+                        PipelineStepRun.pipeline_id == pipeline_id,
+                        PipelineStepRun.step_id == step_id,
+                        PipelineStepRun.status.in_(SUCCEEDED)
+                    )
+                    .order_by(PipelineStepRun.finished_at.desc())
+                    .limit(1)
+                )
+                output_exists = await session.scalar(
+                    text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f'"{self.output_schema}"."{step["output"]}"'}
+                )
+                if not force and previous == record.fingerprint and output_exists:
+                    record.status = "skipped"
+                    skip_reason = "inputs unchanged since last successful run"
+                else:
+                    record.rows_written, quality = await self._materialize(session, step, run_id)
+                    await session.commit()
+                    record.status = "completed"
+                    if quality is not None:
+                        try:
+                            await dq_engine.save_baseline(session, step["output"], quality, f"pipeline run {run_id}")
+                        except Exception as e:
+                            # The output is committed; the next run compares against the previous baseline
+                            logger.warning(f"Saving drift baseline for {step['output']} failed: {str(e)}")
+        except Exception as e:
+            record.status = "failed"
+            record.error = str(e)
+            quality = getattr(e, "results", quality)
+            logger.error(f"Pipeline {pipeline_id} step {step_id} failed: {str(e)}")
+
+        record.finished_at = datetime.utcnow()
+        record.duration_ms = int((time.perf_counter() - started) * 1000)
+        record.evidence = {
+            "step_id": step_id,
+            "sql_hash": hashlib.sha256(step["sql"].encode()).hexdigest(),
+            "output": step["output"],
+            "depends_on": upstream,
+            "inputs": probes,
+            "fingerprint": record.fingerprint,
+            "skip_reason": skip_reason,
+            "rows_written": record.rows_written,
+            "data_quality": quality,
+            "duration_ms": record.duration_ms,
+            "status": record.status,
+            "error": record.error
+        }
+        self._stats[f"steps_{record.status}"] += 1
+        await self._checkpoint(record)
+        return record.status, record.fingerprint
+
+    async def _probe(self, session: AsyncSession, table: str, watermark: Optional[str]) -> Dict[str, Any]:
+        """
+        Cheap change detector for an input: watermark if declared, else a content digest
+
+        The digest sums per-row hashes, so it is order-independent: one
+        streaming pass with constant memory, no sort (as snapshots do).
+        """
+        if watermark:
+            row = (await session.execute(text(
+                f'SELECT count(*), max("{watermark}")::text FROM "{table}"'
+            ), execution_options=WORKLOAD)).one()
+            return {"rows": row[0], "watermark": row[1]}
+        row = (await session.execute(text(
+            f"SELECT count(*), coalesce(sum(hashtextextended(t::text, {PROBE_SEED})), 0)::text "
+            f'FROM "{table}" AS t'
+        ), execution_options=WORKLOAD)).one()
+        return {"rows": row[0], "digest": row[1]}
+
+    async def _materialize(
+        self,
+        session: AsyncSession,
+        step: Dict[str, Any],
+        run_id: UUID
+    ) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """
+        Build the output in a side table and swap it in by rename (one transaction)
+
+        Every table touched lives in the output schema, so a step can never
+        replace an application table. Data-quality checks run on the side
+        table first; a failing check aborts the step and leaves the previous
+        output in place. Side tables are named per run and output, so two
+        pipelines writing the same output never share one.
+
+        Returns:
+            (rows written, data-quality results or None)
+        """
+        schema, output = self.output_schema, step["output"]
+        suffix = hashlib.blake2b(f"{run_id}:{output}".encode(), digest_size=8).hexdigest()
+        build, retired = (f"{prefix}{suffix}" for prefix in STAGING_PREFIXES)
+        await session.execute(text(f'DROP TABLE IF EXISTS "{schema}"."{build}"'), execution_options=WORKLOAD)
+        result = await session.execute(text(f'CREATE TABLE "{schema}"."{build}" AS {step["sql"]}'), execution_options=WORKLOAD)
+        quality = None
+        if step.get("checks"):
+            await dq_engine.load_baselines(session, output)
+            quality = await dq_engine.run_sql(session, build, step["checks"], baseline_table=output)
+            if not quality["passed"]:
+                raise DataQualityError(f"Data quality checks failed: {', '.join(quality['failed'])}", results=quality)
+        await session.execute(text(f'ALTER TABLE IF EXISTS "{schema}"."{output}" RENAME TO "{retired}"'))
+        await session.execute(text(f'ALTER TABLE "{schema}"."{build}" RENAME TO "{output}"'))
+        await session.execute(text(f'DROP TABLE IF EXISTS "{schema}"."{retired}"'), execution_options=WORKLOAD)
+        rows = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else None
+        return rows, quality
+
+    async def _checkpoint(self, record: PipelineStepRun) -> None:
+        async with self.session_factory() as session:
+            await session.merge(record)
+            await session.commit()
+
+    async def _finish(self, pipeline: Dict[str, Any], run_id: UUID, elapsed: float, error: Optional[str] = None) -> None:
+        async with self.session_factory() as session:
+            run = await session.get(PipelineRun, run_id)
+            step_runs = (await session.execute(
+                select(PipelineStepRun).where(PipelineStepRun.run_id == run_id)
+            )).scalars().all()
+            by_step = {row.step_id: row for row in step_runs}
+            succeeded = all(
+                step["step_id"] in by_step and by_step[step["step_id"]].status in SUCCEEDED
+                for step in pipeline["steps"]
+            )
+            run.status = "completed" if succeeded and error is None else "failed"
+            run.finished_at = datetime.utcnow()
+            run.evidence = {
+                "run_id": str(run_id),
+                "pipeline_id": pipeline["id"],
+                "pipeline_version": pipeline["version"],
+                "triggered_by": run.triggered_by,
+                "attempt": run.attempts,
+                "force": run.force,
+                "status": run.status,
+                "max_parallel_steps": self.max_parallel_steps,
+                "attempt_seconds": round(elapsed, 3),
+                "error": error,
+                "steps": {
+                    step_id: {
+                        "status": row.status,
+                        "fingerprint": row.fingerprint,
+                        "rows_written": row.rows_written,
+                        "duration_ms": row.duration_ms,
+                        "error": row.error
+                    }
+                    for step_id, row in by_step.items()
+                }
+            }
+            await session.commit()
+        logger.info(f"Pipeline {pipeline['id']} run {run_id} {run.status} in {elapsed:.3f}s")
+
+    def state(self) -> Dict[str, int]:
+        return {"active_runs": len(self._runs), **self._stats}
+
+
+# Global pipeline engine; parallelism never exceeds the connection pool
+pipeline_engine = PipelineEngine(
+    AsyncSessionLocal,
+    max_parallel_steps=min(settings.PIPELINE_MAX_PARALLEL_STEPS, settings.DB_POOL_SIZE),
+    output_schema=settings.PIPELINE_OUTPUT_SCHEMA,
+    heartbeat_interval=settings.PIPELINE_HEARTBEAT_INTERVAL
+)
+observability.register_state("pipelines", pipeline_engine.state)
@@ -0,0 +1,212 @@
+"""
+On-demand Profiling Service
+Stack-sampling CPU profiles and event-loop health for a running worker
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from utils.logging import logger
+
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    return (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Collect asyncio debug-mode slow callback warnings"""
+
+    def __init__(self, limit: int = 100):
+        super().__init__(level=logging.WARNING)
+        self.limit = limit
+        self.records: List[str] = []
+        self.dropped = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        if not message.startswith("Executing "):
+            return
+        if len(self.records) < self.limit:
+            self.records.append(message)
+        else:
+            self.dropped += 1
+
+
+class SamplingProfiler:
+    """
+    Sample the stacks of every thread for a fixed window
+
+    Nothing runs between profiles: the sampler thread, the loop lag probe
+    and asyncio debug mode exist only for the duration of a request. One
+    profile runs per worker at a time.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(
+        self,
+        seconds: float,
+        interval: float = 0.005,
+        slow_callback_threshold: float = 0.1,
+        output: str = "collapsed"
+    ) -> Dict[str, Any]:
+        """
+        Profile the current worker
+
+        Args:
+            seconds: Length of the sampling window
+            interval: Seconds between stack samples
+            slow_callback_threshold: Report event-loop callbacks running longer than this
+            output: "collapsed" (flamegraph.pl / speedscope text) or "speedscope" (JSON)
+
+        Returns:
+            Dict with the flame graph, sample counts, loop lag and slow callbacks
+        """
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            stop = threading.Event()
+            stacks: Counter = Counter()
+            sampler = threading.Thread(
+                target=self._sample, args=(stop, interval, stacks), name="aureus-profiler", daemon=True
+            )
+
+            handler = _SlowCallbackHandler()
+            asyncio_logger = logging.getLogger("asyncio")
+            previous_debug = loop.get_debug()
+            previous_threshold = loop.slow_callback_duration
+            loop.slow_callback_duration = slow_callback_threshold
+            loop.set_debug(True)
+            asyncio_logger.addHandler(handler)
+
+            logger.info(f"Profiling worker {os.getpid()} for {seconds}s at {interval * 1000:.1f}ms intervals")
+            started = time.perf_counter()
+            sampler.start()
+            try:
+                lags = await self._probe_loop_lag(loop, seconds, interval=0.05)
+            finally:
+                stop.set()
+                await asyncio.to_thread(sampler.join)
+                asyncio_logger.removeHandler(handler)
+                loop.set_debug(previous_debug)
+                loop.slow_callback_duration = previous_threshold
+            elapsed = time.perf_counter() - started
+
+        samples = sum(stacks.values())
+        if output == "speedscope":
+            flamegraph = self._speedscope(stacks, interval, elapsed)
+        else:
+            flamegraph = self._collapsed(stacks)
+
+        return {
+            "pid": os.getpid(),
+            "duration": elapsed,
+            "interval": interval,
+            "samples": samples,
+            "format": output,
+            "flamegraph": flamegraph,
+            "loop_lag": self._summarize_lag(lags),
+            "slow_callbacks": {
+                "threshold": slow_callback_threshold,
+                "count": len(handler.records) + handler.dropped,
+                "callbacks": handler.records,
+            },
+        }
+
+    def _sample(self, stop: threading.Event, interval: float, stacks: Counter) -> None:
+        own_id = threading.get_ident()
+        while not stop.wait(interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_key(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                stacks[(names.get(thread_id, str(thread_id)), tuple(stack))] += 1
+
+    async def _probe_loop_lag(self, loop, seconds: float, interval: float) -> List[float]:
+        # How late each wake-up is relative to when it was scheduled
+        lags = []
+        deadline = loop.time() + seconds
+        while loop.time() < deadline:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, loop.time() - expected))
+        return lags
+
+    def _summarize_lag(self, lags: List[float]) -> Dict[str, float]:
+        if not lags:
+            return {"probes": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(lags)
+        return {
+            "probes": len(ordered),
+            "mean_ms": sum(ordered) / len(ordered) * 1000,
+            "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
+
+    def _collapsed(self, stacks: Counter) -> str:
+        lines = [
+            ";".join([thread_name] + [_frame_label(frame) for frame in stack]) + f" {count}"
+            for (thread_name, stack), count in stacks.most_common()
+        ]
+        return "\n".join(lines)
+
+    def _speedscope(self, stacks: Counter, interval: float, elapsed: float) -> Dict[str, Any]:
+        frame_index: Dict[Frame, int] = {}
+        frames: List[Dict[str, Any]] = []
+        profiles: Dict[str, Dict[str, Any]] = {}
+
+        for (thread_name, stack), count in stacks.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(frame_index[frame])
+
+            profile = profiles.setdefault(thread_name, {
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": elapsed,
+                "samples": [],
+                "weights": [],
+            })
+            profile["samples"].append(indexes)
+            profile["weights"].append(count * interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"aureus worker {os.getpid()}",
+            "exporter": "aureus-profiler",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+
+# Global profiler instance
+profiler = SamplingProfiler()
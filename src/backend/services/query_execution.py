@@ -3,17 +3,33 @@ Query Execution Service
 Handles SQL query execution with evidence generation
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from time import perf_counter
 import uuid
 import json
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
+from db.session import WORKLOAD
 from utils.logging import logger
-from utils.errors import QueryExecutionError
+from utils.errors import QueryExecutionError, SQLValidationError
+from utils.sql import validate_read_only_sql, compile_named_parameters, bind_parameter_names
+from utils.pagination import encode_cursor
 from .observability import observability
+from .schema_index import summarize_context
+from .coalescing import coalescer, coalescing_key
+from .asyncpg_executor import asyncpg_executor
+from .catalog import catalog
+from .query_templates import QueryTemplate
+from .data_quality import dq_engine
+from .snapshots import snapshots
+from .query_history import query_history
+from .slow_queries import slow_queries
+from .slo import slo_engine
+from .events import event_broker
+from .result_store import result_store
 
 
 class QueryExecutionService:
@@ -27,7 +43,13 @@ class QueryExecutionService:
         sql: str,
         dataset_id: str,
         user_id: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        schema_context: Optional[Dict[str, Any]] = None,
+        row_format: str = "objects",
+        params: Optional[Dict[str, Any]] = None,
+        template: Optional[QueryTemplate] = None,
+        checks: Optional[List[Dict[str, Any]]] = None,
+        page_size: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Execute a SQL query and generate evidence pack
@@ -37,30 +59,84 @@ class QueryExecutionService:
             dataset_id: ID of the dataset being queried
             user_id: ID of the user executing the query
             metadata: Additional metadata (e.g., natural language query)
+            schema_context: Schema context retrieved for the natural language question
+            row_format: "objects" for one dict per row, "arrays" for row tuples,
+                "columns" for one list per column
+            params: Bind parameters for :name placeholders
+            template: Registered template the SQL comes from (already validated)
+            checks: Data-quality checks to evaluate over the result rows
+            page_size: Materialize the result in the result store and return
+                only its first page_size rows plus a cursor for the rest
             
         Returns:
             Dict containing query results and evidence
         """
         execution_id = str(uuid.uuid4())
         start_time = datetime.utcnow()
+        coalescing = None
+        data_quality = None
+        next_offset = None
+        truncated = False
         
         logger.info(f"Executing query {execution_id} for user {user_id}")
+        # Stage timings (ms) pushed to the user's event streams as the query progresses
+        stages: Dict[str, float] = {}
+        mark = perf_counter()
+        self._progress(execution_id, user_id, dataset_id, "started")
         
         try:
-            # Validate SQL (read-only check)
-            self._validate_sql(sql)
+            # Validate SQL (read-only check); templates were validated at registration
+            if template is None:
+                self._validate_sql(sql)
+                missing = set(bind_parameter_names(sql)) - set(params or {})
+                if missing:
+                    raise QueryExecutionError(message=f"Missing bind parameters: {sorted(missing)}", sql=sql)
+            if page_size and checks:
+                raise QueryExecutionError(message="Data-quality checks cannot run over a paged result", sql=sql)
+            stages["validate_ms"], mark = round((perf_counter() - mark) * 1000, 3), perf_counter()
             
-            # Execute query
-            result = await self.db.execute(text(sql))
-            rows = result.fetchall()
+            # Execute query; identical concurrent queries share one execution
+            if page_size:
+                # Paged results stream to disk instead of sharing one in-memory result
+                meta = await self._spill(execution_id, user_id, sql, params, row_format, page_size)
+                columns, row_count, truncated = meta["columns"], meta["row_count"], meta["truncated"]
+                _, lines, next_offset = result_store.read_page(execution_id, limit=page_size)
+                rows = None
+            elif settings.QUERY_COALESCING_ENABLED:
+                key = coalescing_key(sql, dataset_id, (metadata or {}).get("user_role") or "", params)
+                (_, columns, rows), coalescing = await coalescer.run(
+                    key, execution_id, lambda: self._fetch(sql, params)
+                )
+            else:
+                columns, rows = await self._fetch(sql, params)
+            if rows is not None:
+                row_count = len(rows)
+            stages["fetch_ms"], mark = round((perf_counter() - mark) * 1000, 3), perf_counter()
+            self._progress(execution_id, user_id, dataset_id, "fetched", rows=row_count, stages=stages)
             
-            # Get column names
-            columns = list(result.keys()) if result.returns_rows else []
+            # Keep driver values as-is; the response layer serializes them natively
+            if rows is None:
+                data = result_store.page_data(lines, meta)
+            elif row_format == "arrays":
+                data = rows
+            elif row_format == "columns":
+                data = [list(column) for column in zip(*rows)] if rows else [[] for _ in columns]
+            else:
+                data = [dict(zip(columns, row)) for row in rows]
             
-            # Convert rows to dict format
-            data = []
-            for row in rows:
-                data.append(dict(zip(columns, row)))
+            # Result rows are already in memory: check them vectorized, no extra scan
+            if checks:
+                column_values = zip(*rows) if rows else [[] for _ in columns]
+                # Drift baselines are keyed by table name, as /datasets/{id}/quality records them
+                card = catalog.get(dataset_id)
+                table = card["name"] if card else dataset_id
+                if any(check.get("type") == "drift" for check in checks):
+                    try:
+                        await dq_engine.load_baselines(self.db, table)
+                    except Exception as e:
+                        logger.warning(f"Refreshing drift baselines for {table} failed: {str(e)}")
+                data_quality = dq_engine.run_local(table, dict(zip(columns, column_values)), checks)
+            stages["shape_ms"], mark = round((perf_counter() - mark) * 1000, 3), perf_counter()
             
             end_time = datetime.utcnow()
             execution_time = (end_time - start_time).total_seconds()
@@ -71,14 +147,22 @@ class QueryExecutionService:
                 sql=sql,
                 dataset_id=dataset_id,
                 user_id=user_id,
-                row_count=len(data),
+                row_count=row_count,
                 execution_time=execution_time,
-                metadata=metadata
+                metadata=metadata,
+                schema_context=schema_context,
+                coalescing=coalescing,
+                template_id=template.template_id if template else None,
+                params=params,
+                data_quality=data_quality
             )
+            stages["evidence_ms"] = round((perf_counter() - mark) * 1000, 3)
+            self._progress(execution_id, user_id, dataset_id, "completed", rows=row_count, stages=stages)
+            self._evidence_ready(evidence)
             
             logger.info(
                 f"Query {execution_id} completed successfully: "
-                f"{len(data)} rows in {execution_time:.3f}s"
+                f"{row_count} rows in {execution_time:.3f}s"
             )
             
             # Track query execution metrics
@@ -87,19 +171,27 @@ class QueryExecutionService:
                 dataset_id=dataset_id,
                 user_id=user_id,
                 execution_time=execution_time,
-                row_count=len(data),
+                row_count=row_count,
                 success=True
             )
+            self._record_history(
+                execution_id, sql, dataset_id, user_id, "success", row_count, execution_time,
+                start_time, params=params, template=template
+            )
+            slow_queries.observe(sql, dataset_id, execution_time * 1000, row_count, True, params=params)
+            slo_engine.record_query(execution_time, True)
             
             return {
                 "execution_id": execution_id,
                 "sql": sql,
                 "columns": columns,
                 "data": data,
-                "row_count": len(data),
+                "row_count": row_count,
                 "execution_time": execution_time,
                 "evidence": evidence,
-                "status": "success"
+                "status": "success",
+                "next_cursor": encode_cursor(*next_offset) if next_offset else None,
+                "truncated": truncated
             }
             
         except Exception as e:
@@ -118,6 +210,12 @@ class QueryExecutionService:
                 success=False,
                 error=str(e)
             )
+            self._record_history(
+                execution_id, sql, dataset_id, user_id, "error", 0, execution_time,
+                start_time, params=params, template=template, error=str(e)
+            )
+            slow_queries.observe(sql, dataset_id, execution_time * 1000, 0, False)
+            slo_engine.record_query(execution_time, False)
             
             observability.track_error(
                 error_type="QueryExecutionError",
@@ -138,8 +236,15 @@ class QueryExecutionService:
                 row_count=0,
                 execution_time=execution_time,
                 metadata=metadata,
+                schema_context=schema_context,
+                coalescing=coalescing,
+                template_id=template.template_id if template else None,
+                params=params,
+                data_quality=data_quality,
                 error=str(e)
             )
+            self._progress(execution_id, user_id, dataset_id, "failed", stages=stages, error=str(e))
+            self._evidence_ready(evidence)
             
             raise QueryExecutionError(
                 message=f"Query execution failed: {str(e)}",
@@ -147,6 +252,108 @@ class QueryExecutionService:
                 evidence=evidence
             )
     
+    async def _spill(
+        self,
+        execution_id: str,
+        user_id: str,
+        sql: str,
+        params: Optional[Dict[str, Any]],
+        row_format: str,
+        page_size: int
+    ) -> Dict[str, Any]:
+        """
+        Stream the result into the result store and return its metadata
+        
+        Rows come from a server-side cursor QUERY_RESULT_FETCH_ROWS at a
+        time, so memory stays bounded by one batch whatever the result
+        size. All pages are cut from this one statement's snapshot.
+        """
+        result = await self.db.stream(text(sql), params or {})
+        writer = None
+        try:
+            columns = list(result.keys())
+            writer = result_store.writer(execution_id, user_id, columns, row_format, page_size)
+            async for partition in result.partitions(settings.QUERY_RESULT_FETCH_ROWS):
+                if not writer.write(partition):
+                    break
+            return writer.commit()
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+        finally:
+            await result.close()
+    
+    async def _fetch(self, sql: str, params: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[tuple]]:
+        """
+        Run SQL on this service's session and return (columns, rows)
+        
+        Rows are tuples, or asyncpg Records (also tuple-like) when the
+        asyncpg executor is configured. Parameters are always bound, never
+        interpolated, so the statement text (and its prepared plan) stays
+        the same across parameter values.
+        """
+        if settings.QUERY_EXECUTOR == "asyncpg":
+            positional_sql, names = compile_named_parameters(sql)
+            return await asyncpg_executor.fetch(self.db, positional_sql, [params[name] for name in names])
+        
+        result = await self.db.execute(text(sql), params or {}, execution_options=WORKLOAD)
+        rows = result.fetchall()
+        columns = list(result.keys()) if result.returns_rows else []
+        return columns, [tuple(row) for row in rows]
+    
+    @staticmethod
+    def _record_history(
+        execution_id: str,
+        sql: str,
+        dataset_id: str,
+        user_id: str,
+        status: str,
+        row_count: int,
+        execution_time: float,
+        started_at: datetime,
+        params: Optional[Dict[str, Any]] = None,
+        template: Optional[QueryTemplate] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Queue the execution for the batched history writer"""
+        if settings.QUERY_HISTORY_ENABLED:
+            query_history.record(
+                execution_id=execution_id,
+                sql=sql,
+                dataset_id=dataset_id,
+                user_id=user_id,
+                status=status,
+                row_count=row_count,
+                duration_ms=execution_time * 1000,
+                params=params,
+                template_id=template.template_id if template else None,
+                error=error,
+                created_at=started_at
+            )
+    
+    @staticmethod
+    def _progress(execution_id: str, user_id: str, dataset_id: str, stage: str, **fields: Any) -> None:
+        """Push a query.progress event to the user's open event streams"""
+        event_broker.publish(
+            "query.progress",
+            {"execution_id": execution_id, "dataset_id": dataset_id, "stage": stage, **fields},
+            user_ids=[user_id]
+        )
+    
+    @staticmethod
+    def _evidence_ready(evidence: Dict[str, Any]) -> None:
+        event_broker.publish(
+            "evidence.ready",
+            {
+                "execution_id": evidence["execution_id"],
+                "dataset_id": evidence["dataset_id"],
+                "status": evidence["execution"]["status"],
+                "row_count": evidence["execution"]["row_count"]
+            },
+            user_ids=[evidence["user_id"]]
+        )
+    
     def _validate_sql(self, sql: str) -> None:
         """
         Validate SQL query (basic security checks)
@@ -157,27 +364,10 @@ class QueryExecutionService:
         Raises:
             QueryExecutionError: If SQL is invalid or unsafe
         """
-        sql_upper = sql.upper().strip()
-        
-        # Must be a SELECT statement
-        if not sql_upper.startswith("SELECT"):
-            raise QueryExecutionError(
-                message="Only SELECT queries are allowed",
-                sql=sql
-            )
-        
-        # Check for dangerous keywords
-        dangerous_keywords = [
-            "DROP", "DELETE", "INSERT", "UPDATE", "ALTER",
-            "CREATE", "TRUNCATE", "GRANT", "REVOKE"
-        ]
-        
-        for keyword in dangerous_keywords:
-            if keyword in sql_upper:
-                raise QueryExecutionError(
-                    message=f"Keyword '{keyword}' is not allowed",
-                    sql=sql
-                )
+        try:
+            validate_read_only_sql(sql)
+        except SQLValidationError as e:
+            raise QueryExecutionError(message=str(e), sql=sql)
     
     def _generate_evidence(
         self,
@@ -188,6 +378,11 @@ class QueryExecutionService:
         row_count: int,
         execution_time: float,
         metadata: Optional[Dict[str, Any]] = None,
+        schema_context: Optional[Dict[str, Any]] = None,
+        coalescing: Optional[Dict[str, Any]] = None,
+        template_id: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        data_quality: Optional[Dict[str, Any]] = None,
         error: Optional[str] = None
     ) -> Dict[str, Any]:
         """
@@ -201,6 +396,11 @@ class QueryExecutionService:
             row_count: Number of rows returned
             execution_time: Execution time in seconds
             metadata: Additional metadata
+            schema_context: Retrieved schema context used for SQL generation
+            coalescing: Whether the result came from a shared (coalesced) execution
+            template_id: Query template executed, if any
+            params: Bound parameter values
+            data_quality: Data-quality results for the result rows
             error: Error message if execution failed
             
         Returns:
@@ -213,22 +413,28 @@ class QueryExecutionService:
             "dataset_id": dataset_id,
             "query": {
                 "sql": sql,
-                "natural_language": metadata.get("nl_query") if metadata else None
+                "natural_language": metadata.get("nl_query") if metadata else None,
+                "template_id": template_id,
+                "params": params
             },
             "execution": {
                 "row_count": row_count,
                 "execution_time": execution_time,
                 "status": "error" if error else "success",
-                "error": error
+                "error": error,
+                "coalescing": coalescing
             },
             "policy_checks": {
                 "sql_validation": "passed" if not error else "failed",
                 "read_only": True,
                 "allowed_tables": True  # TODO: Implement table whitelist check
             },
+            "data_quality": data_quality,
             "lineage": {
                 "source_dataset": dataset_id,
-                "query_dependencies": []  # TODO: Extract table dependencies
+                "source_snapshot": snapshots.citation(dataset_id),
+                "query_dependencies": [],  # TODO: Extract table dependencies
+                "schema_context": summarize_context(schema_context)
             },
             "metadata": metadata or {}
         }
@@ -239,20 +445,23 @@ class QueryExecutionService:
         self,
         user_id: Optional[str] = None,
         dataset_id: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        before: Optional[Tuple[datetime, uuid.UUID]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Retrieve query execution history
+        Retrieve query execution history, newest first
         
         Args:
             user_id: Filter by user ID
             dataset_id: Filter by dataset ID
             limit: Maximum number of results
+            before: (created_at, execution ID) of the last row of the previous page
             
         Returns:
             List of query execution records
         """
-        # TODO: Implement with proper query_executions table
         logger.info(f"Retrieving query history: user={user_id}, dataset={dataset_id}")
         
-        return []
+        return await query_history.history(
+            self.db, user_id=user_id, dataset_id=dataset_id, before=before, limit=limit
+        )
@@ -0,0 +1,425 @@
+"""
+Query History Store
+Batched, deduplicated persistence of query executions with hourly rollups
+"""
+
+import asyncio
+import bisect
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+import orjson
+from sqlalchemy import func, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db.session import AsyncSessionLocal, is_unavailable_error
+from models.query_history import QueryExecution, QueryFingerprint, QueryRollupHourly
+from utils.logging import logger
+from utils.sql import query_shape, shape_fingerprint
+from .observability import observability
+
+
+# Upper bounds (ms) of the rollup latency histogram; a final bucket counts the rest
+LATENCY_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def _strip_nul(value: Any) -> Any:
+    """Drop NUL characters from strings in a JSON-like value; Postgres text and jsonb cannot hold them"""
+    if isinstance(value, str):
+        return value.replace("\x00", "")
+    if isinstance(value, dict):
+        return {_strip_nul(key): _strip_nul(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_strip_nul(item) for item in value]
+    return value
+
+
+def histogram_percentile(histogram: List[int], quantile: float, max_ms: float) -> Optional[float]:
+    """Estimate a latency percentile from rollup bucket counts (linear within a bucket)"""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank = quantile * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            low = LATENCY_BOUNDS_MS[index - 1] if index > 0 else 0.0
+            high = LATENCY_BOUNDS_MS[index] if index < len(LATENCY_BOUNDS_MS) else max_ms
+            return round(min(low + (high - low) * (rank - seen) / count, max_ms), 3)
+        seen += count
+    return max_ms
+
+
+class QueryHistoryStore:
+    """
+    Query history written off the request path
+
+    `record` only appends to an in-memory queue; a background task flushes
+    it every `flush_interval` seconds (sooner once `batch_size` entries are
+    waiting). Each flush is one transaction of three multi-row statements:
+    new fingerprints (query shapes, the same fingerprints slow-query
+    analytics uses; the shape text is stored once and fingerprints this
+    worker already wrote are not resent), the executions themselves, and
+    upserts that add the batch's counts and latency histogram into hourly
+    per-fingerprint rollups. Dashboards read the rollups, never the raw
+    executions. An execution keeps its own statement text only when it
+    has literals the shape replaced.
+
+    When the database is unavailable batches are retried; if the queue
+    fills up the oldest entries are dropped (and counted) rather than
+    growing memory or slowing requests. Any other failure is permanent:
+    a batch Postgres rejects (bad data, a constraint violation) is split
+    until the offending entries are isolated, and those are dropped
+    (counted as rejected) so they cannot stall the writer.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        max_queue: int = 100000,
+        known_fingerprints: int = 50000
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: deque = deque(maxlen=max_queue)
+        self._known: "OrderedDict[str, None]" = OrderedDict()
+        self._known_limit = known_fingerprints
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"recorded": 0, "written": 0, "dropped": 0, "rejected": 0, "flushes": 0, "flush_errors": 0}
+
+    def record(
+        self,
+        execution_id: str,
+        sql: str,
+        dataset_id: str,
+        user_id: str,
+        status: str,
+        row_count: int,
+        duration_ms: float,
+        params: Optional[Dict[str, Any]] = None,
+        template_id: Optional[str] = None,
+        error: Optional[str] = None,
+        created_at: Optional[datetime] = None
+    ) -> None:
+        """Queue one execution for the next flush (never blocks)"""
+        if len(self._queue) == self._queue.maxlen:
+            self._stats["dropped"] += 1
+        sql = _strip_nul(sql)
+        shape = query_shape(sql)
+        self._queue.append({
+            "id": UUID(execution_id),
+            "shape": shape,
+            # Statements without literals are reproduced exactly by their shape's parameters
+            "sql": sql if "?" in shape else None,
+            "fingerprint": shape_fingerprint(sql),
+            "dataset_id": dataset_id,
+            "user_id": user_id,
+            "status": status,
+            "row_count": row_count,
+            "duration_ms": duration_ms,
+            "params": _strip_nul(orjson.loads(orjson.dumps(params, default=str))) if params else None,
+            "template_id": template_id,
+            "error": _strip_nul(error),
+            "created_at": created_at or datetime.utcnow()
+        })
+        self._stats["recorded"] += 1
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the background writer on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer after a final flush"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            while self._queue:
+                await self.flush()
+        except Exception as e:
+            logger.error(f"Final query history flush failed, {len(self._queue)} entries lost: {str(e)}")
+
+    async def _run(self) -> None:
+        delay = self.flush_interval
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while self._queue:
+                    await self.flush()
+                delay = self.flush_interval
+            except Exception as e:
+                # Entries stay queued; back off while the database is unavailable
+                self._stats["flush_errors"] += 1
+                delay = min(delay * 2, 30.0)
+                logger.warning(f"Query history flush failed, retrying in {delay:.1f}s: {str(e)}")
+
+    async def flush(self) -> int:
+        """
+        Write up to one batch and return the number of entries written
+
+        Unwritten entries are requeued if the database is unavailable;
+        entries Postgres rejects are dropped.
+        """
+        batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+        if not batch:
+            return 0
+        # Parts still to write, the next one last
+        pending = [batch]
+        written = 0
+        try:
+            while pending:
+                part = pending.pop()
+                try:
+                    async with self.session_factory() as session:
+                        await self._write(session, part)
+                        await session.commit()
+                except Exception as e:
+                    if is_unavailable_error(e):
+                        raise
+                    if isinstance(e, (DataError, IntegrityError)) and len(part) > 1:
+                        middle = len(part) // 2
+                        pending += [part[middle:], part[:middle]]
+                        continue
+                    self._stats["rejected"] += len(part)
+                    logger.error(f"Query history dropped {len(part)} entries Postgres rejected: {str(e)}")
+                    continue
+                self._remember(part)
+                written += len(part)
+        except BaseException:
+            unwritten = part + [entry for rest in reversed(pending) for entry in rest]
+            free = self._queue.maxlen - len(self._queue)
+            self._queue.extendleft(reversed(unwritten[-free:] if free else []))
+            self._stats["dropped"] += len(unwritten) - min(free, len(unwritten))
+            self._stats["written"] += written
+            raise
+
+        self._stats["written"] += written
+        self._stats["flushes"] += 1
+        return written
+
+    def _remember(self, entries: List[Dict[str, Any]]) -> None:
+        for entry in entries:
+            self._known[entry["fingerprint"]] = None
+            self._known.move_to_end(entry["fingerprint"])
+        while len(self._known) > self._known_limit:
+            self._known.popitem(last=False)
+
+    async def _write(self, session: AsyncSession, batch: List[Dict[str, Any]]) -> None:
+        fingerprints: Dict[str, Dict[str, Any]] = {}
+        for entry in batch:
+            if entry["fingerprint"] not in self._known and entry["fingerprint"] not in fingerprints:
+                fingerprints[entry["fingerprint"]] = {
+                    "fingerprint": entry["fingerprint"],
+                    "sql_text": entry["shape"],
+                    "dataset_id": entry["dataset_id"],
+                    "template_id": entry["template_id"],
+                    "first_seen_at": entry["created_at"]
+                }
+        if fingerprints:
+            # Sorted so concurrent workers take row locks in the same order
+            await session.execute(
+                pg_insert(QueryFingerprint)
+                .values([fingerprints[key] for key in sorted(fingerprints)])
+                .on_conflict_do_nothing(index_elements=["fingerprint"])
+            )
+
+        await session.execute(
+            pg_insert(QueryExecution)
+            .values([
+                {
+                    "sql_text": entry["sql"],
+                    **{key: entry[key] for key in (
+                        "id", "user_id", "dataset_id", "fingerprint", "params", "status",
+                        "row_count", "duration_ms", "error", "created_at"
+                    )}
+                }
+                for entry in batch
+            ])
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+
+        rollups: Dict[Tuple[datetime, str, str], Dict[str, Any]] = {}
+        for entry in batch:
+            hour = entry["created_at"].replace(minute=0, second=0, microsecond=0)
+            key = (hour, entry["dataset_id"], entry["fingerprint"])
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollup = rollups[key] = {
+                    "hour": hour, "dataset_id": entry["dataset_id"], "fingerprint": entry["fingerprint"],
+                    "executions": 0, "errors": 0, "rows_total": 0, "duration_total_ms": 0.0,
+                    "duration_max_ms": 0.0, "latency_histogram": [0] * (len(LATENCY_BOUNDS_MS) + 1)
+                }
+            rollup["executions"] += 1
+            rollup["errors"] += entry["status"] != "success"
+            rollup["rows_total"] += entry["row_count"]
+            rollup["duration_total_ms"] += entry["duration_ms"]
+            rollup["duration_max_ms"] = max(rollup["duration_max_ms"], entry["duration_ms"])
+            rollup["latency_histogram"][bisect.bisect_left(LATENCY_BOUNDS_MS, entry["duration_ms"])] += 1
+
+        stmt = pg_insert(QueryRollupHourly).values([rollups[key] for key in sorted(rollups)])
+        table = QueryRollupHourly.__table__.c
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=["hour", "dataset_id", "fingerprint"],
+            set_={
+                "executions": table.executions + stmt.excluded.executions,
+                "errors": table.errors + stmt.excluded.errors,
+                "rows_total": table.rows_total + stmt.excluded.rows_total,
+                "duration_total_ms": table.duration_total_ms + stmt.excluded.duration_total_ms,
+                "duration_max_ms": func.greatest(table.duration_max_ms, stmt.excluded.duration_max_ms),
+                "latency_histogram": literal_column(
+                    "ARRAY(SELECT a + b FROM unnest(query_rollups_hourly.latency_histogram, "
+                    "excluded.latency_histogram) AS u(a, b))"
+                )
+            }
+        ))
+
+    async def history(
+        self,
+        session: AsyncSession,
+        user_id: Optional[str] = None,
+        dataset_id: Optional[str] = None,
+        before: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Executions newest first, one keyset page
+
+        Filtering by user or dataset reads the matching (filter, created_at, id)
+        index in order; `before` is the (created_at, id) of the last row of
+        the previous page. Entries become visible once flushed.
+        """
+        stmt = (
+            select(
+                QueryExecution,
+                func.coalesce(QueryExecution.sql_text, QueryFingerprint.sql_text),
+                QueryFingerprint.template_id
+            )
+            .join(QueryFingerprint, QueryFingerprint.fingerprint == QueryExecution.fingerprint)
+        )
+        if user_id:
+            stmt = stmt.where(QueryExecution.user_id == user_id)
+        if dataset_id:
+            stmt = stmt.where(QueryExecution.dataset_id == dataset_id)
+        if before is not None:
+            stmt = stmt.where(tuple_(QueryExecution.created_at, QueryExecution.id) < tuple_(*before))
+        stmt = stmt.order_by(QueryExecution.created_at.desc(), QueryExecution.id.desc()).limit(limit)
+
+        return [
+            {
+                "execution_id": str(execution.id),
+                "user_id": execution.user_id,
+                "dataset_id": execution.dataset_id,
+                "fingerprint": execution.fingerprint,
+                "sql": sql_text,
+                "template_id": template_id,
+                "params": execution.params,
+                "status": execution.status,
+                "row_count": execution.row_count,
+                "duration_ms": execution.duration_ms,
+                "error": execution.error,
+                "created_at": execution.created_at
+            }
+            for execution, sql_text, template_id in (await session.execute(stmt)).all()
+        ]
+
+    async def analytics(
+        self,
+        session: AsyncSession,
+        hours: int = 24,
+        dataset_id: Optional[str] = None,
+        top: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Dashboard summary from the hourly rollups
+
+        Returns:
+            Hourly execution and error counts, and the busiest fingerprints
+            with their latency percentiles (estimated from the histograms)
+        """
+        since = (datetime.utcnow() - timedelta(hours=hours)).replace(minute=0, second=0, microsecond=0)
+        stmt = select(QueryRollupHourly).where(QueryRollupHourly.hour >= since)
+        if dataset_id:
+            stmt = stmt.where(QueryRollupHourly.dataset_id == dataset_id)
+
+        hourly: Dict[datetime, List[int]] = {}
+        by_fingerprint: Dict[str, Dict[str, Any]] = {}
+        for rollup in (await session.execute(stmt)).scalars():
+            counts = hourly.setdefault(rollup.hour, [0, 0])
+            counts[0] += rollup.executions
+            counts[1] += rollup.errors
+            summary = by_fingerprint.get(rollup.fingerprint)
+            if summary is None:
+                summary = by_fingerprint[rollup.fingerprint] = {
+                    "fingerprint": rollup.fingerprint, "executions": 0, "errors": 0, "rows_total": 0,
+                    "duration_total_ms": 0.0, "duration_max_ms": 0.0, "histogram": [0] * (len(LATENCY_BOUNDS_MS) + 1)
+                }
+            summary["executions"] += rollup.executions
+            summary["errors"] += rollup.errors
+            summary["rows_total"] += rollup.rows_total
+            summary["duration_total_ms"] += rollup.duration_total_ms
+            summary["duration_max_ms"] = max(summary["duration_max_ms"], rollup.duration_max_ms)
+            summary["histogram"] = [a + b for a, b in zip(summary["histogram"], rollup.latency_histogram)]
+
+        busiest = sorted(by_fingerprint.values(), key=lambda summary: summary["executions"], reverse=True)[:top]
+        texts = dict((await session.execute(
+            select(QueryFingerprint.fingerprint, QueryFingerprint.sql_text)
+            .where(QueryFingerprint.fingerprint.in_([summary["fingerprint"] for summary in busiest]))
+        )).all()) if busiest else {}
+
+        fingerprints = []
+        for summary in busiest:
+            histogram = summary.pop("histogram")
+            fingerprints.append({
+                **summary,
+                "sql": texts.get(summary["fingerprint"]),
+                "avg_ms": round(summary["duration_total_ms"] / summary["executions"], 3) if summary["executions"] else None,
+                "p50_ms": histogram_percentile(histogram, 0.5, summary["duration_max_ms"]),
+                "p95_ms": histogram_percentile(histogram, 0.95, summary["duration_max_ms"]),
+                "p99_ms": histogram_percentile(histogram, 0.99, summary["duration_max_ms"])
+            })
+
+        return {
+            "since": since,
+            "dataset_id": dataset_id,
+            "hourly": [
+                {"hour": hour, "executions": counts[0], "errors": counts[1]}
+                for hour, counts in sorted(hourly.items())
+            ],
+            "fingerprints": fingerprints
+        }
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "queued": len(self._queue),
+            **self._stats
+        }
+
+
+# Global query history store instance
+query_history = QueryHistoryStore(
+    batch_size=settings.QUERY_HISTORY_BATCH_SIZE,
+    flush_interval=settings.QUERY_HISTORY_FLUSH_INTERVAL,
+    max_queue=settings.QUERY_HISTORY_MAX_QUEUE
+)
+observability.register_state("query_history", query_history.state)
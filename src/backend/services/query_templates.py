@@ -0,0 +1,302 @@
+"""
+Query Template Registry
+Named, reviewed SQL templates with typed bind parameters
+"""
+
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db.session import AsyncSessionLocal
+from models.query_template import QueryTemplateRecord
+from utils.errors import SQLValidationError, ValidationError
+from utils.logging import logger
+from utils.sql import bind_parameter_names, compile_named_parameters, validate_read_only_sql
+from .catalog import catalog
+
+
+def _to_integer(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError
+    return int(value)
+
+
+def _to_number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError
+    return float(value)
+
+
+def _to_decimal(value: Any) -> Decimal:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError
+
+
+def _to_boolean(value: Any) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError
+    return value
+
+
+def _to_string(value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError
+    return value
+
+
+# Declared parameter type -> converter from JSON values to driver types
+PARAMETER_TYPES: Dict[str, Callable[[Any], Any]] = {
+    "string": _to_string,
+    "integer": _to_integer,
+    "number": _to_number,
+    "decimal": _to_decimal,
+    "boolean": _to_boolean,
+    "date": date.fromisoformat,
+    "timestamp": datetime.fromisoformat,
+}
+
+
+class QueryTemplate:
+    """A validated query template"""
+
+    def __init__(
+        self,
+        template_id: str,
+        dataset_id: str,
+        sql: str,
+        description: Optional[str] = None,
+        parameters: Optional[List[Dict[str, Any]]] = None,
+        created_by: Optional[str] = None,
+        created_at: Optional[datetime] = None
+    ):
+        self.template_id = template_id
+        self.dataset_id = dataset_id
+        self.sql = sql
+        self.description = description
+        self.parameters = {param["name"]: dict(param) for param in parameters or []}
+        self.created_by = created_by
+        self.created_at = created_at or datetime.utcnow()
+        self._validate()
+        # Compiled once; the executor prepares it once per connection
+        self.positional_sql, self.parameter_order = compile_named_parameters(sql)
+
+    def _validate(self) -> None:
+        try:
+            validate_read_only_sql(self.sql)
+        except SQLValidationError as e:
+            raise ValidationError(f"Template {self.template_id}: {str(e)}")
+
+        used = set(bind_parameter_names(self.sql))
+        declared = set(self.parameters)
+        if used - declared:
+            raise ValidationError(f"Template {self.template_id}: undeclared parameters {sorted(used - declared)}")
+        if declared - used:
+            raise ValidationError(f"Template {self.template_id}: unused parameters {sorted(declared - used)}")
+
+        for name, param in self.parameters.items():
+            param.setdefault("type", "string")
+            param.setdefault("required", True)
+            if param["type"] not in PARAMETER_TYPES:
+                raise ValidationError(f"Template {self.template_id}: unknown type {param['type']} for {name}")
+            if not param["required"] and param.get("default") is None:
+                raise ValidationError(f"Template {self.template_id}: optional parameter {name} needs a default")
+            if param.get("default") is not None:
+                self._coerce(name, param["default"])
+
+    def _coerce(self, name: str, value: Any) -> Any:
+        param_type = self.parameters[name]["type"]
+        try:
+            return PARAMETER_TYPES[param_type](value)
+        except (TypeError, ValueError):
+            raise ValidationError(f"Parameter {name} must be a {param_type}")
+
+    def bind(self, values: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Check and convert request parameters
+
+        Args:
+            values: Parameter values from the request (JSON types)
+
+        Returns:
+            Parameters converted to driver types, defaults filled in
+
+        Raises:
+            ValidationError: Unknown, missing or mistyped parameters
+        """
+        values = values or {}
+        unknown = set(values) - set(self.parameters)
+        if unknown:
+            raise ValidationError(f"Unknown parameters for template {self.template_id}: {sorted(unknown)}")
+
+        bound = {}
+        for name, param in self.parameters.items():
+            if name in values and values[name] is not None:
+                bound[name] = self._coerce(name, values[name])
+            elif param["required"]:
+                raise ValidationError(f"Missing parameter {name} for template {self.template_id}")
+            else:
+                bound[name] = self._coerce(name, param["default"])
+        return bound
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "template_id": self.template_id,
+            "dataset_id": self.dataset_id,
+            "sql": self.sql,
+            "description": self.description,
+            "parameters": list(self.parameters.values()),
+            "created_by": self.created_by,
+            "created_at": self.created_at,
+        }
+
+
+class QueryTemplateRegistry:
+    """
+    Registry of query templates keyed by template ID
+
+    Templates are stored in the query_templates table (seeded by its
+    migration) and cached here validated and compiled, so executions only
+    bind parameters. A template registered by another worker is read on
+    first use; removals by other workers reach this cache at the next
+    refresh, every `refresh_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        refresh_interval: float = 30.0
+    ):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._templates: Dict[str, QueryTemplate] = {}
+        self._refresher: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _from_record(record: QueryTemplateRecord) -> QueryTemplate:
+        return QueryTemplate(
+            template_id=record.template_id,
+            dataset_id=record.dataset_id,
+            sql=record.sql,
+            description=record.description,
+            parameters=record.parameters,
+            created_by=record.created_by,
+            created_at=record.created_at
+        )
+
+    def _cache(self, records: List[QueryTemplateRecord]) -> List[QueryTemplate]:
+        templates = []
+        for record in records:
+            try:
+                templates.append(self._from_record(record))
+            except ValidationError as e:
+                # Valid when registered; the SQL rules have since tightened
+                logger.warning(f"Skipping stored query template {record.template_id}: {str(e)}")
+        return templates
+
+    async def load(self, session: AsyncSession) -> None:
+        """Replace the cache with every stored template"""
+        records = (await session.execute(select(QueryTemplateRecord))).scalars().all()
+        self._templates = {template.template_id: template for template in self._cache(records)}
+        logger.info(f"Loaded {len(self._templates)} query templates")
+
+    async def register(self, definition: Dict[str, Any], created_by: Optional[str] = None) -> QueryTemplate:
+        """
+        Validate, store and cache a template
+
+        Raises:
+            ValidationError: Invalid SQL, parameters, unknown dataset or duplicate ID
+        """
+        card = catalog.get(definition["dataset_id"])
+        if card is None:
+            raise ValidationError(f"Unknown dataset {definition['dataset_id']}")
+
+        # Keyed by catalog ID, whether registered by ID or by name
+        template = QueryTemplate(created_by=created_by, **dict(definition, dataset_id=card["id"]))
+        try:
+            async with self.session_factory() as session:
+                session.add(QueryTemplateRecord(
+                    template_id=template.template_id,
+                    dataset_id=template.dataset_id,
+                    sql=template.sql,
+                    description=template.description,
+                    parameters=list(template.parameters.values()),
+                    created_by=template.created_by,
+                    created_at=template.created_at
+                ))
+                await session.commit()
+        except IntegrityError:
+            raise ValidationError(f"Template {template.template_id} already exists")
+        self._templates[template.template_id] = template
+        logger.info(f"Query template {template.template_id} registered for {template.dataset_id}")
+        return template
+
+    async def get(self, template_id: str) -> Optional[QueryTemplate]:
+        template = self._templates.get(template_id)
+        if template is not None:
+            return template
+        async with self.session_factory() as session:
+            record = await session.get(QueryTemplateRecord, template_id)
+        if record is None:
+            return None
+        for template in self._cache([record]):
+            self._templates[template_id] = template
+            return template
+        return None
+
+    async def list(self, dataset_id: Optional[str] = None) -> List[QueryTemplate]:
+        """Stored templates, optionally for one dataset (by catalog ID or name)"""
+        query = select(QueryTemplateRecord).order_by(QueryTemplateRecord.template_id)
+        if dataset_id is not None:
+            card = catalog.get(dataset_id)
+            query = query.where(QueryTemplateRecord.dataset_id == (card["id"] if card else dataset_id))
+        async with self.session_factory() as session:
+            records = (await session.execute(query)).scalars().all()
+        templates = self._cache(records)
+        self._templates.update({template.template_id: template for template in templates})
+        return templates
+
+    async def remove(self, template_id: str) -> bool:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(QueryTemplateRecord).where(QueryTemplateRecord.template_id == template_id)
+            )
+            await session.commit()
+        self._templates.pop(template_id, None)
+        return result.rowcount > 0
+
+    def start(self) -> None:
+        """Start the periodic cache refresh on the running loop"""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                async with self.session_factory() as session:
+                    await self.load(session)
+            except Exception as e:
+                logger.warning(f"Refreshing query templates failed: {str(e)}")
+
+
+# Global query template registry
+query_templates = QueryTemplateRegistry(refresh_interval=settings.QUERY_TEMPLATE_REFRESH_INTERVAL)
@@ -0,0 +1,63 @@
+"""
+Completed Query Result Cache
+Bounded in-process cache of serialized query results keyed by execution ID
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from utils.http_cache import compute_etag
+
+
+class CompletedResultCache:
+    """
+    LRU cache of serialized completed query responses
+
+    Entries are immutable once a query completes, so the body bytes and
+    their ETag are computed once and served for conditional GETs. The cache
+    is bounded both by entry count and by total body bytes.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, str, str]]" = OrderedDict()
+        self._bytes = 0
+
+    def put(self, execution_id: str, body: bytes, owner_id: str) -> str:
+        """Store a serialized result and return its ETag"""
+        etag = compute_etag(body)
+        if len(body) > self.max_bytes:
+            return etag
+
+        self.discard(execution_id)
+        self._entries[execution_id] = (body, etag, owner_id)
+        self._bytes += len(body)
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (evicted, _, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+        return etag
+
+    def get(self, execution_id: str) -> Optional[Tuple[bytes, str, str]]:
+        """Get (body, etag, owner_id) for a completed execution"""
+        entry = self._entries.get(execution_id)
+        if entry is not None:
+            self._entries.move_to_end(execution_id)
+        return entry
+
+    def discard(self, execution_id: str) -> None:
+        entry = self._entries.pop(execution_id, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+# Global result cache instance
+result_cache = CompletedResultCache(
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESULT_CACHE_MAX_BYTES
+)
@@ -0,0 +1,266 @@
+"""
+Result Store
+Query results materialized once to local disk and served a page at a time
+"""
+
+import asyncio
+import mmap
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+from config import settings
+from utils.logging import logger
+from utils.serialization import dumps_lines
+from .observability import observability
+
+
+class ResultWriter:
+    """
+    Append result rows to a spill file, one JSON document per line
+
+    Rows are written in the response's row shape (objects or arrays), so
+    serving a page is a byte slice of the file. Memory held while writing
+    is one fetch batch plus the file buffer. Rows past `max_bytes` are not
+    written and the result is marked truncated.
+    """
+
+    def __init__(self, store: "ResultStore", meta: Dict[str, Any]):
+        self.store = store
+        self.meta = meta
+        self.path = store.path(meta["query_id"], ".rows")
+        self.tmp = f"{self.path}.tmp"
+        self.file = open(self.tmp, "wb", buffering=store.buffer_bytes)
+        self.objects = meta["row_format"] == "objects"
+        self.rows = 0
+        self.bytes = 0
+        self.truncated = False
+
+    def write(self, rows: Sequence[Sequence[Any]]) -> bool:
+        """Append rows; False once the size limit is reached (stop fetching)"""
+        if self.truncated:
+            return False
+        columns = self.meta["columns"]
+        chunk = dumps_lines(dict(zip(columns, row)) for row in rows) if self.objects else dumps_lines(rows)
+        room = self.store.max_result_bytes - self.bytes
+        if len(chunk) > room:
+            # Keep the whole lines that fit
+            chunk = chunk[:chunk.rfind(b"\n", 0, room) + 1]
+            self.truncated = True
+        self.file.write(chunk)
+        self.rows += chunk.count(b"\n") if self.truncated else len(rows)
+        self.bytes += len(chunk)
+        return not self.truncated
+
+    def commit(self) -> Dict[str, Any]:
+        """Publish the result: data file first, then the metadata readers look up"""
+        self.file.close()
+        os.replace(self.tmp, self.path)
+        self.meta.update(row_count=self.rows, bytes=self.bytes, truncated=self.truncated)
+        meta_path = self.store.path(self.meta["query_id"], ".json")
+        with open(f"{meta_path}.tmp", "wb") as f:
+            f.write(orjson.dumps(self.meta))
+        os.replace(f"{meta_path}.tmp", meta_path)
+        self.store._stats["written"] += 1
+        self.store._stats["truncated"] += self.truncated
+        return self.meta
+
+    def abort(self) -> None:
+        self.file.close()
+        try:
+            os.unlink(self.tmp)
+        except FileNotFoundError:
+            pass
+
+
+class ResultStore:
+    """
+    Spilled query results with cursor paging and TTL cleanup
+
+    Each result is a pair of files in `directory`: `<query_id>.rows` (JSON
+    Lines) and `<query_id>.json` (columns, owner, row count). Pages are
+    read through mmap from a (row, byte offset) cursor, so a page costs
+    O(page size) however deep it is, and the rows are exactly those of the
+    single statement that produced them: every page comes from the same
+    snapshot. Any worker on the host can serve any page.
+
+    Reading a page refreshes the metadata file's mtime; results not read
+    for `ttl` seconds are deleted by a periodic sweep, which also evicts
+    the least recently read results while the directory holds more than
+    `max_total_bytes`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 900.0,
+        max_result_bytes: int = 256 * 1024 * 1024,
+        max_total_bytes: int = 4 * 1024 * 1024 * 1024,
+        buffer_bytes: int = 1024 * 1024,
+        sweep_interval: float = 60.0
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_result_bytes = max_result_bytes
+        self.max_total_bytes = max_total_bytes
+        self.buffer_bytes = buffer_bytes
+        self.sweep_interval = sweep_interval
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"written": 0, "truncated": 0, "pages": 0, "expired": 0, "evicted": 0}
+
+    def path(self, query_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{query_id}{suffix}")
+
+    def writer(self, query_id: str, owner_id: str, columns: List[str], row_format: str, page_size: int) -> ResultWriter:
+        os.makedirs(self.directory, exist_ok=True)
+        return ResultWriter(self, {
+            "query_id": query_id,
+            "owner_id": owner_id,
+            "columns": columns,
+            "row_format": row_format,
+            "page_size": page_size,
+            "created_at": datetime.utcnow().isoformat(),
+        })
+
+    def meta(self, query_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(query_id, ".json"), "rb") as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def read_page(
+        self,
+        query_id: str,
+        row_offset: int = 0,
+        byte_offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Optional[Tuple[Dict[str, Any], bytes, Optional[Tuple[int, int]]]]:
+        """
+        (metadata, page lines, next (row, byte) offset or None) for a page
+
+        Returns None when the result does not exist or has expired.
+
+        Raises:
+            ValueError: if the byte offset is not the start of a row
+        """
+        meta = self.meta(query_id)
+        if meta is None:
+            return None
+        limit = limit or meta["page_size"]
+        size = meta["bytes"]
+        if not 0 <= byte_offset <= size:
+            raise ValueError("offset outside the result")
+        end = byte_offset
+        rows = 0
+        try:
+            with open(self.path(query_id, ".rows"), "rb") as f:
+                if size:
+                    with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                        if byte_offset and mm[byte_offset - 1] != 0x0A:
+                            raise ValueError("offset is not at a row boundary")
+                        while rows < limit and end < size:
+                            end = mm.find(b"\n", end) + 1
+                            rows += 1
+                        lines = mm[byte_offset:end]
+                else:
+                    lines = b""
+            # Sliding expiry: the sweep keys off the metadata mtime
+            os.utime(self.path(query_id, ".json"))
+        except FileNotFoundError:
+            return None
+        self._stats["pages"] += 1
+        return meta, lines, (row_offset + rows, end) if end < size else None
+
+    @staticmethod
+    def page_data(lines: bytes, meta: Dict[str, Any]) -> Any:
+        """Page rows in the result's row format; objects and arrays pass through as raw JSON"""
+        if meta["row_format"] == "columns":
+            rows = orjson.loads(b"[" + lines[:-1].replace(b"\n", b",") + b"]") if lines else []
+            return [list(column) for column in zip(*rows)] if rows else [[] for _ in meta["columns"]]
+        return orjson.Fragment(b"[" + lines[:-1].replace(b"\n", b",") + b"]" if lines else b"[]")
+
+    def discard(self, query_id: str) -> None:
+        for suffix in (".json", ".rows"):
+            try:
+                os.unlink(self.path(query_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def start(self) -> None:
+        """Start the periodic sweep on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error(f"Result store sweep failed: {str(e)}")
+            await asyncio.sleep(self.sweep_interval)
+
+    def sweep(self, now: Optional[float] = None) -> None:
+        """Delete expired results and abandoned spill files, then evict down to the size budget"""
+        now = now or time.time()
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        live = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if name.endswith(".json"):
+                query_id = name[:-5]
+                if now - stat.st_mtime > self.ttl:
+                    self.discard(query_id)
+                    self._stats["expired"] += 1
+                    continue
+                try:
+                    size = os.stat(self.path(query_id, ".rows")).st_size
+                except FileNotFoundError:
+                    size = 0
+                live.append((stat.st_mtime, query_id, size))
+            elif name.endswith(".tmp") and now - stat.st_mtime > self.ttl:
+                # Left behind by a worker that died mid-write
+                os.unlink(path)
+
+        total = sum(size for _, _, size in live)
+        for _, query_id, size in sorted(live):
+            if total <= self.max_total_bytes:
+                break
+            self.discard(query_id)
+            total -= size
+            self._stats["evicted"] += 1
+
+    def state(self) -> Dict[str, Any]:
+        return {"running": self._task is not None and not self._task.done(), **self._stats}
+
+
+# Global result store instance
+result_store = ResultStore(
+    directory=settings.QUERY_RESULT_SPILL_DIR or os.path.join(tempfile.gettempdir(), "aureus-results"),
+    ttl=settings.QUERY_RESULT_TTL,
+    max_result_bytes=settings.QUERY_RESULT_MAX_BYTES,
+    max_total_bytes=settings.QUERY_RESULT_STORE_MAX_BYTES,
+    buffer_bytes=settings.QUERY_RESULT_WRITE_BUFFER_BYTES
+)
+observability.register_state("result_store", result_store.state)
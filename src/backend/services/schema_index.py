@@ -0,0 +1,364 @@
+"""
+Schema Context Retrieval Index
+Selects the tables and columns relevant to a natural language question
+so NL-to-SQL prompts only carry the schema they need
+"""
+
+from typing import Dict, Any, List, Optional, Callable, Tuple
+import heapq
+import math
+import re
+import time
+
+from utils.lazy import lazy_import
+from .catalog import catalog, DatasetCatalog
+
+np = lazy_import("numpy")
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset({
+    "a", "an", "the", "of", "for", "and", "or", "in", "on", "by", "to", "with",
+    "is", "are", "was", "were", "be", "me", "show", "list", "give", "find",
+    "what", "which", "who", "how", "many", "much", "all", "any", "per", "from",
+    "that", "this", "there", "their", "top", "get"
+})
+
+# Embedder signature: list of texts -> (n, dim) array
+Embedder = Callable[[List[str]], "np.ndarray"]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize text for BM25
+
+    Splits identifiers on underscores (customer_ssn -> customer, ssn),
+    drops stop words and folds simple plurals (loans -> loan).
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _column_text(column: Dict[str, Any]) -> str:
+    return " ".join(
+        str(part) for part in (column.get("name"), column.get("description")) if part
+    )
+
+
+def _table_text(card: Dict[str, Any]) -> str:
+    parts = [card.get("name", ""), card.get("description", "")]
+    parts.extend(_column_text(column) for column in card.get("schema", []))
+    return " ".join(str(part) for part in parts if part)
+
+
+class SchemaIndex:
+    """
+    Hybrid BM25 / embedding index over dataset cards
+
+    Each dataset card is one BM25 document (name, description, column names
+    and descriptions). Columns are ranked only inside the selected tables, so
+    query cost is driven by posting list length rather than catalog size.
+    When an embedder is configured, card embeddings live in a single
+    row-normalized float32 matrix and cosine similarity is one mat-vec.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        embedder: Optional[Embedder] = None,
+        embedding_weight: float = 0.5,
+        catalog: Optional[DatasetCatalog] = None
+    ):
+        self.k1 = k1
+        self.b = b
+        self.embedder = embedder
+        self.embedding_weight = embedding_weight
+
+        # Catalog to follow; subscribed on first use so startup stays cheap
+        self._catalog = catalog
+        self._synced = catalog is None
+
+        # Slot-addressed document storage (slots are reused after removal)
+        self._slot_of: Dict[str, int] = {}
+        self._cards: List[Optional[Dict[str, Any]]] = []
+        self._doc_len: Optional["np.ndarray"] = None
+        self._columns: List[List[Tuple[Dict[str, Any], frozenset]]] = []
+        self._free_slots: List[int] = []
+        self._total_len = 0
+
+        # term -> {slot: term frequency}, the source of truth for updates
+        self._postings: Dict[str, Dict[int, int]] = {}
+        # term -> (slots, tfs) arrays, rebuilt lazily for terms touched by updates
+        self._posting_arrays: Dict[str, Tuple["np.ndarray", "np.ndarray"]] = {}
+
+        # Embedding matrix, one row per slot
+        self._vectors: Optional["np.ndarray"] = None
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def sync(self) -> None:
+        """Build the index from the catalog and follow its changes"""
+        if not self._synced:
+            self._synced = True
+            self._catalog.subscribe(self.on_catalog_change)
+
+    def on_catalog_change(self, dataset_id: str, card: Optional[Dict[str, Any]]) -> None:
+        """Catalog listener keeping the index in sync"""
+        if card is None:
+            self.remove(dataset_id)
+        else:
+            self.upsert(card)
+
+    def upsert(self, card: Dict[str, Any]) -> None:
+        """Add or replace a dataset card"""
+        dataset_id = card["id"]
+        if dataset_id in self._slot_of:
+            self.remove(dataset_id)
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._cards)
+            self._cards.append(None)
+            self._columns.append([])
+            if self._doc_len is None:
+                self._doc_len = np.zeros(16, dtype=np.float32)
+            elif slot >= len(self._doc_len):
+                self._doc_len = np.concatenate([self._doc_len, np.zeros_like(self._doc_len)])
+
+        tokens = tokenize(_table_text(card))
+        frequencies: Dict[str, int] = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for token, tf in frequencies.items():
+            self._postings.setdefault(token, {})[slot] = tf
+            self._posting_arrays.pop(token, None)
+
+        self._slot_of[dataset_id] = slot
+        self._cards[slot] = card
+        self._doc_len[slot] = len(tokens)
+        self._total_len += len(tokens)
+        self._columns[slot] = [
+            (column, frozenset(tokenize(_column_text(column))))
+            for column in card.get("schema", [])
+        ]
+
+        if self.embedder is not None:
+            self._set_vector(slot, self.embedder([_table_text(card)])[0])
+
+    def remove(self, dataset_id: str) -> bool:
+        """Remove a dataset card"""
+        slot = self._slot_of.pop(dataset_id, None)
+        if slot is None:
+            return False
+
+        for token in set(tokenize(_table_text(self._cards[slot]))):
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.pop(slot, None)
+                self._posting_arrays.pop(token, None)
+                if not posting:
+                    del self._postings[token]
+
+        self._total_len -= int(self._doc_len[slot])
+        self._cards[slot] = None
+        self._doc_len[slot] = 0
+        self._columns[slot] = []
+        self._free_slots.append(slot)
+        if self._vectors is not None and slot < len(self._vectors):
+            self._vectors[slot] = 0.0
+        return True
+
+    def retrieve(
+        self,
+        question: str,
+        max_tables: int = 5,
+        max_columns: int = 8
+    ) -> Dict[str, Any]:
+        """
+        Retrieve the schema context for a question
+
+        Args:
+            question: Natural language question
+            max_tables: Maximum number of tables to return
+            max_columns: Maximum number of columns per table
+
+        Returns:
+            Dict with the selected tables (each with its relevant columns)
+            and the retrieval time in milliseconds
+        """
+        self.sync()
+        start = time.perf_counter()
+        terms = set(tokenize(question))
+        idf = {term: self._idf(term) for term in terms if term in self._postings}
+
+        scores = self._bm25(idf)
+        if self.embedder is not None and self._vectors is not None:
+            scores = self._blend_embeddings(question, scores)
+
+        ranked = self._top_k(scores, max_tables)
+
+        tables = []
+        for slot, score in ranked:
+            if score <= 0:
+                continue
+            card = self._cards[slot]
+            tables.append({
+                "dataset_id": card["id"],
+                "name": card.get("name"),
+                "description": card.get("description"),
+                "score": round(float(score), 4),
+                "columns": self._rank_columns(slot, idf, max_columns)
+            })
+
+        return {
+            "tables": tables,
+            "retrieval_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        n = len(self._slot_of)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, idf: Dict[str, float]) -> "np.ndarray":
+        """Dense BM25 scores indexed by slot"""
+        n = len(self._cards)
+        scores = np.zeros(n, dtype=np.float32)
+        if not self._slot_of:
+            return scores
+
+        k1 = self.k1
+        avg_len = self._total_len / len(self._slot_of) or 1.0
+        length_norm = k1 * (1 - self.b) + (k1 * self.b / avg_len) * self._doc_len[:n]
+
+        for term, term_idf in idf.items():
+            slots, tfs = self._term_arrays(term)
+            scores[slots] += (term_idf * (k1 + 1)) * tfs / (tfs + length_norm[slots])
+        return scores
+
+    def _term_arrays(self, term: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        arrays = self._posting_arrays.get(term)
+        if arrays is None:
+            posting = self._postings[term]
+            arrays = (
+                np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float32, count=len(posting))
+            )
+            self._posting_arrays[term] = arrays
+        return arrays
+
+    def _blend_embeddings(self, question: str, scores: "np.ndarray") -> "np.ndarray":
+        n = len(self._cards)
+        combined = self._vectors[:n] @ self._normalize(self.embedder([question])[0])
+        combined *= self.embedding_weight
+
+        best = scores.max() if n else 0.0
+        if best > 0:
+            combined += (1 - self.embedding_weight) * scores / best
+
+        # Removed slots must never surface
+        if self._free_slots:
+            combined[self._free_slots] = -np.inf
+        return combined
+
+    @staticmethod
+    def _top_k(scores: "np.ndarray", k: int) -> List[Tuple[int, float]]:
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(slot), float(scores[slot])) for slot in top]
+
+    def _rank_columns(
+        self,
+        slot: int,
+        idf: Dict[str, float],
+        max_columns: int
+    ) -> List[Dict[str, Any]]:
+        scored = []
+        for position, (column, tokens) in enumerate(self._columns[slot]):
+            score = sum(weight for term, weight in idf.items() if term in tokens)
+            scored.append((score, -position, column))
+
+        matched = [entry for entry in scored if entry[0] > 0]
+        # Keep identifier columns when nothing matches so the table is still usable
+        selected = heapq.nlargest(max_columns, matched) if matched else scored[:min(3, max_columns)]
+
+        return [
+            {
+                "name": column.get("name"),
+                "type": column.get("type"),
+                "pii": column.get("pii", False),
+                "description": column.get("description"),
+                "score": round(score, 4)
+            }
+            for score, _, column in selected
+        ]
+
+    def _set_vector(self, slot: int, vector: "np.ndarray") -> None:
+        vector = self._normalize(vector)
+        if self._vectors is None:
+            self._vectors = np.zeros((max(16, slot + 1), vector.shape[0]), dtype=np.float32)
+        elif slot >= len(self._vectors):
+            grown = np.zeros((max(slot + 1, 2 * len(self._vectors)), self._vectors.shape[1]), dtype=np.float32)
+            grown[:len(self._vectors)] = self._vectors
+            self._vectors = grown
+        self._vectors[slot] = vector
+
+    @staticmethod
+    def _normalize(vector: "np.ndarray") -> "np.ndarray":
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+def format_prompt_context(context: Dict[str, Any]) -> str:
+    """
+    Render retrieved schema context as compact prompt text
+
+    One line per table, e.g.:
+        loan_portfolio: All active and closed loans
+          amount NUMERIC -- Original loan amount
+    """
+    lines = []
+    for table in context.get("tables", []):
+        lines.append(f"{table['name']}: {table.get('description') or ''}".rstrip())
+        for column in table["columns"]:
+            line = f"  {column['name']} {column.get('type') or ''}".rstrip()
+            if column.get("description"):
+                line += f" -- {column['description']}"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def summarize_context(context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Compact form of retrieved context for evidence packs"""
+    if not context:
+        return None
+    return {
+        "tables": [
+            {
+                "dataset_id": table["dataset_id"],
+                "name": table["name"],
+                "score": table["score"],
+                "columns": [column["name"] for column in table["columns"]]
+            }
+            for table in context.get("tables", [])
+        ],
+        "retrieval_ms": context.get("retrieval_ms")
+    }
+
+
+# Global schema index, kept in sync with the dataset catalog
+schema_index = SchemaIndex(catalog=catalog)
@@ -0,0 +1,289 @@
+"""
+SLO Engine
+Rolling-window SLIs, error budgets and multi-window burn-rate alerts
+"""
+
+import asyncio
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from config import settings
+from utils.logging import logger
+from .observability import observability
+
+
+# (name, length in seconds, slot resolution in seconds): per-second slots up
+# to 6h, per-minute for the 30-day budget window
+WINDOWS = (
+    ("5m", 300, 1),
+    ("1h", 3600, 1),
+    ("6h", 21600, 1),
+    ("30d", 30 * 86400, 60),
+)
+
+BUDGET_WINDOW = "30d"
+
+# Multi-window burn-rate rules from docs/slo-definitions.md: alert when the
+# budget would be exhausted within `horizon` seconds at the current rate,
+# sustained over the long window and still happening in the short one
+ALERT_RULES = (
+    {"severity": "critical", "long": "1h", "short": "5m", "horizon": 86400},
+    {"severity": "warning", "long": "6h", "short": "1h", "horizon": 7 * 86400},
+)
+
+# Probe and scrape endpoints are not user traffic
+EXCLUDED_PATH_PREFIXES = ("/health", "/ready", "/metrics")
+
+AlertSink = Callable[[Dict[str, Any]], Optional[Awaitable[None]]]
+
+
+class RollingWindow:
+    """
+    Sliding (good, total) event counts over a fixed span
+
+    Counts live in a ring of `seconds // resolution` slots with running
+    sums, so recording is O(1) and reading a ratio is O(1); advancing the
+    clock clears only the slots that expired (bounded by the ring size).
+    """
+
+    __slots__ = ("seconds", "resolution", "size", "good", "total", "good_sum", "total_sum", "head")
+
+    def __init__(self, seconds: int, resolution: int = 1):
+        self.seconds = seconds
+        self.resolution = resolution
+        self.size = seconds // resolution
+        self.good = array("I", bytes(4 * self.size))
+        self.total = array("I", bytes(4 * self.size))
+        self.good_sum = 0
+        self.total_sum = 0
+        self.head: Optional[int] = None
+
+    def advance(self, now: float) -> None:
+        slot = int(now // self.resolution)
+        if self.head is None:
+            self.head = slot
+            return
+        gap = slot - self.head
+        if gap <= 0:
+            return
+        if gap >= self.size:
+            self.good = array("I", bytes(4 * self.size))
+            self.total = array("I", bytes(4 * self.size))
+            self.good_sum = self.total_sum = 0
+        else:
+            for expired in range(self.head + 1, slot + 1):
+                index = expired % self.size
+                self.good_sum -= self.good[index]
+                self.total_sum -= self.total[index]
+                self.good[index] = 0
+                self.total[index] = 0
+        self.head = slot
+
+    def add(self, now: float, good: bool) -> None:
+        self.advance(now)
+        index = self.head % self.size
+        self.total[index] += 1
+        self.total_sum += 1
+        if good:
+            self.good[index] += 1
+            self.good_sum += 1
+
+    @property
+    def bad_sum(self) -> int:
+        return self.total_sum - self.good_sum
+
+
+class ServiceLevelObjective:
+    """One SLO: an objective over good/total events in every rolling window"""
+
+    def __init__(self, name: str, description: str, objective: float, min_events: int = 20):
+        self.name = name
+        self.description = description
+        self.objective = objective
+        self.min_events = min_events
+        self.windows = {name: RollingWindow(seconds, resolution) for name, seconds, resolution in WINDOWS}
+        self.state = "ok"
+        self.state_since = datetime.utcnow()
+        self.last_evaluated = 0.0
+
+    def record(self, good: bool, now: float) -> None:
+        for window in self.windows.values():
+            window.add(now, good)
+
+    def burn_rate(self, window_name: str) -> Optional[float]:
+        """Observed bad fraction over the window divided by the allowed bad fraction"""
+        window = self.windows[window_name]
+        if window.total_sum == 0:
+            return None
+        return (window.bad_sum / window.total_sum) / (1 - self.objective)
+
+    def evaluate(self, now: float) -> str:
+        """Highest-severity rule whose long and short windows both burn too fast"""
+        for window in self.windows.values():
+            window.advance(now)
+        self.last_evaluated = now
+        budget_seconds = self.windows[BUDGET_WINDOW].seconds
+        for rule in ALERT_RULES:
+            if self.windows[rule["long"]].total_sum < self.min_events:
+                continue
+            threshold = budget_seconds / rule["horizon"]
+            long_rate, short_rate = self.burn_rate(rule["long"]), self.burn_rate(rule["short"])
+            if long_rate is not None and short_rate is not None and long_rate >= threshold and short_rate >= threshold:
+                return rule["severity"]
+        return "ok"
+
+    def status(self) -> Dict[str, Any]:
+        budget = self.windows[BUDGET_WINDOW]
+        allowed = (1 - self.objective) * budget.total_sum
+        return {
+            "name": self.name,
+            "description": self.description,
+            "objective": self.objective,
+            "state": self.state,
+            "state_since": self.state_since,
+            "windows": {
+                name: {
+                    "events": window.total_sum,
+                    "bad": window.bad_sum,
+                    "sli": round(window.good_sum / window.total_sum, 6) if window.total_sum else None,
+                    "burn_rate": round(rate, 3) if (rate := self.burn_rate(name)) is not None else None
+                }
+                for name, window in self.windows.items()
+            },
+            "error_budget": {
+                "window": BUDGET_WINDOW,
+                "allowed_bad": round(allowed, 1),
+                "bad": budget.bad_sum,
+                "remaining": round(1 - budget.bad_sum / allowed, 6) if allowed else 1.0
+            },
+            "alert_thresholds": {
+                rule["severity"]: round(budget.seconds / rule["horizon"], 2) for rule in ALERT_RULES
+            }
+        }
+
+
+class SLOEngine:
+    """
+    Evaluate the platform SLOs from the live request and query stream
+
+    Every event updates each SLO's rolling windows in O(1). Burn rates are
+    evaluated at most once a second per SLO (and on every status read);
+    a state change (ok, warning, critical) emits an alert to each
+    registered sink. Sinks are plain callables, sync or async; alerts are
+    also kept in a bounded in-memory log, which stands in for a webhook
+    receiver when no SLO_ALERT_WEBHOOK_URL is configured.
+
+    Windows are per worker: each worker evaluates the ratios of the traffic
+    it serves, which converge to the fleet's under even load balancing.
+    Memory is fixed regardless of traffic: about 550 KB of ring buffers
+    per SLO.
+    """
+
+    def __init__(self, min_events: int = 20, max_alerts: int = 200):
+        self.slos: Dict[str, ServiceLevelObjective] = {
+            "availability": ServiceLevelObjective(
+                "availability", "Non-5xx HTTP responses / all responses", settings.SLO_AVAILABILITY_TARGET, min_events
+            ),
+            "query_latency": ServiceLevelObjective(
+                "query_latency",
+                f"Queries completing within {settings.SLO_QUERY_LATENCY_THRESHOLD_S:g}s / all queries",
+                settings.SLO_QUERY_LATENCY_TARGET,
+                min_events
+            ),
+            "query_success": ServiceLevelObjective(
+                "query_success", "Successful queries / all queries", settings.SLO_QUERY_SUCCESS_TARGET, min_events
+            ),
+        }
+        self.latency_threshold = settings.SLO_QUERY_LATENCY_THRESHOLD_S
+        self.alerts: deque = deque(maxlen=max_alerts)
+        self._sinks: List[AlertSink] = []
+        self._tasks: Set[asyncio.Task] = set()
+
+    def add_sink(self, sink: AlertSink) -> None:
+        """Register an alert hook, called with each alert dict"""
+        self._sinks.append(sink)
+
+    def record_request(self, path: str, status_code: int) -> None:
+        if path.startswith(EXCLUDED_PATH_PREFIXES):
+            return
+        self._record("availability", status_code < 500)
+
+    def record_query(self, duration: float, success: bool) -> None:
+        self._record("query_success", success)
+        if success:
+            self._record("query_latency", duration <= self.latency_threshold)
+
+    def _record(self, name: str, good: bool) -> None:
+        now = time.time()
+        slo = self.slos[name]
+        slo.record(good, now)
+        if now - slo.last_evaluated >= 1.0:
+            self._evaluate(slo, now)
+
+    def _evaluate(self, slo: ServiceLevelObjective, now: float) -> None:
+        state = slo.evaluate(now)
+        if state == slo.state:
+            return
+        previous, slo.state, slo.state_since = slo.state, state, datetime.utcnow()
+        status = slo.status()
+        alert = {
+            "slo": slo.name,
+            "state": state,
+            "previous_state": previous,
+            "resolved": state == "ok",
+            "timestamp": slo.state_since.isoformat(),
+            "burn_rates": {name: window["burn_rate"] for name, window in status["windows"].items()},
+            "error_budget_remaining": status["error_budget"]["remaining"]
+        }
+        self.alerts.append(alert)
+        log = logger.info if state == "ok" else logger.warning
+        log(f"SLO {slo.name} {previous} -> {state}")
+        for sink in self._sinks:
+            self._deliver(sink, alert)
+
+    def _deliver(self, sink: AlertSink, alert: Dict[str, Any]) -> None:
+        try:
+            result = sink(alert)
+        except Exception as e:
+            logger.error(f"SLO alert sink failed: {str(e)}")
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.get_running_loop().create_task(result)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def status(self) -> Dict[str, Any]:
+        """Current state, window SLIs, burn rates and remaining budget of every SLO"""
+        now = time.time()
+        for slo in self.slos.values():
+            self._evaluate(slo, now)
+        return {
+            "slos": [slo.status() for slo in self.slos.values()],
+            "alerts": list(self.alerts)[-20:]
+        }
+
+    def state(self) -> Dict[str, Any]:
+        return {name: slo.state for name, slo in self.slos.items()}
+
+
+def webhook_sink(url: str, timeout: float = 5.0) -> AlertSink:
+    """Alert sink POSTing each alert as JSON to `url`"""
+    async def deliver(alert: Dict[str, Any]) -> None:
+        import httpx
+        try:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.post(url, json=alert)
+                response.raise_for_status()
+        except Exception as e:
+            logger.error(f"SLO alert webhook {url} failed: {str(e)}")
+    return deliver
+
+
+# Global SLO engine instance
+slo_engine = SLOEngine(min_events=settings.SLO_MIN_EVENTS)
+if settings.SLO_ALERT_WEBHOOK_URL:
+    slo_engine.add_sink(webhook_sink(settings.SLO_ALERT_WEBHOOK_URL))
+observability.register_state("slo", slo_engine.state)
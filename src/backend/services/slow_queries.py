@@ -0,0 +1,420 @@
+"""
+Slow Query Analyzer
+Per-shape latency statistics, EXPLAIN capture and regression flags
+"""
+
+import asyncio
+import bisect
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from db.session import AsyncSessionLocal
+from models.query_history import QueryShapeBaseline
+from utils.logging import logger
+from utils.sql import query_shape, shape_fingerprint
+from .observability import observability
+from .query_history import LATENCY_BOUNDS_MS, histogram_percentile
+
+
+# Plan node fields that define a plan's structure (costs and row estimates are ignored)
+PLAN_SHAPE_FIELDS = ("Node Type", "Join Type", "Strategy", "Relation Name", "Index Name", "Parent Relationship")
+
+
+def plan_hash(plan: Dict[str, Any]) -> str:
+    """Digest of a JSON plan's structure: node types, join strategies, relations and indexes"""
+    def walk(node: Dict[str, Any]) -> list:
+        return [
+            [node.get(field) for field in PLAN_SHAPE_FIELDS],
+            [walk(child) for child in node.get("Plans", [])]
+        ]
+    return hashlib.blake2b(orjson.dumps(walk(plan)), digest_size=8).hexdigest()
+
+
+class _ShapeStats:
+    """Running statistics for one query shape"""
+
+    def __init__(self, fingerprint: str, shape: str, dataset_id: str):
+        self.fingerprint = fingerprint
+        self.shape = shape
+        self.dataset_id = dataset_id
+        self.executions = 0
+        self.errors = 0
+        self.slow = 0
+        self.histogram = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows_total = 0
+        self.rows_min: Optional[int] = None
+        self.rows_max: Optional[int] = None
+        self.window = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+        self.window_count = 0
+        self.window_max_ms = 0.0
+        self.window_p95: Optional[float] = None
+        self.baseline_p95: Optional[float] = None
+        self.plan: Optional[Dict[str, Any]] = None
+        self.plan_hash: Optional[str] = None
+        self.plan_captured_at: Optional[datetime] = None
+        self.baseline_plan_hash: Optional[str] = None
+        self.baseline_plan: Optional[Dict[str, Any]] = None
+        self.last_explain = float("-inf")
+        self.flags: Dict[str, Dict[str, Any]] = {}
+        self.last_seen = datetime.utcnow()
+
+    def to_dict(self, include_plans: bool = True) -> Dict[str, Any]:
+        result = {
+            "fingerprint": self.fingerprint,
+            "shape": self.shape,
+            "dataset_id": self.dataset_id,
+            "executions": self.executions,
+            "errors": self.errors,
+            "slow_executions": self.slow,
+            "avg_ms": round(self.total_ms / (self.executions - self.errors), 3) if self.executions > self.errors else None,
+            "p50_ms": histogram_percentile(self.histogram, 0.5, self.max_ms),
+            "p95_ms": histogram_percentile(self.histogram, 0.95, self.max_ms),
+            "p99_ms": histogram_percentile(self.histogram, 0.99, self.max_ms),
+            "max_ms": round(self.max_ms, 3),
+            "rows": {
+                "min": self.rows_min,
+                "max": self.rows_max,
+                "avg": round(self.rows_total / (self.executions - self.errors), 1) if self.executions > self.errors else None
+            },
+            "recent_p95_ms": self.window_p95,
+            "baseline_p95_ms": self.baseline_p95,
+            "plan_hash": self.plan_hash,
+            "baseline_plan_hash": self.baseline_plan_hash,
+            "plan_captured_at": self.plan_captured_at,
+            "flags": list(self.flags.values()),
+            "last_seen": self.last_seen
+        }
+        if include_plans:
+            result["plan"] = self.plan
+            result["baseline_plan"] = self.baseline_plan if self.baseline_plan_hash != self.plan_hash else None
+        return result
+
+
+class SlowQueryAnalyzer:
+    """
+    Slow-query analytics keyed by query shape
+
+    Executions are grouped by the fingerprint of their SQL with literals
+    stripped, so `... WHERE id = 1` and `... WHERE id = -2` are one shape;
+    query history rollups use the same fingerprint.
+    Each shape keeps a latency histogram and row-count stats. Latency is
+    also collected in windows of `window` executions: a window whose p95
+    exceeds the shape's baseline by `regression_factor` (and by at least
+    `min_regression_ms`) flags a latency regression; otherwise the
+    baseline moves slowly towards the window's p95.
+
+    Executions slower than `threshold_ms` trigger a background
+    `EXPLAIN (FORMAT JSON)` (planning only; the query is not run again),
+    at most once per shape every `explain_interval` seconds. A plan whose
+    structure (node types, joins, relations and indexes) differs from the
+    shape's baseline plan flags a plan change. `accept` makes the current
+    latency and plan the new baseline.
+
+    Statistics are per worker and bounded to `max_shapes` most recently
+    seen shapes. Baselines (p95 and plan) are written to Postgres every
+    `baseline_flush_interval` seconds when they changed and loaded at
+    startup, so a restart does not forget what "normal" was; with several
+    workers the last writer wins.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        threshold_ms: float = 500.0,
+        window: int = 100,
+        regression_factor: float = 2.0,
+        min_regression_ms: float = 50.0,
+        explain_interval: float = 300.0,
+        max_concurrent_explains: int = 2,
+        max_shapes: int = 2000,
+        baseline_flush_interval: float = 60.0
+    ):
+        self.session_factory = session_factory
+        self.threshold_ms = threshold_ms
+        self.window = window
+        self.regression_factor = regression_factor
+        self.min_regression_ms = min_regression_ms
+        self.explain_interval = explain_interval
+        self.max_shapes = max_shapes
+        self.baseline_flush_interval = baseline_flush_interval
+        self._shapes: "OrderedDict[str, _ShapeStats]" = OrderedDict()
+        # Persisted baselines of shapes not (or no longer) tracked: (p95, plan hash, plan)
+        self._baselines: "OrderedDict[str, Tuple[Optional[float], Optional[str], Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._flusher: Optional[asyncio.Task] = None
+        self._explains = asyncio.Semaphore(max_concurrent_explains)
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {
+            "explains": 0, "explain_errors": 0, "latency_regressions": 0, "plan_changes": 0,
+            "baselines_written": 0, "baseline_errors": 0
+        }
+
+    def observe(
+        self,
+        sql: str,
+        dataset_id: str,
+        duration_ms: float,
+        row_count: int,
+        success: bool,
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record one execution; slow ones schedule a plan capture"""
+        fingerprint = shape_fingerprint(sql)
+        stats = self._shapes.get(fingerprint)
+        if stats is None:
+            stats = self._shapes[fingerprint] = _ShapeStats(fingerprint, query_shape(sql), dataset_id)
+            baseline = self._baselines.pop(fingerprint, None)
+            if baseline is not None:
+                stats.baseline_p95, stats.baseline_plan_hash, stats.baseline_plan = baseline
+            while len(self._shapes) > self.max_shapes:
+                _, evicted = self._shapes.popitem(last=False)
+                self._keep_baseline(evicted)
+        else:
+            self._shapes.move_to_end(fingerprint)
+        stats.executions += 1
+        stats.last_seen = datetime.utcnow()
+        if not success:
+            stats.errors += 1
+            return
+
+        bucket = bisect.bisect_left(LATENCY_BOUNDS_MS, duration_ms)
+        stats.histogram[bucket] += 1
+        stats.total_ms += duration_ms
+        stats.max_ms = max(stats.max_ms, duration_ms)
+        stats.rows_total += row_count
+        stats.rows_min = row_count if stats.rows_min is None else min(stats.rows_min, row_count)
+        stats.rows_max = row_count if stats.rows_max is None else max(stats.rows_max, row_count)
+
+        stats.window[bucket] += 1
+        stats.window_count += 1
+        stats.window_max_ms = max(stats.window_max_ms, duration_ms)
+        if stats.window_count >= self.window:
+            self._close_window(stats)
+
+        if duration_ms >= self.threshold_ms:
+            stats.slow += 1
+            now = time.monotonic()
+            if now - stats.last_explain >= self.explain_interval:
+                stats.last_explain = now
+                task = asyncio.get_running_loop().create_task(self._capture_plan(stats, sql, params))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    def _close_window(self, stats: _ShapeStats) -> None:
+        p95 = histogram_percentile(stats.window, 0.95, stats.window_max_ms)
+        stats.window_p95 = p95
+        stats.window = [0] * len(stats.window)
+        stats.window_count = 0
+        stats.window_max_ms = 0.0
+
+        baseline = stats.baseline_p95
+        if baseline is None:
+            stats.baseline_p95 = p95
+            self._dirty.add(stats.fingerprint)
+        elif p95 > baseline * self.regression_factor and p95 - baseline >= self.min_regression_ms:
+            if "latency" not in stats.flags:
+                self._stats["latency_regressions"] += 1
+                logger.warning(f"Latency regression for query shape {stats.fingerprint}: p95 {baseline:.1f}ms -> {p95:.1f}ms")
+            stats.flags["latency"] = {
+                "type": "latency_regression",
+                "baseline_p95_ms": baseline,
+                "recent_p95_ms": p95,
+                "detected_at": stats.flags.get("latency", {}).get("detected_at", datetime.utcnow())
+            }
+        else:
+            stats.flags.pop("latency", None)
+            stats.baseline_p95 = round(0.8 * baseline + 0.2 * p95, 3)
+            self._dirty.add(stats.fingerprint)
+
+    async def _capture_plan(self, stats: _ShapeStats, sql: str, params: Optional[Dict[str, Any]]) -> None:
+        async with self._explains:
+            try:
+                async with self.session_factory() as session:
+                    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params or {})
+                    document = result.fetchall()[0][0]
+            except Exception as e:
+                self._stats["explain_errors"] += 1
+                logger.warning(f"EXPLAIN for query shape {stats.fingerprint} failed: {str(e)}")
+                return
+        if isinstance(document, (str, bytes)):
+            document = orjson.loads(document)
+        self._stats["explains"] += 1
+        self.record_plan(stats.fingerprint, document[0]["Plan"])
+
+    def record_plan(self, fingerprint: str, plan: Dict[str, Any]) -> None:
+        """Store a captured plan for a shape and compare it with the baseline plan"""
+        stats = self._shapes.get(fingerprint)
+        if stats is None:
+            return
+        digest = plan_hash(plan)
+        stats.plan, stats.plan_hash, stats.plan_captured_at = plan, digest, datetime.utcnow()
+        if stats.baseline_plan_hash is None:
+            stats.baseline_plan_hash, stats.baseline_plan = digest, plan
+            self._dirty.add(fingerprint)
+        elif digest != stats.baseline_plan_hash:
+            if "plan" not in stats.flags:
+                self._stats["plan_changes"] += 1
+                logger.warning(f"Plan change for query shape {fingerprint}: {stats.baseline_plan_hash} -> {digest}")
+            stats.flags["plan"] = {
+                "type": "plan_changed",
+                "baseline_plan_hash": stats.baseline_plan_hash,
+                "plan_hash": digest,
+                "detected_at": stats.flags.get("plan", {}).get("detected_at", datetime.utcnow())
+            }
+        else:
+            stats.flags.pop("plan", None)
+
+    def accept(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Make a shape's recent latency and current plan its baseline, clearing its flags"""
+        stats = self._shapes.get(fingerprint)
+        if stats is None:
+            return None
+        if stats.window_p95 is not None:
+            stats.baseline_p95 = stats.window_p95
+        if stats.plan_hash is not None:
+            stats.baseline_plan_hash, stats.baseline_plan = stats.plan_hash, stats.plan
+        stats.flags.clear()
+        self._dirty.add(fingerprint)
+        return stats.to_dict()
+
+    def _keep_baseline(self, stats: _ShapeStats) -> None:
+        # An evicted shape's baseline comes back if the shape is seen again
+        if stats.baseline_p95 is None and stats.baseline_plan_hash is None:
+            return
+        self._baselines[stats.fingerprint] = (stats.baseline_p95, stats.baseline_plan_hash, stats.baseline_plan)
+        while len(self._baselines) > self.max_shapes:
+            self._baselines.popitem(last=False)
+
+    async def load_baselines(self, session: AsyncSession) -> None:
+        """Restore the most recently updated baselines (up to `max_shapes`)"""
+        rows = (await session.execute(
+            select(QueryShapeBaseline).order_by(QueryShapeBaseline.updated_at.desc()).limit(self.max_shapes)
+        )).scalars().all()
+        for row in reversed(rows):
+            baseline = (row.baseline_p95_ms, row.baseline_plan_hash, row.baseline_plan)
+            stats = self._shapes.get(row.fingerprint)
+            if stats is None:
+                self._baselines[row.fingerprint] = baseline
+            elif stats.baseline_p95 is None and stats.baseline_plan_hash is None:
+                stats.baseline_p95, stats.baseline_plan_hash, stats.baseline_plan = baseline
+        logger.info(f"Loaded slow-query baselines for {len(rows)} query shapes")
+
+    async def flush_baselines(self) -> int:
+        """Upsert the baselines that changed since the last flush; they are retried if the write fails"""
+        dirty, self._dirty = self._dirty, set()
+        rows = [
+            {
+                "fingerprint": stats.fingerprint,
+                "dataset_id": stats.dataset_id,
+                "baseline_p95_ms": stats.baseline_p95,
+                "baseline_plan_hash": stats.baseline_plan_hash,
+                "baseline_plan": stats.baseline_plan,
+                "updated_at": datetime.utcnow()
+            }
+            for stats in (self._shapes.get(fingerprint) for fingerprint in sorted(dirty))
+            if stats is not None
+        ]
+        if not rows:
+            return 0
+        try:
+            async with self.session_factory() as session:
+                await self._write_baselines(session, rows)
+                await session.commit()
+        except BaseException:
+            self._dirty |= dirty
+            self._stats["baseline_errors"] += 1
+            raise
+        self._stats["baselines_written"] += len(rows)
+        return len(rows)
+
+    async def _write_baselines(self, session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        stmt = pg_insert(QueryShapeBaseline).values(rows)
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=["fingerprint"],
+            set_={column: stmt.excluded[column] for column in (
+                "dataset_id", "baseline_p95_ms", "baseline_plan_hash", "baseline_plan", "updated_at"
+            )}
+        ))
+
+    def start(self) -> None:
+        """Start the periodic baseline writer on the running loop"""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer after a final flush"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        try:
+            await self.flush_baselines()
+        except Exception as e:
+            logger.error(f"Final slow-query baseline flush failed: {str(e)}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.baseline_flush_interval)
+            try:
+                await self.flush_baselines()
+            except Exception as e:
+                logger.warning(f"Slow-query baseline flush failed: {str(e)}")
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        stats = self._shapes.get(fingerprint)
+        return stats.to_dict() if stats is not None else None
+
+    def report(
+        self,
+        flagged_only: bool = False,
+        sort: str = "p95",
+        limit: int = 50,
+        dataset_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Shapes ordered by p95, total time or slow-execution count; flagged shapes first"""
+        shapes = [
+            stats for stats in self._shapes.values()
+            if (not flagged_only or stats.flags) and (dataset_id is None or stats.dataset_id == dataset_id)
+        ]
+        keys = {
+            "p95": lambda stats: histogram_percentile(stats.histogram, 0.95, stats.max_ms) or 0.0,
+            "total": lambda stats: stats.total_ms,
+            "slow": lambda stats: stats.slow,
+        }
+        shapes.sort(key=lambda stats: (bool(stats.flags), keys[sort](stats)), reverse=True)
+        return [stats.to_dict(include_plans=False) for stats in shapes[:limit]]
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "shapes": len(self._shapes),
+            "flagged": sum(1 for stats in self._shapes.values() if stats.flags),
+            "baselines_pending": len(self._dirty),
+            **self._stats
+        }
+
+
+# Global slow query analyzer instance
+slow_queries = SlowQueryAnalyzer(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    window=settings.SLOW_QUERY_WINDOW,
+    regression_factor=settings.SLOW_QUERY_REGRESSION_FACTOR,
+    min_regression_ms=settings.SLOW_QUERY_MIN_REGRESSION_MS,
+    explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL,
+    max_shapes=settings.SLOW_QUERY_MAX_SHAPES,
+    baseline_flush_interval=settings.SLOW_QUERY_BASELINE_FLUSH_INTERVAL
+)
+observability.register_state("slow_queries", slow_queries.state)
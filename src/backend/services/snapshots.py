@@ -0,0 +1,382 @@
+"""
+Dataset Snapshot Service
+Content fingerprints of dataset tables for evidence citation and diffing
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from config import settings
+from db.session import AsyncSessionLocal, WORKLOAD
+from models.snapshot import DatasetSnapshot
+from utils.errors import ValidationError
+from utils.lazy import lazy_import
+from utils.logging import logger
+from utils.sql import IDENTIFIER_RE
+from .catalog import catalog
+from .observability import observability
+
+np = lazy_import("numpy")
+
+
+# hashtextextended seeds: one places keys in buckets, the other hashes row content
+BUCKET_SEED = 1
+CONTENT_SEED = 2
+
+# A parent's bucket count is kept (so manifests stay comparable) until the
+# table outgrows or shrinks away from it by this factor
+REBUCKET_FACTOR = 4
+
+UINT64 = 1 << 64
+
+
+def bucket_count_for(rows: int, bucket_rows: int, max_buckets: int) -> int:
+    """Smallest power of two giving at most `bucket_rows` rows per bucket, capped"""
+    count = 1
+    while count * bucket_rows < rows and count < max_buckets:
+        count *= 2
+    return count
+
+
+def bucket_expression(key_column: str, bucket_count: int, alias: str = "t") -> str:
+    """SQL expression placing a row in its bucket; NULL keys share a bucket"""
+    return f"""(hashtextextended(coalesce({alias}."{key_column}"::text, ''), {BUCKET_SEED}) & {bucket_count - 1})"""
+
+
+def pack_manifest(counts, hashes) -> bytes:
+    """Per-bucket row counts (int64) followed by content hashes (uint64)"""
+    return np.asarray(counts, dtype="<i8").tobytes() + np.asarray(hashes, dtype="<u8").tobytes()
+
+
+def unpack_manifest(manifest: bytes, bucket_count: int) -> Tuple[Any, Any]:
+    counts = np.frombuffer(manifest, dtype="<i8", count=bucket_count)
+    hashes = np.frombuffer(manifest, dtype="<u8", count=bucket_count, offset=bucket_count * 8)
+    return counts, hashes
+
+
+def diff_manifests(
+    before: bytes,
+    after: bytes,
+    bucket_count: int,
+    limit: int
+) -> Dict[str, Any]:
+    """
+    Compare two manifests bucket by bucket
+
+    Only the manifests are read: the cost is O(buckets), independent of the
+    table size, and the output names exactly the buckets whose rows differ.
+
+    Returns:
+        Diff summary with up to `limit` changed buckets and their row counts
+    """
+    counts_before, hashes_before = unpack_manifest(before, bucket_count)
+    counts_after, hashes_after = unpack_manifest(after, bucket_count)
+    changed = np.flatnonzero((hashes_before != hashes_after) | (counts_before != counts_after))
+    shown = changed[:limit]
+    return {
+        "bucket_count": bucket_count,
+        "identical": changed.size == 0,
+        "changed_buckets": int(changed.size),
+        "changed_fraction": round(changed.size / bucket_count, 6),
+        "rows_before": int(counts_before.sum()),
+        "rows_after": int(counts_after.sum()),
+        "buckets": [
+            {"bucket": int(bucket), "rows_before": int(counts_before[bucket]), "rows_after": int(counts_after[bucket])}
+            for bucket in shown
+        ],
+        "truncated": changed.size > shown.size
+    }
+
+
+class SnapshotService:
+    """
+    Snapshots of dataset tables as per-bucket content hashes
+
+    Rows are spread over a power-of-two number of buckets by a hash of the
+    key column. One GROUP BY scan records each bucket's row count and an
+    order-independent content hash (the wrapped sum of per-row hashes), so
+    a snapshot costs one table scan and stores ~16 bytes per bucket instead
+    of a copy of the data. Two snapshots of the same table compare bucket
+    by bucket: identical buckets are proven unchanged, and only changed
+    buckets need to be read to show row-level differences.
+
+    Snapshots chain to their parent and inherit its bucket count, so each
+    records how many buckets changed since the previous one. The latest
+    snapshot per dataset is kept in memory so evidence packs can cite it
+    without a database round trip; it is re-read every `refresh_interval`
+    seconds to pick up snapshots taken by other workers.
+    """
+
+    def __init__(
+        self,
+        bucket_rows: int = 64,
+        max_buckets: int = 1 << 22,
+        diff_limit: int = 1000,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        refresh_interval: float = 30.0
+    ):
+        self.bucket_rows = bucket_rows
+        self.max_buckets = max_buckets
+        self.diff_limit = diff_limit
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._refresher: Optional[asyncio.Task] = None
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._stats = {"snapshots": 0, "diffs": 0, "rows_scanned": 0}
+
+    def citation(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Latest known snapshot of a dataset (by ID or name), as cited in evidence packs"""
+        card = catalog.get(dataset_id)
+        return self._latest.get(card["id"] if card else dataset_id)
+
+    def _remember(self, snapshot: DatasetSnapshot) -> bool:
+        current = self._latest.get(snapshot.dataset_id)
+        if current is not None and current["snapshot_id"] == str(snapshot.id):
+            return False
+        if current is None or current["taken_at"] <= snapshot.created_at.isoformat():
+            self._latest[snapshot.dataset_id] = {
+                "snapshot_id": str(snapshot.id),
+                "taken_at": snapshot.created_at.isoformat(),
+                "table": snapshot.table_name,
+                "row_count": snapshot.row_count,
+                "digest": snapshot.digest,
+                "watermark": snapshot.watermark
+            }
+            return True
+        return False
+
+    async def load_latest(self, session: AsyncSession) -> None:
+        """Populate the citation cache with each dataset's newest snapshot"""
+        rows = (await session.execute(
+            select(DatasetSnapshot)
+            .distinct(DatasetSnapshot.dataset_id)
+            .order_by(DatasetSnapshot.dataset_id, DatasetSnapshot.created_at.desc())
+        )).scalars().all()
+        updated = sum(self._remember(snapshot) for snapshot in rows)
+        if updated:
+            logger.info(f"Loaded latest snapshots for {updated} datasets")
+
+    def start(self) -> None:
+        """Start the periodic citation refresh on the running loop"""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                async with self.session_factory() as session:
+                    await self.load_latest(session)
+            except Exception as e:
+                logger.warning(f"Refreshing snapshot citations failed: {str(e)}")
+
+    async def latest(self, session: AsyncSession, dataset_id: str, manifest: bool = False) -> Optional[DatasetSnapshot]:
+        """A dataset's newest snapshot; its manifest is loaded only when asked for"""
+        stmt = (
+            select(DatasetSnapshot)
+            .where(DatasetSnapshot.dataset_id == dataset_id)
+            .order_by(DatasetSnapshot.created_at.desc())
+            .limit(1)
+        )
+        return await session.scalar(stmt.options(undefer(DatasetSnapshot.manifest)) if manifest else stmt)
+
+    async def scan(
+        self,
+        session: AsyncSession,
+        table: str,
+        key_column: str,
+        bucket_count: int,
+        watermark_column: Optional[str] = None
+    ) -> Tuple[bytes, int, Optional[Dict[str, Any]]]:
+        """
+        Hash a table into a manifest with one aggregate scan
+
+        Returns:
+            (manifest, row count, watermark or None)
+        """
+        for name in (table, key_column, watermark_column):
+            if name is not None and not IDENTIFIER_RE.match(name):
+                raise ValidationError(f"Invalid identifier {name}")
+
+        select_list = [
+            f"{bucket_expression(key_column, bucket_count)} AS bucket",
+            "count(*) AS rows",
+            f"sum(hashtextextended(t::text, {CONTENT_SEED})) AS content"
+        ]
+        if watermark_column:
+            select_list.append(f'max(t."{watermark_column}") AS watermark')
+        result = await session.execute(
+            text(f'SELECT {", ".join(select_list)} FROM "{table}" AS t GROUP BY 1'), execution_options=WORKLOAD
+        )
+
+        counts = np.zeros(bucket_count, dtype="<i8")
+        hashes = np.zeros(bucket_count, dtype="<u8")
+        high = None
+        for row in result.fetchall():
+            counts[row[0]] = row[1]
+            hashes[row[0]] = int(row[2]) % UINT64
+            if watermark_column and row[3] is not None and (high is None or row[3] > high):
+                high = row[3]
+
+        watermark = {"column": watermark_column, "max": str(high) if high is not None else None} if watermark_column else None
+        return pack_manifest(counts, hashes), int(counts.sum()), watermark
+
+    async def take(
+        self,
+        session: AsyncSession,
+        dataset_id: str,
+        table: str,
+        key_column: str,
+        user_id: str,
+        watermark_column: Optional[str] = None
+    ) -> DatasetSnapshot:
+        """
+        Snapshot a table and record it as the dataset's latest snapshot
+
+        Args:
+            session: Session to scan and persist on (committed here)
+            dataset_id: Dataset the table backs
+            table: Table to hash
+            key_column: Column rows are bucketed by (normally the primary key)
+            user_id: Requesting user, or the service that triggered the snapshot
+            watermark_column: Monotonic column (e.g. updated_at) to record the high-water mark of
+
+        Returns:
+            The persisted snapshot
+        """
+        started = time.perf_counter()
+        parent = await self.latest(session, dataset_id, manifest=True)
+        estimate = await session.scalar(
+            text("SELECT greatest(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table}
+        )
+        if estimate is None:
+            raise ValidationError(f"Table {table} does not exist")
+
+        bucket_count = bucket_count_for(estimate, self.bucket_rows, self.max_buckets)
+        comparable = (
+            parent is not None
+            and parent.table_name == table
+            and parent.key_column == key_column
+            and parent.bucket_count * REBUCKET_FACTOR >= bucket_count
+            and bucket_count * REBUCKET_FACTOR >= parent.bucket_count
+        )
+        if comparable:
+            bucket_count = parent.bucket_count
+
+        manifest, row_count, watermark = await self.scan(session, table, key_column, bucket_count, watermark_column)
+        changed = None
+        if comparable:
+            changed = diff_manifests(parent.manifest, manifest, bucket_count, 0)["changed_buckets"]
+
+        snapshot = DatasetSnapshot(
+            dataset_id=dataset_id,
+            table_name=table,
+            key_column=key_column,
+            parent_id=parent.id if parent is not None else None,
+            bucket_count=bucket_count,
+            row_count=row_count,
+            watermark=watermark,
+            digest=hashlib.blake2b(manifest, digest_size=32).hexdigest(),
+            manifest=manifest,
+            changed_buckets=changed,
+            duration_ms=int((time.perf_counter() - started) * 1000),
+            created_by=user_id
+        )
+        session.add(snapshot)
+        await session.commit()
+        await session.refresh(snapshot)
+
+        self._remember(snapshot)
+        self._stats["snapshots"] += 1
+        self._stats["rows_scanned"] += row_count
+        logger.info(
+            f"Snapshot {snapshot.id} of {dataset_id} ({table}): {row_count} rows in {bucket_count} buckets, "
+            f"{changed if changed is not None else 'n/a'} changed since parent, {snapshot.duration_ms}ms"
+        )
+        return snapshot
+
+    def diff(self, before: DatasetSnapshot, after: DatasetSnapshot, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Diff two snapshots of the same dataset from their manifests alone
+
+        Both snapshots must be loaded with their manifests (undefer).
+
+        Raises:
+            ValidationError: Snapshots bucketed differently (not comparable)
+        """
+        if (before.table_name, before.key_column, before.bucket_count) != (after.table_name, after.key_column, after.bucket_count):
+            raise ValidationError("Snapshots are bucketed differently and cannot be compared")
+        self._stats["diffs"] += 1
+        diff = diff_manifests(before.manifest, after.manifest, before.bucket_count, limit or self.diff_limit)
+        return {"from": str(before.id), "to": str(after.id), "key_column": before.key_column, **diff}
+
+    async def diff_live(
+        self,
+        session: AsyncSession,
+        snapshot: DatasetSnapshot,
+        rows: int = 0,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Diff a snapshot against the table as it is now
+
+        Rehashes the table (one scan) and compares manifests. With rows > 0,
+        also returns up to `rows` current rows from the changed buckets;
+        unchanged buckets are never read. The snapshot must be loaded with
+        its manifest (undefer).
+        """
+        manifest, _, _ = await self.scan(session, snapshot.table_name, snapshot.key_column, snapshot.bucket_count)
+        self._stats["diffs"] += 1
+        diff = diff_manifests(snapshot.manifest, manifest, snapshot.bucket_count, limit or self.diff_limit)
+        diff = {"from": str(snapshot.id), "to": "live", "key_column": snapshot.key_column, **diff}
+
+        if rows > 0 and diff["buckets"]:
+            result = await session.execute(
+                text(
+                    f'SELECT {bucket_expression(snapshot.key_column, snapshot.bucket_count)} AS bucket, t.* '
+                    f'FROM "{snapshot.table_name}" AS t '
+                    f'WHERE {bucket_expression(snapshot.key_column, snapshot.bucket_count)} = ANY(:buckets) LIMIT :rows'
+                ),
+                {"buckets": [bucket["bucket"] for bucket in diff["buckets"]], "rows": rows},
+                execution_options=WORKLOAD
+            )
+            diff["columns"] = list(result.keys())
+            diff["rows"] = [list(row) for row in result.fetchall()]
+        return diff
+
+    def state(self) -> Dict[str, Any]:
+        return {"datasets": len(self._latest), **self._stats}
+
+
+def default_key_column(card: Dict[str, Any]) -> Optional[str]:
+    """Key column for a dataset card: its declared primary key, else its first column"""
+    if card.get("primary_key"):
+        return card["primary_key"]
+    schema = card.get("schema") or []
+    return schema[0]["name"] if schema else None
+
+
+# Global snapshot service instance
+snapshots = SnapshotService(
+    bucket_rows=settings.SNAPSHOT_BUCKET_ROWS,
+    max_buckets=settings.SNAPSHOT_MAX_BUCKETS,
+    diff_limit=settings.SNAPSHOT_DIFF_MAX_BUCKETS,
+    refresh_interval=settings.SNAPSHOT_CITATION_REFRESH_INTERVAL
+)
+observability.register_state("snapshots", snapshots.state)
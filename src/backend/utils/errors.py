@@ -35,6 +35,13 @@ class SQLValidationError(AureusException):
     pass
 
 
+class DataQualityError(AureusException):
+    """Data-quality checks failed"""
+    def __init__(self, message: str, results: dict = None):
+        super().__init__(message)
+        self.results = results
+
+
 class QueryExecutionError(AureusException):
     """Query execution failed"""
     def __init__(self, message: str, execution_id: str = None, evidence: dict = None, sql: str = None):
@@ -44,6 +51,15 @@ class QueryExecutionError(AureusException):
         self.sql = sql
 
 
+class DependencyUnavailableError(AureusException):
+    """An external dependency is failing fast (circuit open or bulkhead full)"""
+    def __init__(self, dependency: str, reason: str, retry_after: int = 5):
+        super().__init__(f"{dependency} unavailable: {reason}")
+        self.dependency = dependency
+        self.reason = reason
+        self.retry_after = retry_after
+
+
 def create_error_response(code: str, message: str, details: list = None, request_id: str = None):
     """Create standardized error response"""
     error = {
@@ -0,0 +1,65 @@
+"""
+HTTP validators (ETag / If-None-Match) for deterministic resources
+"""
+
+from typing import Any, Optional
+import hashlib
+
+from fastapi import Request, Response
+
+from utils.serialization import dumps
+
+
+# Suffixes added by CompressionMiddleware to encoded representations
+ENCODING_SUFFIXES = ("-zstd", "-br", "-gzip")
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag over the exact response bytes"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _strip_validator(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    if tag.endswith('"'):
+        for suffix in ENCODING_SUFFIXES:
+            if tag.endswith(suffix + '"'):
+                return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate If-None-Match against an ETag
+
+    Uses weak comparison as required for If-None-Match and accepts the
+    encoding-specific variants produced by the compression middleware.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_strip_validator(candidate) == etag for candidate in if_none_match.split(","))
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    media_type: str = "application/json"
+) -> Response:
+    """Return 304 when the client copy is current, else the full body with its ETag"""
+    etag = etag or compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def cached_json_response(request: Request, content: Any) -> Response:
+    """Serialize content and serve it with ETag / If-None-Match support"""
+    return conditional_response(request, dumps(content))
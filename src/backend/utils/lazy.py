@@ -0,0 +1,31 @@
+"""
+Deferred imports for heavy optional modules
+
+Heavy SDKs (numpy, boto3, openai, celery, ...) should not be imported while
+a worker boots. `lazy_import` returns a module proxy that performs the real
+import on first attribute access:
+
+    boto3 = lazy_import("boto3")
+    ...
+    client = boto3.client("s3")  # imported here, on first use
+"""
+
+import importlib
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        # Later lookups hit the real module directly
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return `name` if already imported, else a proxy that imports it on first use"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return _LazyModule(name)
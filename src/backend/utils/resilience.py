@@ -0,0 +1,272 @@
+"""
+Resilience primitives
+Per-dependency circuit breakers and bulkheads
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import settings
+from utils.errors import DependencyUnavailableError
+from utils.logging import logger
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Failure-rate and latency circuit breaker
+
+    Outcomes of the last `window` calls are kept in a ring; a call is bad
+    if it failed or took longer than `slow_call_seconds`. Once at least
+    `min_calls` are recorded and the bad share reaches `failure_rate`, the
+    breaker opens and callers fail fast for `open_seconds`. It then lets
+    `half_open_calls` concurrent trial calls through: if they all succeed
+    it closes, and any bad trial reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 1.0,
+        window: int = 50,
+        min_calls: int = 10,
+        open_seconds: float = 10.0,
+        half_open_calls: int = 3,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.window = window
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._outcomes = bytearray(window)  # 1 = bad
+        self._next = 0
+        self._calls = 0
+        self._bad = 0
+        self._trials = 0
+        self._trial_successes = 0
+        self.stats = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trials = self._trial_successes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now; every allowed call must be recorded"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._trials < self.half_open_calls:
+            self._trials += 1
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def record(self, success: bool, latency: float = 0.0) -> None:
+        """Record the outcome of an allowed call"""
+        slow = latency > self.slow_call_seconds
+        bad = not success or slow
+        self.stats["calls"] += 1
+        if not success:
+            self.stats["failures"] += 1
+        elif slow:
+            self.stats["slow_calls"] += 1
+
+        if self._state == HALF_OPEN:
+            self._trials -= 1
+            if bad:
+                self._open()
+            else:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self._close()
+            return
+        if self._state == OPEN:
+            return  # a call allowed before the breaker opened
+
+        index = self._next
+        self._bad += bad - self._outcomes[index]
+        self._outcomes[index] = bad
+        self._next = (index + 1) % self.window
+        self._calls = min(self._calls + 1, self.window)
+        if self._calls >= self.min_calls and self._bad >= self.failure_rate * self._calls:
+            self._open()
+
+    def cancel(self) -> None:
+        """An allowed call ended without an outcome (e.g. the caller was cancelled)"""
+        if self._state == HALF_OPEN:
+            self._trials -= 1
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self.clock()
+        self.stats["opened"] += 1
+        logger.warning(f"Circuit breaker {self.name} opened for {self.open_seconds:.0f}s")
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._outcomes = bytearray(self.window)
+        self._next = self._calls = self._bad = 0
+        logger.info(f"Circuit breaker {self.name} closed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self._bad / self._calls, 3) if self._calls else 0.0,
+            **self.stats,
+        }
+
+
+class Bulkhead:
+    """
+    Cap concurrent calls into one dependency
+
+    Callers beyond `capacity` wait at most `max_wait` seconds for a slot,
+    then fail fast, so a slow dependency ties up a bounded number of tasks
+    instead of every request the loop is serving.
+    """
+
+    def __init__(self, name: str, capacity: int, max_wait: float = 0.1):
+        self.name = name
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(capacity)
+        self.in_use = 0
+        self.rejected = 0
+
+    async def __aenter__(self):
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        else:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise DependencyUnavailableError(self.name, f"{self.capacity} concurrent calls in progress")
+        self.in_use += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.in_use -= 1
+        self._semaphore.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"capacity": self.capacity, "in_use": self.in_use, "rejected": self.rejected}
+
+
+class Dependency:
+    """An external dependency guarded by a circuit breaker and optionally a bulkhead"""
+
+    def __init__(self, name: str, breaker: CircuitBreaker, bulkhead: Optional[Bulkhead] = None):
+        self.name = name
+        self.breaker = breaker
+        self.bulkhead = bulkhead
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await fn(*args, **kwargs) through the bulkhead and breaker
+
+        Raises DependencyUnavailableError without calling fn when the
+        breaker is open or the bulkhead is full; any exception from fn
+        counts as a failure.
+        """
+        if self.bulkhead is None:
+            return await self._call(fn, *args, **kwargs)
+        async with self.bulkhead:
+            return await self._call(fn, *args, **kwargs)
+
+    async def _call(self, fn, *args, **kwargs) -> Any:
+        if not self.breaker.allow():
+            raise DependencyUnavailableError(self.name, "circuit open")
+        start = time.perf_counter()
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            self.breaker.cancel()
+            raise
+        except Exception:
+            self.breaker.record(False)
+            raise
+        self.breaker.record(True, time.perf_counter() - start)
+        return result
+
+    def call_sync(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Breaker-only guard for blocking client calls (no bulkhead: they hold the loop anyway)"""
+        if not self.breaker.allow():
+            raise DependencyUnavailableError(self.name, "circuit open")
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.breaker.record(False)
+            raise
+        self.breaker.record(True, time.perf_counter() - start)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = {"breaker": self.breaker.snapshot()}
+        if self.bulkhead is not None:
+            snapshot["bulkhead"] = self.bulkhead.snapshot()
+        return snapshot
+
+
+class DependencyRegistry:
+    """Named dependencies, reported together in /health and /metrics"""
+
+    def __init__(self):
+        self._dependencies: Dict[str, Dependency] = {}
+
+    def register(
+        self,
+        name: str,
+        slow_call_seconds: float,
+        concurrency: Optional[int] = None,
+        **breaker_options: Any
+    ) -> Dependency:
+        bulkhead = None
+        if concurrency:
+            bulkhead = Bulkhead(name, concurrency, settings.RESILIENCE_BULKHEAD_WAIT_MS / 1000)
+        breaker = CircuitBreaker(
+            name,
+            failure_rate=breaker_options.pop("failure_rate", settings.RESILIENCE_FAILURE_RATE),
+            slow_call_seconds=slow_call_seconds,
+            window=breaker_options.pop("window", settings.RESILIENCE_WINDOW),
+            min_calls=breaker_options.pop("min_calls", settings.RESILIENCE_MIN_CALLS),
+            open_seconds=breaker_options.pop("open_seconds", settings.RESILIENCE_OPEN_SECONDS),
+            half_open_calls=breaker_options.pop("half_open_calls", settings.RESILIENCE_HALF_OPEN_CALLS),
+            **breaker_options
+        )
+        dependency = self._dependencies[name] = Dependency(name, breaker, bulkhead)
+        return dependency
+
+    def __getitem__(self, name: str) -> Dependency:
+        return self._dependencies[name]
+
+    def health(self) -> Dict[str, str]:
+        return {name: dependency.breaker.state for name, dependency in self._dependencies.items()}
+
+    def state(self) -> Dict[str, Any]:
+        return {name: dependency.snapshot() for name, dependency in self._dependencies.items()}
+
+
+# Global dependency registry. Postgres has no bulkhead here: its
+# connection pool is one (DB_POOL_SIZE + DB_MAX_OVERFLOW, DB_POOL_TIMEOUT).
+dependencies = DependencyRegistry()
+dependencies.register("postgres", settings.RESILIENCE_POSTGRES_SLOW_MS / 1000)
+dependencies.register("redis", settings.RESILIENCE_REDIS_SLOW_MS / 1000, settings.RESILIENCE_REDIS_CONCURRENCY)
+dependencies.register("s3", settings.RESILIENCE_S3_SLOW_MS / 1000, settings.RESILIENCE_S3_CONCURRENCY)
+dependencies.register("llm", settings.RESILIENCE_LLM_SLOW_MS / 1000, settings.RESILIENCE_LLM_CONCURRENCY)
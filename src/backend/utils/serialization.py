@@ -0,0 +1,55 @@
+"""
+Fast JSON serialization using orjson
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """
+    Serialize types orjson does not handle natively
+
+    datetime, date, time, UUID and dataclasses are native to orjson.
+    Decimals are written as exact JSON numbers rather than floats so
+    monetary values keep their precision.
+    """
+    if isinstance(obj, Decimal):
+        if not obj.is_finite():
+            return None
+        return orjson.Fragment(str(obj).encode())
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return bytes(obj).hex()
+    # Driver row types (SQLAlchemy Row, asyncpg Record) are tuple-like
+    if hasattr(obj, "__iter__") and hasattr(obj, "__getitem__"):
+        return tuple(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def dumps_lines(items: Iterable[Any]) -> bytes:
+    """Serialize each item as one line of JSON (orjson escapes newlines inside strings)"""
+    option = ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+    return b"".join([orjson.dumps(item, default=_default, option=option) for item in items])
+
+
+class AureusJSONResponse(JSONResponse):
+    """Default JSON response class backed by orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
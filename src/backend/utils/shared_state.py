@@ -0,0 +1,310 @@
+"""
+Shared worker state
+Counters and revoked tokens shared by the worker processes of one host
+"""
+
+import asyncio
+import atexit
+import hashlib
+import os
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional
+
+from config import settings
+from utils.logging import logger
+
+
+# Set by the launcher in each worker's environment
+SEGMENT_ENV = "AUREUS_SHARED_STATE"
+SLOT_ENV = "AUREUS_WORKER_SLOT"
+POSITION_ENV = "AUREUS_WORKER_POSITION"  # stable across restarts, unlike the slot
+
+MAGIC = 0x31535341  # "ASS1"
+
+# Header words: magic, worker slots, revocation slots per generation,
+# revocation hashes, rotation seconds, then the period each of the three
+# revocation generations holds
+HEADER_WORDS = 16
+_SLOTS, _REVOCATION_SIZE, _REVOCATION_HASHES, _ROTATION, _TAGS = 1, 2, 3, 4, 5
+GENERATIONS = 3
+
+# Worker states
+EMPTY, STARTING, READY, DRAINING = 0, 1, 2, 3
+STATE_NAMES = {EMPTY: "empty", STARTING: "starting", READY: "ready", DRAINING: "draining"}
+
+# Fields of a worker row, then the counters copied from the worker's metrics
+ROW_FIELDS = ("pid", "state", "started_at", "heartbeat_at")
+COUNTERS = (
+    "requests.count",
+    "requests.errors",
+    "queries.total",
+    "queries.failed",
+    "queries.rows_returned",
+)
+ROW_WIDTH = len(ROW_FIELDS) + len(COUNTERS)
+
+_PID, _STATE, _STARTED_AT, _HEARTBEAT_AT = range(len(ROW_FIELDS))
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class SharedState:
+    """
+    Fixed-layout view over one shared memory segment
+
+    Row 0 holds the counters of workers that have exited; rows 1..slots
+    belong to one worker each. A worker only writes its own row (counters
+    are copied from its metrics once a second), so no locks are needed:
+    readers sum the rows.
+
+    Revoked token IDs go in a Bloom filter with one byte per slot (setting
+    a byte is idempotent, so concurrent writers never lose each other's
+    entries). The filter has three generations rotated every access token
+    lifetime: a revocation is written to the current period's generation
+    and checked against the current and previous ones, which covers every
+    token still unexpired. The next generation is cleared a period ahead,
+    by whichever process notices first, so nobody clears a generation
+    that is being written. With 1M slots and 10 hashes the false positive
+    rate is about 1e-10 at 10,000 revocations per token lifetime and 1e-4
+    at 50,000.
+
+    Without the launcher, the same layout lives in private memory with a
+    single worker slot.
+    """
+
+    def __init__(self, buffer, slot: int, segment: Optional[shared_memory.SharedMemory] = None):
+        self._bytes = memoryview(buffer)
+        self._words = self._bytes.cast("q")
+        if self._words[0] != MAGIC:
+            raise ValueError("Not a shared state segment")
+        self.slot = slot
+        self.segment = segment
+        self.slots = self._words[_SLOTS]
+        self.revocation_size = self._words[_REVOCATION_SIZE]
+        self.revocation_hashes = self._words[_REVOCATION_HASHES]
+        self.rotation = self._words[_ROTATION]
+        self._revocation_offset = (HEADER_WORDS + (self.slots + 1) * ROW_WIDTH) * 8
+        self.revoked = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def size(slots: int, revocation_size: int) -> int:
+        return (HEADER_WORDS + (slots + 1) * ROW_WIDTH) * 8 + GENERATIONS * revocation_size
+
+    @staticmethod
+    def _initialize(buffer, slots: int, revocation_size: int, revocation_hashes: int, rotation: int) -> None:
+        words = memoryview(buffer).cast("q")
+        words[_SLOTS] = slots
+        words[_REVOCATION_SIZE] = revocation_size
+        words[_REVOCATION_HASHES] = revocation_hashes
+        words[_ROTATION] = rotation
+        for generation in range(GENERATIONS):
+            words[_TAGS + generation] = -1
+        words[0] = MAGIC
+
+    @classmethod
+    def create(
+        cls,
+        slots: int,
+        revocation_size: int = 1 << 20,
+        revocation_hashes: int = 10,
+        rotation: int = 3600
+    ) -> "SharedState":
+        """New shared segment (launcher side); unlink it with `close(unlink=True)`"""
+        segment = shared_memory.SharedMemory(create=True, size=cls.size(slots, revocation_size))
+        cls._initialize(segment.buf, slots, revocation_size, revocation_hashes, rotation)
+        return cls(segment.buf, 0, segment)
+
+    @classmethod
+    def attach(cls, name: str, slot: int) -> "SharedState":
+        """Attach a worker to the launcher's segment"""
+        segment = shared_memory.SharedMemory(name=name)
+        state = cls(segment.buf, slot, segment)
+        # Views into the segment must be released before it can be closed
+        atexit.register(state.close)
+        return state
+
+    @classmethod
+    def local(cls, revocation_size: int = 1 << 20, revocation_hashes: int = 10, rotation: int = 3600) -> "SharedState":
+        """Single-process state in private memory"""
+        buffer = bytearray(cls.size(1, revocation_size))
+        cls._initialize(buffer, 1, revocation_size, revocation_hashes, rotation)
+        return cls(buffer, 1)
+
+    def close(self, unlink: bool = False) -> None:
+        if self.segment is None:
+            return
+        self._words.release()
+        self._bytes.release()
+        self.segment.close()
+        if unlink:
+            self.segment.unlink()
+        self.segment = None
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.segment.name if self.segment is not None else None
+
+    # Worker rows
+
+    def _row(self, slot: int) -> int:
+        return HEADER_WORDS + slot * ROW_WIDTH
+
+    def claim(self, pid: Optional[int] = None) -> None:
+        """Take over this worker's row"""
+        base = self._row(self.slot)
+        for index in range(ROW_WIDTH):
+            self._words[base + index] = 0
+        now = _now_ms()
+        self._words[base + _PID] = pid or os.getpid()
+        self._words[base + _STARTED_AT] = now
+        self._words[base + _HEARTBEAT_AT] = now
+        self._words[base + _STATE] = STARTING
+
+    def set_state(self, state: int) -> None:
+        self._words[self._row(self.slot) + _STATE] = state
+
+    def worker_state(self, slot: int) -> int:
+        return self._words[self._row(slot) + _STATE]
+
+    def publish(self, values: Dict[str, float]) -> None:
+        """Copy this worker's counters into its row and refresh its heartbeat"""
+        base = self._row(self.slot)
+        for index, name in enumerate(COUNTERS, len(ROW_FIELDS)):
+            self._words[base + index] = int(values.get(name, 0))
+        self._words[base + _HEARTBEAT_AT] = _now_ms()
+
+    def retire(self, slot: int) -> None:
+        """Fold an exited worker's counters into row 0 and free its row (launcher only)"""
+        base = self._row(slot)
+        for index in range(len(ROW_FIELDS), ROW_WIDTH):
+            self._words[index + HEADER_WORDS] += self._words[base + index]
+        for index in range(ROW_WIDTH):
+            self._words[base + index] = 0
+
+    def workers(self) -> List[Dict[str, Any]]:
+        now = _now_ms()
+        workers = []
+        for slot in range(1, self.slots + 1):
+            base = self._row(slot)
+            state = self._words[base + _STATE]
+            if state == EMPTY:
+                continue
+            workers.append({
+                "slot": slot,
+                "pid": self._words[base + _PID],
+                "state": STATE_NAMES.get(state, "unknown"),
+                "uptime_s": round((now - self._words[base + _STARTED_AT]) / 1000, 1),
+                "heartbeat_age_s": round((now - self._words[base + _HEARTBEAT_AT]) / 1000, 1),
+                **{name: self._words[base + index] for index, name in enumerate(COUNTERS, len(ROW_FIELDS))},
+            })
+        return workers
+
+    def totals(self) -> Dict[str, int]:
+        """Counters summed over every worker, including ones that exited"""
+        totals = dict.fromkeys(COUNTERS, 0)
+        for slot in range(self.slots + 1):
+            base = self._row(slot)
+            for index, name in enumerate(COUNTERS, len(ROW_FIELDS)):
+                totals[name] += self._words[base + index]
+        return totals
+
+    # Token revocation
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.revocation_size for i in range(self.revocation_hashes)]
+
+    def _generation(self, generation: int, period: int) -> int:
+        """Byte offset of a generation, cleared first if it holds an older period"""
+        start = self._revocation_offset + generation * self.revocation_size
+        if self._words[_TAGS + generation] != period:
+            self._bytes[start:start + self.revocation_size] = bytes(self.revocation_size)
+            self._words[_TAGS + generation] = period
+        return start
+
+    def prepare_rotation(self, now: Optional[float] = None) -> None:
+        """Clear the next period's generation ahead of time (called once a second)"""
+        period = int((now or time.time()) // self.rotation) + 1
+        self._generation(period % GENERATIONS, period)
+
+    def revoke(self, key: str, now: Optional[float] = None) -> None:
+        """Mark a token ID revoked on every worker until it would have expired"""
+        period = int((now or time.time()) // self.rotation)
+        start = self._generation(period % GENERATIONS, period)
+        for position in self._positions(key):
+            self._bytes[start + position] = 1
+        self.revoked += 1
+
+    def is_revoked(self, key: str, now: Optional[float] = None) -> bool:
+        period = int((now or time.time()) // self.rotation)
+        positions = None
+        for current in (period, period - 1):
+            generation = current % GENERATIONS
+            if self._words[_TAGS + generation] != current:
+                continue
+            positions = positions or self._positions(key)
+            start = self._revocation_offset + generation * self.revocation_size
+            if all(self._bytes[start + position] for position in positions):
+                return True
+        return False
+
+    # Heartbeat
+
+    def start(self, sample: Callable[[], Dict[str, float]], interval: float = 1.0) -> None:
+        """Claim this worker's row and publish `sample()` every `interval` seconds"""
+        if self._task is not None and not self._task.done():
+            return
+        self.claim()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat(sample, interval))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _heartbeat(self, sample: Callable[[], Dict[str, float]], interval: float) -> None:
+        while True:
+            try:
+                self.publish(sample())
+                self.prepare_rotation()
+            except Exception as e:
+                logger.error(f"Publishing shared worker state failed: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "shared": self.segment is not None,
+            "worker_slot": self.slot,
+            "workers": self.workers(),
+            "totals": self.totals(),
+            "revoked_here": self.revoked,
+        }
+
+
+def _from_environment() -> SharedState:
+    name = os.environ.get(SEGMENT_ENV)
+    if name:
+        try:
+            return SharedState.attach(name, int(os.environ.get(SLOT_ENV, "1")))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Attaching shared state segment {name} failed, using private state: {str(e)}")
+    return SharedState.local(
+        settings.SHARED_STATE_REVOCATION_SLOTS,
+        settings.SHARED_STATE_REVOCATION_HASHES,
+        settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    )
+
+
+# Global shared state: the launcher's segment in a launched worker, private otherwise
+shared_state = _from_environment()
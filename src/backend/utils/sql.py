@@ -0,0 +1,191 @@
+"""
+SQL text utilities
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+from utils.errors import SQLValidationError
+
+
+# Unquoted lowercase Postgres identifier, for table and column names taken from requests
+IDENTIFIER_RE = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+_TOKEN_RE = re.compile(
+    r"""
+      (?P<literal>'(?:[^']|'')*'|"(?:[^"]|"")*")   # string literals and quoted identifiers
+    | (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<space>\s+)
+    | (?P<word>\w+)
+    | (?P<symbol>.)
+    """,
+    re.VERBOSE | re.DOTALL
+)
+
+# Keywords after which + or - before a number is its sign, not arithmetic
+_SIGN_KEYWORDS = frozenset((
+    "select", "where", "and", "or", "not", "between", "when", "then", "else",
+    "in", "is", "like", "by", "limit", "offset", "having", "on", "values", "return"
+))
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Canonical form of a SQL statement for identity comparisons
+
+    Comments are dropped, keywords and unquoted identifiers lowercased and
+    whitespace collapsed (and removed next to punctuation), while string
+    literals and quoted identifiers are kept verbatim. Trailing semicolons
+    are ignored. Two statements with the same normal form are the same
+    query; the result is not meant to be executed.
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        if kind in ("comment", "space"):
+            continue
+        token = match.group()
+        tokens.append(token if kind == "literal" else token.lower())
+
+    return _join_tokens(tokens)
+
+
+@lru_cache(maxsize=1024)
+def query_shape(sql: str) -> str:
+    """
+    Normalized SQL with constant values replaced by ?
+
+    Statements that differ only in string or numeric literals (including
+    their sign), or in the length of a literal list such as IN (1, 2, 3),
+    share a shape. Bind placeholders (:name) are kept, so a template has
+    one shape.
+    """
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        token = match.group()
+        if kind in ("comment", "space"):
+            continue
+        if kind == "literal":
+            tokens.append("?" if token[0] == "'" else token)
+        elif kind == "word" and token[0].isdigit():
+            if tokens[-2:] == ["?", "."]:
+                tokens.pop()  # fractional part of a decimal already replaced
+            elif not (tokens and tokens[-1] in (":", "$")):
+                if tokens and tokens[-1] in ("-", "+") and _is_sign(tokens[:-1]):
+                    tokens.pop()
+                tokens.append("?")
+            else:
+                tokens.append(token)
+        elif token == ")" and len(tokens) >= 2 and tokens[-1] == "?":
+            # Collapse "( ?, ?, ... )" to "( ? )"
+            i = len(tokens) - 1
+            while i >= 2 and tokens[i - 1] == "," and tokens[i - 2] == "?":
+                i -= 2
+            if tokens[i - 1] == "(":
+                del tokens[i + 1:]
+            tokens.append(")")
+        else:
+            tokens.append(token.lower())
+    return _join_tokens(tokens)
+
+
+def _is_sign(preceding: List[str]) -> bool:
+    # A sign follows an operator, an opening bracket, a comma or a keyword, never an operand
+    if not preceding:
+        return True
+    token = preceding[-1]
+    if token[0].isalnum() or token[0] in "_\"'":
+        return token in _SIGN_KEYWORDS
+    return token not in (")", "]", "?")
+
+
+def shape_fingerprint(sql: str) -> str:
+    """
+    Identity of a query shape: digest of query_shape(sql)
+
+    The one fingerprint used for query history, its rollups and slow-query
+    analytics, so a dashboard row and /v1/admin/slow-queries/{fingerprint}
+    refer to the same shape.
+    """
+    return hashlib.blake2b(query_shape(sql).encode(), digest_size=16).hexdigest()
+
+
+def _join_tokens(tokens: List[str]) -> str:
+    while tokens and tokens[-1] == ";":
+        tokens.pop()
+
+    parts = []
+    previous_is_word = False
+    for token in tokens:
+        is_word = token[0].isalnum() or token[0] in "_'\""
+        if parts and is_word and previous_is_word:
+            parts.append(" ")
+        parts.append(token)
+        previous_is_word = is_word
+    return "".join(parts)
+
+
+DANGEROUS_KEYWORDS = [
+    "DROP", "DELETE", "INSERT", "UPDATE", "ALTER",
+    "CREATE", "TRUNCATE", "GRANT", "REVOKE"
+]
+
+
+def validate_read_only_sql(sql: str) -> None:
+    """
+    Basic read-only check: a single SELECT without DDL/DML keywords
+
+    Raises:
+        SQLValidationError: If SQL is not a plain SELECT
+    """
+    sql_upper = sql.upper().strip()
+    
+    if not sql_upper.startswith("SELECT"):
+        raise SQLValidationError("Only SELECT queries are allowed")
+    
+    for keyword in DANGEROUS_KEYWORDS:
+        if keyword in sql_upper:
+            raise SQLValidationError(f"Keyword '{keyword}' is not allowed")
+
+
+def bind_parameter_names(sql: str) -> Tuple[str, ...]:
+    """Distinct :name bind parameters in order of first use"""
+    return compile_named_parameters(sql)[1]
+
+
+@lru_cache(maxsize=1024)
+def compile_named_parameters(sql: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Rewrite :name bind parameters as asyncpg positional $n parameters
+
+    String literals, quoted identifiers, comments and ::type casts are left
+    untouched; a name used twice maps to the same position.
+
+    Returns:
+        (positional SQL, parameter names in position order)
+    """
+    names: List[str] = []
+    parts = []
+    tokens = list(_TOKEN_RE.finditer(sql))
+    i = 0
+    while i < len(tokens):
+        token = tokens[i].group()
+        is_bind = (
+            token == ":"
+            and i + 1 < len(tokens)
+            and tokens[i + 1].lastgroup == "word"
+            and not (i > 0 and tokens[i - 1].group() == ":")
+        )
+        if is_bind:
+            name = tokens[i + 1].group()
+            if name not in names:
+                names.append(name)
+            parts.append(f"${names.index(name) + 1}")
+            i += 2
+            continue
+        parts.append(token)
+        i += 1
+    return "".join(parts), tuple(names)
@@ -0,0 +1,15 @@
+"""
+Shared fixtures for backend tests
+The backend uses top-level imports (`from config import settings`), so its
+source directory must be on sys.path
+"""
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent.parent / "backend"
+
+sys.path.insert(0, str(BACKEND_DIR))
+
+# No Redis in unit tests
+os.environ.setdefault("RATE_LIMIT_STORAGE_URI", "memory://")
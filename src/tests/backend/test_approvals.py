@@ -0,0 +1,206 @@
+"""
+Tests for the approval workflow API
+Covers keyset pagination of the request listing and bulk approve/reject
+with optimistic concurrency
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.dialects import postgresql
+
+from api import approval
+from db.session import get_db, get_read_db
+from models.approval import ApprovalRequest, ApprovalStatus
+from security.auth import get_current_user
+
+T0 = datetime(2026, 10, 19, 9, 0)
+
+
+def request(minutes, status=ApprovalStatus.pending, dataset_id="dataset-1", requested_by="user-1"):
+    return ApprovalRequest(
+        id=uuid.uuid4(), dataset_id=dataset_id, requested_by=requested_by, approver_id=None,
+        status=status, comment=None, version=1,
+        created_at=T0 + timedelta(minutes=minutes), updated_at=T0 + timedelta(minutes=minutes)
+    )
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class ListingSession:
+    """Session stand-in evaluating the listing query's filters, keyset and limit in Python"""
+
+    def __init__(self, requests):
+        self.requests = requests
+        self.statements = []
+
+    async def execute(self, statement):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        sql, params = str(compiled), compiled.params
+        self.statements.append((sql, params))
+
+        rows = sorted(self.requests, key=lambda row: (row.created_at, row.id), reverse=True)
+        if "status = 'pending'" in sql:
+            rows = [row for row in rows if row.status == ApprovalStatus.pending]
+        for column in ("status", "dataset_id", "requested_by"):
+            if f"{column}_1" in params:
+                rows = [row for row in rows if getattr(row, column) == params[f"{column}_1"]]
+        after = [value for value in params.values() if isinstance(value, (datetime, uuid.UUID))]
+        if after:
+            rows = [row for row in rows if (row.created_at, row.id) < tuple(after)]
+        return FakeResult(rows[:statement._limit])
+
+
+class BulkSession:
+    """Session stand-in returning preset rows for the bulk UPDATE ... RETURNING"""
+
+    def __init__(self, updated):
+        self.updated = updated
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return FakeResult(self.updated)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def call(session, method, path, role="approver", **kwargs):
+    app = FastAPI()
+    app.include_router(approval.router, prefix="/v1/approvals")
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="approver-1", role=role)
+    app.dependency_overrides[get_read_db] = lambda: session
+    app.dependency_overrides[get_db] = lambda: session
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+
+    return asyncio.run(run())
+
+
+def walk(session, limit, **params):
+    """Every page of the listing, following next_cursor"""
+    pages, cursor = [], None
+    while True:
+        query = dict(params, limit=limit, **({"cursor": cursor} if cursor else {}))
+        body = call(session, "GET", "/v1/approvals/requests", params=query).json()
+        pages.append([item["id"] for item in body["items"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+class TestKeysetListing:
+    """Test suite for the newest-first keyset listing"""
+
+    def test_pages_cover_every_request_once_newest_first(self):
+        requests = [request(minutes) for minutes in range(7)]
+        pages = walk(ListingSession(requests), limit=3)
+        expected = [str(row.id) for row in sorted(requests, key=lambda row: row.created_at, reverse=True)]
+        assert pages == [expected[0:3], expected[3:6], expected[6:7]]
+
+    def test_ties_on_created_at_broken_by_id(self):
+        """Requests created in the same instant are neither skipped nor repeated across pages"""
+        requests = [request(0) for _ in range(5)]
+        pages = walk(ListingSession(requests), limit=2)
+        listed = [request_id for page in pages for request_id in page]
+        assert sorted(listed) == sorted(str(row.id) for row in requests)
+        assert len(listed) == 5
+
+    def test_exact_page_has_no_cursor(self):
+        pages = walk(ListingSession([request(minutes) for minutes in range(3)]), limit=3)
+        assert len(pages) == 1
+
+    def test_filters_apply_to_every_page(self):
+        requests = [request(minutes, dataset_id="dataset-2" if minutes % 2 else "dataset-1") for minutes in range(6)]
+        pages = walk(ListingSession(requests), limit=2, dataset_id="dataset-2")
+        listed = {request_id for page in pages for request_id in page}
+        assert listed == {str(row.id) for row in requests if row.dataset_id == "dataset-2"}
+
+    def test_pending_filter_matches_partial_index(self):
+        session = ListingSession([request(0), request(1, status=ApprovalStatus.approved)])
+        body = call(session, "GET", "/v1/approvals/requests", params={"status": "pending"}).json()
+        assert [item["status"] for item in body["items"]] == ["pending"]
+        sql, _ = session.statements[0]
+        assert "approval_requests.status = 'pending'" in sql
+
+    def test_invalid_cursor_rejected(self):
+        response = call(ListingSession([]), "GET", "/v1/approvals/requests", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+
+class TestBulkActions:
+    """Test suite for bulk approve/reject"""
+
+    @pytest.fixture
+    def published(self, monkeypatch):
+        events = []
+        monkeypatch.setattr(approval.event_broker, "publish", lambda *args, **kwargs: events.append((args, kwargs)))
+        return events
+
+    def test_stale_or_decided_requests_reported_as_conflicts(self, published):
+        fresh, stale = uuid.uuid4(), uuid.uuid4()
+        session = BulkSession([SimpleNamespace(id=fresh, version=3, dataset_id="dataset-1", requested_by="user-1")])
+        response = call(session, "POST", "/v1/approvals/requests/bulk-action", json={
+            "action": "approve",
+            "items": [{"id": str(fresh), "version": 2}, {"id": str(stale), "version": 1}],
+        })
+        assert response.status_code == 200
+        assert response.json() == {"action": "approve", "applied": [{"id": str(fresh), "version": 3}], "conflicts": [str(stale)]}
+        assert session.commits == 1
+
+    def test_one_statement_guarded_by_version_and_status(self, published):
+        session = BulkSession([])
+        call(session, "POST", "/v1/approvals/requests/bulk-action", json={
+            "action": "reject", "items": [{"id": str(uuid.uuid4()), "version": 1}],
+        })
+        [sql] = session.statements
+        assert sql.startswith("UPDATE approval_requests")
+        assert "(approval_requests.id, approval_requests.version) IN" in sql
+        assert "approval_requests.status = %(status_1)s" in sql
+        assert "RETURNING" in sql
+
+    def test_only_applied_requests_notified(self, published):
+        applied = SimpleNamespace(id=uuid.uuid4(), version=2, dataset_id="dataset-1", requested_by="user-7")
+        call(BulkSession([applied]), "POST", "/v1/approvals/requests/bulk-action", json={
+            "action": "approve",
+            "items": [{"id": str(applied.id), "version": 1}, {"id": str(uuid.uuid4()), "version": 1}],
+        })
+        [(args, kwargs)] = published
+        assert args[0] == "approval.updated"
+        assert [item["id"] for item in args[1]["items"]] == [applied.id]
+        assert kwargs["user_ids"] == {"user-7"}
+
+    def test_nothing_applied_publishes_nothing(self, published):
+        call(BulkSession([]), "POST", "/v1/approvals/requests/bulk-action", json={
+            "action": "approve", "items": [{"id": str(uuid.uuid4()), "version": 1}],
+        })
+        assert published == []
+
+    def test_requires_approver(self, published):
+        session = BulkSession([])
+        response = call(session, "POST", "/v1/approvals/requests/bulk-action", role="analyst", json={
+            "action": "approve", "items": [{"id": str(uuid.uuid4()), "version": 1}],
+        })
+        assert response.status_code == 403
+        assert session.statements == []
+
+    def test_empty_batch_rejected(self, published):
+        response = call(BulkSession([]), "POST", "/v1/approvals/requests/bulk-action", json={"action": "approve", "items": []})
+        assert response.status_code == 422
@@ -0,0 +1,85 @@
+"""
+Tests for the asyncpg executor
+Covers beginning the session's transaction before statements go straight
+to the driver
+"""
+import asyncio
+
+from sqlalchemy.dialects.postgresql.asyncpg import AsyncAdapt_asyncpg_connection
+
+from services.asyncpg_executor import AsyncpgExecutor
+
+
+class FakeTransaction:
+    def __init__(self, driver, options):
+        self.driver = driver
+        self.options = options
+
+    async def start(self):
+        self.driver.begun.append(self.options)
+
+
+class FakeDriver:
+    """asyncpg connection stand-in recording the transactions it begins"""
+
+    def __init__(self):
+        self.begun = []
+
+    def transaction(self, **options):
+        return FakeTransaction(self, options)
+
+
+class FakeRaw:
+    def __init__(self, adapter, driver):
+        self.dbapi_connection = adapter
+        self.driver_connection = driver
+
+
+class FakeConnection:
+    def __init__(self, raw):
+        self.raw = raw
+
+    async def get_raw_connection(self):
+        return self.raw
+
+
+class FakeSession:
+    def __init__(self, raw):
+        self.raw = raw
+
+    async def connection(self):
+        return FakeConnection(self.raw)
+
+
+def driver_connection(readonly=False, isolation_level="read_committed", calls=1):
+    async def run():
+        driver = FakeDriver()
+        adapter = AsyncAdapt_asyncpg_connection(None, driver)
+        adapter.readonly = readonly
+        adapter.isolation_level = isolation_level
+        session = FakeSession(FakeRaw(adapter, driver))
+        executor = AsyncpgExecutor()
+        for _ in range(calls):
+            assert await executor.driver_connection(session) is driver
+        return driver.begun, adapter._started
+
+    return asyncio.run(run())
+
+
+class TestDriverConnection:
+    """Test suite for the session transaction on the raw driver path"""
+
+    def test_read_only_session_begins_read_only(self):
+        """get_read_db sessions run driver statements under BEGIN READ ONLY"""
+        begun, started = driver_connection(readonly=True)
+        assert [options["readonly"] for options in begun] == [True]
+        assert started
+
+    def test_transaction_begins_once(self):
+        begun, _ = driver_connection(calls=3)
+        assert len(begun) == 1
+
+    def test_autocommit_session_has_no_transaction(self):
+        begun, started = driver_connection(isolation_level="autocommit")
+        assert begun == []
+        assert not started
@@ -0,0 +1,82 @@
+"""
+Tests for the dataset catalog
+Covers merging cards stored by other workers and saving cards
+"""
+import asyncio
+
+from models.catalog import DatasetCardRecord
+from services.catalog import DEFAULT_DATASETS, DatasetCatalog
+
+LOANS = DEFAULT_DATASETS[0]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session stand-in over a dict of dataset_cards rows"""
+
+    def __init__(self, table):
+        self.table = table
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        return FakeResult(list(self.table.values()))
+
+    async def commit(self):
+        pass
+
+
+class FakeCatalog(DatasetCatalog):
+    """Catalog whose saves go to a dict"""
+
+    def __init__(self, table):
+        super().__init__(DEFAULT_DATASETS, session_factory=lambda: FakeSession(table))
+        self.table = table
+        self.changes = []
+        self.subscribe(lambda dataset_id, card: self.changes.append(dataset_id), replay=False)
+
+    async def _write(self, session, row):
+        self.table[row["dataset_id"]] = DatasetCardRecord(**row)
+
+
+class TestSharedCards:
+    """Test suite for cards shared across workers"""
+
+    def test_saved_card_reaches_other_workers(self):
+        table = {}
+        card = {"id": "new_loans", "name": "new_loans", "description": "", "row_count": 10}
+        asyncio.run(FakeCatalog(table).save(card))
+
+        other = FakeCatalog(table)
+        asyncio.run(other.load(FakeSession(table)))
+        assert other.get("new_loans") == card
+        assert other.changes == ["new_loans"]
+
+    def test_stored_card_replaces_seed(self):
+        table = {}
+        updated = dict(LOANS, row_count=42)
+        asyncio.run(FakeCatalog(table).save(updated))
+
+        other = FakeCatalog(table)
+        asyncio.run(other.load(FakeSession(table)))
+        assert other.get(LOANS["name"])["row_count"] == 42
+
+    def test_unchanged_cards_do_not_notify(self):
+        table = {"dataset-1": DatasetCardRecord(dataset_id="dataset-1", card=LOANS)}
+        catalog = FakeCatalog(table)
+        asyncio.run(catalog.load(FakeSession(table)))
+        assert catalog.changes == []
@@ -0,0 +1,336 @@
+"""
+Tests for query coalescing
+Covers single-flight within a worker, leader failure and cancellation,
+the coalescing key and the Redis-coordinated path across workers
+"""
+import asyncio
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from services.coalescing import QueryCoalescer, coalescing_key, decode_outcome, encode_outcome
+
+COLUMNS = ["id", "amount"]
+ROWS = [(1, Decimal("10.50")), (2, Decimal("3.00"))]
+
+
+class CountingQuery:
+    """Query stand-in that blocks until released and counts executions"""
+
+    def __init__(self, rows=ROWS, error=None):
+        self.rows = rows
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return COLUMNS, self.rows
+
+
+async def settle():
+    """Let every started task reach its first await"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestSingleFlight:
+    """Test suite for coalescing within one worker"""
+
+    def test_identical_concurrent_queries_share_one_execution(self):
+        async def run():
+            coalescer, query = QueryCoalescer(), CountingQuery()
+            tasks = [asyncio.create_task(coalescer.run("k", f"exec-{index}", query)) for index in range(5)]
+            await settle()
+            query.release.set()
+            return coalescer, query, await asyncio.gather(*tasks)
+
+        coalescer, query, results = asyncio.run(run())
+        assert query.calls == 1
+        assert all(outcome == ("exec-0", COLUMNS, ROWS) for outcome, _ in results)
+        assert results[0][1] == {"coalesced": False, "scope": "leader", "leader_execution_id": "exec-0"}
+        assert {info["scope"] for _, info in results[1:]} == {"local"}
+        assert coalescer.state() == {
+            "in_flight": 0, "leader": 1, "local_follower": 4, "remote_follower": 0, "redis_errors": 0, "redis_skipped": 0
+        }
+
+    def test_different_keys_run_separately(self):
+        async def run():
+            coalescer, query = QueryCoalescer(), CountingQuery()
+            query.release.set()
+            await asyncio.gather(coalescer.run("a", "exec-1", query), coalescer.run("b", "exec-2", query))
+            return query.calls
+
+        assert asyncio.run(run()) == 2
+
+    def test_completed_results_are_not_reused(self):
+        async def run():
+            coalescer, query = QueryCoalescer(), CountingQuery()
+            query.release.set()
+            await coalescer.run("k", "exec-1", query)
+            outcome, info = await coalescer.run("k", "exec-2", query)
+            return query.calls, info
+
+        calls, info = asyncio.run(run())
+        assert calls == 2
+        assert info["scope"] == "leader"
+
+    def test_leader_failure_reaches_followers_and_clears_key(self):
+        async def run():
+            coalescer, query = QueryCoalescer(), CountingQuery(error=RuntimeError("relation does not exist"))
+            tasks = [asyncio.create_task(coalescer.run("k", f"exec-{index}", query)) for index in range(3)]
+            await settle()
+            query.release.set()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+            retry = CountingQuery()
+            retry.release.set()
+            outcome, _ = await coalescer.run("k", "exec-retry", retry)
+            return coalescer, query, results, outcome
+
+        coalescer, query, results, outcome = asyncio.run(run())
+        assert query.calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert outcome[0] == "exec-retry"
+        assert coalescer.state()["in_flight"] == 0
+
+    def test_cancelled_leader_hands_over_to_follower(self):
+        async def run():
+            coalescer, query = QueryCoalescer(), CountingQuery()
+            leader = asyncio.create_task(coalescer.run("k", "exec-leader", query))
+            await settle()
+            follower = asyncio.create_task(coalescer.run("k", "exec-follower", query))
+            await settle()
+            leader.cancel()
+            await settle()
+            query.release.set()
+            outcome, info = await follower
+            return query.calls, outcome, info, leader.cancelled()
+
+        calls, outcome, info, leader_cancelled = asyncio.run(run())
+        assert leader_cancelled
+        assert calls == 2
+        assert outcome[0] == "exec-follower"
+        assert info["scope"] == "leader"
+
+    def test_cancelled_follower_leaves_leader_running(self):
+        async def run():
+            coalescer, query = QueryCoalescer(), CountingQuery()
+            leader = asyncio.create_task(coalescer.run("k", "exec-leader", query))
+            await settle()
+            follower = asyncio.create_task(coalescer.run("k", "exec-follower", query))
+            await settle()
+            follower.cancel()
+            await settle()
+            query.release.set()
+            outcome, _ = await leader
+            return query.calls, outcome
+
+        calls, outcome = asyncio.run(run())
+        assert calls == 1
+        assert outcome[0] == "exec-leader"
+
+
+class TestKey:
+    """Test suite for the coalescing key"""
+
+    def test_whitespace_and_case_insensitive_keywords(self):
+        assert coalescing_key("SELECT *  FROM loans", "dataset-1", "analyst") == \
+            coalescing_key("select * from loans", "dataset-1", "analyst")
+
+    def test_role_dataset_and_params_are_part_of_identity(self):
+        base = coalescing_key("SELECT 1", "dataset-1", "analyst", {"a": 1})
+        assert base != coalescing_key("SELECT 1", "dataset-1", "admin", {"a": 1})
+        assert base != coalescing_key("SELECT 1", "dataset-2", "analyst", {"a": 1})
+        assert base != coalescing_key("SELECT 1", "dataset-1", "analyst", {"a": 2})
+
+    def test_param_order_ignored(self):
+        assert coalescing_key("SELECT 1", "d", "r", {"a": 1, "b": 2}) == coalescing_key("SELECT 1", "d", "r", {"b": 2, "a": 1})
+
+
+class TestOutcomePayload:
+    """Test suite for outcomes shared through Redis"""
+
+    def test_driver_types_round_trip(self):
+        row = (
+            Decimal("1.10"), datetime(2026, 10, 19, 9, 30), date(2026, 10, 19), time(9, 30),
+            timedelta(seconds=90), uuid.UUID(int=7), b"\x00\xff", None, "text", 3, 1.5, True,
+        )
+        assert decode_outcome(encode_outcome(("exec-1", ["c"] * len(row), [row]))) == ("exec-1", ["c"] * len(row), [row])
+
+    def test_published_error_raises(self):
+        with pytest.raises(RuntimeError, match="boom"):
+            decode_outcome(orjson.dumps({"error": "boom"}))
+
+
+class FakeLock:
+    def __init__(self, redis, name):
+        self.redis = redis
+        self.name = name
+
+    async def acquire(self):
+        if self.name in self.redis.locks:
+            return False
+        self.redis.locks.add(self.name)
+        return True
+
+    async def release(self):
+        self.redis.locks.discard(self.name)
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return {"data": await asyncio.wait_for(self.queue.get(), timeout)}
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, px=None):
+        self.commands.append(("set", key, value))
+
+    def publish(self, channel, message):
+        self.commands.append(("publish", channel, message))
+
+    async def execute(self):
+        for command, key, value in self.commands:
+            if command == "set":
+                self.redis.values[key] = value
+            else:
+                for queue in self.redis.subscribers.get(key, []):
+                    queue.put_nowait(value)
+
+
+class FakeRedis:
+    """In-memory stand-in for the Redis commands the coalescer uses, shared by 'workers'"""
+
+    def __init__(self):
+        self.locks = set()
+        self.values = {}
+        self.subscribers = {}
+
+    def lock(self, name, timeout=None, blocking=False):
+        return FakeLock(self, name)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def worker(redis):
+    coalescer = QueryCoalescer(redis_url="redis://fake", wait_timeout=1.0)
+    coalescer._redis = redis
+    return coalescer
+
+
+class TestDistributed:
+    """Test suite for coalescing across workers through Redis"""
+
+    def test_second_worker_waits_for_first(self):
+        async def run():
+            redis = FakeRedis()
+            first, second = worker(redis), worker(redis)
+            leader_query, follower_query = CountingQuery(), CountingQuery()
+            leader = asyncio.create_task(first.run("k", "exec-1", leader_query))
+            await settle()
+            follower = asyncio.create_task(second.run("k", "exec-2", follower_query))
+            await settle()
+            leader_query.release.set()
+            return await leader, await follower, follower_query.calls, second.state()
+
+        (leader_outcome, _), (outcome, info), follower_calls, state = asyncio.run(run())
+        assert follower_calls == 0
+        assert outcome == leader_outcome
+        assert info == {"coalesced": True, "scope": "distributed", "leader_execution_id": "exec-1"}
+        assert state["remote_follower"] == 1
+
+    def test_result_published_before_subscribe_is_found(self):
+        async def run():
+            redis = FakeRedis()
+            redis.locks.add("aureus:coalesce:lock:k")
+            redis.values["aureus:coalesce:result:k"] = encode_outcome(("exec-1", COLUMNS, ROWS))
+            query = CountingQuery()
+            outcome, _ = await worker(redis).run("k", "exec-2", query)
+            return query.calls, outcome
+
+        calls, outcome = asyncio.run(run())
+        assert calls == 0
+        assert outcome == ("exec-1", COLUMNS, ROWS)
+
+    def test_leader_failure_makes_follower_run_locally(self):
+        async def run():
+            redis = FakeRedis()
+            first, second = worker(redis), worker(redis)
+            leader_query = CountingQuery(error=RuntimeError("timeout"))
+            follower_query = CountingQuery()
+            follower_query.release.set()
+            leader = asyncio.create_task(first.run("k", "exec-1", leader_query))
+            await settle()
+            follower = asyncio.create_task(second.run("k", "exec-2", follower_query))
+            await settle()
+            leader_query.release.set()
+            leader_result = await asyncio.gather(leader, return_exceptions=True)
+            return leader_result[0], await follower, follower_query.calls
+
+        leader_error, (outcome, info), follower_calls = asyncio.run(run())
+        assert isinstance(leader_error, RuntimeError)
+        assert follower_calls == 1
+        assert outcome[0] == "exec-2"
+        assert info["scope"] == "leader"
+
+    def test_leader_releases_lock(self):
+        async def run():
+            redis = FakeRedis()
+            query = CountingQuery()
+            query.release.set()
+            await worker(redis).run("k", "exec-1", query)
+            return redis
+
+        redis = asyncio.run(run())
+        assert redis.locks == set()
+        assert decode_outcome(redis.values["aureus:coalesce:result:k"])[0] == "exec-1"
+
+    def test_redis_error_falls_back_to_local_execution(self):
+        class BrokenRedis(FakeRedis):
+            def lock(self, name, timeout=None, blocking=False):
+                raise ConnectionError("connection refused")
+
+        async def run():
+            coalescer, query = worker(BrokenRedis()), CountingQuery()
+            query.release.set()
+            outcome, _ = await coalescer.run("k", "exec-1", query)
+            return coalescer.state(), query.calls, outcome
+
+        state, calls, outcome = asyncio.run(run())
+        assert calls == 1
+        assert outcome[0] == "exec-1"
+        assert state["redis_errors"] == 1
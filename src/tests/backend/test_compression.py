@@ -0,0 +1,153 @@
+"""
+Tests for response compression and HTTP validators
+Covers Accept-Encoding negotiation, whole and streamed bodies, pass-through
+cases and ETag / If-None-Match across encoded representations
+"""
+import asyncio
+import gzip
+
+import brotli
+import httpx
+import pytest
+import zstandard
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from middleware.compression import CompressionMiddleware, negotiate_encoding
+from utils.http_cache import cached_json_response, compute_etag, etag_matches
+
+decoders = {
+    "identity": lambda raw: raw,
+    "gzip": gzip.decompress,
+    "br": brotli.decompress,
+    "zstd": lambda raw: zstandard.ZstdDecompressor().decompressobj().decompress(raw),
+}
+
+LARGE = {"rows": [{"id": index, "name": f"row {index}"} for index in range(200)]}
+
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/large")
+    async def large(request: Request):
+        return cached_json_response(request, LARGE)
+
+    @app.get("/small")
+    async def small(request: Request):
+        return cached_json_response(request, {"ok": True})
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for index in range(50):
+                yield f'{{"id": {index}}}\n'.encode() * 20
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/no-transform")
+    async def no_transform():
+        return PlainTextResponse("x" * 4096, headers={"Cache-Control": "no-transform"})
+
+    return CompressionMiddleware(app, minimum_size=1024)
+
+
+def get(path, encoding="gzip", **headers):
+    """The response (decoded by httpx) and its raw bytes as sent"""
+    async def run():
+        transport = httpx.ASGITransport(app=build_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            request = client.build_request("GET", path, headers={"Accept-Encoding": encoding, **headers})
+            response = await client.send(request, stream=True)
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+            response._content = decoders[response.headers.get("content-encoding", "identity")](raw)
+            return response, raw
+
+    return asyncio.run(run())
+
+
+class TestNegotiation:
+    """Test suite for Accept-Encoding negotiation"""
+
+    def test_server_preference_breaks_ties(self):
+        assert negotiate_encoding("gzip, br, zstd", ["zstd", "br", "gzip"]) == "zstd"
+
+    def test_q_values(self):
+        assert negotiate_encoding("zstd;q=0.1, gzip;q=0.9", ["zstd", "br", "gzip"]) == "gzip"
+
+    def test_q_zero_excludes(self):
+        assert negotiate_encoding("gzip;q=0", ["gzip"]) is None
+
+    def test_wildcard(self):
+        assert negotiate_encoding("*", ["br", "gzip"]) == "br"
+        assert negotiate_encoding("*;q=0, gzip", ["br", "gzip"]) == "gzip"
+
+    def test_identity_only(self):
+        assert negotiate_encoding("identity", ["gzip"]) is None
+
+
+class TestCompression:
+    """Test suite for the compression middleware"""
+
+    @pytest.mark.parametrize("coding", ["gzip", "br", "zstd"])
+    def test_large_body_compressed(self, coding):
+        response, raw = get("/large", encoding=coding)
+        assert response.headers["content-encoding"] == coding
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.json() == LARGE
+        assert int(response.headers["content-length"]) == len(raw) < len(response.content)
+
+    def test_small_body_passed_through(self):
+        response, _ = get("/small")
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+
+    def test_no_accept_encoding_passed_through(self):
+        response, _ = get("/large", encoding="identity")
+        assert "content-encoding" not in response.headers
+
+    def test_no_transform_respected(self):
+        response, _ = get("/no-transform")
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.parametrize("coding", ["gzip", "br", "zstd"])
+    def test_stream_compressed_chunk_by_chunk(self, coding):
+        response, raw = get("/stream", encoding=coding)
+        assert response.headers["content-encoding"] == coding
+        assert "content-length" not in response.headers
+        assert response.content.count(b"\n") == 50 * 20
+        assert len(raw) < len(response.content)
+
+
+class TestValidators:
+    """Test suite for ETag / If-None-Match"""
+
+    def test_encoded_etag_gets_coding_suffix(self):
+        response, _ = get("/large")
+        plain, _ = get("/large", encoding="identity")
+        assert response.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    def test_not_modified_for_plain_etag(self):
+        plain, _ = get("/large", encoding="identity")
+        response, _ = get("/large", **{"If-None-Match": plain.headers["etag"]})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert "content-encoding" not in response.headers
+
+    def test_not_modified_for_encoded_etag(self):
+        encoded, _ = get("/large")
+        response, _ = get("/large", encoding="identity", **{"If-None-Match": encoded.headers["etag"]})
+        assert response.status_code == 304
+
+    def test_stale_etag_gets_full_body(self):
+        response, _ = get("/large", **{"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert response.json() == LARGE
+
+    def test_etag_matches_lists_weak_and_star(self):
+        etag = compute_etag(b"body")
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches(f'{etag[:-1]}-br"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches(f'{etag[:-1]}-deflate"', etag)
@@ -0,0 +1,232 @@
+"""
+Tests for the data quality engine
+Covers compiling checks into one aggregate query, evaluating them
+over in-memory columns and persisted drift baselines
+"""
+import asyncio
+
+import pytest
+
+from models.data_quality import DataQualityBaseline
+from services.data_quality import DataQualityEngine, population_stability, validate_checks
+from utils.errors import ValidationError
+
+CHECKS = [
+    {"type": "null_rate", "column": "customer_id", "max_rate": 0.1},
+    {"type": "unique", "column": "loan_id"},
+    {"type": "range", "column": "amount", "min": 0, "max": 1000},
+    {"type": "referential", "column": "customer_id", "ref_table": "customers", "ref_column": "id"},
+]
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def keys(self):
+        return list(self.row)
+
+    def fetchall(self):
+        return [tuple(self.row.values())]
+
+
+class FakeSession:
+    """Session stand-in recording the statement and returning one row of metrics"""
+
+    def __init__(self, row):
+        self.row = row
+        self.statements = []
+
+    async def execute(self, statement, params=None, execution_options=None):
+        self.statements.append((str(statement), params))
+        return FakeResult(self.row)
+
+
+def run_sql(engine, checks, row, table="loans"):
+    session = FakeSession(row)
+    results = asyncio.run(engine.run_sql(session, table, checks))
+    return results, session.statements
+
+
+class TestValidateChecks:
+    """Test suite for check normalization"""
+
+    def test_defaults_and_unique_names(self):
+        checks = validate_checks([
+            {"type": "null_rate", "column": "a"},
+            {"type": "null_rate", "column": "a"},
+        ])
+        assert [check["name"] for check in checks] == ["null_rate:a", "null_rate:a#1"]
+        assert checks[0]["severity"] == "error"
+        assert checks[0]["max_rate"] == 0.0
+
+    @pytest.mark.parametrize("check", [
+        {"type": "median", "column": "a"},
+        {"type": "null_rate", "column": "a; DROP TABLE users"},
+        {"type": "range", "column": "a"},
+        {"type": "referential", "column": "a", "ref_table": "b"},
+    ])
+    def test_invalid_checks_rejected(self, check):
+        with pytest.raises(ValidationError):
+            validate_checks([check])
+
+
+class TestRunSql:
+    """Test suite for checks compiled to SQL"""
+
+    def test_all_checks_in_one_query(self):
+        results, statements = run_sql(DataQualityEngine(), CHECKS, {"n": 100, "m0": 5, "m1": 0, "m2": 2, "m3": 0})
+        assert len(statements) == 1
+        sql, params = statements[0]
+        assert sql.startswith('SELECT count(*) AS n, count(*) - count(t."customer_id") AS m0')
+        assert 'count(t."loan_id") - count(DISTINCT t."loan_id") AS m1' in sql
+        assert 'count(*) FILTER (WHERE t."amount" < :m2_min OR t."amount" > :m2_max) AS m2' in sql
+        assert 'LEFT JOIN (SELECT DISTINCT "id" AS v FROM "customers") AS r3 ON r3.v = t."customer_id"' in sql
+        assert params == {"m2_min": 0, "m2_max": 1000}
+        assert results["scan"]["queries"] == 1
+
+    def test_metrics_evaluated_against_thresholds(self):
+        results, _ = run_sql(DataQualityEngine(), CHECKS, {"n": 100, "m0": 5, "m1": 1, "m2": 0, "m3": 3})
+        passed = {check["name"]: check["passed"] for check in results["checks"]}
+        assert passed == {
+            "null_rate:customer_id": True,
+            "unique:loan_id": False,
+            "range:amount": True,
+            "referential:customer_id": False,
+        }
+        assert results["failed"] == ["unique:loan_id", "referential:customer_id"]
+        assert not results["passed"]
+
+    def test_invalid_table_rejected(self):
+        with pytest.raises(ValidationError):
+            run_sql(DataQualityEngine(), CHECKS, {}, table='loans"; --')
+
+    def test_drift_buckets_use_baseline_edges(self):
+        engine = DataQualityEngine()
+        engine.record_baseline("loans", {"profile": {"amount": [10.0, 20.0]}})
+        row = {"n": 30, "m0_edges": [11.0, 19.0], "m0_b0": 10, "m0_b1": 10, "m0_b2": 10}
+        results, statements = run_sql(engine, [{"type": "drift", "column": "amount"}], row)
+        sql, params = statements[0]
+        assert "AS m0_b2" in sql
+        assert params == {"m0_hi0": 10.0, "m0_lo1": 10.0, "m0_hi1": 20.0, "m0_lo2": 20.0}
+        assert results["checks"][0]["value"] == 0.0
+        assert results["profile"] == {"amount": [11.0, 19.0]}
+
+
+class TestRunLocal:
+    """Test suite for checks over in-memory columns"""
+
+    def test_matches_sql_semantics(self):
+        columns = {
+            "loan_id": ["a", "b", "b", "c"],
+            "customer_id": [1, None, 2, 9],
+            "amount": [10, 2000, None, -1],
+        }
+        results = DataQualityEngine().run_local("loans", columns, CHECKS, references={"customers.id": [1, 2, None]})
+        values = {check["name"]: check["value"] for check in results["checks"]}
+        assert values == {
+            "null_rate:customer_id": 0.25,
+            "unique:loan_id": 1,
+            "range:amount": 0.5,
+            "referential:customer_id": 0.25,
+        }
+        assert results["rows"] == 4
+        assert results["scan"]["mode"] == "local"
+
+    def test_missing_column_fails_check(self):
+        results = DataQualityEngine().run_local("loans", {"loan_id": [1]}, [{"type": "null_rate", "column": "other"}])
+        check = results["checks"][0]
+        assert not check["passed"]
+        assert "not present" in check["message"]
+
+    def test_missing_reference_fails_check(self):
+        checks = [{"type": "referential", "column": "a", "ref_table": "b", "ref_column": "c"}]
+        results = DataQualityEngine().run_local("t", {"a": [1]}, checks)
+        assert "b.c not provided" in results["checks"][0]["message"]
+
+    def test_drift_against_recorded_baseline(self):
+        engine = DataQualityEngine()
+        values = list(range(100))
+        first = engine.run_local("t", {"x": values}, [{"type": "drift", "column": "x"}])
+        assert first["checks"][0]["message"] == "No baseline profile yet"
+        engine.record_baseline("t", first)
+
+        same = engine.run_local("t", {"x": values}, [{"type": "drift", "column": "x"}])
+        assert same["checks"][0]["passed"]
+        shifted = engine.run_local("t", {"x": [value + 50 for value in values]}, [{"type": "drift", "column": "x"}])
+        assert not shifted["checks"][0]["passed"]
+
+
+class BaselineSession:
+    """Session stand-in over persisted baseline rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.commits = 0
+
+    async def execute(self, statement, params=None, execution_options=None):
+        table = statement.compile().params.get("table_name_1")
+        return FakeBaselineResult([row for row in self.rows if table in (None, row.table_name)])
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeBaselineResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class PersistingEngine(DataQualityEngine):
+    """Engine whose baseline writes go to a list"""
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+
+    async def _write_baselines(self, session, rows):
+        self.rows.extend(DataQualityBaseline(**row) for row in rows)
+
+
+class TestBaselines:
+    """Test suite for baselines shared across workers"""
+
+    def test_saved_baseline_reaches_other_workers(self):
+        rows = []
+        session = BaselineSession(rows)
+        asyncio.run(PersistingEngine(rows).save_baseline(session, "loans", {"profile": {"amount": [1.0, 2.0], "empty": []}}, "user-1"))
+        assert session.commits == 1
+        assert [(row.column_name, row.recorded_by) for row in rows] == [("amount", "user-1")]
+
+        other = DataQualityEngine()
+        asyncio.run(other.load_baselines(session))
+        assert other.baseline("loans", "amount") == [1.0, 2.0]
+
+    def test_table_load_replaces_stale_local_baseline(self):
+        engine = DataQualityEngine()
+        engine.record_baseline("loans", {"profile": {"amount": [9.0], "fee": [3.0]}})
+        engine.record_baseline("alerts", {"profile": {"score": [5.0]}})
+        session = BaselineSession([DataQualityBaseline(table_name="loans", column_name="amount", edges=[1.0])])
+        asyncio.run(engine.load_baselines(session, "loans"))
+        assert engine.baseline("loans", "amount") == [1.0]
+        assert engine.baseline("loans", "fee") is None
+        assert engine.baseline("alerts", "score") == [5.0]
+
+
+class TestPopulationStability:
+    """Test suite for the PSI computation"""
+
+    def test_uniform_is_zero(self):
+        assert population_stability([10] * 10) == 0.0
+
+    def test_empty_is_zero(self):
+        assert population_stability([0] * 10) == 0.0
+
+    def test_skew_is_positive(self):
+        assert population_stability([91] + [1] * 9) > 1
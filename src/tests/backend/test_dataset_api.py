@@ -0,0 +1,45 @@
+"""
+Tests for the dataset API
+Covers who may read table rows through snapshot diffs
+"""
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from api import dataset
+from db.session import get_read_db
+from middleware import limiter
+from security.auth import get_current_user
+
+
+def diff_status(role, rows):
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.include_router(dataset.router, prefix="/v1/datasets")
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=uuid.uuid4(), role=role)
+    app.dependency_overrides[get_read_db] = lambda: None
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(f"/v1/datasets/unknown/snapshots/{uuid.uuid4()}/diff", params={"rows": rows})
+            return response.status_code
+
+    return asyncio.run(run())
+
+
+class TestSnapshotDiffRows:
+    """Test suite for rows in live snapshot diffs"""
+
+    def test_analysts_may_not_read_rows(self):
+        assert diff_status("analyst", 10) == 403
+
+    def test_admins_and_approvers_reach_the_diff(self):
+        # The dataset is unknown: past the role check, the lookup answers 404
+        assert diff_status("admin", 10) == 404
+        assert diff_status("approver", 10) == 404
+
+    def test_bucket_level_diff_open_to_all(self):
+        assert diff_status("analyst", 0) == 404
@@ -0,0 +1,78 @@
+"""
+Tests for the event broker
+Covers closing push connections whose credentials no longer hold: token
+expiry, revocation, and disabled or re-roled users
+"""
+import asyncio
+import time
+import uuid
+
+from services.events import EventBroker, PING
+from utils.shared_state import shared_state
+
+
+class FakeSession:
+    """Session stand-in answering the revalidation query from a dict"""
+
+    def __init__(self, users):
+        self.users = users
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        requested = statement.whereclause.right.value
+        return [(user_id, *self.users[user_id]) for user_id in requested if user_id in self.users]
+
+
+class TestCredentialLifetime:
+    """Test suite for connections outliving their credentials"""
+
+    def test_closed_at_token_expiry(self):
+        async def run():
+            broker = EventBroker()
+            subscriber = broker.subscribe("u1", "analyst", expires_at=time.time() + 0.05)
+            assert await asyncio.wait_for(subscriber.get(), 1.0) is None
+            return subscriber.reason
+
+        assert asyncio.run(run()) == "token_expired"
+
+    def test_expiry_cancelled_on_unsubscribe(self):
+        async def run():
+            broker = EventBroker()
+            subscriber = broker.subscribe("u1", "analyst", expires_at=time.time() + 0.01)
+            broker.unsubscribe(subscriber)
+            await asyncio.sleep(0.05)
+            return subscriber.reason, broker.state()["auth_closed"]
+
+        assert asyncio.run(run()) == ("unsubscribed", 0)
+
+    def test_heartbeat_closes_revoked_tokens(self):
+        async def run():
+            broker = EventBroker()
+            revoked = broker.subscribe("u1", "analyst", jti=uuid.uuid4().hex)
+            live = broker.subscribe("u1", "analyst", jti=uuid.uuid4().hex)
+            shared_state.revoke(revoked.jti)
+            broker.beat()
+            return revoked, live
+
+        revoked, live = asyncio.run(run())
+        assert revoked.reason == "token_revoked"
+        assert not live.closed
+        assert live.queue[0] == PING
+
+    def test_revalidate_closes_disabled_and_re_roled_users(self):
+        active, disabled, promoted, deleted = (uuid.uuid4() for _ in range(4))
+        users = {active: ("analyst", True), disabled: ("analyst", False), promoted: ("admin", True)}
+
+        async def run():
+            broker = EventBroker(session_factory=lambda: FakeSession(users))
+            subscribers = {user_id: broker.subscribe(str(user_id), "analyst") for user_id in (active, disabled, promoted, deleted)}
+            await broker.revalidate()
+            return {user_id: subscriber.reason for user_id, subscriber in subscribers.items()}
+
+        reasons = asyncio.run(run())
+        assert reasons == {active: None, disabled: "user_disabled", promoted: "role_changed", deleted: "user_disabled"}
@@ -0,0 +1,185 @@
+"""
+Tests for the ingestion service
+Covers spooling uploads, worker threads outliving cancellation, target table
+resolution and jobs persisted across workers
+"""
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.ingestion import IngestionJobRecord
+from services.ingestion import IngestionJob, IngestionService, _in_thread
+from utils.errors import ValidationError
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session stand-in over a dict of ingestion_jobs rows"""
+
+    def __init__(self, table):
+        self.table = table
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, model, key):
+        return self.table.get(key)
+
+    async def execute(self, statement):
+        return FakeResult(sorted(self.table.values(), key=lambda record: record.created_at, reverse=True))
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeIngestion(IngestionService):
+    """Service whose saves go to a dict and whose loads never start"""
+
+    def __init__(self, table, **options):
+        super().__init__(session_factory=lambda: FakeSession(table), **options)
+        self.table = table
+
+    async def _write(self, session, rows):
+        for row in rows:
+            self.table[row["id"]] = IngestionJobRecord(**row)
+
+    async def _run(self, job):
+        pass
+
+
+def stored(status="completed", age=0.0, **values):
+    job = IngestionJob("loans", "loans", "csv", "", 10, "0" * 64, "user-1")
+    job.status = status
+    record = IngestionJobRecord(**job.to_record())
+    record.created_at = record.heartbeat_at = datetime.utcnow() - timedelta(seconds=age)
+    for name, value in values.items():
+        setattr(record, name, value)
+    return record
+
+
+async def upload(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestSpool:
+    """Test suite for spooling uploads"""
+
+    def test_submit_spools_upload_and_saves_job(self):
+        table = {}
+        service = FakeIngestion(table)
+        job = asyncio.run(service.submit("new_loans", "csv", upload(b"id\n", b"1\n", b"2\n"), "user-1"))
+        try:
+            with open(job.path, "rb") as spool:
+                assert spool.read() == b"id\n1\n2\n"
+        finally:
+            os.unlink(job.path)
+        assert job.bytes == 7
+        assert table[job.job_id].status == "queued"
+
+    def test_cancelled_thread_finishes_before_cancellation_propagates(self):
+        """Callers close the file the thread reads once the cancellation reaches them"""
+        finished = threading.Event()
+
+        def read():
+            time.sleep(0.2)
+            finished.set()
+
+        async def run():
+            task = asyncio.ensure_future(_in_thread(read))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                return finished.is_set()
+
+        assert asyncio.run(run())
+
+
+class TestTargetTable:
+    """Test suite for resolving the table a load replaces"""
+
+    def test_catalog_dataset_by_id_or_name(self):
+        service = FakeIngestion({})
+        assert service.resolve_table("dataset-1") == "loan_portfolio"
+        assert service.resolve_table("loan_portfolio") == "loan_portfolio"
+
+    def test_new_dataset_uses_its_id(self):
+        assert FakeIngestion({}).resolve_table("new_loans") == "new_loans"
+
+    @pytest.mark.parametrize("name", [
+        "users", "approval_requests", "alembic_version", "ingestion_jobs",
+        "pipeline_build_x", "loans__load_1234abcd", "loans__old_1234abcd",
+    ])
+    def test_new_dataset_may_not_replace_reserved_tables(self, name):
+        with pytest.raises(ValidationError):
+            FakeIngestion({}).resolve_table(name)
+
+    def test_job_records_catalog_id(self):
+        table = {}
+        job = asyncio.run(FakeIngestion(table).submit("loan_portfolio", "csv", upload(b"id\n1\n"), "user-1"))
+        os.unlink(job.path)
+        assert job.dataset_id == "dataset-1"
+        assert job.table == "loan_portfolio"
+
+
+class TestPersistedJobs:
+    """Test suite for jobs shared across workers"""
+
+    def test_get_reads_other_workers_jobs(self):
+        record = stored(rows_loaded=5)
+        service = FakeIngestion({record.id: record})
+        job = asyncio.run(service.get(record.id))
+        assert job.status == "completed"
+        assert job.rows_loaded == 5
+
+    def test_abandoned_job_is_failed(self):
+        record = stored(status="running", age=120)
+        service = FakeIngestion({record.id: record}, stale_after=60)
+        job = asyncio.run(service.get(record.id))
+        assert job.status == "failed"
+        assert job.error.startswith("Abandoned")
+
+    def test_running_job_with_recent_heartbeat_is_left_alone(self):
+        record = stored(status="running", age=5)
+        service = FakeIngestion({record.id: record}, stale_after=60)
+        assert asyncio.run(service.get(record.id)).status == "running"
+
+    def test_list_prefers_local_jobs(self):
+        table = {}
+        service = FakeIngestion(table)
+        older = stored(age=30)
+        table[older.id] = older
+        job = asyncio.run(service.submit("new_loans", "csv", upload(b"id\n1\n"), "user-1"))
+        os.unlink(job.path)
+        job.rows_loaded = 1
+
+        jobs = asyncio.run(service.list())
+        assert [listed.job_id for listed in jobs] == [job.job_id, older.id]
+        assert jobs[0] is job
+
+    def test_list_by_name_or_id(self):
+        service = FakeIngestion({})
+        job = asyncio.run(service.submit("loan_portfolio", "csv", upload(b"id\n1\n"), "user-1"))
+        os.unlink(job.path)
+        for key in ("dataset-1", "loan_portfolio"):
+            assert [listed.job_id for listed in asyncio.run(service.list(key))] == [job.job_id]
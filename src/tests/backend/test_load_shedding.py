@@ -0,0 +1,176 @@
+"""
+Tests for adaptive load shedding
+Covers the AIMD limiter, route classification and goodput under overload
+"""
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from middleware.load_shedding import AIMDLimiter, LoadSheddingMiddleware, classify_route
+
+
+class StubMonitor:
+    """Event loop monitor with a fixed lag"""
+
+    def __init__(self, lag: float = 0.0):
+        self.lag = lag
+
+    def state(self):
+        return {"lag_ms": self.lag * 1000}
+
+
+def build_app(shedding: bool, db_capacity: int = 2, service_time: float = 0.05, monitor=None):
+    """App whose query endpoint is bound by a slow, fixed-capacity database"""
+    app = FastAPI()
+    database = asyncio.Semaphore(db_capacity)
+
+    @app.post("/v1/query/execute")
+    async def execute():
+        async with database:
+            await asyncio.sleep(service_time)
+        return {"status": "completed"}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    if not shedding:
+        return app
+    return LoadSheddingMiddleware(
+        app,
+        target_latency=0.1,
+        initial_limit=8,
+        min_limit=1,
+        monitor=monitor or StubMonitor(),
+        registry=None
+    )
+
+
+async def offer_load(app, rate: float, duration: float, deadline: float):
+    """
+    Open-loop load: requests arrive at `rate` per second regardless of
+    how fast the server answers, like users during an incident
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        results = []
+        health_latencies = []
+
+        async def query():
+            start = time.perf_counter()
+            response = await client.post("/v1/query/execute")
+            results.append((response.status_code, time.perf_counter() - start))
+
+        async def health():
+            start = time.perf_counter()
+            response = await client.get("/health")
+            assert response.status_code == 200
+            health_latencies.append(time.perf_counter() - start)
+
+        tasks = []
+        for i in range(int(rate * duration)):
+            tasks.append(asyncio.create_task(query()))
+            if i % 10 == 0:
+                tasks.append(asyncio.create_task(health()))
+            await asyncio.sleep(1 / rate)
+        await asyncio.gather(*tasks)
+
+    goodput = sum(1 for status, latency in results if status == 200 and latency <= deadline)
+    shed = sum(1 for status, _ in results if status == 503)
+    return goodput, shed, max(health_latencies)
+
+
+class TestAIMDLimiter:
+    """Test suite for the AIMD concurrency limiter"""
+
+    def test_rejects_beyond_limit(self):
+        """Acquisitions beyond the limit are shed"""
+        limiter = AIMDLimiter(initial_limit=2)
+        assert limiter.try_acquire()
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+        assert limiter.state() == {"limit": 2, "in_flight": 2, "accepted": 2, "shed": 1}
+
+    def test_additive_increase_on_fast_completions(self):
+        """Completions within target grow the limit by about one per window"""
+        limiter = AIMDLimiter(initial_limit=10, target_latency=1.0)
+        for _ in range(10):
+            limiter.try_acquire()
+            limiter.release(0.01)
+        assert 10.9 < limiter.limit < 11.0
+
+    def test_multiplicative_decrease_once_per_window(self):
+        """A burst of slow completions cuts the limit once"""
+        limiter = AIMDLimiter(initial_limit=10, target_latency=1.0, backoff=0.5)
+        for _ in range(5):
+            limiter.try_acquire()
+        for _ in range(5):
+            limiter.release(2.0)
+        assert limiter.limit == 5
+
+    def test_limit_bounds(self):
+        """The limit stays within [min_limit, max_limit]"""
+        limiter = AIMDLimiter(initial_limit=4, min_limit=3, max_limit=5, target_latency=0.0, backoff=0.1)
+        limiter.try_acquire()
+        limiter.release(1.0, overloaded=True)
+        assert limiter.limit == 3
+
+        limiter = AIMDLimiter(initial_limit=5, max_limit=5)
+        limiter.try_acquire()
+        limiter.release(0.0)
+        assert limiter.limit == 5
+
+
+class TestLoadShedding:
+    """Test suite for the load shedding middleware"""
+
+    def test_route_classes(self):
+        """Probes and auth are critical, data endpoints are analytics"""
+        assert classify_route("/health") == "critical"
+        assert classify_route("/ready") == "critical"
+        assert classify_route("/v1/auth/login") == "critical"
+        assert classify_route("/v1/query/execute") == "analytics"
+        assert classify_route("/v1/datasets/") == "analytics"
+        assert classify_route("/v1/approvals/requests") == "default"
+
+    def test_shed_response_has_retry_after(self):
+        """Shed requests get 503 with Retry-After before reaching the handler"""
+        async def run():
+            app = build_app(shedding=True)
+            app.limiters["analytics"].limit = 0
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/v1/query/execute")
+
+        response = asyncio.run(run())
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert response.json()["error"]["code"] == "SERVICE_OVERLOADED"
+
+    def test_event_loop_lag_sheds_analytics_but_not_health(self):
+        """A lagging loop sheds analytics traffic while probes still pass"""
+        async def run():
+            app = build_app(shedding=True, monitor=StubMonitor(lag=0.5))
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/v1/query/execute"), await client.get("/health")
+
+        query, health = asyncio.run(run())
+        assert query.status_code == 503
+        assert health.status_code == 200
+
+    def test_goodput_under_overload(self):
+        """
+        Offered load at 3x database capacity: without shedding the queue
+        grows until nearly every response misses its deadline; with
+        shedding, admitted requests keep finishing in time
+        """
+        # Capacity: 2 concurrent x 50ms = 40 req/s; offered: 120 req/s
+        unshed_goodput, _, _ = asyncio.run(offer_load(build_app(shedding=False), rate=120, duration=2.5, deadline=0.5))
+        goodput, shed, health_max = asyncio.run(offer_load(build_app(shedding=True), rate=120, duration=2.5, deadline=0.5))
+
+        assert shed > 0
+        assert goodput > 2 * unshed_goodput
+        assert health_max < 0.25
@@ -0,0 +1,121 @@
+"""
+Tests for the metrics history
+Covers the tiered rings, rollups, queries and the on-disk format
+"""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from services.metrics_history import MetricsHistory
+
+# Midnight UTC, so every tier's slots start on round timestamps
+T0 = 1_800_000_000 - 1_800_000_000 % 86400
+
+
+def history(**options):
+    return MetricsHistory(None, **options)
+
+
+def at(seconds):
+    return datetime.fromtimestamp(T0 + seconds, tz=timezone.utc)
+
+
+class TestRings:
+    """Test suite for recording and reading samples"""
+
+    def test_raw_samples(self):
+        metrics = history()
+        for tick in range(3):
+            metrics.record({"requests.count": tick * 10.0}, now=T0 + tick * 10)
+        result = metrics.query("requests", start=at(0), end=at(20), resolution="10s")
+        assert result["timestamps"] == [T0, T0 + 10, T0 + 20]
+        assert result["series"]["requests.count"]["value"] == [0.0, 10.0, 20.0]
+
+    def test_rollup_committed_when_bucket_closes(self):
+        metrics = history()
+        for tick, value in enumerate([1.0, 5.0, 3.0, 2.0, 4.0, 3.0, 9.0]):
+            metrics.record({"lag": value}, now=T0 + tick * 10)
+        result = metrics.query("lag", start=at(0), end=at(60), resolution="1m")
+        # The bucket of minute 1 (value 9.0) is still in progress
+        assert result["timestamps"] == [T0]
+        assert result["series"]["lag"] == {"avg": [3.0], "min": [1.0], "max": [5.0]}
+
+    def test_gaps_are_skipped_and_missing_series_null(self):
+        metrics = history()
+        metrics.record({"a": 1.0}, now=T0)
+        metrics.record({"a": 2.0, "b": 7.0}, now=T0 + 30)
+        result = metrics.query(None, start=at(0), end=at(30), resolution="10s")
+        assert result["timestamps"] == [T0, T0 + 30]
+        assert result["series"]["b"]["value"] == [None, 7.0]
+
+    def test_ring_overwrites_previous_lap(self):
+        metrics = history()
+        metrics.record({"a": 1.0}, now=T0)
+        metrics.record({"a": 2.0}, now=T0 + 86400)
+        lap = metrics.query("a", start=at(0), end=at(0), resolution="10s")
+        assert lap["timestamps"] == []
+
+    def test_series_beyond_limit_dropped(self):
+        metrics = history(max_series=2)
+        metrics.record({"a": 1.0, "b": 1.0, "c": 1.0}, now=T0)
+        assert metrics.names == ["a", "b"]
+        assert metrics.dropped_values == 1
+
+    def test_prefix_match(self):
+        metrics = history()
+        metrics.record({"queries.total": 1.0, "queries_other": 1.0, "requests.count": 1.0}, now=T0)
+        assert metrics.match("queries, requests.count") == ["queries.total", "requests.count"]
+
+    def test_unknown_resolution_rejected(self):
+        with pytest.raises(ValueError):
+            history().query(resolution="5s")
+
+
+class TestPersistence:
+    """Test suite for dump/load and flushing to disk"""
+
+    def test_dump_load_round_trip(self):
+        metrics = history()
+        for tick in range(12):
+            metrics.record({"a": float(tick), "b": -float(tick)}, now=T0 + tick * 10)
+        restored = history()
+        assert restored.load(metrics.dump())
+        assert restored.names == ["a", "b"]
+        for resolution in ("10s", "1m"):
+            assert restored.query("a,b", start=at(0), end=at(120), resolution=resolution) == \
+                metrics.query("a,b", start=at(0), end=at(120), resolution=resolution)
+
+    def test_load_keeps_first_series_within_limit(self):
+        metrics = history()
+        metrics.record({"a": 1.0, "b": 2.0}, now=T0)
+        restored = history(max_series=1)
+        assert restored.load(metrics.dump())
+        assert restored.names == ["a"]
+
+    @pytest.mark.parametrize("corrupt", [
+        lambda data: b"XXXX" + data[4:],
+        lambda data: data[:-8],
+    ])
+    def test_load_rejects_mismatched_layout(self, corrupt):
+        metrics = history()
+        metrics.record({"a": 1.0}, now=T0)
+        restored = history()
+        assert not restored.load(corrupt(metrics.dump()))
+        assert restored.names == []
+
+    def test_flush_and_restore(self, tmp_path):
+        path = str(tmp_path / "history.bin")
+        metrics = history(path=path)
+        metrics.record({"a": 1.0}, now=T0)
+        asyncio.run(metrics.flush())
+        assert metrics.flushes == 1
+
+        restored = history(path=path)
+        asyncio.run(restored.restore())
+        assert restored.query("a", start=at(0), end=at(0), resolution="10s")["series"]["a"]["value"] == [1.0]
+
+    def test_restore_without_file_starts_empty(self, tmp_path):
+        metrics = history(path=str(tmp_path / "missing.bin"))
+        asyncio.run(metrics.restore())
+        assert metrics.names == []
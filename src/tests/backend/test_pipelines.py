@@ -0,0 +1,146 @@
+"""
+Tests for the pipeline engine
+Covers DAG validation, step fingerprints, where step outputs may be
+written and run status bookkeeping
+"""
+import asyncio
+import uuid
+
+import pytest
+
+from models.pipeline import PipelineRun
+from services.pipelines import PipelineEngine, step_fingerprint, validate_pipeline
+from utils.errors import ValidationError
+
+
+def step(step_id, output=None, depends_on=(), sql="SELECT 1 AS x", **extra):
+    return {"step_id": step_id, "sql": sql, "output": output or f"out_{step_id}", "depends_on": list(depends_on), **extra}
+
+
+class TestDag:
+    """Test suite for step graph validation"""
+
+    def test_topological_order(self):
+        steps = [step("c", depends_on=["a", "b"]), step("b", depends_on=["a"]), step("a")]
+        assert validate_pipeline(steps) == ["a", "b", "c"]
+
+    def test_independent_steps_in_id_order(self):
+        assert validate_pipeline([step("b"), step("a")]) == ["a", "b"]
+
+    def test_cycle_rejected(self):
+        steps = [step("a", depends_on=["c"]), step("b", depends_on=["a"]), step("c", depends_on=["b"]), step("d")]
+        with pytest.raises(ValidationError, match=r"cycle among steps \['a', 'b', 'c'\]"):
+            validate_pipeline(steps)
+
+    def test_unknown_dependency_rejected(self):
+        with pytest.raises(ValidationError, match="unknown steps"):
+            validate_pipeline([step("a", depends_on=["missing"])])
+
+    def test_duplicate_step_rejected(self):
+        with pytest.raises(ValidationError, match="Duplicate step"):
+            validate_pipeline([step("a", output="x"), step("a", output="y")])
+
+    def test_shared_output_rejected(self):
+        with pytest.raises(ValidationError, match="more than one step"):
+            validate_pipeline([step("a", output="x"), step("b", output="x")])
+
+    def test_watermark_must_be_on_an_input(self):
+        with pytest.raises(ValidationError, match="watermark"):
+            validate_pipeline([step("a", inputs=["loans"], watermarks={"alerts": "updated_at"})])
+
+    def test_write_sql_rejected(self):
+        with pytest.raises(ValidationError, match="Step a"):
+            validate_pipeline([step("a", sql="DELETE FROM loan_portfolio")])
+
+
+class TestFingerprint:
+    """Test suite for step fingerprints"""
+
+    PROBES = {"loans": {"rows": 10, "digest": "123"}}
+
+    def test_formatting_does_not_change_fingerprint(self):
+        a = step_fingerprint(step("a", sql="SELECT id FROM loans"), {}, self.PROBES)
+        b = step_fingerprint(step("a", sql="select  id\nfrom loans -- reformatted"), {}, self.PROBES)
+        assert a == b
+
+    @pytest.mark.parametrize("changed", [
+        {"step": step("a", sql="SELECT id, amount FROM loans")},
+        {"step": step("a", output="other_output")},
+        {"upstream": {"b": "0" * 32}},
+        {"probes": {"loans": {"rows": 11, "digest": "123"}}},
+        {"probes": {"loans": {"rows": 10, "digest": "124"}}},
+    ])
+    def test_inputs_change_fingerprint(self, changed):
+        base = {"step": step("a", sql="SELECT id FROM loans"), "upstream": {}, "probes": self.PROBES}
+        assert step_fingerprint(**base) != step_fingerprint(**{**base, **changed})
+
+
+class TestOutputNames:
+    """Test suite for reserved output names"""
+
+    @pytest.mark.parametrize("output", ["users", "approval_requests", "query_executions", "pipeline_step_runs", "alembic_version"])
+    def test_application_tables_rejected(self, output):
+        """Outputs may not name an application table"""
+        with pytest.raises(ValidationError, match="reserved"):
+            validate_pipeline([step("a", output=output)])
+
+    def test_catalog_tables_rejected(self):
+        """Outputs may not replace a catalog dataset"""
+        with pytest.raises(ValidationError, match="reserved"):
+            validate_pipeline([step("a", output="loan_portfolio")])
+
+    def test_staging_prefixes_rejected(self):
+        """Outputs may not collide with the engine's side tables"""
+        with pytest.raises(ValidationError, match="reserved"):
+            validate_pipeline([step("a", output="pipeline_build_x")])
+
+    def test_other_outputs_accepted(self):
+        assert validate_pipeline([step("a", output="loan_summary")]) == ["a"]
+
+
+class FakeResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+class FakeSession:
+    """Session stand-in holding one pipeline run"""
+
+    def __init__(self, run):
+        self.run = run
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        return FakeResult()
+
+    async def get(self, model, key):
+        return self.run
+
+    async def merge(self, record):
+        return record
+
+    async def commit(self):
+        pass
+
+
+class TestRunLifecycle:
+    """Test suite for run status bookkeeping"""
+
+    def test_invalid_definition_fails_the_run(self):
+        """A run whose steps no longer validate is marked failed, not left running"""
+        run = PipelineRun(id=uuid.uuid4(), pipeline_id="p", status="running", triggered_by="u", force=False, attempts=1)
+        engine = PipelineEngine(lambda: FakeSession(run))
+        pipeline = {"id": "p", "version": 1, "steps": [step("a", depends_on=["b"]), step("b", depends_on=["a"])]}
+
+        asyncio.run(engine._execute(pipeline, run.id, force=False))
+        assert run.status == "failed"
+        assert "cycle" in run.evidence["error"]
+        assert run.finished_at is not None
@@ -0,0 +1,78 @@
+"""
+Tests for the query history store
+Covers which flush failures are retried and which entries are dropped
+"""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+
+from services.query_history import QueryHistoryStore
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+
+class FakeStore(QueryHistoryStore):
+    """Store whose writes fail for entries marked bad, or for everything while `down`"""
+
+    def __init__(self, **options):
+        super().__init__(session_factory=FakeSession, **options)
+        self.down = False
+        self.rows = []
+
+    async def _write(self, session, batch):
+        if self.down:
+            raise OperationalError("INSERT", {}, ConnectionRefusedError("connection refused"))
+        if any(entry["shape"] == "bad" for entry in batch):
+            raise DataError("INSERT", {}, ValueError("invalid input"))
+        self.rows += [entry["shape"] for entry in batch]
+
+
+def record(store, sql, **fields):
+    store.record(str(uuid.uuid4()), sql, "dataset-1", "user-1", "success", 1, 1.0, **fields)
+
+
+class TestFlush:
+    """Test suite for flush failure handling"""
+
+    def test_rejected_entries_are_isolated_and_dropped(self):
+        store = FakeStore()
+        for sql in ["a", "bad", "b", "c", "bad", "d"]:
+            record(store, sql)
+
+        assert asyncio.run(store.flush()) == 4
+        assert store.rows == ["a", "b", "c", "d"]
+        assert store.state()["rejected"] == 2
+        assert not store._queue
+
+    def test_unavailable_database_requeues_in_order(self):
+        store = FakeStore()
+        for sql in ["a", "b", "c"]:
+            record(store, sql)
+        store.down = True
+
+        with pytest.raises(OperationalError):
+            asyncio.run(store.flush())
+        assert [entry["shape"] for entry in store._queue] == ["a", "b", "c"]
+
+        store.down = False
+        assert asyncio.run(store.flush()) == 3
+        assert store.rows == ["a", "b", "c"]
+
+    def test_nul_characters_stripped(self):
+        store = FakeStore()
+        record(store, "SELECT '\x00'", params={"name\x00": ["x\x00y"]}, error="bad\x00byte")
+        entry = store._queue[0]
+        assert entry["sql"] == "SELECT ''"
+        assert entry["params"] == {"name": ["xy"]}
+        assert entry["error"] == "badbyte"
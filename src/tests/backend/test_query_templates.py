@@ -0,0 +1,129 @@
+"""
+Tests for the query template registry
+Covers the seeded templates and templates shared through Postgres
+"""
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from services.catalog import catalog
+from services.query_templates import QueryTemplate, QueryTemplateRegistry
+from utils.errors import ValidationError
+
+MIGRATION = Path(__file__).parents[2] / "backend" / "db" / "migrations" / "versions" / "0010_query_templates.py"
+
+DEFINITION = {
+    "template_id": "loans-by-id",
+    "dataset_id": "loan_portfolio",
+    "sql": "SELECT * FROM loan_portfolio WHERE loan_id = :loan_id",
+    "parameters": [{"name": "loan_id", "type": "string"}],
+}
+
+
+def seed_templates():
+    spec = importlib.util.spec_from_file_location("migration_0010", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.SEED_TEMPLATES
+
+
+class FakeResult:
+    def __init__(self, rows=(), rowcount=0):
+        self.rows = list(rows)
+        self.rowcount = rowcount
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session stand-in over a dict of query_templates rows"""
+
+    def __init__(self, table):
+        self.table = table
+        self.added = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add(self, record):
+        self.added.append(record)
+
+    async def get(self, model, key):
+        return self.table.get(key)
+
+    async def execute(self, statement):
+        if statement.is_delete:
+            key = statement.whereclause.right.value
+            return FakeResult(rowcount=int(self.table.pop(key, None) is not None))
+        return FakeResult(self.table.values())
+
+    async def commit(self):
+        for record in self.added:
+            if record.template_id in self.table:
+                raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+            self.table[record.template_id] = record
+        self.added = []
+
+
+def registry(table):
+    return QueryTemplateRegistry(session_factory=lambda: FakeSession(table))
+
+
+class TestSeedTemplates:
+    """Test suite for the templates seeded by the migration"""
+
+    @pytest.mark.parametrize("definition", seed_templates(), ids=lambda definition: definition["template_id"])
+    def test_seed_uses_catalog_ids_and_validates(self, definition):
+        card = catalog.get(definition["dataset_id"])
+        assert card is not None and card["id"] == definition["dataset_id"]
+        QueryTemplate(**definition)
+
+
+class TestRegistry:
+    """Test suite for templates stored in Postgres"""
+
+    def test_register_stores_catalog_id(self):
+        table = {}
+        template = asyncio.run(registry(table).register(DEFINITION, created_by="user-1"))
+        assert template.dataset_id == "dataset-1"
+        assert table["loans-by-id"].dataset_id == "dataset-1"
+
+    def test_duplicate_is_rejected(self):
+        table = {}
+        asyncio.run(registry(table).register(DEFINITION))
+        with pytest.raises(ValidationError):
+            asyncio.run(registry(table).register(DEFINITION))
+
+    def test_other_workers_template_is_read_on_first_use(self):
+        table = {}
+        asyncio.run(registry(table).register(DEFINITION))
+        other = registry(table)
+        template = asyncio.run(other.get("loans-by-id"))
+        assert template.parameter_order == ("loan_id",)
+        assert asyncio.run(other.get("missing")) is None
+
+    def test_remove_deletes_stored_template(self):
+        table = {}
+        templates = registry(table)
+        asyncio.run(templates.register(DEFINITION))
+        assert asyncio.run(templates.remove("loans-by-id"))
+        assert table == {}
+        assert asyncio.run(templates.get("loans-by-id")) is None
+
+    def test_load_drops_templates_removed_elsewhere(self):
+        table = {}
+        templates = registry(table)
+        asyncio.run(templates.register(DEFINITION))
+        table.clear()
+        asyncio.run(templates.load(FakeSession(table)))
+        assert templates._templates == {}
@@ -0,0 +1,51 @@
+"""
+Tests for the request tracking middleware
+Covers request metrics keyed by route template
+"""
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from middleware.request_tracking import UNMATCHED_PATH, RequestTrackingMiddleware
+from services.observability import ObservabilityService
+
+
+class StubSLO:
+    def record_request(self, path, status_code):
+        pass
+
+
+def request_keys(*requests):
+    app = FastAPI()
+
+    @app.get("/v1/query/{query_id}")
+    async def get_query(query_id: str):
+        return {"query_id": query_id}
+
+    registry = ObservabilityService()
+    tracked = RequestTrackingMiddleware(app, registry=registry, slo=StubSLO())
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=tracked), base_url="http://test") as client:
+            for method, path in requests:
+                await client.request(method, path)
+
+    asyncio.run(run())
+    return {key: stats[0] for key, stats in registry._request_stats.items()}
+
+
+class TestRequestStats:
+    """Test suite for bounded request metrics"""
+
+    def test_ids_in_paths_share_route_template(self):
+        keys = request_keys(*[("GET", f"/v1/query/{index}") for index in range(5)])
+        assert keys == {("GET", "/v1/query/{query_id}"): 5}
+
+    def test_unknown_paths_share_one_bucket(self):
+        keys = request_keys(("GET", "/probe/a"), ("GET", "/probe/b"), ("GET", "/.env"))
+        assert keys == {("GET", UNMATCHED_PATH): 3}
+
+    def test_made_up_methods_share_one_bucket(self):
+        keys = request_keys(("PURGE", "/v1/query/1"), ("FOO", "/v1/query/2"))
+        assert keys == {("OTHER", "/v1/query/{query_id}"): 2}
@@ -0,0 +1,226 @@
+"""
+Tests for dependency resilience
+Covers circuit breakers, bulkheads and the fallbacks used while a
+dependency is failing
+"""
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.session import GuardedSession, WORKLOAD
+from middleware.rate_limiting import rate_limit_exceeded_handler
+from models.user import User
+from security.auth import authenticate_token, create_access_token, user_snapshots
+from utils.errors import DependencyUnavailableError
+from utils.resilience import Bulkhead, CircuitBreaker, Dependency, dependencies
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_breaker(clock=None, **options):
+    breaker = CircuitBreaker("test", window=10, min_calls=4, open_seconds=10, half_open_calls=2, clock=clock or FakeClock(), **options)
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record(False)
+    assert breaker.state == "open"
+    return breaker
+
+
+class UnreachableDatabase:
+    """Session stand-in whose statements fail as if Postgres were down"""
+
+    async def execute(self, statement):
+        raise OperationalError("SELECT", {}, ConnectionRefusedError("connection refused"))
+
+    async def rollback(self):
+        pass
+
+
+class TestCircuitBreaker:
+    """Test suite for the circuit breaker"""
+
+    def test_opens_on_failure_rate(self):
+        """The breaker opens once half of at least min_calls calls failed"""
+        breaker = CircuitBreaker("test", failure_rate=0.5, window=10, min_calls=4, clock=FakeClock())
+        for success in (True, False, True):
+            breaker.allow()
+            breaker.record(success)
+        assert breaker.state == "closed"
+        breaker.allow()
+        breaker.record(False)
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.snapshot()["rejected"] == 1
+
+    def test_slow_calls_count_as_bad(self):
+        """Successful but slow calls open the breaker too"""
+        breaker = CircuitBreaker("test", slow_call_seconds=0.1, window=10, min_calls=4, clock=FakeClock())
+        for _ in range(4):
+            breaker.allow()
+            breaker.record(True, latency=0.5)
+        assert breaker.state == "open"
+        assert breaker.snapshot()["slow_calls"] == 4
+
+    def test_half_open_closes_after_successful_trials(self):
+        """After open_seconds a limited number of trials pass; all succeeding closes it"""
+        clock = FakeClock()
+        breaker = open_breaker(clock)
+        clock.now = 10.0
+        assert breaker.state == "half_open"
+        assert breaker.allow() and breaker.allow()
+        assert not breaker.allow()
+        breaker.record(True)
+        breaker.record(True)
+        assert breaker.state == "closed"
+
+    def test_failed_trial_reopens(self):
+        """A bad trial call reopens the breaker for another open period"""
+        clock = FakeClock()
+        breaker = open_breaker(clock)
+        clock.now = 10.0
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == "open"
+        clock.now = 15.0
+        assert not breaker.allow()
+
+
+class TestDependency:
+    """Test suite for guarded dependency calls"""
+
+    def test_open_circuit_fails_fast(self):
+        """An open breaker raises without calling the dependency"""
+        calls = []
+
+        async def fn():
+            calls.append(1)
+
+        dependency = Dependency("redis", open_breaker())
+        with pytest.raises(DependencyUnavailableError):
+            asyncio.run(dependency.call(fn))
+        assert calls == []
+
+    def test_errors_are_recorded(self):
+        """Exceptions from the dependency count as failures and propagate"""
+        async def fn():
+            raise ConnectionError("refused")
+
+        dependency = Dependency("redis", CircuitBreaker("redis", window=10, min_calls=2, clock=FakeClock()))
+
+        async def run():
+            for _ in range(2):
+                with pytest.raises(ConnectionError):
+                    await dependency.call(fn)
+
+        asyncio.run(run())
+        assert dependency.breaker.state == "open"
+
+    def test_bulkhead_rejects_when_full(self):
+        """Callers beyond capacity are rejected after max_wait instead of queueing"""
+        async def run():
+            release = asyncio.Event()
+            dependency = Dependency("s3", CircuitBreaker("s3"), Bulkhead("s3", capacity=2, max_wait=0.01))
+            holders = [asyncio.ensure_future(dependency.call(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(DependencyUnavailableError):
+                await dependency.call(release.wait)
+            release.set()
+            await asyncio.gather(*holders)
+            return dependency.snapshot()["bulkhead"]
+
+        bulkhead = asyncio.run(run())
+        assert bulkhead == {"capacity": 2, "in_use": 0, "rejected": 1}
+
+
+class TestFallbacks:
+    """Test suite for degraded operation while a dependency is down"""
+
+    def test_rate_limits_enforced_without_redis(self):
+        """With Redis unreachable, limits are enforced in memory instead of erroring"""
+        limiter = Limiter(
+            key_func=lambda: "client",
+            storage_uri="guarded+redis://127.0.0.1:1/0",
+            storage_options={"socket_timeout": 0.2, "socket_connect_timeout": 0.2},
+            in_memory_fallback_enabled=True
+        )
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+        @app.get("/limited")
+        @limiter.limit("3/minute")
+        async def limited(request: Request):
+            return {"ok": True}
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return [(await client.get("/limited")).status_code for _ in range(5)]
+
+        assert asyncio.run(run()) == [200, 200, 200, 429, 429]
+
+    def test_open_postgres_circuit_skips_the_database(self, monkeypatch):
+        """Sessions raise immediately while the Postgres breaker is open"""
+        monkeypatch.setattr(dependencies["postgres"], "breaker", open_breaker())
+
+        async def run():
+            async with GuardedSession() as session:
+                await session.execute(text("SELECT 1"))
+
+        with pytest.raises(DependencyUnavailableError):
+            asyncio.run(run())
+
+    @pytest.mark.parametrize("options, slow_calls", [({}, 1), (WORKLOAD, 0)])
+    def test_slow_workload_statements_do_not_count(self, monkeypatch, options, slow_calls):
+        """A long analyst query is not a sign of Postgres trouble; a slow control-plane statement is"""
+        breaker = CircuitBreaker("postgres", slow_call_seconds=0.01)
+        monkeypatch.setattr(dependencies["postgres"], "breaker", breaker)
+
+        async def slow_execute(self, statement, params=None, **kwargs):
+            await asyncio.sleep(0.05)
+
+        async def connection(self):
+            pass
+
+        monkeypatch.setattr(AsyncSession, "execute", slow_execute)
+        monkeypatch.setattr(AsyncSession, "connection", connection)
+
+        async def run():
+            async with GuardedSession() as session:
+                await session.execute(text("SELECT 1"), execution_options=options)
+
+        asyncio.run(run())
+        assert breaker.stats["calls"] == 1
+        assert breaker.stats["slow_calls"] == slow_calls
+
+    def test_authenticates_from_user_snapshot(self):
+        """A recently seen user still authenticates while Postgres is unreachable"""
+        user_id = uuid.uuid4()
+        user_snapshots.put(User(id=user_id, email="a@example.com", full_name="A", role="analyst", is_active=True))
+        token = create_access_token({"sub": str(user_id)})
+
+        user = asyncio.run(authenticate_token(UnreachableDatabase(), token))
+        assert user.id == user_id
+        assert user.role == "analyst"
+
+    def test_unknown_user_without_database_is_unavailable(self):
+        """Without a snapshot the lookup fails as unavailable (503), not unauthorized"""
+        token = create_access_token({"sub": str(uuid.uuid4())})
+        with pytest.raises(DependencyUnavailableError):
+            asyncio.run(authenticate_token(UnreachableDatabase(), token))
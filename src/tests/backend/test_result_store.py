@@ -0,0 +1,104 @@
+"""
+Tests for the result store
+Covers spilling results, cursor paging, truncation and the expiry sweep
+"""
+import os
+
+import orjson
+import pytest
+
+from services.result_store import ResultStore
+
+COLUMNS = ["id", "name"]
+ROWS = [[index, f"row {index}"] for index in range(10)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path), ttl=60)
+
+
+def spill(store, rows=ROWS, row_format="arrays", page_size=4, query_id="q1"):
+    writer = store.writer(query_id, "user-1", COLUMNS, row_format, page_size)
+    for start in range(0, len(rows), 3):
+        if not writer.write(rows[start:start + 3]):
+            break
+    return writer.commit()
+
+
+def pages(store, query_id="q1"):
+    """Every page, following the cursors"""
+    result, cursor = [], (0, 0)
+    while cursor is not None:
+        meta, lines, cursor = store.read_page(query_id, *cursor)
+        result.append(orjson.loads(orjson.dumps(store.page_data(lines, meta))))
+    return result
+
+
+class TestPaging:
+    """Test suite for cursor paging"""
+
+    def test_pages_cover_every_row_once(self, store):
+        spill(store)
+        assert pages(store) == [ROWS[0:4], ROWS[4:8], ROWS[8:10]]
+
+    def test_cursor_carries_row_and_byte_offsets(self, store):
+        spill(store)
+        _, first, cursor = store.read_page("q1")
+        assert cursor == (4, len(first))
+        _, lines, _ = store.read_page("q1", *cursor, limit=1)
+        assert orjson.loads(lines) == ROWS[4]
+
+    def test_object_rows(self, store):
+        spill(store, row_format="objects", page_size=20)
+        assert pages(store) == [[dict(zip(COLUMNS, row)) for row in ROWS]]
+
+    def test_column_format(self, store):
+        spill(store, rows=ROWS[:3], row_format="columns")
+        assert pages(store) == [[[0, 1, 2], ["row 0", "row 1", "row 2"]]]
+
+    def test_empty_result(self, store):
+        meta = spill(store, rows=[])
+        assert meta["row_count"] == 0
+        assert pages(store) == [[]]
+
+    def test_offset_inside_a_row_rejected(self, store):
+        spill(store)
+        with pytest.raises(ValueError):
+            store.read_page("q1", 1, 3)
+
+    def test_offset_past_the_end_rejected(self, store):
+        meta = spill(store)
+        with pytest.raises(ValueError):
+            store.read_page("q1", 0, meta["bytes"] + 1)
+
+    def test_unknown_result(self, store):
+        assert store.read_page("missing") is None
+
+
+class TestLimits:
+    """Test suite for size limits and expiry"""
+
+    def test_truncated_at_whole_rows(self, tmp_path):
+        store = ResultStore(str(tmp_path), max_result_bytes=50)
+        meta = spill(store, page_size=100)
+        assert meta["truncated"]
+        rows = pages(store)[0]
+        assert rows == ROWS[:len(rows)]
+        assert meta["row_count"] == len(rows)
+        assert meta["bytes"] <= 50
+
+    def test_sweep_expires_unread_results(self, store):
+        spill(store)
+        store.sweep(now=os.stat(store.path("q1", ".json")).st_mtime + 61)
+        assert store.read_page("q1") is None
+        assert not os.path.exists(store.path("q1", ".rows"))
+
+    def test_sweep_evicts_least_recently_read(self, tmp_path):
+        store = ResultStore(str(tmp_path), max_total_bytes=200)
+        for query_id in ("old", "new"):
+            spill(store, query_id=query_id)
+        os.utime(store.path("old", ".json"), (1, 1))
+        store.sweep(now=2)
+        assert store.meta("old") is None
+        assert store.meta("new") is not None
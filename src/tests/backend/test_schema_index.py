@@ -0,0 +1,143 @@
+"""
+Tests for the schema context index
+Covers tokenization, BM25 table and column ranking, hybrid embedding
+scores and following catalog changes
+"""
+import numpy as np
+
+from services.catalog import DEFAULT_DATASETS, DatasetCatalog
+from services.schema_index import SchemaIndex, format_prompt_context, tokenize
+
+CUSTOMERS = {
+    "id": "dataset-3",
+    "name": "customers",
+    "description": "Bank customers and their segments",
+    "schema": [
+        {"name": "customer_id", "type": "VARCHAR", "pii": True, "description": "Customer identifier"},
+        {"name": "segment", "type": "VARCHAR", "description": "Retail or corporate segment"},
+    ],
+}
+
+
+def index(*cards, **options):
+    schema_index = SchemaIndex(**options)
+    for card in cards or DEFAULT_DATASETS:
+        schema_index.upsert(card)
+    return schema_index
+
+
+def table_names(context):
+    return [table["name"] for table in context["tables"]]
+
+
+class KeywordEmbedder:
+    """Embeds text as counts of a few keywords"""
+
+    KEYWORDS = ("loan", "alert", "customer")
+
+    def __call__(self, texts):
+        return np.array([[tokenize(text).count(word) for word in self.KEYWORDS] for text in texts], dtype=np.float32)
+
+
+class TestTokenize:
+    """Test suite for BM25 tokenization"""
+
+    def test_identifiers_split_and_plurals_folded(self):
+        assert tokenize("Show customer_ssn for all Loans") == ["customer", "ssn", "loan"]
+
+    def test_double_s_and_short_words_kept(self):
+        assert tokenize("business gas") == ["business", "gas"]
+
+
+class TestRanking:
+    """Test suite for BM25 retrieval"""
+
+    def test_relevant_table_ranked_first(self):
+        context = index().retrieve("high risk loans by amount")
+        assert table_names(context) == ["loan_portfolio"]
+        assert context["tables"][0]["score"] > 0
+
+    def test_unmatched_question_returns_nothing(self):
+        assert index().retrieve("weather forecast")["tables"] == []
+
+    def test_rare_terms_outweigh_common_ones(self):
+        """'customer' appears in every card; 'segment' only in one"""
+        schema_index = index(*DEFAULT_DATASETS, CUSTOMERS)
+        assert table_names(schema_index.retrieve("customer segment"))[0] == "customers"
+
+    def test_max_tables(self):
+        schema_index = index(*DEFAULT_DATASETS, CUSTOMERS)
+        assert len(schema_index.retrieve("customer", max_tables=2)["tables"]) == 2
+
+    def test_matching_columns_ranked_within_table(self):
+        """amount and risk_rating match two terms each (ties keep schema order), loan_id one"""
+        columns = index().retrieve("loan amount and risk rating")["tables"][0]["columns"]
+        assert [column["name"] for column in columns] == ["amount", "risk_rating", "loan_id"]
+        assert columns[0]["score"] == columns[1]["score"] > columns[2]["score"]
+
+    def test_first_columns_kept_when_none_match(self):
+        columns = index().retrieve("portfolio", max_columns=8)["tables"][0]["columns"]
+        assert [column["name"] for column in columns] == ["loan_id", "customer_ssn", "amount"]
+        assert columns[1]["pii"]
+
+
+class TestUpdates:
+    """Test suite for upserts, removals and catalog sync"""
+
+    def test_removed_card_never_returned(self):
+        schema_index = index()
+        assert schema_index.remove("dataset-1")
+        assert not schema_index.remove("dataset-1")
+        assert "loan_portfolio" not in table_names(schema_index.retrieve("loan amount"))
+        assert len(schema_index) == 1
+
+    def test_removed_slot_is_reused(self):
+        schema_index = index()
+        schema_index.remove("dataset-1")
+        schema_index.upsert(CUSTOMERS)
+        assert len(schema_index._cards) == 2
+        assert table_names(schema_index.retrieve("segment")) == ["customers"]
+
+    def test_replaced_card_drops_old_terms(self):
+        schema_index = index()
+        schema_index.upsert(dict(DEFAULT_DATASETS[0], description="Mortgages", schema=[]))
+        assert table_names(schema_index.retrieve("mortgage")) == ["loan_portfolio"]
+        assert table_names(schema_index.retrieve("risk rating")) == []
+
+    def test_follows_catalog_changes(self):
+        catalog = DatasetCatalog(DEFAULT_DATASETS)
+        schema_index = SchemaIndex(catalog=catalog)
+        assert table_names(schema_index.retrieve("alert severity")) == ["aml_alerts"]
+        catalog.upsert(CUSTOMERS)
+        assert table_names(schema_index.retrieve("segment")) == ["customers"]
+        catalog.remove("dataset-2")
+        assert table_names(schema_index.retrieve("alert severity")) == []
+
+
+class TestHybrid:
+    """Test suite for blended BM25 and embedding scores"""
+
+    def test_embeddings_find_tables_without_shared_terms(self):
+        schema_index = index(embedder=KeywordEmbedder(), embedding_weight=1.0)
+        context = schema_index.retrieve("loan", max_tables=1)
+        assert table_names(context) == ["loan_portfolio"]
+
+    def test_blend_keeps_bm25_order_for_keyword_matches(self):
+        schema_index = index(embedder=KeywordEmbedder(), embedding_weight=0.5)
+        assert table_names(schema_index.retrieve("alert severity", max_tables=1)) == ["aml_alerts"]
+
+    def test_removed_card_never_returned(self):
+        schema_index = index(embedder=KeywordEmbedder(), embedding_weight=1.0)
+        schema_index.remove("dataset-1")
+        assert "loan_portfolio" not in table_names(schema_index.retrieve("loan"))
+
+
+class TestPromptContext:
+    """Test suite for rendering retrieved context"""
+
+    def test_one_line_per_table_and_column(self):
+        context = index().retrieve("alert severity", max_columns=1)
+        assert format_prompt_context(context).splitlines() == [
+            f"aml_alerts: {DEFAULT_DATASETS[1]['description']}",
+            "  severity VARCHAR -- Alert severity",
+        ]
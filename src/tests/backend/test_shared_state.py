@@ -0,0 +1,85 @@
+"""
+Tests for shared worker state
+Covers the revoked-token filter and its generations, and worker counters
+"""
+import pytest
+
+from utils.shared_state import READY, SharedState
+
+ROTATION = 3600
+NOW = 1_800_000_000.0
+
+
+@pytest.fixture
+def state():
+    return SharedState.local(revocation_size=4096, revocation_hashes=4, rotation=ROTATION)
+
+
+class TestRevocation:
+    """Test suite for the revocation filter"""
+
+    def test_revoked_token_is_found(self, state):
+        state.revoke("jti-1", now=NOW)
+        assert state.is_revoked("jti-1", now=NOW)
+        assert not state.is_revoked("jti-2", now=NOW)
+        assert state.revoked == 1
+
+    def test_revocation_outlives_one_token_lifetime(self, state):
+        """A token issued just before the revocation is still unexpired in the next period"""
+        state.revoke("jti-1", now=NOW)
+        assert state.is_revoked("jti-1", now=NOW + ROTATION)
+
+    def test_revocation_expires_after_two_periods(self, state):
+        state.revoke("jti-1", now=NOW)
+        assert not state.is_revoked("jti-1", now=NOW + 2 * ROTATION)
+
+    def test_prepare_rotation_keeps_live_generations(self, state):
+        state.revoke("jti-1", now=NOW)
+        state.prepare_rotation(now=NOW)
+        state.prepare_rotation(now=NOW + ROTATION)
+        assert state.is_revoked("jti-1", now=NOW + ROTATION)
+
+    def test_reused_generation_is_cleared(self, state):
+        """Three periods later the same generation holds a new period, without old entries"""
+        state.revoke("jti-1", now=NOW)
+        state.revoke("jti-2", now=NOW + 3 * ROTATION)
+        assert state.is_revoked("jti-2", now=NOW + 3 * ROTATION)
+        assert not state.is_revoked("jti-1", now=NOW + 3 * ROTATION)
+
+    def test_no_false_positives_at_low_load(self, state):
+        for index in range(20):
+            state.revoke(f"revoked-{index}", now=NOW)
+        assert not any(state.is_revoked(f"other-{index}", now=NOW) for index in range(1000))
+
+    def test_revocation_visible_to_other_workers(self):
+        launcher = SharedState.create(2, revocation_size=4096, revocation_hashes=4, rotation=ROTATION)
+        try:
+            first = SharedState(launcher.segment.buf, 1)
+            second = SharedState(launcher.segment.buf, 2)
+            first.revoke("jti-1", now=NOW)
+            assert second.is_revoked("jti-1", now=NOW)
+            for worker in (first, second):
+                worker._words.release()
+                worker._bytes.release()
+        finally:
+            launcher.close(unlink=True)
+
+
+class TestCounters:
+    """Test suite for worker rows"""
+
+    def test_totals_include_retired_workers(self):
+        launcher = SharedState.create(2, revocation_size=64, revocation_hashes=2)
+        try:
+            launcher.slot = 1
+            launcher.claim(pid=101)
+            launcher.set_state(READY)
+            launcher.publish({"requests.count": 5, "queries.total": 2})
+            assert [worker["state"] for worker in launcher.workers()] == ["ready"]
+
+            launcher.retire(1)
+            assert launcher.workers() == []
+            assert launcher.totals()["requests.count"] == 5
+            assert launcher.totals()["queries.total"] == 2
+        finally:
+            launcher.close(unlink=True)
@@ -0,0 +1,79 @@
+"""
+Tests for the SLO engine
+Covers rolling-window event counts and burn-rate evaluation
+"""
+import pytest
+
+from services.slo import RollingWindow, ServiceLevelObjective
+
+
+class TestRollingWindow:
+    """Test suite for RollingWindow"""
+
+    def test_counts_within_span(self):
+        window = RollingWindow(10)
+        for second in range(5):
+            window.add(1000 + second, good=second != 2)
+        assert (window.good_sum, window.total_sum, window.bad_sum) == (4, 5, 1)
+
+    def test_expired_slots_drop_out(self):
+        window = RollingWindow(10)
+        window.add(1000, good=False)
+        window.add(1005, good=True)
+        window.advance(1010)
+        assert (window.good_sum, window.total_sum) == (1, 1)
+        window.advance(1015)
+        assert window.total_sum == 0
+
+    def test_gap_longer_than_span_clears_ring(self):
+        window = RollingWindow(10)
+        for second in range(10):
+            window.add(1000 + second, good=True)
+        window.add(5000, good=False)
+        assert (window.good_sum, window.total_sum) == (0, 1)
+        assert sum(window.total) == 1
+
+    def test_clock_going_back_counts_in_head_slot(self):
+        window = RollingWindow(10)
+        window.add(1005, good=True)
+        window.add(1003, good=True)
+        assert window.total[1005 % 10] == 2
+        assert window.head == 1005
+
+    def test_coarse_resolution(self):
+        window = RollingWindow(600, resolution=60)
+        assert window.size == 10
+        window.add(6000, good=True)
+        window.add(6059, good=False)
+        assert window.total[100 % 10] == 2
+        window.advance(6000 + 600)
+        assert window.total_sum == 0
+
+
+class TestServiceLevelObjective:
+    """Test suite for burn-rate alerting"""
+
+    def test_no_traffic_is_ok(self):
+        slo = ServiceLevelObjective("availability", "", objective=0.99)
+        assert slo.burn_rate("1h") is None
+        assert slo.evaluate(1000) == "ok"
+
+    def test_too_few_events_never_alert(self):
+        slo = ServiceLevelObjective("availability", "", objective=0.99, min_events=20)
+        for second in range(10):
+            slo.record(False, 1000 + second)
+        assert slo.evaluate(1010) == "ok"
+
+    def test_sustained_errors_are_critical(self):
+        slo = ServiceLevelObjective("availability", "", objective=0.99, min_events=20)
+        for second in range(100):
+            slo.record(second % 2 == 0, 1000 + second)
+        assert slo.burn_rate("1h") == pytest.approx(50)
+        assert slo.evaluate(1100) == "critical"
+
+    def test_slow_burn_is_a_warning(self):
+        """About 10x budget: past the 6h rule's threshold, short of the 1h rule's"""
+        slo = ServiceLevelObjective("availability", "", objective=0.99, min_events=20)
+        for second in range(1000):
+            slo.record(second % 10 != 0, 1000 + second)
+        assert slo.evaluate(2000) == "warning"
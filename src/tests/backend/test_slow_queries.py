@@ -0,0 +1,84 @@
+"""
+Tests for the slow query analyzer
+Covers latency baselines and their persistence across restarts
+"""
+import asyncio
+
+from models.query_history import QueryShapeBaseline
+from services.slow_queries import SlowQueryAnalyzer
+from utils.sql import shape_fingerprint
+
+SQL = "SELECT * FROM loan_portfolio WHERE id = 1"
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session stand-in returning the stored baselines to any query"""
+
+    def __init__(self, table):
+        self.table = table
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        return FakeResult(list(self.table.values()))
+
+    async def commit(self):
+        pass
+
+
+class FakeAnalyzer(SlowQueryAnalyzer):
+    """Analyzer whose baselines are written to a dict keyed by fingerprint"""
+
+    def __init__(self, table, **options):
+        super().__init__(session_factory=lambda: FakeSession(table), window=4, **options)
+        self.table = table
+
+    async def _write_baselines(self, session, rows):
+        for row in rows:
+            self.table[row["fingerprint"]] = QueryShapeBaseline(**row)
+
+
+class TestBaselines:
+    """Test suite for shape baselines"""
+
+    def test_first_window_sets_baseline(self):
+        slow_queries = FakeAnalyzer({})
+        for _ in range(4):
+            slow_queries.observe(SQL, "dataset-1", 20.0, 1, True)
+        assert slow_queries.get(shape_fingerprint(SQL))["baseline_p95_ms"] is not None
+
+    def test_regression_flagged_against_baseline(self):
+        slow_queries = FakeAnalyzer({}, min_regression_ms=10.0)
+        for duration in [10.0] * 4 + [400.0] * 4:
+            slow_queries.observe(SQL, "dataset-1", duration, 1, True)
+        flags = slow_queries.get(shape_fingerprint(SQL))["flags"]
+        assert [flag["type"] for flag in flags] == ["latency_regression"]
+
+    def test_baselines_survive_restart(self):
+        table = {}
+        before = FakeAnalyzer(table)
+        for _ in range(4):
+            before.observe(SQL, "dataset-1", 20.0, 1, True)
+        assert asyncio.run(before.flush_baselines()) == 1
+        assert asyncio.run(before.flush_baselines()) == 0
+        baseline = before.get(shape_fingerprint(SQL))["baseline_p95_ms"]
+
+        after = FakeAnalyzer(table)
+        asyncio.run(after.load_baselines(FakeSession(table)))
+        after.observe("SELECT * FROM loan_portfolio WHERE id = -7", "dataset-1", 20.0, 1, True)
+        assert after.get(shape_fingerprint(SQL))["baseline_p95_ms"] == baseline
@@ -0,0 +1,145 @@
+"""
+Tests for dataset snapshots
+Covers manifest diffs, bucket sizing, loading the manifest only where
+snapshots are diffed and citations taken by other workers
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import undefer
+
+from models.snapshot import DatasetSnapshot
+from services.snapshots import SnapshotService, bucket_count_for, diff_manifests, pack_manifest, unpack_manifest
+from utils.errors import ValidationError
+
+COUNTS = [3, 0, 5, 2]
+HASHES = [11, 0, (1 << 64) - 1, 7]
+
+
+def compiled(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestManifestLoading:
+    """Test suite for the deferred manifest column"""
+
+    def test_manifest_not_selected_by_default(self):
+        sql = compiled(select(DatasetSnapshot))
+        assert "dataset_snapshots.digest" in sql
+        assert "dataset_snapshots.manifest" not in sql
+
+    def test_manifest_selected_when_undeferred(self):
+        sql = compiled(select(DatasetSnapshot).options(undefer(DatasetSnapshot.manifest)))
+        assert "dataset_snapshots.manifest" in sql
+
+
+def snapshot(counts=COUNTS, hashes=HASHES, key_column="id"):
+    return DatasetSnapshot(
+        id=uuid.uuid4(), dataset_id="dataset-1", table_name="loans", key_column=key_column,
+        bucket_count=len(counts), row_count=sum(counts), digest="", manifest=pack_manifest(counts, hashes)
+    )
+
+
+class TestManifests:
+    """Test suite for manifest packing and diffs"""
+
+    def test_round_trip(self):
+        counts, hashes = unpack_manifest(pack_manifest(COUNTS, HASHES), len(COUNTS))
+        assert counts.tolist() == COUNTS
+        assert hashes.tolist() == HASHES
+
+    def test_identical(self):
+        manifest = pack_manifest(COUNTS, HASHES)
+        diff = diff_manifests(manifest, manifest, len(COUNTS), limit=10)
+        assert diff["identical"]
+        assert diff["changed_buckets"] == 0
+        assert diff["buckets"] == []
+        assert diff["rows_before"] == diff["rows_after"] == 10
+
+    def test_changed_content_and_counts(self):
+        """An update changes only the hash; inserts and deletes change the count too"""
+        after = pack_manifest([3, 1, 5, 2], [12, 9, (1 << 64) - 1, 7])
+        diff = diff_manifests(pack_manifest(COUNTS, HASHES), after, len(COUNTS), limit=10)
+        assert not diff["identical"]
+        assert diff["changed_fraction"] == 0.5
+        assert diff["buckets"] == [
+            {"bucket": 0, "rows_before": 3, "rows_after": 3},
+            {"bucket": 1, "rows_before": 0, "rows_after": 1},
+        ]
+        assert diff["rows_after"] == 11
+        assert not diff["truncated"]
+
+    def test_limit_truncates_listing(self):
+        after = pack_manifest([4, 1, 6, 3], HASHES)
+        diff = diff_manifests(pack_manifest(COUNTS, HASHES), after, len(COUNTS), limit=2)
+        assert diff["changed_buckets"] == 4
+        assert [bucket["bucket"] for bucket in diff["buckets"]] == [0, 1]
+        assert diff["truncated"]
+
+    def test_service_diff_rejects_incomparable_snapshots(self):
+        with pytest.raises(ValidationError):
+            SnapshotService().diff(snapshot(), snapshot(key_column="loan_id"))
+
+    def test_service_diff_names_snapshots(self):
+        before, after = snapshot(), snapshot(hashes=[11, 0, 1, 7])
+        diff = SnapshotService().diff(before, after)
+        assert (diff["from"], diff["to"]) == (str(before.id), str(after.id))
+        assert diff["changed_buckets"] == 1
+
+
+class TestBucketCount:
+    """Test suite for bucket sizing"""
+
+    @pytest.mark.parametrize("rows, expected", [(0, 1), (64, 1), (65, 2), (1000, 16), (1 << 30, 1 << 10)])
+    def test_power_of_two_capped(self, rows, expected):
+        assert bucket_count_for(rows, bucket_rows=64, max_buckets=1 << 10) == expected
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session stand-in returning the newest snapshot rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, statement):
+        return FakeResult(self.rows)
+
+
+class TestCitations:
+    """Test suite for the latest-snapshot citation cache"""
+
+    def test_refresh_picks_up_newer_snapshots(self):
+        service = SnapshotService()
+        first = snapshot()
+        first.created_at = datetime(2026, 10, 19)
+        asyncio.run(service.load_latest(FakeSession([first])))
+        assert service.citation("loan_portfolio")["snapshot_id"] == str(first.id)
+
+        newer = snapshot()
+        newer.created_at = first.created_at + timedelta(minutes=1)
+        asyncio.run(service.load_latest(FakeSession([newer])))
+        assert service.citation("dataset-1")["snapshot_id"] == str(newer.id)
+
+    def test_refresh_never_moves_back(self):
+        service = SnapshotService()
+        newer, older = snapshot(), snapshot()
+        newer.created_at = datetime(2026, 10, 19, 1)
+        older.created_at = datetime(2026, 10, 19)
+        asyncio.run(service.load_latest(FakeSession([newer])))
+        asyncio.run(service.load_latest(FakeSession([older])))
+        assert service.citation("dataset-1")["snapshot_id"] == str(newer.id)
@@ -0,0 +1,40 @@
+"""
+Tests for SQL text utilities
+Covers query shapes and the fingerprint shared by query history and
+slow-query analytics
+"""
+import pytest
+
+from utils.sql import query_shape, shape_fingerprint
+
+
+class TestQueryShape:
+    """Test suite for query_shape"""
+
+    @pytest.mark.parametrize("a, b", [
+        ("SELECT * FROM t WHERE id = 1", "select *  from T where ID = 42"),
+        ("SELECT * FROM t WHERE id = 1", "SELECT * FROM t WHERE id = -1"),
+        ("SELECT * FROM t WHERE name = 'a'", "SELECT * FROM t WHERE name = 'it''s'"),
+        ("SELECT * FROM t WHERE id IN (1)", "SELECT * FROM t WHERE id IN (1, -2, 3)"),
+        ("SELECT x FROM t WHERE y BETWEEN 1 AND 2", "SELECT x FROM t WHERE y BETWEEN -1.5 AND +2"),
+        ("SELECT 1", "SELECT 2; -- trailing comment"),
+    ])
+    def test_same_shape(self, a, b):
+        assert query_shape(a) == query_shape(b)
+        assert shape_fingerprint(a) == shape_fingerprint(b)
+
+    @pytest.mark.parametrize("a, b", [
+        ("SELECT * FROM t WHERE id = 1", "SELECT * FROM u WHERE id = 1"),
+        ("SELECT * FROM t WHERE id = :id", "SELECT * FROM t WHERE id = :other"),
+        ("SELECT a FROM t", "SELECT a - 1 FROM t"),
+        ('SELECT "Amount" FROM t', 'SELECT "amount" FROM t'),
+        ("SELECT * FROM t WHERE id IN (1)", "SELECT * FROM t WHERE id IN (SELECT 1)"),
+    ])
+    def test_different_shape(self, a, b):
+        assert shape_fingerprint(a) != shape_fingerprint(b)
+
+    def test_subtraction_is_not_a_sign(self):
+        assert query_shape("SELECT a - 1, f(x) - 2 FROM t") == "select a-?,f(x)-?from t"
+
+    def test_bind_placeholders_kept(self):
+        assert query_shape("SELECT * FROM t WHERE id = :id AND n = $1") == "select*from t where id=:id and n=$1"